@@ -23,16 +23,37 @@ REPORTS_DIR = ML_ROOT / "outputs" / "reports"
 CHARTS_DIR  = ML_ROOT / "outputs" / "charts"
 
 # ── CSV files generated by ML main.py ─────────────────────────────────────────
+# Every run publishes a complete set into REPORTS_DIR/versions/<version>/ and
+# swaps REPORTS_DIR/current.json to it (src/publishing.py). ml_service pins one
+# version per request and reads these FILE NAMES from it; the paths below are
+# the flat pre-versioning layout, still used until the first versioned run.
 BUDGETS_CSV    = REPORTS_DIR / "frontend_category_budgets.csv"
 INVENTORY_CSV  = REPORTS_DIR / "detailed_inventory_plan.csv"
+INVENTORY_PARQUET = REPORTS_DIR / "detailed_inventory_plan.parquet"   # typed copy, pushdown reads
 EVALUATION_CSV = REPORTS_DIR / "model_evaluation.csv"
 COMPARISON_CSV = REPORTS_DIR / "model_comparison.csv"
 TRENDS_CSV     = ML_ROOT / "data" / "preprocessed_12_month_data.csv"
 
+# ── Per-stage pipeline profile written by ML main.py ──────────────────────────
+# pipeline_profile.json is part of each version; the history spans versions
+PROFILE_JSON    = REPORTS_DIR / "pipeline_profile.json"
+PROFILE_HISTORY = REPORTS_DIR / "pipeline_profile_history.jsonl"
+
+# ── Trained model artifacts written by ML main.py ─────────────────────────────
+# latest.json points at the current forecaster_<version>.joblib
+MODELS_DIR = ML_ROOT / "outputs" / "models"
+
 # ── Chart images generated by ML main.py ──────────────────────────────────────
 BUDGET_CHART_PNG = CHARTS_DIR / "category_budget_chart.png"
 TRENDS_CHART_PNG = CHARTS_DIR / "monthly_category_trends.png"
 
+# ── Charts rendered on demand by this API ─────────────────────────────────────
+# main.py writes only the chart data; PNGs are drawn on request and cached
+# per report version in CHART_CACHE_DIR
+CATEGORY_SALES_CSV = REPORTS_DIR / "category_monthly_sales.csv"
+CHART_CACHE_DIR    = CHARTS_DIR / "cache"
+CHART_DPI          = 150
+
 import os
 
 # ── CORS settings ─────────────────────────────────────────────────────────────
@@ -60,16 +81,24 @@ API_DESCRIPTION = """
 ML-powered stock predictions for People's Pharmacy.
 
 ### How To Use
-1. Call **POST /api/v1/predict/run** first to generate predictions
-2. Then call any GET endpoint to retrieve the results
+1. Call **POST /api/v1/predict/retrain** once to train and save the model
+2. Call **POST /api/v1/predict/run** to refresh predictions from the saved model
+3. Then call any GET endpoint to retrieve the results
 
 ### Available Endpoints
-- **POST /predict/run** — Run the ML prediction pipeline (~60 seconds)
+- **POST /predict/retrain** — Start a background retrain job (returns a job_id at once)
+- **GET /predict/jobs/{job_id}** — Retrain progress per stage (also as SSE on /events)
+- **POST /predict/run** — Regenerate the reports from the saved model (no retraining)
+- **POST /predict/budget-scenarios** — Budgets for a grid of safety factors / category caps
+- **GET  /predict/reports/versions** — Published report versions (POST /reports/rollback to switch back)
+- **GET  /predict/forecast** — What-if predictions for any month / safety factor
 - **GET  /predict/summary** — Dashboard overview card
 - **GET  /predict/budgets** — Budget per medicine category
 - **GET  /predict/inventory** — Full item inventory plan
 - **GET  /predict/evaluation** — Model accuracy metrics
 - **GET  /predict/trends** — 12-month sales trends
+- **GET  /predict/charts/{chart}** — Budget / trend chart PNG (rendered on demand, cached)
+- **GET  /predict/charts/{chart}/series** — The same chart as JSON series
 """
 
 API_VERSION = "1.0.0"
@@ -5,10 +5,11 @@ This is the ENTRY POINT of the FastAPI server.
 
 What it does:
 1. Creates the FastAPI app
-2. Sets up CORS (allows React to call this API)
-3. Registers all routers (URL groups)
-4. Adds health check endpoint
-5. Starts the server
+2. Loads the trained ML model at startup
+3. Sets up CORS (allows React to call this API)
+4. Registers all routers (URL groups)
+5. Adds health check endpoint
+6. Starts the server
 
 Run with:
     uvicorn main:app --reload --port 8002
@@ -19,6 +20,7 @@ Then visit:
     http://localhost:8002/api/v1/...  ← Your actual endpoints
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -32,6 +34,15 @@ from core.config import (
     API_PREFIX,
 )
 from routers import predict
+from services import ml_service
+
+
+# ── Startup ───────────────────────────────────────────────────────────────────
+# Load the trained model ONCE so predictions never wait on disk or retraining
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ml_service.load_model_on_startup()
+    yield
 
 
 # ── Create FastAPI App ────────────────────────────────────────────────────────
@@ -43,6 +54,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 
@@ -72,13 +84,17 @@ app.include_router(predict.router, prefix=API_PREFIX)
     "/health",
     tags=["Health"],
     summary="Health Check",
-    description="Returns 'healthy' if the API server is running."
+    description="Returns 'healthy' if the API server is running, "
+                "plus hit/miss counters of the in-memory report cache "
+                "and of the on-demand chart cache."
 )
 async def health_check():
     return {
         "status": "healthy",
         "api_version": API_VERSION,
         "timestamp": datetime.now().isoformat(),
+        "report_cache": ml_service.get_report_cache_stats(),
+        "chart_cache": ml_service.get_chart_cache_stats(),
     }
 
 
@@ -13,19 +13,30 @@ What a ROUTER does:
 It does NOT contain business logic — that's in ml_service.py
 """
 
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import Literal, Optional
 
+from schemas.requests import BudgetScenarioRequest
 from schemas.responses import (
     RunPredictionResponse,
+    ForecastResponse,
+    BudgetScenariosResponse,
+    JobResponse,
+    JobListResponse,
     BudgetsResponse,
     InventoryResponse,
     EvaluationResponse,
+    PipelineProfileResponse,
     TrendsResponse,
+    ChartSeriesResponse,
+    ReportVersionsResponse,
+    RollbackResponse,
     DashboardSummary,
     ErrorResponse,
 )
 from services import ml_service
+from core.config import CHART_DPI
 
 # ── Create router ─────────────────────────────────────────────────────────────
 # prefix="/predict" means all URLs in this file start with /predict
@@ -37,43 +48,41 @@ router = APIRouter(
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-# ENDPOINT 1 — Run ML Pipeline
+# ENDPOINT 1 — Refresh Predictions From Saved Model
 # POST /api/v1/predict/run
 # ══════════════════════════════════════════════════════════════════════════════
 @router.post(
     "/run",
     response_model=RunPredictionResponse,
-    summary="Run ML Prediction Pipeline",
+    summary="Refresh Predictions (no retraining)",
     description="""
-    Triggers the full ML prediction pipeline (main.py).
+    Regenerates next month's predictions from the saved model.
 
-    ⚠️ This takes 40-60 seconds to complete.
+    ⚡ Takes well under a second — the model is NOT retrained.
 
     What it does:
-    1. Loads and preprocesses pharmacy sales data
-    2. Trains Random Forest model per item
-    3. Predicts next month's stock requirements
-    4. Calculates budget per category
-    5. Saves all CSV reports and charts
+    1. Uses the trained model already loaded in memory
+    2. Predicts next month's stock requirements for every item
+    3. Sets recommended stock at the P90 forecast and calculates budgets
+    4. Rewrites the budget + inventory plan reports
 
-    Call this FIRST before using other endpoints.
-    React team: show a loading spinner while this runs.
+    Needs a trained model — call POST /predict/retrain once first.
     """,
     responses={
-        200: {"description": "Pipeline ran successfully"},
-        500: {"model": ErrorResponse, "description": "Pipeline failed"},
+        200: {"description": "Predictions refreshed"},
+        404: {"model": ErrorResponse, "description": "No trained model yet"},
+        500: {"model": ErrorResponse, "description": "Prediction failed"},
     }
 )
-async def run_prediction(background_tasks: BackgroundTasks):
+async def run_prediction():
     """
     POST /api/v1/predict/run
 
-    Runs the complete ML pipeline.
+    Refreshes the reports from the saved model.
     Returns status, total budget, and timing info.
     """
     try:
-        result = ml_service.run_ml_pipeline()
-        return result
+        return ml_service.run_ml_pipeline()
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except RuntimeError as e:
@@ -85,6 +94,276 @@ async def run_prediction(background_tasks: BackgroundTasks):
         )
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+# ENDPOINT 1b — Retrain Model
+# POST /api/v1/predict/retrain
+# ══════════════════════════════════════════════════════════════════════════════
+@router.post(
+    "/retrain",
+    response_model=JobResponse,
+    response_model_exclude_none=True,
+    status_code=202,
+    summary="Retrain ML Model (background job)",
+    description="""
+    Starts the full ML pipeline (main.py) and saves a new model version.
+
+    ⚡ Returns IMMEDIATELY with a job_id — the pipeline itself
+    takes 40-60 seconds and runs in the background.
+
+    What the job does:
+    1. Loads and preprocesses pharmacy sales data
+    2. Trains the normalized global Random Forest
+    3. Predicts next month's stock requirements
+    4. Calculates budget per category
+    5. Saves all CSV reports, charts and the model artifact
+
+    If a retrain is already running, you get THAT job back
+    (attached = true) — no second pipeline is started.
+
+    React team: poll GET /predict/jobs/{job_id} or listen to
+    GET /predict/jobs/{job_id}/events for a live progress bar.
+    """,
+    responses={
+        202: {"description": "Retrain job started (or attached)"},
+        404: {"model": ErrorResponse, "description": "main.py not found"},
+    }
+)
+async def retrain_model():
+    """POST /api/v1/predict/retrain"""
+    try:
+        return ml_service.retrain_ml_pipeline()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+@router.get(
+    "/jobs",
+    response_model=JobListResponse,
+    response_model_exclude_none=True,
+    summary="Recent Retrain Jobs",
+    description="Recent retrain jobs (newest first) with status, stage timings and duration.",
+)
+async def list_jobs():
+    """GET /api/v1/predict/jobs"""
+    return ml_service.list_jobs()
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobResponse,
+    response_model_exclude_none=True,
+    summary="Retrain Job Status",
+    description="""
+    Status of one retrain job: current stage, progress (0-1),
+    per-stage timings, full log and — once finished — the result.
+    """,
+    responses={
+        200: {"description": "Job returned"},
+        404: {"model": ErrorResponse, "description": "Unknown job id"},
+    }
+)
+async def get_job(job_id: str):
+    """GET /api/v1/predict/jobs/{job_id}"""
+    try:
+        return ml_service.get_job(job_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get(
+    "/jobs/{job_id}/events",
+    summary="Retrain Job Progress Stream (SSE)",
+    description="""
+    Server-sent events for one retrain job:
+    - **stage**: a new pipeline step started (number, title, timings)
+    - **log**: one line of pipeline output
+    - **done**: final job status (closes the stream)
+
+    React team: `new EventSource('/api/v1/predict/jobs/<id>/events')`
+    """,
+    responses={
+        200: {"description": "text/event-stream"},
+        404: {"model": ErrorResponse, "description": "Unknown job id"},
+    }
+)
+def stream_job_events(job_id: str):
+    """GET /api/v1/predict/jobs/{job_id}/events"""
+    try:
+        ml_service.get_job(job_id, include_logs=False)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return StreamingResponse(
+        ml_service.stream_job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ENDPOINT 1e — What-if Budget Scenarios
+# POST /api/v1/predict/budget-scenarios
+# ══════════════════════════════════════════════════════════════════════════════
+@router.post(
+    "/budget-scenarios",
+    response_model=BudgetScenariosResponse,
+    summary="What-if Budget Scenarios",
+    description="""
+    Budget per category for several safety buffers at once, computed
+    from the current inventory plan — no retraining, nothing saved.
+
+    - **safety_factors**: one scenario each (1.10 = 10% buffer on the prediction)
+    - **category_caps**: maximum budget per category, in every scenario
+    - **price_factors**: price multiplier per category (1.08 = +8%)
+
+    Example body:
+    `{"safety_factors": [1.1, 1.15, 1.3], "category_caps": {"Respiratory & Antibiotics": 2000000}}`
+    """,
+    responses={
+        200: {"description": "One budget breakdown per scenario"},
+        404: {"model": ErrorResponse, "description": "No inventory plan yet"},
+        422: {"model": ErrorResponse, "description": "Unknown category or bad factor"},
+    }
+)
+async def simulate_budgets(body: BudgetScenarioRequest):
+    """POST /api/v1/predict/budget-scenarios"""
+    try:
+        return ml_service.simulate_budgets(
+            safety_factors=body.safety_factors,
+            category_caps=body.category_caps,
+            price_factors=body.price_factors,
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ENDPOINT 1d — Report Versions
+# GET  /api/v1/predict/reports/versions
+# POST /api/v1/predict/reports/rollback
+# ══════════════════════════════════════════════════════════════════════════════
+@router.get(
+    "/reports/versions",
+    response_model=ReportVersionsResponse,
+    summary="Published Report Versions",
+    description="""
+    Every pipeline run (and every POST /predict/run) publishes a complete
+    set of reports as a new version; the API reads only the current one.
+    The last **keep** versions are retained for rollback (newest first).
+    """,
+)
+async def get_report_versions():
+    """GET /api/v1/predict/reports/versions"""
+    return ml_service.get_report_versions()
+
+
+@router.post(
+    "/reports/rollback",
+    response_model=RollbackResponse,
+    summary="Roll Back Reports",
+    description="""
+    Serves an earlier report version again — instantly, nothing is recomputed.
+
+    - **version**: any version listed by GET /predict/reports/versions
+    - omitted: the version before the current one
+    """,
+    responses={
+        200: {"description": "Current version switched"},
+        404: {"model": ErrorResponse, "description": "No such (earlier) version"},
+    }
+)
+async def rollback_reports(
+    version: Optional[str] = Query(None, description="Version to serve (default: previous)"),
+):
+    """POST /api/v1/predict/reports/rollback"""
+    try:
+        return ml_service.rollback_reports(version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ENDPOINT 1c — What-if Forecast
+# GET /api/v1/predict/forecast
+# ══════════════════════════════════════════════════════════════════════════════
+@router.get(
+    "/forecast",
+    response_model=ForecastResponse,
+    summary="What-if Forecast",
+    description="""
+    Predicts budgets for any target month and stock policy
+    using the model already in memory. Nothing is saved.
+
+    Stock policy (pick one):
+    - **service_level**: recommended stock = that forecast quantile
+      (0.9 → P90: enough stock in ~90% of the model's scenarios)
+    - **safety_factor**: recommended stock = predicted x factor (flat buffer)
+    - neither: the default P90 service level
+
+    **horizon** (1-6): also return an outlook for the following months
+    (each month's features are rolled forward from the previous forecast).
+
+    Example: GET /predict/forecast?target_month=6&service_level=0.95
+    Example: GET /predict/forecast?horizon=6  (6-month purchasing outlook)
+    """,
+    responses={
+        200: {"description": "Forecast returned"},
+        404: {"model": ErrorResponse, "description": "No trained model yet"},
+        422: {"model": ErrorResponse, "description": "Both service_level and safety_factor given"},
+    }
+)
+async def get_forecast(
+    target_month: Optional[int] = Query(
+        default=None, ge=1, le=12,
+        description="Month to predict (1-12). Defaults to next month."
+    ),
+    target_year: Optional[int] = Query(
+        default=None, ge=2000, le=2100,
+        description="Year of the target month"
+    ),
+    service_level: Optional[float] = Query(
+        default=None, ge=0.5, lt=1.0,
+        description="Recommended stock = this quantile of the forecast"
+    ),
+    safety_factor: Optional[float] = Query(
+        default=None, ge=1.0, le=3.0,
+        description="Recommended stock = predicted x safety_factor"
+    ),
+    horizon: int = Query(
+        default=1, ge=1, le=6,
+        description="Months to forecast, starting at the target month"
+    ),
+):
+    """GET /api/v1/predict/forecast"""
+    if service_level is not None and safety_factor is not None:
+        raise HTTPException(
+            status_code=422,
+            detail="Give either service_level or safety_factor, not both."
+        )
+    try:
+        return ml_service.get_forecast(
+            target_month=target_month,
+            target_year=target_year,
+            safety_factor=safety_factor,
+            service_level=service_level,
+            horizon=horizon,
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # ENDPOINT 2 — Dashboard Summary
 # GET /api/v1/predict/summary
@@ -169,9 +448,12 @@ async def get_budgets():
     - **search**: search by item name (e.g. ATORVA)
     - **limit**: number of items per page (default 100)
     - **offset**: pagination offset (default 0)
+    - **sort_by**: file (default) / budget / predicted_qty
+    - **order**: desc (default) / asc
 
     React team: use this for the inventory data table.
     Example: GET /predict/inventory?category=Cardiovascular&limit=50
+    Example: GET /predict/inventory?sort_by=budget&limit=10  (top 10 spend)
     """,
     responses={
         200: {"description": "Inventory returned"},
@@ -200,6 +482,14 @@ async def get_inventory(
         ge=0,
         description="Pagination offset"
     ),
+    sort_by: Literal["file", "budget", "predicted_qty"] = Query(
+        default="file",
+        description="file = report order, budget / predicted_qty = sorted"
+    ),
+    order: Literal["asc", "desc"] = Query(
+        default="desc",
+        description="Sort direction when sort_by is budget or predicted_qty"
+    ),
 ):
     """GET /api/v1/predict/inventory"""
     try:
@@ -208,6 +498,8 @@ async def get_inventory(
             search=search,
             limit=limit,
             offset=offset,
+            sort_by=sort_by,
+            order=order,
         )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -250,6 +542,36 @@ async def get_evaluation():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+# ENDPOINT 5b — Pipeline Stage Profile
+# GET /api/v1/predict/profile
+# ══════════════════════════════════════════════════════════════════════════════
+@router.get(
+    "/profile",
+    response_model=PipelineProfileResponse,
+    summary="Pipeline Stage Profile",
+    description="""
+    Wall time, CPU time and peak memory of every stage (1-11)
+    of the last retrain, compared with the run before it.
+
+    Use it to spot which stage got slower after a change:
+    **wall_change_pct** is the % change in wall time per stage.
+    """,
+    responses={
+        200: {"description": "Profile returned"},
+        404: {"model": ErrorResponse, "description": "Run /predict/retrain first"},
+    }
+)
+async def get_profile():
+    """GET /api/v1/predict/profile"""
+    try:
+        return ml_service.get_pipeline_profile()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # ENDPOINT 6 — Sales Trends
 # GET /api/v1/predict/trends
@@ -279,3 +601,65 @@ async def get_trends():
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ENDPOINT 7 — Charts (rendered on demand)
+# GET /api/v1/predict/charts/{chart}
+# GET /api/v1/predict/charts/{chart}/series
+# ══════════════════════════════════════════════════════════════════════════════
+@router.get(
+    "/charts/{chart}",
+    response_class=FileResponse,
+    summary="Chart Image (PNG)",
+    description="""
+    Budget-by-category (**budget**) or sales-trend (**trends**) chart.
+
+    Rendered the first time it is requested after a pipeline run, then
+    served from a cache keyed by the report version — the **ETag**
+    header carries that version.
+    """,
+    responses={
+        200: {"content": {"image/png": {}}, "description": "PNG chart"},
+        404: {"model": ErrorResponse, "description": "Run /predict/retrain first"},
+    }
+)
+async def get_chart(
+    chart: Literal["budget", "trends"],
+    dpi: int = Query(CHART_DPI, ge=72, le=300, description="Image resolution"),
+):
+    """GET /api/v1/predict/charts/{chart}"""
+    try:
+        result = ml_service.get_chart(chart, dpi=dpi)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return FileResponse(
+        result["path"],
+        media_type="image/png",
+        headers={"ETag": f'"{result["version"]}"', "Cache-Control": "no-cache"},
+    )
+
+
+@router.get(
+    "/charts/{chart}/series",
+    response_model=ChartSeriesResponse,
+    summary="Chart Data (JSON)",
+    description="""
+    The data behind a chart, for the frontend to draw it itself:
+    **labels** is the x axis, each entry of **series** one bar/line.
+    """,
+    responses={
+        200: {"description": "Chart series returned"},
+        404: {"model": ErrorResponse, "description": "Run /predict/retrain first"},
+    }
+)
+async def get_chart_series(chart: Literal["budget", "trends"]):
+    """GET /api/v1/predict/charts/{chart}/series"""
+    try:
+        return ml_service.get_chart_series(chart)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
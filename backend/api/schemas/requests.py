@@ -0,0 +1,55 @@
+"""
+schemas/requests.py
+───────────────────
+Defines the shape of JSON request BODIES (most endpoints only take
+query parameters — see routers/).
+
+FastAPI validates the body against these models before the endpoint
+runs; a bad body is answered with 422 and the offending field.
+"""
+
+from pydantic import BaseModel, Field, field_validator
+from typing import Dict, List
+
+
+MAX_SCENARIOS = 50
+
+
+class BudgetScenarioRequest(BaseModel):
+    """POST /api/v1/predict/budget-scenarios"""
+    safety_factors: List[float] = Field(
+        ..., min_length=1, max_length=MAX_SCENARIOS,
+        example=[1.10, 1.15, 1.30],
+        description="One scenario per factor: recommended stock = ceil(predicted x factor)",
+    )
+    category_caps: Dict[str, float] = Field(
+        default_factory=dict,
+        example={"Consumer Goods & Skincare": 500000},
+        description="Maximum budget (Rs.) per category, applied in every scenario",
+    )
+    price_factors: Dict[str, float] = Field(
+        default_factory=dict,
+        example={"Cardiovascular": 1.08},
+        description="Multiplies the prices of a category (e.g. 1.08 = supplier +8%)",
+    )
+
+    @field_validator("safety_factors")
+    @classmethod
+    def _factors_in_range(cls, factors: List[float]) -> List[float]:
+        if any(not 1.0 <= f <= 3.0 for f in factors):
+            raise ValueError("every safety factor must be between 1.0 and 3.0")
+        return factors
+
+    @field_validator("category_caps")
+    @classmethod
+    def _caps_not_negative(cls, caps: Dict[str, float]) -> Dict[str, float]:
+        if any(cap < 0 for cap in caps.values()):
+            raise ValueError("category caps must be >= 0")
+        return caps
+
+    @field_validator("price_factors")
+    @classmethod
+    def _price_factors_positive(cls, factors: Dict[str, float]) -> Dict[str, float]:
+        if any(f <= 0 for f in factors.values()):
+            raise ValueError("price factors must be > 0")
+        return factors
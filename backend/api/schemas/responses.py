@@ -18,11 +18,20 @@ from typing import List, Optional
 # HEALTH
 # ══════════════════════════════════════════════════════════════════════════════
 
+class ReportCacheStats(BaseModel):
+    """In-memory report cache counters (part of GET /health)"""
+    hits: int = Field(..., example=120)
+    misses: int = Field(..., example=4)
+    hit_rate: float = Field(..., example=0.9677)
+    entries: int = Field(..., example=4)
+
+
 class HealthResponse(BaseModel):
     """GET /health"""
     status: str = Field(..., example="healthy")
     api_version: str = Field(..., example="1.0.0")
     timestamp: str = Field(..., example="2026-03-20T10:30:00")
+    report_cache: Optional[ReportCacheStats] = None
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -49,6 +58,106 @@ class RunPredictionResponse(BaseModel):
     total_budget: float = Field(..., example=40935807.31)
     time_taken_seconds: float = Field(..., example=47.3)
     timestamp: str = Field(..., example="2026-03-20T10:30:00")
+    report_version: Optional[str] = Field(None, example="20260320_103000_123456")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# REPORT VERSIONS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ReportVersion(BaseModel):
+    """One published set of pipeline reports"""
+    version: str = Field(..., example="20260320_103000_123456")
+    published_at: Optional[str] = Field(None, example="2026-03-20T10:30:52")
+    files: List[str] = Field(..., example=["detailed_inventory_plan.csv", "model_evaluation.csv"])
+    current: bool = Field(..., example=True)
+
+
+class ReportVersionsResponse(BaseModel):
+    """GET /predict/reports/versions"""
+    current_version: Optional[str] = Field(None, example="20260320_103000_123456")
+    keep: int = Field(..., example=5)
+    versions: List[ReportVersion]
+
+
+class RollbackResponse(BaseModel):
+    """POST /predict/reports/rollback"""
+    current_version: str = Field(..., example="20260313_101500_654321")
+    previous_version: Optional[str] = Field(None, example="20260320_103000_123456")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RETRAIN JOBS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class JobStage(BaseModel):
+    """One numbered step of main.py (1-11) inside a retrain job"""
+    number: int = Field(..., example=4)
+    title: str = Field(..., example="Training Normalized Global Model")
+    started_at: str = Field(..., example="2026-03-20T10:30:05")
+    finished_at: Optional[str] = Field(None, example="2026-03-20T10:30:31")
+    duration_seconds: Optional[float] = Field(None, example=26.4)
+
+
+class JobResponse(BaseModel):
+    """POST /predict/retrain, GET /predict/jobs/{job_id}"""
+    job_id: str = Field(..., example="3f9c2a7d1e04")
+    status: str = Field(..., example="running",
+                        description="queued / running / succeeded / failed")
+    attached: Optional[bool] = Field(None, example=False,
+                                     description="True if this retrain joined an already running job")
+    created_at: str = Field(..., example="2026-03-20T10:30:00")
+    started_at: Optional[str] = Field(None, example="2026-03-20T10:30:00")
+    finished_at: Optional[str] = Field(None, example=None)
+    duration_seconds: Optional[float] = Field(None, example=31.2)
+    current_stage: Optional[str] = Field(None, example="Training Normalized Global Model")
+    progress: float = Field(..., example=0.273, description="Finished stages / 11")
+    stages: List[JobStage] = []
+    result: Optional[RunPredictionResponse] = None
+    error: Optional[str] = None
+    logs: Optional[List[str]] = None
+
+
+class JobListResponse(BaseModel):
+    """GET /predict/jobs — newest first"""
+    total_jobs: int = Field(..., example=3)
+    jobs: List[JobResponse]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PIPELINE PROFILE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class StageProfile(BaseModel):
+    """One numbered step of the last main.py run"""
+    number: int = Field(..., example=5)
+    name: str = Field(..., example="train_evaluate")
+    wall_seconds: float = Field(..., example=21.4)
+    cpu_seconds: float = Field(..., example=80.2,
+                               description="All threads — can exceed wall time")
+    peak_rss_mb: Optional[float] = Field(None, example=812.5,
+                                         description="Process peak memory at the end of the stage")
+    rss_growth_mb: Optional[float] = Field(None, example=240.1,
+                                           description="How much the peak grew during this stage")
+    previous_wall_seconds: Optional[float] = Field(None, example=19.8)
+    wall_change_pct: Optional[float] = Field(None, example=8.1,
+                                             description="Wall time vs the previous run")
+
+
+class ProfileTotals(BaseModel):
+    wall_seconds: float = Field(..., example=48.7)
+    cpu_seconds: float = Field(..., example=131.0)
+    peak_rss_mb: Optional[float] = Field(None, example=1024.3)
+
+
+class PipelineProfileResponse(BaseModel):
+    """GET /api/v1/predict/profile"""
+    started_at: str = Field(..., example="2026-03-20T10:30:00")
+    eval_mode: Optional[str] = Field(None, example="holdout")
+    total: ProfileTotals
+    stages: List[StageProfile]
+    previous_run_at: Optional[str] = Field(None, example="2026-03-13T09:12:44")
+    runs_recorded: int = Field(..., example=7)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -69,6 +178,56 @@ class BudgetsResponse(BaseModel):
     count: int = Field(..., example=8)
 
 
+class OutlookMonth(BaseModel):
+    """One month of a multi-month forecast"""
+    target_month: str = Field(..., example="July 2026")
+    predicted_qty: int = Field(..., example=512340, description="All items, units")
+    predicted_value: float = Field(..., example=15320456.75,
+                                   description="predicted_qty x latest price (no safety stock)")
+
+
+class ForecastResponse(BaseModel):
+    """GET /api/v1/predict/forecast — in-process what-if, nothing is saved"""
+    model_config = {"protected_namespaces": ()}
+    target_month: str = Field(..., example="June 2026")
+    service_level: Optional[float] = Field(None, example=0.9,
+                                           description="Recommended stock = this forecast quantile")
+    safety_factor: Optional[float] = Field(None, example=None,
+                                           description="Recommended stock = predicted x safety_factor "
+                                                       "(flat buffer, when no service level)")
+    model_version: str = Field(..., example="20260320_103000",
+                               description="Version of the trained model artifact used")
+    items_predicted: int = Field(..., example=5024)
+    total_budget: float = Field(..., example=40935807.31)
+    categories: List[CategoryBudget]
+    outlook: Optional[List[OutlookMonth]] = Field(
+        None, description="Only when horizon > 1: the target month and the months after it")
+    time_taken_ms: float = Field(..., example=42.7)
+
+
+class ScenarioCategoryBudget(BaseModel):
+    """One category's budget inside one what-if scenario"""
+    category: str = Field(..., example="Cardiovascular")
+    budget_required: float = Field(..., example=1250000.50)
+    capped: bool = Field(..., example=False, description="True when the category cap cut this budget")
+
+
+class BudgetScenario(BaseModel):
+    """Budgets at one safety factor"""
+    safety_factor: float = Field(..., example=1.15)
+    total_budget: float = Field(..., example=41200000.00)
+    categories: List[ScenarioCategoryBudget]
+
+
+class BudgetScenariosResponse(BaseModel):
+    """POST /api/v1/predict/budget-scenarios — nothing is saved"""
+    target_month: str = Field(..., example="April 2026")
+    report_version: Optional[str] = Field(None, example="20260320_103000_123456")
+    items: int = Field(..., example=5024)
+    scenarios: List[BudgetScenario]
+    time_taken_ms: float = Field(..., example=4.2)
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # INVENTORY
 # ══════════════════════════════════════════════════════════════════════════════
@@ -80,11 +239,14 @@ class InventoryItem(BaseModel):
     predicted_qty: int = Field(..., example=2847,
                                description="ML predicted quantity")
     recommended_stock: int = Field(..., example=3417,
-                                   description="predicted_qty x 1.20 safety buffer")
+                                   description="Service-level quantile (or predicted_qty x 1.20)")
     price: float = Field(..., example=37.20,
                          description="Latest unit price in LKR")
     budget_required: float = Field(..., example=127112.40,
                                    description="recommended_stock x price")
+    p50_qty: Optional[int] = Field(None, example=2810, description="Median forecast")
+    p90_qty: Optional[int] = Field(None, example=3390, description="90th percentile forecast")
+    p95_qty: Optional[int] = Field(None, example=3555, description="95th percentile forecast")
 
 
 class InventoryResponse(BaseModel):
@@ -137,6 +299,27 @@ class TrendsResponse(BaseModel):
     data: List[TrendDataPoint]
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+# CHARTS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ChartSeries(BaseModel):
+    """One line / bar series, aligned with ChartSeriesResponse.labels"""
+    name: str = Field(..., example="Cardiovascular")
+    values: List[float] = Field(..., example=[15230.0, 14980.0])
+
+
+class ChartSeriesResponse(BaseModel):
+    """GET /api/v1/predict/charts/{chart}/series"""
+    chart: str = Field(..., example="trends")
+    version: str = Field(..., example="3f9a1c0d2b7e")
+    title: str = Field(..., example="Monthly Sales Trend by Category")
+    x_label: str = Field(..., example="Month")
+    y_label: str = Field(..., example="Total Quantity Sold")
+    labels: List[str] = Field(..., example=["2026-02", "2026-03"])
+    series: List[ChartSeries]
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # DASHBOARD SUMMARY
 # ══════════════════════════════════════════════════════════════════════════════
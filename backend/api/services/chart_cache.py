@@ -0,0 +1,102 @@
+"""
+services/chart_cache.py
+───────────────────────
+On-demand chart rendering, cached per report version.
+
+Why this exists:
+The pipeline used to render both PNG charts at dpi=300 inside every
+run, importing matplotlib even though dashboards rarely ask for them.
+Now the pipeline only writes the chart DATA; a chart is rendered the
+first time someone requests it, and then served from disk.
+
+How it works:
+- A chart's version is a short hash of the (mtime, size) stamps of the
+  report files it is drawn from — a new pipeline run → new version
+- The PNG is stored as <cache_dir>/<chart>_<version>_<dpi>.png
+- Same version → the cached file is returned, no rendering
+- New version → rendered once (per-chart lock, so concurrent requests
+  share one render), written to a temp file and os.replace()d into
+  place; files of older versions of that chart are deleted
+- The render function is only CALLED on a miss, so matplotlib is only
+  imported when a chart is actually drawn
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable
+
+
+def report_version(paths: Iterable[Path]) -> str:
+    """Short hash of the source files' (name, mtime, size) — FileNotFoundError if one is missing."""
+    digest = hashlib.sha1()
+    for path in paths:
+        st = os.stat(path)
+        digest.update(f"{Path(path).name}:{st.st_mtime_ns}:{st.st_size};".encode())
+    return digest.hexdigest()[:12]
+
+
+class ChartCache:
+    """{(chart, version, dpi) → PNG file} with one render per version."""
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = Path(cache_dir)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._renders = 0
+        self._hits = 0
+
+    def _chart_lock(self, chart: str) -> threading.Lock:
+        with self._lock:
+            lock = self._locks.get(chart)
+            if lock is None:
+                lock = self._locks[chart] = threading.Lock()
+            return lock
+
+    def path_for(self, chart: str, version: str, dpi: int) -> Path:
+        return self.cache_dir / f"{chart}_{version}_{dpi}.png"
+
+    def get(self, chart: str, version: str, dpi: int,
+            render: Callable[[Path, int], None]) -> Path:
+        """
+        Returns the cached PNG for this version, calling render(tmp_path, dpi)
+        to draw it if it does not exist yet.
+        """
+        path = self.path_for(chart, version, dpi)
+        if path.exists():
+            with self._lock:
+                self._hits += 1
+            return path
+
+        with self._chart_lock(chart):
+            if path.exists():          # rendered while we waited
+                with self._lock:
+                    self._hits += 1
+                return path
+
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.stem}.{threading.get_ident()}.tmp.png")
+            try:
+                render(tmp_path, dpi)
+                os.replace(tmp_path, path)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+            with self._lock:
+                self._renders += 1
+            self._prune(chart, keep=version)
+            return path
+
+    def _prune(self, chart: str, keep: str) -> None:
+        """Deletes PNGs of older versions of this chart."""
+        for old in self.cache_dir.glob(f"{chart}_*.png"):
+            if not old.name.startswith(f"{chart}_{keep}_"):
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"renders": self._renders, "hits": self._hits}
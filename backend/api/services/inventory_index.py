@@ -0,0 +1,185 @@
+"""
+services/inventory_index.py
+───────────────────────────
+Prebuilt in-memory index over detailed_inventory_plan.csv.
+
+Why this exists:
+GET /predict/inventory used to scan the whole plan on every request
+(str.upper().str.contains), then build rows with iterrows.
+The index is built ONCE per report version (it lives in the report
+cache next to the parsed frame) and answers filtered, sorted, paged
+queries by set operations on row-id arrays instead of scans.
+
+What it holds:
+- category → row ids            (case-insensitive exact match)
+- n-gram  → row ids             (1, 2 and 3-character substrings of
+                                 every upper-cased item name)
+- precomputed sort orders       (budget, predicted qty — each row's rank)
+- typed, pre-rounded columns    (pages are serialized with zip, not iterrows;
+                                 P50/P90/P95 included when the plan has them)
+
+Substring search:
+- query of 1-3 chars → the posting list of the query itself IS the answer
+- longer query       → intersect the posting lists of its trigrams, then
+                       confirm the few candidates with a real `in` check
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+MAX_GRAM = 3
+
+SORT_FIELDS = ("file", "budget", "predicted_qty")
+
+# response key → plan column
+QUANTILE_FIELDS = (("p50_qty", "P50_Qty"), ("p90_qty", "P90_Qty"), ("p95_qty", "P95_Qty"))
+
+
+def _grams(text: str, n: int):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def plan_columns(df: pd.DataFrame, pred_col: Optional[str]) -> Dict[str, np.ndarray]:
+    """
+    Response key → typed, pre-rounded column of the plan (P50/P90/P95
+    only when the plan has them). Shared by the index and the Parquet
+    pushdown path so both serialize rows identically.
+    """
+    def _col(name, default=0):
+        if name in df.columns:
+            return df[name]
+        return pd.Series(default, index=df.index)
+
+    predicted = _col(pred_col) if pred_col else pd.Series(0, index=df.index)
+    columns = {
+        "item":              df["Item"].astype(str).to_numpy(),
+        "category":          df["Category"].astype(str).to_numpy(),
+        "predicted_qty":     predicted.fillna(0).astype(np.int64).to_numpy(),
+        "recommended_stock": _col("Recommended_Stock").fillna(0).astype(np.int64).to_numpy(),
+        "price":             _col("Price").fillna(0).astype(float).round(2).to_numpy(),
+        "budget_required":   np.round(_col("Budget_Required").fillna(0).astype(float).to_numpy(), 2),
+    }
+    # Forecast quantiles — only in plans written with them
+    for key, col in QUANTILE_FIELDS:
+        if col in df.columns:
+            columns[key] = df[col].fillna(0).astype(np.int64).to_numpy()
+    return columns
+
+
+def serialize_rows(columns: Dict[str, np.ndarray], ids=None) -> List[Dict[str, Any]]:
+    """Rows `ids` (default: all) of plan_columns() as response dicts."""
+    keys = tuple(columns)
+    values = (col.tolist() if ids is None else col[ids].tolist() for col in columns.values())
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+class InventoryIndex:
+    """Read-only query engine over one version of the inventory plan."""
+
+    def __init__(self, df: pd.DataFrame, pred_col: Optional[str]) -> None:
+        n_rows = len(df)
+        self.n_rows = n_rows
+        self._all_ids = np.arange(n_rows, dtype=np.int64)
+
+        # ── Typed, pre-rounded output columns ────────────────────────────────
+        self._columns  = plan_columns(df, pred_col)
+        self._item     = self._columns["item"]
+        self._category = self._columns["category"]
+        self._predicted  = self._columns["predicted_qty"]
+        self._budget_raw = (df["Budget_Required"].fillna(0).astype(float).to_numpy()
+                            if "Budget_Required" in df.columns else np.zeros(n_rows))
+
+        # ── Category → row ids ───────────────────────────────────────────────
+        by_category = defaultdict(list)
+        for row_id, cat in enumerate(self._category):
+            by_category[cat.lower()].append(row_id)
+        self._by_category = {k: np.asarray(v, dtype=np.int64) for k, v in by_category.items()}
+
+        # ── n-gram → row ids ─────────────────────────────────────────────────
+        self._upper = np.array([name.upper() for name in self._item], dtype=object)
+        postings = defaultdict(list)
+        for row_id, name in enumerate(self._upper):
+            for n in range(1, MAX_GRAM + 1):
+                for gram in _grams(name, n):
+                    postings[gram].append(row_id)
+        # row ids were appended in ascending order → already sorted
+        self._postings = {g: np.asarray(ids, dtype=np.int64) for g, ids in postings.items()}
+
+        # ── Sort orders: rank of every row (0 = first) ───────────────────────
+        self._rank = {"file": self._all_ids}
+        for field, values in (("budget", self._budget_raw), ("predicted_qty", self._predicted)):
+            order = np.argsort(values, kind="stable")
+            rank = np.empty(n_rows, dtype=np.int64)
+            rank[order] = self._all_ids
+            self._rank[field] = rank
+
+    # ── filtering ────────────────────────────────────────────────────────────
+
+    def _search_ids(self, term: str) -> np.ndarray:
+        term = term.upper()
+        if len(term) <= MAX_GRAM:
+            return self._postings.get(term, np.empty(0, dtype=np.int64))
+
+        candidates = None
+        for gram in _grams(term, MAX_GRAM):
+            ids = self._postings.get(gram)
+            if ids is None:
+                return np.empty(0, dtype=np.int64)
+            candidates = ids if candidates is None else np.intersect1d(
+                candidates, ids, assume_unique=True)
+            if len(candidates) == 0:
+                return candidates
+        # trigrams can all be present without the full term being contiguous
+        keep = [term in name for name in self._upper[candidates]]
+        return candidates[np.asarray(keep, dtype=bool)]
+
+    def filter_ids(self, category: Optional[str] = None, search: Optional[str] = None) -> np.ndarray:
+        """Row ids (ascending) matching every given filter."""
+        ids = None
+        if category:
+            ids = self._by_category.get(category.lower(), np.empty(0, dtype=np.int64))
+        if search:
+            found = self._search_ids(search)
+            ids = found if ids is None else np.intersect1d(ids, found, assume_unique=True)
+        return self._all_ids if ids is None else ids
+
+    # ── public query ─────────────────────────────────────────────────────────
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        sort_by: str = "file",
+        descending: bool = False,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Returns {"total_items": int, "items": [...]} for one page.
+        sort_by "file" keeps the plan's own order (the old behaviour).
+        """
+        if sort_by not in self._rank:
+            raise ValueError(f"sort_by must be one of {SORT_FIELDS}")
+
+        ids = self.filter_ids(category, search)
+        total = len(ids)
+
+        rank = self._rank[sort_by]
+        if len(ids) == self.n_rows and sort_by != "file":
+            # Unfiltered: the full order is already known — no sort needed
+            ordered = np.empty(self.n_rows, dtype=np.int64)
+            ordered[rank] = self._all_ids
+        else:
+            ordered = ids[np.argsort(rank[ids], kind="stable")]
+        if descending:
+            ordered = ordered[::-1]
+
+        page = ordered[offset: offset + limit]
+        return {"total_items": total, "items": self._serialize(page)}
+
+    def _serialize(self, ids: np.ndarray) -> List[Dict[str, Any]]:
+        return serialize_rows(self._columns, ids)
@@ -0,0 +1,297 @@
+"""
+services/job_runner.py
+──────────────────────
+Background runner for the ML training pipeline (main.py).
+
+Why this exists:
+Retraining takes about a minute. Blocking an HTTP request on a
+subprocess for that long gives the frontend no feedback, so:
+
+- submit() starts main.py in a background thread and returns a job
+  IMMEDIATELY (job_id + status)
+- main.py's stdout is read line by line; the numbered step banners it
+  prints ("1. Loading...", ..., "11. Generating Visualizations...")
+  become per-stage progress with start/finish timings
+- every line is kept as the job's log
+- a submit while a job is running ATTACHES to that job instead of
+  starting a second pipeline
+- finished jobs (result, logs, durations) stay in a bounded history
+
+Subscribers (the SSE endpoint) wait on a Condition and are woken on
+every new log line or state change.
+"""
+
+import os
+import re
+import subprocess
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+# main.py prints its steps as "<n>. <title>" at the start of a line
+STAGE_LINE = re.compile(r"^(\d{1,2})\.\s+(\S.*)$")
+TOTAL_STAGES = 11
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class PipelineJob:
+    """State of one pipeline run. Mutated only by its runner thread."""
+
+    def __init__(self) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.status = QUEUED
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.stages: List[Dict[str, Any]] = []
+        self.logs: List[str] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._t0: Optional[float] = None
+        self._stage_t0: Optional[float] = None
+
+    # ── timings ──────────────────────────────────────────────────────────────
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self._t0 is None:
+            return None
+        end = self._t_end if self.finished_at else time.perf_counter()
+        return round(end - self._t0, 2)
+
+    def _start(self) -> None:
+        self.status = RUNNING
+        self.started_at = datetime.now()
+        self._t0 = time.perf_counter()
+
+    def _close_stage(self, now: float) -> None:
+        if self.stages and self.stages[-1]["finished_at"] is None:
+            stage = self.stages[-1]
+            stage["finished_at"] = datetime.now().isoformat()
+            stage["duration_seconds"] = round(now - self._stage_t0, 3)
+
+    def _enter_stage(self, number: int, title: str) -> None:
+        now = time.perf_counter()
+        self._close_stage(now)
+        self._stage_t0 = now
+        self.stages.append({
+            "number": number,
+            "title": title.rstrip(". "),
+            "started_at": datetime.now().isoformat(),
+            "finished_at": None,
+            "duration_seconds": None,
+        })
+
+    def _finish(self, status: str) -> None:
+        self._t_end = time.perf_counter()
+        self._close_stage(self._t_end)
+        self.status = status
+        self.finished_at = datetime.now()
+
+    # ── serialization ────────────────────────────────────────────────────────
+
+    def to_dict(self, include_logs: bool = False) -> Dict[str, Any]:
+        completed = sum(1 for s in self.stages if s["finished_at"] is not None)
+        current = self.stages[-1] if self.stages and self.status == RUNNING else None
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": self.duration_seconds,
+            "current_stage": current["title"] if current else None,
+            "progress": 1.0 if self.status == SUCCEEDED else round(completed / TOTAL_STAGES, 3),
+            "stages": [dict(s) for s in self.stages],
+            "result": self.result,
+            "error": self.error,
+        }
+        if include_logs:
+            data["logs"] = list(self.logs)
+        return data
+
+
+class JobRunner:
+    """Runs at most ONE pipeline at a time and remembers recent jobs."""
+
+    def __init__(self, history_size: int = 20, timeout_seconds: int = 600) -> None:
+        self._jobs: "OrderedDict[str, PipelineJob]" = OrderedDict()
+        self._active: Optional[PipelineJob] = None
+        self._history_size = history_size
+        self._timeout = timeout_seconds
+        self._cond = threading.Condition()
+
+    # ── submit ───────────────────────────────────────────────────────────────
+
+    def submit(
+        self,
+        command: List[str],
+        cwd: str,
+        parse_result: Callable[[str], Dict[str, Any]],
+        on_success: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Starts `command` in the background, or attaches to the running job.
+        Returns (job_dict, attached).
+        """
+        with self._cond:
+            if self._active is not None:
+                return self._active.to_dict(), True
+
+            job = PipelineJob()
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._history_size:
+                self._jobs.popitem(last=False)
+            self._active = job
+
+        thread = threading.Thread(
+            target=self._run,
+            args=(job, command, cwd, parse_result, on_success),
+            name=f"pipeline-job-{job.id}",
+            daemon=True,
+        )
+        thread.start()
+        return job.to_dict(), False
+
+    def _run(self, job, command, cwd, parse_result, on_success) -> None:
+        # Whatever goes wrong, the job must finish: a job left active
+        # would capture every later submit until the API restarts
+        try:
+            self._run_pipeline(job, command, cwd, parse_result, on_success)
+        except Exception as e:
+            self._fail(job, f"Job runner error: {e!r}")
+
+    def _run_pipeline(self, job, command, cwd, parse_result, on_success) -> None:
+        with self._cond:
+            job._start()
+            self._cond.notify_all()
+
+        try:
+            proc = subprocess.Popen(
+                command,
+                cwd=cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding="utf-8",          # fix Windows cp1252 emoji crash
+                errors="replace",
+                bufsize=1,
+                env={**os.environ, "PYTHONIOENCODING": "utf-8", "PYTHONUNBUFFERED": "1"},
+            )
+        except OSError as e:
+            self._fail(job, f"Could not start ML pipeline: {e}")
+            return
+
+        # Safety limit — same 10 minutes the blocking version used
+        watchdog = threading.Timer(self._timeout, proc.kill)
+        watchdog.start()
+        try:
+            for raw in proc.stdout:
+                line = raw.rstrip("\n")
+                with self._cond:
+                    job.logs.append(line)
+                    match = STAGE_LINE.match(line)
+                    if match and 1 <= int(match.group(1)) <= TOTAL_STAGES:
+                        job._enter_stage(int(match.group(1)), match.group(2))
+                    self._cond.notify_all()
+            returncode = proc.wait()
+        except BaseException:
+            proc.kill()
+            raise
+        finally:
+            watchdog.cancel()
+
+        if returncode != 0:
+            tail = "\n".join(job.logs[-20:])
+            self._fail(job, f"ML pipeline failed after {job.duration_seconds}s.\n"
+                            f"Error output:\n{tail}")
+            return
+
+        try:
+            result = parse_result("\n".join(job.logs))
+            if on_success is not None:
+                on_success()
+        except Exception as e:
+            self._fail(job, f"Pipeline finished but post-processing failed: {e}")
+            return
+
+        with self._cond:
+            job._finish(SUCCEEDED)
+            result["time_taken_seconds"] = job.duration_seconds
+            job.result = result
+            self._active = None
+            self._cond.notify_all()
+
+    def _fail(self, job: PipelineJob, message: str) -> None:
+        with self._cond:
+            job.error = message
+            job._finish(FAILED)
+            self._active = None
+            self._cond.notify_all()
+
+    # ── queries ──────────────────────────────────────────────────────────────
+
+    def get(self, job_id: str, include_logs: bool = False) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return job.to_dict(include_logs=include_logs) if job else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Most recent first, without logs."""
+        with self._cond:
+            return [job.to_dict() for job in reversed(self._jobs.values())]
+
+    def active(self) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            return self._active.to_dict() if self._active else None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Blocks until the job finishes (or timeout). Used by tests / scripts."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            job = self._jobs.get(job_id)
+            while job is not None and job.status not in FINISHED:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return job.to_dict() if job else None
+
+    def events(self, job_id: str, heartbeat_seconds: float = 15.0) -> Iterator[Dict[str, Any]]:
+        """
+        Yields {"event": ..., "data": ...} dicts as the job progresses:
+        "stage" for every new stage, "log" for every line, "done" at the end.
+        Starts from the beginning, so late subscribers get the full story.
+        Yields a "ping" while nothing happens so proxies keep the stream open.
+        """
+        sent_logs = sent_stages = 0
+        while True:
+            with self._cond:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                if (len(job.logs) == sent_logs and len(job.stages) == sent_stages
+                        and job.status not in FINISHED):
+                    self._cond.wait(heartbeat_seconds)
+                new_stages = [dict(s) for s in job.stages[sent_stages:]]
+                new_logs = job.logs[sent_logs:]
+                snapshot = job.to_dict() if job.status in FINISHED else None
+
+            if not new_stages and not new_logs and snapshot is None:
+                yield {"event": "ping", "data": {"job_id": job_id}}
+                continue
+            for stage in new_stages:
+                yield {"event": "stage", "data": stage}
+            for line in new_logs:
+                yield {"event": "log", "data": {"line": line}}
+            sent_stages += len(new_stages)
+            sent_logs += len(new_logs)
+            if snapshot is not None:
+                yield {"event": "done", "data": snapshot}
+                return
@@ -5,34 +5,77 @@ The SERVICE layer — handles all business logic.
 
 What this does:
 1. Reads CSV files generated by main.py
-2. Triggers the ML pipeline (main.py) when requested
-3. Transforms raw CSV data into clean JSON-ready Python dicts
-4. Handles all errors in one place
+2. Loads the trained model artifact ONCE and predicts in-process
+3. Retrains the model (main.py subprocess) only when explicitly asked,
+   as a background job with stage-by-stage progress
+4. Transforms raw CSV data into clean JSON-ready Python dicts
+5. Handles all errors in one place
 
 The ROUTER (predict.py) just calls these functions.
 It never reads files or runs ML directly.
 """
 
 import os
+import json
 import sys
 import time
-import subprocess
 import threading
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 
-# Add ML root to path so we can import from it
 from core.config import (
     BASE_DIR,
     ML_ROOT,
+    REPORTS_DIR,
+    MODELS_DIR,
     BUDGETS_CSV,
     INVENTORY_CSV,
+    INVENTORY_PARQUET,
     EVALUATION_CSV,
     TRENDS_CSV,
     COMPARISON_CSV,
+    PROFILE_JSON,
+    PROFILE_HISTORY,
+    CATEGORY_SALES_CSV,
+    CHART_CACHE_DIR,
+    CHART_DPI,
+)
+
+# Add ML root to path so we can import from it
+# (appended, so the ML main.py never shadows this API's main.py)
+if str(ML_ROOT) not in sys.path:
+    sys.path.append(str(ML_ROOT))
+
+from services.chart_cache import ChartCache, report_version
+from services.inventory_index import QUANTILE_FIELDS, InventoryIndex, plan_columns, serialize_rows
+from services.job_runner import JobRunner
+from services.report_cache import ReportCache
+from src.forecast import (  # noqa: E402  (needs ML_ROOT on sys.path)
+    SAFETY_FACTOR,
+    SERVICE_LEVEL,
+    load_artifact,
+    predict_from_artifact,
+    next_target_month,
+    month_label,
+    horizon_months,
+    predicted_column,
+    save_plan_reports,
+)
+from src.plan_store import plan_info, query_plan, read_plan  # noqa: E402
+from src.publishing import (  # noqa: E402
+    KEEP_VERSIONS,
+    current_version,
+    discard_staging,
+    list_versions,
+    pinned_reports_dir,
+    publish_version,
+    rollback,
+    stage_version,
 )
+# NOTE: src.visualization (matplotlib) is imported only inside chart renders
 
 # Month number → name lookup
 MONTH_NAMES = {
@@ -82,33 +125,163 @@ def _get_target_month_from_csv(csv_path: Path) -> str:
 # SERVICE FUNCTIONS
 # ══════════════════════════════════════════════════════════════════════════════
 
-# Lock to prevent concurrent pipeline runs
-_pipeline_lock = threading.Lock()
+# Retrains run as background jobs — at most one at a time
+_job_runner = JobRunner()
+
+# The trained model is loaded once and shared by every request
+_model_lock = threading.Lock()
+_model_artifact: Optional[Dict[str, Any]] = None
+
+
+def load_model(force: bool = False) -> Dict[str, Any]:
+    """
+    Returns the in-memory model artifact, loading it from MODELS_DIR
+    the first time (or again when force=True, e.g. after a retrain).
+
+    Raises FileNotFoundError if no model has been trained yet.
+    """
+    global _model_artifact
+    if _model_artifact is not None and not force:
+        return _model_artifact
+
+    with _model_lock:
+        if _model_artifact is None or force:
+            try:
+                _model_artifact = load_artifact(str(MODELS_DIR))
+            except FileNotFoundError:
+                raise FileNotFoundError(
+                    "No trained model found. "
+                    "Run POST /api/v1/predict/retrain first to train one."
+                )
+        return _model_artifact
+
+
+def load_model_on_startup() -> None:
+    """Called from the FastAPI lifespan — a missing model is not fatal."""
+    try:
+        load_model(force=True)
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"[ml_service] Model not loaded at startup: {e}")
+
+
+def _resolve_target_month(target_month: Optional[int], target_year: Optional[int],
+                          today: Optional[datetime] = None):
+    today = today or datetime.today()
+    default_month, default_year = next_target_month(today)
+    if target_year:
+        return target_month or default_month, target_year
+    if not target_month:
+        return default_month, default_year
+    # The month's next occurrence: this year unless it has already passed
+    if target_month < today.month:
+        return target_month, today.year + 1   # e.g. asking for January in March
+    return target_month, today.year           # e.g. asking for December in December
+
 
 def run_ml_pipeline() -> Dict[str, Any]:
     """
-    Triggers main.py as a subprocess.
+    Regenerates next month's reports from the saved model.
 
-    Why subprocess?
-    main.py takes 40-60 seconds to run.
-    Running it as subprocess means the API stays responsive
-    and we can capture its output/errors cleanly.
+    No retraining: predictions come from the in-memory artifact
+    (milliseconds), then the budget + inventory plan CSVs are published
+    as a new report version so every GET endpoint sees the fresh numbers.
+    Model evaluation (and the rest of the set) is carried over from the
+    current version, as measured at the last retrain.
 
     Returns dict with status, budget, timing info.
     """
-    if not _pipeline_lock.acquire(blocking=False):
-        raise RuntimeError(
-            "ML pipeline is already running. Please wait for it to finish (~4 minutes)."
-        )
+    start_time = time.time()
+    artifact = load_model()
 
+    target_month, target_year = next_target_month()
+    merged, category_budget, _ = predict_from_artifact(
+        artifact, target_month, target_year, SAFETY_FACTOR, service_level=SERVICE_LEVEL
+    )
+    staging = stage_version(str(REPORTS_DIR), carry_over=_CARRIED_OVER)
     try:
-        return _run_ml_pipeline_inner()
-    finally:
-        _pipeline_lock.release()
+        save_plan_reports(staging, category_budget, merged)
+        version = publish_version(str(REPORTS_DIR), staging)
+    except Exception:
+        discard_staging(staging)
+        raise
+
+    return {
+        "status": "success",
+        "message": f"Predictions regenerated from model {artifact['version']}",
+        "target_month": month_label(target_month, target_year),
+        "items_predicted": len(merged),
+        "total_budget": round(float(category_budget["Budget_Required"].sum()), 2),
+        "time_taken_seconds": round(time.time() - start_time, 2),
+        "timestamp": datetime.now().isoformat(),
+        "report_version": version,
+    }
 
-def _run_ml_pipeline_inner() -> Dict[str, Any]:
-    start_time = time.time()
 
+def get_forecast(
+    target_month: Optional[int] = None,
+    target_year: Optional[int] = None,
+    safety_factor: Optional[float] = None,
+    service_level: Optional[float] = None,
+    horizon: int = 1,
+) -> Dict[str, Any]:
+    """
+    What-if predictions from the in-memory model — nothing is written.
+    Any target month / stock policy, answered without retraining.
+
+    Stock policy:
+    - service_level given → Recommended_Stock from that forecast quantile
+    - safety_factor given → flat predicted x safety_factor buffer
+    - neither             → default SERVICE_LEVEL (what /run uses)
+
+    horizon > 1 adds an "outlook": predicted units + value for the
+    target month and each following month (features rolled forward).
+    """
+    start_time = time.perf_counter()
+    artifact = load_model()
+    month, year = _resolve_target_month(target_month, target_year)
+
+    if service_level is None and safety_factor is None:
+        service_level = SERVICE_LEVEL
+    merged, category_budget, _ = predict_from_artifact(
+        artifact, month, year,
+        safety_factor if safety_factor is not None else SAFETY_FACTOR,
+        service_level=service_level,
+        horizon=horizon,
+    )
+
+    outlook = None
+    if horizon > 1:
+        price = merged["Price"].to_numpy()
+        outlook = [
+            {
+                "target_month": month_label(m, y),
+                "predicted_qty": int(merged[predicted_column(month_label(m, y))].sum()),
+                "predicted_value": round(float(
+                    (merged[predicted_column(month_label(m, y))].to_numpy() * price).sum()), 2),
+            }
+            for m, y in horizon_months(month, year, horizon)
+        ]
+
+    categories = [
+        {"category": str(cat), "budget_required": round(float(budget), 2)}
+        for cat, budget in zip(category_budget["Category"], category_budget["Budget_Required"])
+    ]
+
+    return {
+        "target_month": month_label(month, year),
+        "service_level": service_level,
+        "safety_factor": None if service_level is not None else safety_factor,
+        "model_version": artifact["version"],
+        "items_predicted": len(merged),
+        "total_budget": round(float(category_budget["Budget_Required"].sum()), 2),
+        "categories": categories,
+        "outlook": outlook,
+        "time_taken_ms": round((time.perf_counter() - start_time) * 1000, 2),
+    }
+
+
+def _pipeline_command() -> List[str]:
+    """[python, main.py] — the interpreter main.py should run under."""
     main_py_path = ML_ROOT / "main.py"
 
     if not main_py_path.exists():
@@ -119,36 +292,61 @@ def _run_ml_pipeline_inner() -> Dict[str, Any]:
 
     # Find the root unified venv python (to ensure all ML libraries are present)
     root_venv_python = BASE_DIR.parent / "venv" / "Scripts" / "python.exe"
-    
+
     # Fallback to current interpreter if root venv isn't found
     python_exe = str(root_venv_python) if root_venv_python.exists() else sys.executable
+    return [python_exe, str(main_py_path)]
 
-    # Run main.py using the robust python interpreter
-    result = subprocess.run(
-        [python_exe, str(main_py_path)],
+
+def retrain_ml_pipeline() -> Dict[str, Any]:
+    """
+    Starts a retrain (main.py as a subprocess) in the background.
+
+    Why background?
+    main.py takes 40-60 seconds to run.
+    The request returns a job_id at once; progress (stages 1-11,
+    timings, logs) is read from get_job() / stream_job_events().
+
+    A retrain requested while one is running attaches to it.
+    The fresh artifact is loaded into memory when the job succeeds.
+    Returns the job dict plus "attached".
+    """
+    job, attached = _job_runner.submit(
+        _pipeline_command(),
         cwd=str(ML_ROOT),          # run FROM the ML folder
-        capture_output=True,       # capture stdout and stderr
-        text=True,                 # return strings not bytes
-        timeout=600,               # 10 min max (safety limit)
-        encoding="utf-8",          # fix Windows cp1252 emoji crash
-        env={**os.environ, "PYTHONIOENCODING": "utf-8"},  # force subprocess to write UTF-8
+        parse_result=_parse_pipeline_stdout,
+        on_success=lambda: load_model(force=True),
     )
+    return {**job, "attached": attached}
 
-    elapsed = round(time.time() - start_time, 2)
 
-    # If main.py crashed → return error details
-    if result.returncode != 0:
-        raise RuntimeError(
-            f"ML pipeline failed after {elapsed}s.\n"
-            f"Error output:\n{result.stderr}"
-        )
+def list_jobs() -> Dict[str, Any]:
+    """Recent pipeline jobs, newest first — with their durations."""
+    jobs = _job_runner.list()
+    return {"total_jobs": len(jobs), "jobs": jobs}
+
+
+def get_job(job_id: str, include_logs: bool = True) -> Dict[str, Any]:
+    job = _job_runner.get(job_id, include_logs=include_logs)
+    if job is None:
+        raise FileNotFoundError(f"No pipeline job with id '{job_id}'.")
+    return job
+
+
+def stream_job_events(job_id: str) -> Iterator[str]:
+    """Server-sent events for one job: stage / log / done (+ ping)."""
+    get_job(job_id, include_logs=False)   # 404 before the stream starts
+    for event in _job_runner.events(job_id):
+        yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
 
+
+def _parse_pipeline_stdout(stdout: str) -> Dict[str, Any]:
     # Extract total budget from main.py's printed output
     total_budget = 0.0
     items_predicted = 0
     target_month = "Next Month"
 
-    for line in result.stdout.split("\n"):
+    for line in stdout.split("\n"):
         # Updated string match to "Total budget" to align with main.py output
         if "Total budget" in line:
             # Line: "   [+] Total budget: Rs. 40,935,807.31"
@@ -160,7 +358,7 @@ def _run_ml_pipeline_inner() -> Dict[str, Any]:
         if "Items predicted" in line:
             # Line: "   Items predicted: 5024"
             try:
-                items_predicted = int(line.split(":")[-1].strip())
+                items_predicted = int(line.split(":")[-1].strip().replace(",", ""))
             except ValueError:
                 pass
         if "Target month" in line:
@@ -172,154 +370,143 @@ def _run_ml_pipeline_inner() -> Dict[str, Any]:
 
     return {
         "status": "success",
-        "message": "Prediction pipeline completed successfully",
+        "message": "Model retrained and predictions generated successfully",
         "target_month": target_month,
         "items_predicted": items_predicted,
         "total_budget": total_budget,
-        "time_taken_seconds": elapsed,
         "timestamp": datetime.now().isoformat(),
     }
 
 
-# ─────────────────────────────────────────────────────────────────────────────
+# ══════════════════════════════════════════════════════════════════════════════
+# REPORT READERS (cached)
+# ══════════════════════════════════════════════════════════════════════════════
+# Each _parse_* function runs ONLY when its file changed on disk.
+# It returns everything the endpoint needs (frame + derived aggregates),
+# and _report_cache hands the same object to every later request.
 
-def get_budgets() -> Dict[str, Any]:
-    """
-    Reads frontend_category_budgets.csv
-    Returns category budgets sorted highest first.
+_report_cache = ReportCache()
 
-    CSV columns: Category, Budget_Required
+
+def get_report_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters — shown on GET /health."""
+    return _report_cache.stats()
+
+
+# ── Report versions ───────────────────────────────────────────────────────────
+# main.py publishes every run as REPORTS_DIR/versions/<version>/ and swaps
+# current.json atomically. A request resolves current.json ONCE
+# (_pin_reports) and reads all of its files from that directory, so it
+# never mixes two runs — even if a new version is published mid-request.
+
+# Files the refresh-from-saved-model does not regenerate
+_CARRIED_OVER = (EVALUATION_CSV.name, PROFILE_JSON.name, CATEGORY_SALES_CSV.name)
+
+_pin_lock = threading.Lock()
+_last_pinned: Dict[str, Any] = {"version": None, "dir": None}
+
+
+def _pin_reports() -> Dict[str, Any]:
+    """The current report version and the paths of its files."""
+    version, reports_dir = pinned_reports_dir(str(REPORTS_DIR))
+    reports_dir = Path(reports_dir)
+    with _pin_lock:
+        if _last_pinned["version"] not in (None, version):
+            # Parsed copies of the superseded version are not needed anymore
+            _report_cache.drop_under(_last_pinned["dir"])
+        _last_pinned.update(version=version, dir=reports_dir)
+    return {
+        "version": version,
+        "budgets": reports_dir / BUDGETS_CSV.name,
+        "inventory": reports_dir / INVENTORY_CSV.name,
+        "inventory_parquet": reports_dir / INVENTORY_PARQUET.name,
+        "evaluation": reports_dir / EVALUATION_CSV.name,
+        "profile": reports_dir / PROFILE_JSON.name,
+        "category_sales": reports_dir / CATEGORY_SALES_CSV.name,
+    }
+
+
+def get_report_versions() -> Dict[str, Any]:
+    """Published report versions, newest first."""
+    current = current_version(str(REPORTS_DIR))
+    versions = [
+        {**v, "current": v["version"] == current}
+        for v in reversed(list_versions(str(REPORTS_DIR)))
+    ]
+    return {"current_version": current, "keep": KEEP_VERSIONS, "versions": versions}
+
+
+def rollback_reports(version: Optional[str] = None) -> Dict[str, Any]:
     """
-    _file_exists_or_raise(
-        BUDGETS_CSV,
-        hint="Run POST /api/v1/predict/run first to generate predictions."
-    )
+    Points current.json at `version` (default: the one before the current).
+    FileNotFoundError if that version does not exist.
+    """
+    current, previous = rollback(str(REPORTS_DIR), version)
+    return {"current_version": current, "previous_version": previous}
 
-    df = pd.read_csv(BUDGETS_CSV)
-    df = df.sort_values("Budget_Required", ascending=False)
 
-    # Get target month from inventory CSV (more reliable)
-    target_month = "Next Month"
-    if INVENTORY_CSV.exists():
-        target_month = _get_target_month_from_csv(INVENTORY_CSV)
+def _verdict_for_r2(r2: float):
+    if r2 >= 0.85:
+        return "Excellent", f"Model explains {r2*100:.1f}% of sales variation. Highly reliable."
+    if r2 >= 0.70:
+        return "Good", f"Model explains {r2*100:.1f}% of sales variation. Reliable for ordering."
+    if r2 >= 0.50:
+        return "Acceptable", f"Model explains {r2*100:.1f}% of sales variation. Use with 20% safety buffer."
+    return "Needs Improvement", f"Model explains {r2*100:.1f}% of sales variation. More data needed."
+
+
+def _parse_budgets(path: Path) -> Dict[str, Any]:
+    df = pd.read_csv(path)
+    df = df.sort_values("Budget_Required", ascending=False)
 
     categories = [
         {
-            "category": row["Category"],
-            "budget_required": round(float(row["Budget_Required"]), 2),
+            "category": category,
+            "budget_required": round(float(budget), 2),
         }
-        for _, row in df.iterrows()
+        for category, budget in zip(df["Category"], df["Budget_Required"])
     ]
 
     return {
-        "target_month": target_month,
         "total_budget": round(df["Budget_Required"].sum(), 2),
         "categories": categories,
         "count": len(categories),
     }
 
 
-# ─────────────────────────────────────────────────────────────────────────────
-
-def get_inventory(
-    category: Optional[str] = None,
-    search: Optional[str] = None,
-    limit: int = 100,
-    offset: int = 0,
-) -> Dict[str, Any]:
-    """
-    Reads detailed_inventory_plan.csv
-    Supports filtering by category and search by item name.
-    Supports pagination (limit/offset).
-
-    CSV columns: Item, Category, Predicted_*_Qty,
-                 Recommended_Stock, Price, Budget_Required
-    """
-    _file_exists_or_raise(
-        INVENTORY_CSV,
-        hint="Run POST /api/v1/predict/run first."
-    )
-
-    df = pd.read_csv(INVENTORY_CSV)
-
+def _pred_col_and_month(columns: List[str]):
     # Find the predicted qty column (name changes each month)
     pred_col = next(
-        (c for c in df.columns if c.startswith("Predicted_")), None
+        (c for c in columns if c.startswith("Predicted_")), None
     )
     target_month = "Next Month"
     if pred_col:
         target_month = pred_col.replace("Predicted_", "").replace("_Qty", "").replace("_", " ")
+    return pred_col, target_month
 
-    # Apply category filter
-    if category:
-        df = df[df["Category"].str.lower() == category.lower()]
-
-    # Apply search filter (item name contains search string)
-    if search:
-        df = df[df["Item"].str.upper().str.contains(search.upper(), na=False)]
-
-    total_items = len(df)
-
-    # Apply pagination
-    df_page = df.iloc[offset: offset + limit]
-
-    items = []
-    for _, row in df_page.iterrows():
-        predicted_qty = int(row[pred_col]) if pred_col else 0
-        items.append({
-            "item": str(row["Item"]),
-            "category": str(row["Category"]),
-            "predicted_qty": predicted_qty,
-            "recommended_stock": int(row.get("Recommended_Stock", 0)),
-            "price": round(float(row.get("Price", 0)), 2),
-            "budget_required": round(float(row.get("Budget_Required", 0)), 2),
-        })
+
+def _parse_inventory(path: Path) -> Dict[str, Any]:
+    # Parquet (typed, no text parsing) when the run wrote it, else the CSV
+    df = read_plan(str(path)) if path.suffix == ".parquet" else pd.read_csv(path)
+    pred_col, target_month = _pred_col_and_month(list(df.columns))
 
     return {
+        "df": df,
+        "pred_col": pred_col,
         "target_month": target_month,
-        "total_items": total_items,
-        "limit": limit,
-        "offset": offset,
-        "items": items,
+        # Built once per file version, shared by every /inventory request
+        "index": InventoryIndex(df, pred_col),
     }
 
 
-# ─────────────────────────────────────────────────────────────────────────────
-
-def get_evaluation() -> Dict[str, Any]:
-    """
-    Reads model_evaluation.csv
-    Returns ML accuracy metrics.
-
-    CSV columns: Metric, Value, Interpretation
-    """
-    _file_exists_or_raise(
-        EVALUATION_CSV,
-        hint="Run POST /api/v1/predict/run first."
-    )
-
-    df = pd.read_csv(EVALUATION_CSV)
+def _parse_evaluation(path: Path) -> Dict[str, Any]:
+    df = pd.read_csv(path)
 
     # Convert rows to a simple key→value dict
-    metrics = {
-        str(row["Metric"]): row["Value"]
-        for _, row in df.iterrows()
-    }
+    metrics = dict(zip(df["Metric"].astype(str), df["Value"]))
 
     r2 = float(metrics.get("R2_Score", 0))
-
-    if r2 >= 0.85:
-        verdict = "Excellent"
-        interpretation = f"Model explains {r2*100:.1f}% of sales variation. Highly reliable."
-    elif r2 >= 0.70:
-        verdict = "Good"
-        interpretation = f"Model explains {r2*100:.1f}% of sales variation. Reliable for ordering."
-    elif r2 >= 0.50:
-        verdict = "Acceptable"
-        interpretation = f"Model explains {r2*100:.1f}% of sales variation. Use with 20% safety buffer."
-    else:
-        verdict = "Needs Improvement"
-        interpretation = f"Model explains {r2*100:.1f}% of sales variation. More data needed."
+    verdict, interpretation = _verdict_for_r2(r2)
 
     return {
         "mae": round(float(metrics.get("MAE", 0)), 4),
@@ -331,21 +518,8 @@ def get_evaluation() -> Dict[str, Any]:
     }
 
 
-# ─────────────────────────────────────────────────────────────────────────────
-
-def get_trends() -> Dict[str, Any]:
-    """
-    Reads preprocessed_12_month_data.csv
-    Returns monthly sales totals per category for line charts.
-
-    Excludes 'Other Meds/Unclassified' (too noisy for trends).
-    """
-    _file_exists_or_raise(
-        TRENDS_CSV,
-        hint="Run POST /api/v1/predict/run first."
-    )
-
-    df = pd.read_csv(TRENDS_CSV)
+def _parse_trends(path: Path) -> Dict[str, Any]:
+    df = pd.read_csv(path, usecols=lambda c: c in {"Date", "Month", "Category", "Qty"})
 
     # Aggregate: total qty per month per category
     trend_df = (
@@ -375,12 +549,12 @@ def get_trends() -> Dict[str, Any]:
 
     data_points = [
         {
-            "month": int(row["Month"]),
-            "month_name": MONTH_NAMES.get(int(row["Month"]), str(row["Month"])),
-            "category": str(row["Category"]),
-            "total_qty": round(float(row["Qty"]), 2),
+            "month": int(month),
+            "month_name": MONTH_NAMES.get(int(month), str(month)),
+            "category": str(category),
+            "total_qty": round(float(qty), 2),
         }
-        for _, row in trend_df.iterrows()
+        for month, category, qty in zip(trend_df["Month"], trend_df["Category"], trend_df["Qty"])
     ]
 
     return {
@@ -390,13 +564,349 @@ def get_trends() -> Dict[str, Any]:
     }
 
 
+def _parse_profile_history(path: Path) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _parse_profile(path: Path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _parse_plan_parquet(path: Path) -> Dict[str, Any]:
+    # Metadata only — no plan rows are read here
+    info = plan_info(str(path))
+    pred_col, target_month = _pred_col_and_month(info["columns"])
+    wanted = ["Item", "Category", pred_col, "Recommended_Stock", "Price", "Budget_Required",
+              *(col for _, col in QUANTILE_FIELDS)]
+    return {
+        **info,
+        "pred_col": pred_col,
+        "target_month": target_month,
+        "read_columns": [c for c in wanted if c and c in info["columns"]],
+    }
+
+
+def _plan_parquet(reports: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Cached metadata of this version's Parquet plan (None for CSV-only runs)."""
+    path = reports["inventory_parquet"]
+    if not path.exists():
+        return None
+    return _report_cache.get(path, _parse_plan_parquet, name="plan_parquet")
+
+
+def _load_inventory(reports: Dict[str, Any]) -> Dict[str, Any]:
+    path = reports["inventory_parquet"]
+    if not path.exists():
+        path = reports["inventory"]
+    return _report_cache.get(path, _parse_inventory, name="inventory")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+
+def get_budgets(reports: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Reads frontend_category_budgets.csv (cached)
+    Returns category budgets sorted highest first.
+
+    CSV columns: Category, Budget_Required
+    """
+    reports = reports or _pin_reports()
+    _file_exists_or_raise(
+        reports["budgets"],
+        hint="Run POST /api/v1/predict/run first to generate predictions."
+    )
+
+    budgets = _report_cache.get(reports["budgets"], _parse_budgets, name="budgets")
+
+    # Get target month from inventory CSV (more reliable)
+    target_month = "Next Month"
+    plan = _plan_parquet(reports)
+    if plan is not None:
+        target_month = plan["target_month"]
+    elif reports["inventory"].exists():
+        target_month = _report_cache.get(
+            reports["inventory"], _get_target_month_from_csv, name="target_month"
+        )
+
+    return {"target_month": target_month, **budgets}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+
+def get_inventory(
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+    sort_by: str = "file",
+    order: str = "desc",
+) -> Dict[str, Any]:
+    """
+    Reads the inventory plan
+    Supports filtering by category and search by item name.
+    Supports sorting (file order / budget / predicted qty).
+    Supports pagination (limit/offset).
+
+    Without a search term the page is read straight from
+    detailed_inventory_plan.parquet: the category filter skips row
+    groups, and only Row + the sort key are read before fetching the
+    page's rows. A search term needs the prebuilt InventoryIndex
+    (n-gram postings, built once per report version).
+
+    Columns: Item, Category, Predicted_*_Qty,
+             Recommended_Stock, Price, Budget_Required
+    """
+    reports = _pin_reports()
+    plan = _plan_parquet(reports)
+    if plan is not None and not search:
+        return _query_plan_parquet(reports, plan, category, limit, offset, sort_by, order)
+
+    _file_exists_or_raise(
+        reports["inventory"],
+        hint="Run POST /api/v1/predict/run first."
+    )
+
+    inventory = _load_inventory(reports)
+    page = inventory["index"].query(
+        category=category,
+        search=search,
+        sort_by=sort_by,
+        descending=(sort_by != "file" and order == "desc"),
+        limit=limit,
+        offset=offset,
+    )
+
+    return {
+        "target_month": inventory["target_month"],
+        "total_items": page["total_items"],
+        "limit": limit,
+        "offset": offset,
+        "items": page["items"],
+    }
+
+
+_SORT_COLUMNS = {"file": None, "budget": "Budget_Required"}
+
+
+def _query_plan_parquet(reports, plan, category, limit, offset, sort_by, order) -> Dict[str, Any]:
+    if sort_by not in ("file", "budget", "predicted_qty"):
+        raise ValueError("sort_by must be one of ('file', 'budget', 'predicted_qty')")
+    sort_column = plan["pred_col"] if sort_by == "predicted_qty" else _SORT_COLUMNS[sort_by]
+    total, page = query_plan(
+        str(reports["inventory_parquet"]),
+        category=category,
+        sort_column=sort_column,
+        descending=(sort_by != "file" and order == "desc"),
+        limit=limit,
+        offset=offset,
+        columns=plan["read_columns"],
+        categories=plan["categories"],
+    )
+    return {
+        "target_month": plan["target_month"],
+        "total_items": total,
+        "limit": limit,
+        "offset": offset,
+        "items": serialize_rows(plan_columns(page, plan["pred_col"])),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _parse_budget_arrays(path: Path) -> Dict[str, Any]:
+    # Only the three columns a budget needs, items grouped by category so a
+    # per-category sum is one np.add.reduceat over contiguous slices
+    pred_col, target_month = _pred_col_and_month(
+        plan_info(str(path))["columns"] if path.suffix == ".parquet"
+        else list(pd.read_csv(path, nrows=0).columns)
+    )
+    if pred_col is None:
+        raise ValueError(f"{path.name} has no Predicted_*_Qty column.")
+    columns = ["Category", pred_col, "Price"]
+    df = (read_plan(str(path), columns=columns) if path.suffix == ".parquet"
+          else pd.read_csv(path, usecols=columns))
+
+    codes, categories = pd.factorize(df["Category"].astype(str), sort=True)
+    order = np.argsort(codes, kind="stable")
+    codes = codes[order]
+    return {
+        "target_month": target_month,
+        "categories": [str(c) for c in categories],
+        "codes": codes,
+        "starts": np.searchsorted(codes, np.arange(len(categories))),
+        "predicted": df[pred_col].fillna(0).to_numpy(dtype=np.float64)[order],
+        "price": df["Price"].fillna(0).to_numpy(dtype=np.float64)[order],
+    }
+
+
+def _category_vector(values: Dict[str, float], categories: List[str], default: float,
+                     what: str) -> np.ndarray:
+    """{category name (any case): value} → one value per category, `default` elsewhere."""
+    index = {name.lower(): i for i, name in enumerate(categories)}
+    vector = np.full(len(categories), default, dtype=np.float64)
+    for name, value in values.items():
+        i = index.get(name.lower())
+        if i is None:
+            raise ValueError(f"Unknown category in {what}: '{name}'.")
+        vector[i] = value
+    return vector
+
+
+def simulate_budgets(
+    safety_factors: List[float],
+    category_caps: Optional[Dict[str, float]] = None,
+    price_factors: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Per-category budgets of the current inventory plan under a grid of
+    flat safety factors, with optional per-category budget caps and
+    price factors — every scenario in one vectorized pass:
+
+        recommended = ceil(predicted x factor)          (scenarios x items)
+        budget      = recommended x price x price_factor
+        by category = np.add.reduceat(budget)           (scenarios x categories)
+        capped      = min(by category, cap)
+
+    Predictions and prices come from the published plan (cached per
+    report version); nothing is retrained or written. The buffer is the
+    same ceil(predicted x factor) rule as main.py's flat safety stock.
+    """
+    start_time = time.perf_counter()
+    reports = _pin_reports()
+    path = reports["inventory_parquet"]
+    if not path.exists():
+        path = reports["inventory"]
+    _file_exists_or_raise(path, hint="Run POST /api/v1/predict/run first.")
+    arrays = _report_cache.get(path, _parse_budget_arrays, name="budget_arrays")
+
+    categories = arrays["categories"]
+    caps = _category_vector(category_caps or {}, categories, np.inf, "category_caps")
+    price = arrays["price"] * _category_vector(
+        price_factors or {}, categories, 1.0, "price_factors")[arrays["codes"]]
+
+    factors = np.asarray(safety_factors, dtype=np.float64)
+    budget = np.multiply.outer(factors, arrays["predicted"])
+    np.ceil(budget, out=budget)
+    budget *= price
+    uncapped = (np.add.reduceat(budget, arrays["starts"], axis=1) if len(price)
+                else np.zeros((len(factors), len(categories))))
+    capped = np.minimum(uncapped, caps)
+
+    scenarios = []
+    for factor, row, raw in zip(safety_factors, capped, uncapped):
+        order = np.argsort(-row, kind="stable")
+        scenarios.append({
+            "safety_factor": factor,
+            "total_budget": round(float(row.sum()), 2),
+            "categories": [
+                {
+                    "category": categories[i],
+                    "budget_required": round(float(row[i]), 2),
+                    "capped": bool(raw[i] > caps[i]),
+                }
+                for i in order
+            ],
+        })
+
+    return {
+        "target_month": arrays["target_month"],
+        "report_version": reports["version"],
+        "items": len(price),
+        "scenarios": scenarios,
+        "time_taken_ms": round((time.perf_counter() - start_time) * 1000, 2),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+
+def get_evaluation(reports: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Reads model_evaluation.csv (cached)
+    Returns ML accuracy metrics.
+
+    CSV columns: Metric, Value, Interpretation
+    """
+    reports = reports or _pin_reports()
+    _file_exists_or_raise(
+        reports["evaluation"],
+        hint="Run POST /api/v1/predict/run first."
+    )
+
+    return dict(_report_cache.get(reports["evaluation"], _parse_evaluation, name="evaluation"))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+
+def get_pipeline_profile() -> Dict[str, Any]:
+    """
+    Reads pipeline_profile.json (cached) — wall / CPU / peak RSS of every
+    stage of the last main.py run — and compares each stage with the run
+    before it (pipeline_profile_history.jsonl), so a stage that got slower
+    stands out.
+    """
+    profile_path = _pin_reports()["profile"]
+    _file_exists_or_raise(
+        profile_path,
+        hint="Run POST /api/v1/predict/retrain first."
+    )
+    latest = _report_cache.get(profile_path, _parse_profile, name="profile")
+
+    try:
+        history = _report_cache.get(PROFILE_HISTORY, _parse_profile_history, name="profile_history")
+    except FileNotFoundError:
+        history = []
+    earlier = [run for run in history if run.get("started_at") != latest.get("started_at")]
+    previous = earlier[-1] if earlier else None
+    previous_wall = {
+        st["name"]: st["wall_seconds"] for st in (previous or {}).get("stages", [])
+    }
+
+    stages = []
+    for st in latest.get("stages", []):
+        before = previous_wall.get(st["name"])
+        change = None
+        if before:   # None or 0 → no meaningful percentage
+            change = round((st["wall_seconds"] - before) / before * 100, 1)
+        stages.append({**st, "previous_wall_seconds": before, "wall_change_pct": change})
+
+    return {
+        "started_at": latest.get("started_at"),
+        "eval_mode": latest.get("eval_mode"),
+        "total": latest.get("total", {}),
+        "stages": stages,
+        "previous_run_at": previous.get("started_at") if previous else None,
+        "runs_recorded": len(history),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+
+def get_trends() -> Dict[str, Any]:
+    """
+    Reads preprocessed_12_month_data.csv (cached)
+    Returns monthly sales totals per category for line charts.
+
+    Excludes 'Other Meds/Unclassified' (too noisy for trends).
+    """
+    _file_exists_or_raise(
+        TRENDS_CSV,
+        hint="Run POST /api/v1/predict/run first."
+    )
+
+    return dict(_report_cache.get(TRENDS_CSV, _parse_trends, name="trends"))
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 
 def get_summary() -> Dict[str, Any]:
     """
     Aggregates key numbers for the main dashboard summary card.
-    Combines data from budgets + evaluation + trends CSVs.
+    Combines data from budgets + evaluation + trends (all cached),
+    all read from the same report version.
     """
+    reports = _pin_reports()
     summary = {
         "target_month": "Not yet run",
         "total_budget": 0.0,
@@ -410,8 +920,8 @@ def get_summary() -> Dict[str, Any]:
     }
 
     # Budget info
-    if BUDGETS_CSV.exists():
-        budgets = get_budgets()
+    if reports["budgets"].exists():
+        budgets = get_budgets(reports)
         summary["target_month"] = budgets["target_month"]
         summary["total_budget"] = budgets["total_budget"]
         if budgets["categories"]:
@@ -419,30 +929,133 @@ def get_summary() -> Dict[str, Any]:
             summary["top_category"] = top["category"]
             summary["top_category_budget"] = top["budget_required"]
         # Last modified time of budgets CSV = last run time
-        mtime = os.path.getmtime(BUDGETS_CSV)
+        mtime = os.path.getmtime(reports["budgets"])
         summary["last_run"] = datetime.fromtimestamp(mtime).isoformat()
 
     # Item count
-    if INVENTORY_CSV.exists():
-        inv_df = pd.read_csv(INVENTORY_CSV)
-        summary["total_items"] = len(inv_df)
+    plan = _plan_parquet(reports)
+    if plan is not None:
+        summary["total_items"] = plan["num_rows"]    # from the file footer
+    elif reports["inventory"].exists():
+        summary["total_items"] = len(_load_inventory(reports)["df"])
 
     # Model accuracy
-    if EVALUATION_CSV.exists():
-        evaluation = get_evaluation()
+    if reports["evaluation"].exists():
+        evaluation = get_evaluation(reports)
         summary["model_r2"] = evaluation["r2_score"]
         summary["model_verdict"] = evaluation["verdict"]
 
     # Date range
     if TRENDS_CSV.exists():
         try:
-            df = pd.read_csv(TRENDS_CSV, usecols=["Date"])
-            dates = pd.to_datetime(df["Date"], errors="coerce")
-            summary["data_date_range"] = (
-                f"{dates.min().strftime('%b %Y')} - "
-                f"{dates.max().strftime('%b %Y')}"
-            )
+            summary["data_date_range"] = get_trends()["date_range"]
         except Exception:
             pass
 
     return summary
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CHARTS — rendered on demand, cached per report version
+# ══════════════════════════════════════════════════════════════════════════════
+
+CHARTS = ("budget", "trends")
+_chart_cache = ChartCache(CHART_CACHE_DIR)
+
+
+def _trends_source(reports: Dict[str, Any]) -> Path:
+    # category_monthly_sales.csv (written by every run) — else the older
+    # row-level preprocessed CSV
+    return reports["category_sales"] if reports["category_sales"].exists() else TRENDS_CSV
+
+
+def _chart_sources(chart: str) -> List[Path]:
+    if chart not in CHARTS:
+        raise ValueError(f"Unknown chart '{chart}'. Choose from: {', '.join(CHARTS)}")
+    reports = _pin_reports()
+    path = reports["budgets"] if chart == "budget" else _trends_source(reports)
+    _file_exists_or_raise(path, hint="Run POST /api/v1/predict/retrain first.")
+    return [path]
+
+
+def _parse_category_sales(path: Path) -> pd.DataFrame:
+    return pd.read_csv(path, usecols=lambda c: c in {"Category", "Year", "Month", "Qty"})
+
+
+def _load_chart_frame(chart: str, path: Path) -> pd.DataFrame:
+    if chart == "budget":
+        return _report_cache.get(path, pd.read_csv, name="budget_chart")
+    return _report_cache.get(path, _parse_category_sales, name="category_sales")
+
+
+def get_chart(chart: str, dpi: int = CHART_DPI) -> Dict[str, Any]:
+    """
+    Returns {"path", "version"} of the chart PNG, rendering it only if
+    this report version has not been drawn at this dpi yet.
+    """
+    sources = _chart_sources(chart)
+    version = report_version(sources)
+
+    def render(tmp_path: Path, dpi: int) -> None:
+        from src.visualization import plot_budget_distribution, plot_category_trends
+
+        frame = _load_chart_frame(chart, sources[0])
+        plot = plot_budget_distribution if chart == "budget" else plot_category_trends
+        plot(frame, output_folder=str(tmp_path.parent), file_name=tmp_path.name, dpi=dpi)
+
+    path = _chart_cache.get(chart, version, dpi, render)
+    return {"path": path, "version": version}
+
+
+def get_chart_series(chart: str) -> Dict[str, Any]:
+    """
+    The data behind a chart as JSON, for the frontend to draw itself:
+    labels (x axis) + one list of values per series.
+    """
+    sources = _chart_sources(chart)
+    version = report_version(sources)
+    df = _load_chart_frame(chart, sources[0])
+
+    if chart == "budget":
+        df = df.sort_values("Budget_Required", ascending=False)
+        return {
+            "chart": chart,
+            "version": version,
+            "title": "Predicted Budget by Category for Next Month",
+            "x_label": "Category",
+            "y_label": "Estimated Budget Required",
+            "labels": df["Category"].astype(str).tolist(),
+            "series": [{
+                "name": "Budget_Required",
+                "values": [round(float(v), 2) for v in df["Budget_Required"]],
+            }],
+        }
+
+    df = df[df["Category"] != "Other Meds/Unclassified"]
+    if "Year" in df.columns:
+        period = df["Year"].astype(int).astype(str) + "-" + df["Month"].astype(int).map("{:02d}".format)
+    else:
+        period = df["Month"].astype(int).map(lambda m: MONTH_NAMES.get(m, str(m)))
+    pivot = (
+        df.assign(Period=period)
+        .pivot_table(index="Period", columns="Category", values="Qty", aggfunc="sum", fill_value=0)
+    )
+    if "Year" not in df.columns:
+        order = {name: n for n, name in MONTH_NAMES.items()}
+        pivot = pivot.loc[sorted(pivot.index, key=lambda p: order.get(p, 0))]
+    return {
+        "chart": chart,
+        "version": version,
+        "title": "Monthly Sales Trend by Category",
+        "x_label": "Month",
+        "y_label": "Total Quantity Sold",
+        "labels": [str(p) for p in pivot.index],
+        "series": [
+            {"name": str(cat), "values": [round(float(v), 2) for v in pivot[cat]]}
+            for cat in pivot.columns
+        ],
+    }
+
+
+def get_chart_cache_stats() -> Dict[str, int]:
+    return _chart_cache.stats()
@@ -0,0 +1,121 @@
+"""
+services/report_cache.py
+────────────────────────
+Process-wide cache for the report files the ML pipeline writes.
+
+Why this exists:
+Every GET endpoint used to call pd.read_csv on every request —
+/summary alone parsed several files. Reports only change when the
+pipeline runs, so each parsed file (plus anything derived from it)
+is kept in memory and reused until the file on disk changes.
+
+How it works:
+- An entry is stored with the file's (mtime, size) stamp
+- Every get() re-stats the file (cheap) and compares stamps
+- Same stamp      → HIT, cached value returned
+- Different stamp → MISS, loader runs again
+- Concurrent requests for the same stale file wait on one per-file
+  lock, so only ONE of them runs the loader and the rest share its result
+
+Cached values are shared between requests — treat them as read-only.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+
+class ReportCache:
+    """Thread-safe {file → parsed value} cache invalidated by mtime/size."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()   # guards _key_locks + counters
+        self._hits = 0
+        self._misses = 0
+
+    # ── internals ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _stamp(path: Path) -> Tuple[int, int]:
+        st = os.stat(path)   # FileNotFoundError propagates to the caller
+        return st.st_mtime_ns, st.st_size
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    # ── public API ───────────────────────────────────────────────────────────
+
+    def get(self, path: Path, loader: Callable[[Path], Any], name: str = "") -> Any:
+        """
+        Returns loader(path), reusing the cached value while the file's
+        mtime and size are unchanged.
+
+        `name` lets several derived values be cached for the same file
+        (e.g. the full inventory frame and a header-only lookup).
+        """
+        key = f"{name}:{path}"
+        try:
+            stamp = self._stamp(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(key, None)
+            raise
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self._count(hit=True)
+            return entry[1]
+
+        with self._key_lock(key):
+            # Another request may have reloaded it while we waited
+            stamp = self._stamp(path)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._count(hit=True)
+                return entry[1]
+
+            self._count(hit=False)
+            value = loader(path)
+            # Stamp taken BEFORE loading: if the file changes mid-load the
+            # next request sees a newer stamp and reloads again.
+            self._entries[key] = (stamp, value)
+            return value
+
+    def drop_under(self, directory: Path) -> int:
+        """Drops entries for files inside `directory` (an unpublished report version)."""
+        prefix = os.path.join(str(directory), "")
+        with self._lock:
+            stale = [key for key in self._entries if key.split(":", 1)[1].startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drops every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit / miss counters for the health endpoint."""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "entries": len(self._entries),
+            }
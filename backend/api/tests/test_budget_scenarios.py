@@ -0,0 +1,109 @@
+"""
+tests/test_budget_scenarios.py
+──────────────────────────────
+Tests for POST /predict/budget-scenarios (vectorized what-if budgets).
+Uses a throwaway reports dir, so the real outputs are never touched.
+
+How to run:
+    cd backend/api
+    pytest tests/test_budget_scenarios.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services import ml_service
+from src.forecast import apply_safety_buffer, calculate_budget, save_plan_reports
+from src.publishing import publish_version, stage_version
+
+client = TestClient(app)
+URL = "/api/v1/predict/budget-scenarios"
+PRED_COL = "Predicted_May_2026_Qty"
+
+
+@pytest.fixture
+def plan():
+    rng = np.random.default_rng(11)
+    n = 400
+    return pd.DataFrame({
+        "Item": [f"MED {i:03d}" for i in range(n)],
+        "Category": rng.choice(["Respiratory", "Anti-Diabetic", "Cardiovascular"], n),
+        PRED_COL: rng.integers(0, 60, n),
+        "Recommended_Stock": rng.integers(0, 60, n),
+        "Price": rng.uniform(5, 500, n).round(2),
+        "Budget_Required": 0.0,
+    })
+
+
+@pytest.fixture
+def reports_dir(plan, tmp_path, monkeypatch):
+    staging = stage_version(str(tmp_path))
+    save_plan_reports(staging, plan.groupby("Category")["Budget_Required"].sum().reset_index(), plan)
+    publish_version(str(tmp_path), staging)
+    monkeypatch.setattr(ml_service, "REPORTS_DIR", tmp_path)
+    return tmp_path
+
+
+def by_category(response_scenario):
+    return {c["category"]: c["budget_required"] for c in response_scenario["categories"]}
+
+
+def test_matches_pipeline_flat_buffer(plan, reports_dir):
+    """Each scenario equals step 8 + 9 of main.py at that safety factor"""
+    factors = [1.0, 1.1, 1.15, 1.3]
+    response = client.post(URL, json={"safety_factors": factors})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["target_month"] == "May 2026"
+    assert data["items"] == len(plan)
+
+    prices = plan[["Item", "Price"]]
+    for factor, scenario in zip(factors, data["scenarios"]):
+        buffered = apply_safety_buffer(plan.drop(columns=["Recommended_Stock", "Price", "Budget_Required"]),
+                                       PRED_COL, safety_factor=factor)
+        _, expected = calculate_budget(buffered, prices)
+        assert scenario["safety_factor"] == factor
+        assert by_category(scenario) == pytest.approx(
+            dict(zip(expected["Category"], expected["Budget_Required"])), abs=0.01)
+        assert scenario["total_budget"] == pytest.approx(expected["Budget_Required"].sum(), abs=0.05)
+
+
+def test_caps_and_price_factors(plan, reports_dir):
+    """Caps limit one category; price factors scale one category"""
+    base = by_category(client.post(URL, json={"safety_factors": [1.2]}).json()["scenarios"][0])
+    response = client.post(URL, json={
+        "safety_factors": [1.2],
+        "category_caps": {"respiratory": 1000.0},
+        "price_factors": {"Cardiovascular": 2.0},
+    })
+    scenario = response.json()["scenarios"][0]
+    budgets = by_category(scenario)
+    assert budgets["Respiratory"] == 1000.0
+    assert budgets["Cardiovascular"] == pytest.approx(2 * base["Cardiovascular"], abs=0.02)
+    assert budgets["Anti-Diabetic"] == base["Anti-Diabetic"]
+    capped = {c["category"]: c["capped"] for c in scenario["categories"]}
+    assert capped == {"Respiratory": True, "Cardiovascular": False, "Anti-Diabetic": False}
+
+
+def test_categories_sorted_highest_first(reports_dir):
+    """Every scenario lists its categories by budget, highest first"""
+    scenario = client.post(URL, json={"safety_factors": [1.5]}).json()["scenarios"][0]
+    budgets = [c["budget_required"] for c in scenario["categories"]]
+    assert budgets == sorted(budgets, reverse=True)
+
+
+def test_bad_requests_are_422(reports_dir):
+    """Out-of-range factor, empty grid, unknown category → 422"""
+    assert client.post(URL, json={"safety_factors": [0.9]}).status_code == 422
+    assert client.post(URL, json={"safety_factors": []}).status_code == 422
+    response = client.post(URL, json={"safety_factors": [1.1], "category_caps": {"Nope": 1}})
+    assert response.status_code == 422
+    assert "Nope" in response.json()["detail"]
@@ -0,0 +1,108 @@
+"""
+tests/test_charts.py
+────────────────────
+Tests for the on-demand chart cache and the /predict/charts endpoints.
+
+How to run:
+    cd backend/api
+    pytest tests/test_charts.py -v
+"""
+
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from main import app
+from services.chart_cache import ChartCache, report_version
+
+client = TestClient(app)
+
+
+def _fake_render(calls):
+    def render(path, dpi):
+        calls.append(dpi)
+        path.write_bytes(b"png")
+    return render
+
+
+# ── ChartCache ────────────────────────────────────────────────────────────────
+
+def test_cache_renders_once_per_version(tmp_path):
+    """Second request for the same version is served from disk"""
+    calls = []
+    cache = ChartCache(tmp_path)
+    first = cache.get("budget", "v1", 150, _fake_render(calls))
+    second = cache.get("budget", "v1", 150, _fake_render(calls))
+    assert first == second and first.exists()
+    assert calls == [150]
+    assert cache.stats() == {"renders": 1, "hits": 1}
+
+
+def test_new_version_replaces_old_file(tmp_path):
+    """A new report version renders again and prunes the old PNG"""
+    calls = []
+    cache = ChartCache(tmp_path)
+    old = cache.get("budget", "v1", 150, _fake_render(calls))
+    other = cache.get("trends", "v1", 150, _fake_render(calls))
+    new = cache.get("budget", "v2", 150, _fake_render(calls))
+    assert new.exists() and not old.exists()
+    assert other.exists()
+    assert len(calls) == 3
+
+
+def test_concurrent_requests_share_one_render(tmp_path):
+    """Threads asking for the same missing chart trigger a single render"""
+    calls = []
+    cache = ChartCache(tmp_path)
+    threads = [
+        threading.Thread(target=cache.get, args=("budget", "v1", 150, _fake_render(calls)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [150]
+    assert not list(tmp_path.glob("*.tmp.png"))
+
+
+def test_report_version_changes_with_file(tmp_path):
+    """Rewriting a source report gives a new version"""
+    path = tmp_path / "budget.csv"
+    path.write_text("a\n1\n")
+    before = report_version([path])
+    path.write_text("a\n1\n2\n")
+    assert report_version([path]) != before
+
+
+# ── Endpoints ─────────────────────────────────────────────────────────────────
+
+def test_chart_image_returns_png_or_404():
+    """GET /predict/charts/budget is a PNG with the version as ETag"""
+    response = client.get("/api/v1/predict/charts/budget", params={"dpi": 72})
+    assert response.status_code in [200, 404]
+    if response.status_code == 200:
+        assert response.headers["content-type"] == "image/png"
+        assert response.content[:4] == b"\x89PNG"
+        assert response.headers["etag"]
+
+
+def test_chart_series_shape():
+    """Series endpoint returns labels and equally long value lists"""
+    for chart in ["budget", "trends"]:
+        response = client.get(f"/api/v1/predict/charts/{chart}/series")
+        assert response.status_code in [200, 404]
+        if response.status_code == 200:
+            data = response.json()
+            assert data["chart"] == chart
+            for series in data["series"]:
+                assert len(series["values"]) == len(data["labels"])
+
+
+def test_unknown_chart_rejected():
+    """Only budget and trends exist"""
+    response = client.get("/api/v1/predict/charts/pie")
+    assert response.status_code == 422
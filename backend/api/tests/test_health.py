@@ -95,3 +95,12 @@ def test_openapi_schema_accessible():
     """OpenAPI JSON schema at /openapi.json should return 200"""
     response = client.get("/openapi.json")
     assert response.status_code == 200
+
+
+def test_health_has_report_cache_counters():
+    """Health exposes report cache hit/miss counters"""
+    response = client.get("/health")
+    data = response.json()
+    assert "report_cache" in data
+    for key in ("hits", "misses", "hit_rate", "entries"):
+        assert key in data["report_cache"]
@@ -0,0 +1,99 @@
+"""
+tests/test_inventory_index.py
+─────────────────────────────
+Checks the prebuilt inventory index against the old full-scan logic.
+
+How to run:
+    cd backend/api
+    pytest tests/test_inventory_index.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+from services.inventory_index import InventoryIndex
+
+PRED_COL = "Predicted_April_2026_Qty"
+
+
+@pytest.fixture(scope="module")
+def plan():
+    names = ["ATORVA 10MG", "ATORVA 20MG", "PANADOL 500MG", "ZINC 10MG",
+             "H.C.T 25MG", "GLUCOPHAGE 500", "Vitamin C", "AMLODIPINE 5MG"]
+    cats = ["Cardiovascular", "Cardiovascular", "Analgesics (Pain/Fever)",
+            "Vitamins & Supplements", "Cardiovascular", "Anti-Diabetic",
+            "Vitamins & Supplements", "Cardiovascular"]
+    predicted = [300, 120, 900, 15, 40, 220, 60, 120]
+    price = [37.2, 51.0, 5.0, 12.0, 8.5, 9.0, 20.0, 14.25]
+    df = pd.DataFrame({"Item": names, "Category": cats, PRED_COL: predicted})
+    df["Recommended_Stock"] = (df[PRED_COL] * 1.2).apply(lambda v: int(-(-v // 1)))
+    df["Price"] = price
+    df["Budget_Required"] = df["Recommended_Stock"] * df["Price"]
+    return df
+
+
+def _scan(df, category=None, search=None):
+    """The old get_inventory filtering."""
+    if category:
+        df = df[df["Category"].str.lower() == category.lower()]
+    if search:
+        df = df[df["Item"].str.upper().str.contains(search.upper(), na=False, regex=False)]
+    return df["Item"].tolist()
+
+
+@pytest.mark.parametrize("category,search", [
+    (None, None), ("cardiovascular", None), (None, "ATORVA"), (None, "10MG"),
+    (None, "a"), (None, "MG"), (None, "H.C"), (None, "vitamin c"),
+    ("Cardiovascular", "MG"), ("Vitamins & Supplements", "ATORVA"),
+    (None, "NOPE"), ("Unknown", None), (None, "ATORVA 20MG"),
+])
+def test_filters_match_full_scan(plan, category, search):
+    """Index filtering returns the same rows, in file order, as the scan"""
+    index = InventoryIndex(plan, PRED_COL)
+    result = index.query(category=category, search=search, limit=1000)
+    expected = _scan(plan, category, search)
+    assert [r["item"] for r in result["items"]] == expected
+    assert result["total_items"] == len(expected)
+
+
+def test_sorted_by_budget_descending(plan):
+    """sort_by=budget returns the highest spend first"""
+    index = InventoryIndex(plan, PRED_COL)
+    items = index.query(sort_by="budget", descending=True, limit=3)["items"]
+    expected = plan.sort_values("Budget_Required", ascending=False)["Item"].head(3).tolist()
+    assert [r["item"] for r in items] == expected
+
+
+def test_sorted_filtered_and_paged(plan):
+    """Filter + sort + offset/limit combine like the pandas equivalent"""
+    index = InventoryIndex(plan, PRED_COL)
+    items = index.query(category="Cardiovascular", sort_by="predicted_qty",
+                        limit=2, offset=1)["items"]
+    expected = (plan[plan["Category"] == "Cardiovascular"]
+                .sort_values(PRED_COL, kind="stable")["Item"].iloc[1:3].tolist())
+    assert [r["item"] for r in items] == expected
+
+
+def test_rows_serialize_with_plain_types(plan):
+    """Rows carry rounded Python numbers, ready for JSON"""
+    index = InventoryIndex(plan, PRED_COL)
+    row = index.query(search="AMLODIPINE")["items"][0]
+    assert row == {
+        "item": "AMLODIPINE 5MG",
+        "category": "Cardiovascular",
+        "predicted_qty": 120,
+        "recommended_stock": 144,
+        "price": 14.25,
+        "budget_required": 2052.0,
+    }
+    assert type(row["predicted_qty"]) is int
+
+
+def test_unknown_sort_field_rejected(plan):
+    with pytest.raises(ValueError):
+        InventoryIndex(plan, PRED_COL).query(sort_by="price")
@@ -0,0 +1,131 @@
+"""
+tests/test_job_runner.py
+────────────────────────
+Tests for the background retrain job runner and the /predict/jobs
+endpoints. A tiny fake pipeline (python -c ...) stands in for main.py.
+
+How to run:
+    cd backend/api
+    pytest tests/test_job_runner.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.job_runner import JobRunner
+
+client = TestClient(app)
+
+
+FAKE_PIPELINE = (
+    "import time\n"
+    "print('1. Loading and Cleaning Data...')\n"
+    "time.sleep({sleep})\n"
+    "print('   Items predicted: 1,234')\n"
+    "print('2. Training Model...')\n"
+    "print('   [+] Total budget: Rs. 1,500.50')\n"
+    "raise SystemExit({code})\n"
+)
+
+
+def _fake(sleep=0.0, code=0):
+    return [sys.executable, "-c", FAKE_PIPELINE.format(sleep=sleep, code=code)]
+
+
+def _parse(stdout):
+    return {"lines": len(stdout.splitlines())}
+
+
+def test_submit_returns_immediately_and_records_stages(tmp_path):
+    """Job id comes back at once; both numbered stages get timings"""
+    runner = JobRunner()
+    job, attached = runner.submit(_fake(sleep=0.3), str(tmp_path), _parse)
+    assert attached is False
+    assert job["status"] in ("queued", "running")
+
+    done = runner.wait(job["job_id"], timeout=30)
+    assert done["status"] == "succeeded"
+    assert [s["number"] for s in done["stages"]] == [1, 2]
+    assert all(s["duration_seconds"] is not None for s in done["stages"])
+    assert done["stages"][0]["duration_seconds"] >= 0.25
+    assert done["result"]["lines"] == 4
+    assert done["progress"] == 1.0
+
+
+def test_overlapping_submit_attaches_to_running_job(tmp_path):
+    """A second submit while running returns the same job"""
+    runner = JobRunner()
+    first, _ = runner.submit(_fake(sleep=1.0), str(tmp_path), _parse)
+    second, attached = runner.submit(_fake(), str(tmp_path), _parse)
+    assert attached is True
+    assert second["job_id"] == first["job_id"]
+    runner.wait(first["job_id"], timeout=30)
+    assert len(runner.list()) == 1
+
+
+def test_failed_pipeline_keeps_logs_and_error(tmp_path):
+    """Non-zero exit → failed status with the output tail in error"""
+    runner = JobRunner()
+    job, _ = runner.submit(_fake(code=3), str(tmp_path), _parse)
+    done = runner.wait(job["job_id"], timeout=30)
+    assert done["status"] == "failed"
+    assert "Training Model" in done["error"]
+    assert len(runner.get(job["job_id"], include_logs=True)["logs"]) == 4
+
+
+def test_runner_error_fails_job_and_frees_the_runner(tmp_path):
+    """An unexpected error while reading output fails the job, not the runner"""
+    from unittest import mock
+    from services.job_runner import PipelineJob
+
+    runner = JobRunner()
+    with mock.patch.object(PipelineJob, "_enter_stage", side_effect=RuntimeError("bad stage")):
+        job, _ = runner.submit(_fake(sleep=5.0), str(tmp_path), _parse)
+        done = runner.wait(job["job_id"], timeout=30)
+    assert done["status"] == "failed"
+    assert "bad stage" in done["error"]
+    assert runner.active() is None
+
+    # the next submit starts a fresh job instead of attaching to the dead one
+    second, attached = runner.submit(_fake(), str(tmp_path), _parse)
+    assert attached is False
+    assert runner.wait(second["job_id"], timeout=30)["status"] == "succeeded"
+
+
+def test_events_stream_ends_with_done(tmp_path):
+    """Event stream replays stages + logs and closes with done"""
+    runner = JobRunner()
+    job, _ = runner.submit(_fake(sleep=0.2), str(tmp_path), _parse)
+    events = [e["event"] for e in runner.events(job["job_id"], heartbeat_seconds=0.05)]
+    assert events[-1] == "done"
+    assert events.count("stage") == 2
+    assert events.count("log") == 4
+
+
+def test_history_is_bounded(tmp_path):
+    """Only the newest history_size jobs are kept"""
+    runner = JobRunner(history_size=2)
+    ids = []
+    for _ in range(3):
+        job, _ = runner.submit(_fake(), str(tmp_path), _parse)
+        runner.wait(job["job_id"], timeout=30)
+        ids.append(job["job_id"])
+    assert [j["job_id"] for j in runner.list()] == ids[:0:-1]
+
+
+def test_jobs_endpoint_returns_list():
+    """GET /predict/jobs returns the job history"""
+    response = client.get("/api/v1/predict/jobs")
+    assert response.status_code == 200
+    assert "jobs" in response.json()
+
+
+def test_unknown_job_returns_404():
+    """GET /predict/jobs/{id} for an unknown id returns 404"""
+    assert client.get("/api/v1/predict/jobs/doesnotexist").status_code == 404
+    assert client.get("/api/v1/predict/jobs/doesnotexist/events").status_code == 404
@@ -0,0 +1,104 @@
+"""
+tests/test_plan_parquet.py
+──────────────────────────
+GET /predict/inventory answered from the Parquet plan (pushdown) must
+return exactly what the in-memory index returns for the CSV.
+
+How to run:
+    cd backend/api
+    pytest tests/test_plan_parquet.py -v
+"""
+
+import sys
+import os
+import itertools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services import ml_service
+from src.forecast import save_plan_reports
+from src.plan_store import PLAN_PARQUET_FILE
+from src.publishing import publish_version, stage_version
+
+client = TestClient(app)
+
+
+def make_plan(n=300):
+    rng = np.random.default_rng(7)
+    recommended = rng.integers(0, 40, n)
+    price = rng.choice([10.0, 25.5, 99.99], n)
+    return pd.DataFrame({
+        "Item": [f"MED {i:03d} {'TAB' if i % 3 else 'SYR'}" for i in range(n)],
+        "Category": rng.choice(["Respiratory", "Anti-Diabetic", "Vitamins & Supplements"], n),
+        "Predicted_May_2026_Qty": rng.integers(0, 30, n),
+        "P50_Qty": rng.integers(0, 30, n),
+        "P90_Qty": recommended,
+        "P95_Qty": recommended + 2,
+        "Recommended_Stock": recommended,
+        "Price": price,
+        "Budget_Required": recommended * price,
+    })
+
+
+@pytest.fixture
+def reports_dir(tmp_path, monkeypatch):
+    plan = make_plan()
+    budgets = plan.groupby("Category")["Budget_Required"].sum().reset_index()
+    staging = stage_version(str(tmp_path))
+    save_plan_reports(staging, budgets, plan)
+    publish_version(str(tmp_path), staging)
+    monkeypatch.setattr(ml_service, "REPORTS_DIR", tmp_path)
+    return tmp_path
+
+
+def csv_only(reports_dir):
+    """Same version without its Parquet file → the index path"""
+    os.remove(ml_service._pin_reports()["inventory_parquet"])
+
+
+def test_run_writes_parquet_plan(reports_dir):
+    """save_plan_reports writes the Parquet plan next to the CSV"""
+    assert ml_service._pin_reports()["inventory_parquet"].name == PLAN_PARQUET_FILE
+    assert ml_service._pin_reports()["inventory_parquet"].exists()
+
+
+def test_parquet_pages_match_index(reports_dir):
+    """Category / sort / order / offset combinations give identical pages"""
+    combos = list(itertools.product(
+        [None, "respiratory", "Vitamins & Supplements", "Nope"],
+        ["file", "budget", "predicted_qty"],
+        ["asc", "desc"],
+        [0, 95, 290],
+    ))
+    url = "/api/v1/predict/inventory"
+
+    def fetch(category, sort_by, order, offset):
+        params = {"sort_by": sort_by, "order": order, "offset": offset, "limit": 20}
+        if category:
+            params["category"] = category
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        return response.json()
+
+    from_parquet = [fetch(*combo) for combo in combos]
+    csv_only(reports_dir)
+    from_index = [fetch(*combo) for combo in combos]
+    assert from_parquet == from_index
+
+
+def test_search_still_uses_index(reports_dir):
+    """A search term is answered by the n-gram index"""
+    response = client.get("/api/v1/predict/inventory", params={"search": "syr", "limit": 500})
+    assert response.status_code == 200
+    assert response.json()["total_items"] == 100
+
+
+def test_summary_counts_rows_from_footer(reports_dir):
+    """Summary item count comes from the Parquet metadata"""
+    assert client.get("/api/v1/predict/summary").json()["total_items"] == 300
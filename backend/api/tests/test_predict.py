@@ -264,3 +264,142 @@ def test_trends_excludes_unclassified():
         data = response.json()
         for point in data["data"]:
             assert point["category"] != "Other Meds/Unclassified"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FORECAST ENDPOINT (in-process, saved model)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def test_forecast_returns_valid_status():
+    """GET /forecast returns 200, or 404 if no model has been trained yet"""
+    response = client.get("/api/v1/predict/forecast")
+    assert response.status_code in [200, 404]
+
+
+def test_forecast_uses_requested_month_and_factor():
+    """target_month / safety_factor are echoed back in the response"""
+    response = client.get("/api/v1/predict/forecast?target_month=6&target_year=2026&safety_factor=1.5")
+    if response.status_code == 200:
+        data = response.json()
+        assert data["target_month"] == "June 2026"
+        assert data["safety_factor"] == 1.5
+        assert "model_version" in data
+        calculated = sum(c["budget_required"] for c in data["categories"])
+        assert abs(data["total_budget"] - calculated) < 1.0
+
+
+def test_forecast_defaults_to_service_level():
+    """No policy given → default P90 service level, no safety_factor"""
+    response = client.get("/api/v1/predict/forecast?target_month=6&target_year=2026")
+    if response.status_code == 200:
+        data = response.json()
+        assert data["service_level"] == 0.9
+        assert data["safety_factor"] is None
+
+
+def test_forecast_higher_service_level_costs_more():
+    """P95 stock never needs less budget than P50 stock"""
+    low = client.get("/api/v1/predict/forecast?target_month=6&target_year=2026&service_level=0.5")
+    high = client.get("/api/v1/predict/forecast?target_month=6&target_year=2026&service_level=0.95")
+    if low.status_code == 200:
+        assert high.json()["total_budget"] >= low.json()["total_budget"]
+
+
+def test_forecast_both_policies_rejected():
+    """service_level and safety_factor together → 422"""
+    response = client.get("/api/v1/predict/forecast?service_level=0.9&safety_factor=1.2")
+    assert response.status_code == 422
+
+
+def test_forecast_horizon_returns_outlook():
+    """horizon=3 → three outlook months starting at the target month"""
+    response = client.get("/api/v1/predict/forecast?target_month=11&target_year=2026&horizon=3")
+    if response.status_code == 200:
+        months = [m["target_month"] for m in response.json()["outlook"]]
+        assert months == ["November 2026", "December 2026", "January 2027"]
+
+
+def test_forecast_horizon_too_long_rejected():
+    """horizon above 6 months should be rejected"""
+    response = client.get("/api/v1/predict/forecast?horizon=7")
+    assert response.status_code == 422
+
+
+def test_forecast_invalid_month_rejected():
+    """target_month=13 should be rejected"""
+    response = client.get("/api/v1/predict/forecast?target_month=13")
+    assert response.status_code == 422
+
+
+def test_forecast_safety_factor_below_one_rejected():
+    """safety_factor < 1.0 would order less than predicted — rejected"""
+    response = client.get("/api/v1/predict/forecast?safety_factor=0.5")
+    assert response.status_code == 422
+
+
+def test_inventory_sort_by_budget_is_descending():
+    """sort_by=budget returns items with the highest budget first"""
+    response = client.get("/api/v1/predict/inventory?sort_by=budget&limit=20")
+    if response.status_code == 200:
+        budgets = [item["budget_required"] for item in response.json()["items"]]
+        assert budgets == sorted(budgets, reverse=True)
+
+
+def test_inventory_invalid_sort_rejected():
+    """Unknown sort_by values are rejected"""
+    response = client.get("/api/v1/predict/inventory?sort_by=price")
+    assert response.status_code == 422
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PROFILE ENDPOINT
+# ══════════════════════════════════════════════════════════════════════════════
+
+def test_profile_returns_valid_status():
+    """GET /predict/profile returns 200 or 404"""
+    response = client.get("/api/v1/predict/profile")
+    assert response.status_code in [200, 404]
+
+
+def test_profile_compares_with_previous_run(tmp_path, monkeypatch):
+    """Each stage carries its wall-time change vs the previous run"""
+    import json
+    from services import ml_service
+
+    def run(started, wall):
+        return {"started_at": started, "eval_mode": "oob",
+                "total": {"wall_seconds": wall, "cpu_seconds": wall, "peak_rss_mb": 100.0},
+                "stages": [{"number": 1, "name": "load", "wall_seconds": wall,
+                            "cpu_seconds": wall, "peak_rss_mb": 100.0, "rss_growth_mb": 5.0}]}
+
+    latest = run("2026-03-20T10:00:00", 3.0)
+    (tmp_path / "pipeline_profile.json").write_text(json.dumps(latest))
+    (tmp_path / "h.jsonl").write_text(
+        json.dumps(run("2026-03-13T10:00:00", 2.0)) + "\n" + json.dumps(latest) + "\n")
+    monkeypatch.setattr(ml_service, "REPORTS_DIR", tmp_path)
+    monkeypatch.setattr(ml_service, "PROFILE_HISTORY", tmp_path / "h.jsonl")
+
+    response = client.get("/api/v1/predict/profile")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["previous_run_at"] == "2026-03-13T10:00:00"
+    assert data["runs_recorded"] == 2
+    assert data["stages"][0]["previous_wall_seconds"] == 2.0
+    assert data["stages"][0]["wall_change_pct"] == 50.0
+
+
+def test_target_month_resolves_to_its_next_occurrence():
+    """A month without a year is this year's unless it has passed — also in December"""
+    from datetime import datetime
+    from services.ml_service import _resolve_target_month
+
+    december = datetime(2026, 12, 15)
+    assert _resolve_target_month(None, None, today=december) == (1, 2027)
+    assert _resolve_target_month(12, None, today=december) == (12, 2026)
+    assert _resolve_target_month(1, None, today=december) == (1, 2027)
+
+    march = datetime(2026, 3, 10)
+    assert _resolve_target_month(None, None, today=march) == (4, 2026)
+    assert _resolve_target_month(1, None, today=march) == (1, 2027)
+    assert _resolve_target_month(3, None, today=march) == (3, 2026)
+    assert _resolve_target_month(None, 2030, today=march) == (4, 2030)
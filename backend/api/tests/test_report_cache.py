@@ -0,0 +1,106 @@
+"""
+tests/test_report_cache.py
+──────────────────────────
+Tests for the in-memory report cache used by ml_service.
+
+How to run:
+    cd backend/api
+    pytest tests/test_report_cache.py -v
+"""
+
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from services.report_cache import ReportCache
+
+
+def _write(path, text):
+    path.write_text(text)
+
+
+def test_second_read_is_a_hit(tmp_path):
+    """Unchanged file → loader runs once, second call is a hit"""
+    path = tmp_path / "report.csv"
+    _write(path, "a,b\n1,2\n")
+    cache = ReportCache()
+    calls = []
+
+    def loader(p):
+        calls.append(p)
+        return p.read_text()
+
+    assert cache.get(path, loader) == "a,b\n1,2\n"
+    assert cache.get(path, loader) == "a,b\n1,2\n"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_changed_file_is_reloaded(tmp_path):
+    """New mtime/size → loader runs again and returns the new content"""
+    path = tmp_path / "report.csv"
+    _write(path, "v1")
+    cache = ReportCache()
+    assert cache.get(path, lambda p: p.read_text()) == "v1"
+
+    _write(path, "version 2")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert cache.get(path, lambda p: p.read_text()) == "version 2"
+    assert cache.stats()["misses"] == 2
+
+
+def test_names_cache_separate_values_for_one_file(tmp_path):
+    """Two derived values of the same file do not overwrite each other"""
+    path = tmp_path / "report.csv"
+    _write(path, "abc")
+    cache = ReportCache()
+    assert cache.get(path, lambda p: p.read_text(), name="full") == "abc"
+    assert cache.get(path, lambda p: len(p.read_text()), name="size") == 3
+    assert cache.get(path, lambda p: p.read_text(), name="full") == "abc"
+
+
+def test_missing_file_raises_and_drops_entry(tmp_path):
+    """Deleted file → FileNotFoundError (endpoints turn it into a 404)"""
+    path = tmp_path / "report.csv"
+    _write(path, "x")
+    cache = ReportCache()
+    cache.get(path, lambda p: p.read_text())
+    path.unlink()
+    with pytest.raises(FileNotFoundError):
+        cache.get(path, lambda p: p.read_text())
+    assert cache.stats()["entries"] == 0
+
+
+def test_concurrent_requests_share_one_load(tmp_path):
+    """Eight threads hitting a cold entry run the loader exactly once"""
+    path = tmp_path / "report.csv"
+    _write(path, "data")
+    cache = ReportCache()
+    calls = []
+    results = []
+
+    def slow_loader(p):
+        calls.append(p)
+        time.sleep(0.2)
+        return p.read_text()
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get(path, slow_loader)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == ["data"] * 8
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 7
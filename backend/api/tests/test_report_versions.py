@@ -0,0 +1,78 @@
+"""
+tests/test_report_versions.py
+─────────────────────────────
+Tests for reading pinned report versions and rolling them back.
+Uses a throwaway reports dir, so the real outputs are never touched.
+
+How to run:
+    cd backend/api
+    pytest tests/test_report_versions.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services import ml_service
+from src.publishing import publish_version, stage_version
+
+client = TestClient(app)
+
+
+def publish_budget(root, budget):
+    staging = stage_version(str(root))
+    with open(os.path.join(staging, "frontend_category_budgets.csv"), "w") as f:
+        f.write(f"Category,Budget_Required\nAnalgesics,{budget}\n")
+    return publish_version(str(root), staging)
+
+
+@pytest.fixture
+def reports_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_service, "REPORTS_DIR", tmp_path)
+    return tmp_path
+
+
+def test_budgets_read_from_current_version(reports_dir):
+    """GET /predict/budgets serves the newest published version"""
+    publish_budget(reports_dir, 100.0)
+    publish_budget(reports_dir, 250.0)
+    response = client.get("/api/v1/predict/budgets")
+    assert response.status_code == 200
+    assert response.json()["total_budget"] == 250.0
+
+
+def test_versions_listed_newest_first(reports_dir):
+    """GET /predict/reports/versions marks the current version"""
+    first = publish_budget(reports_dir, 100.0)
+    second = publish_budget(reports_dir, 250.0)
+    data = client.get("/api/v1/predict/reports/versions").json()
+    assert data["current_version"] == second
+    assert [v["version"] for v in data["versions"]] == [second, first]
+    assert [v["current"] for v in data["versions"]] == [True, False]
+
+
+def test_rollback_serves_previous_version(reports_dir):
+    """POST /predict/reports/rollback switches every reader back"""
+    first = publish_budget(reports_dir, 100.0)
+    second = publish_budget(reports_dir, 250.0)
+    response = client.post("/api/v1/predict/reports/rollback")
+    assert response.status_code == 200
+    assert response.json() == {"current_version": first, "previous_version": second}
+    assert client.get("/api/v1/predict/budgets").json()["total_budget"] == 100.0
+
+    response = client.post("/api/v1/predict/reports/rollback", params={"version": second})
+    assert response.json()["current_version"] == second
+    assert client.get("/api/v1/predict/budgets").json()["total_budget"] == 250.0
+
+
+def test_rollback_unknown_version_is_404(reports_dir):
+    """Unknown version (or nothing older) → 404"""
+    publish_budget(reports_dir, 100.0)
+    assert client.post("/api/v1/predict/reports/rollback").status_code == 404
+    response = client.post("/api/v1/predict/reports/rollback", params={"version": "nope"})
+    assert response.status_code == 404
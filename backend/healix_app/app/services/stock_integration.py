@@ -168,6 +168,7 @@ class StockIntegrationService:
             db.execute(sql, {"qty": quantity, "mid": medicine_id})
             db.commit()
             logger.info(f"[STOCK_BRIDGE] Deducted {quantity} units for med_id {medicine_id}")
+            self._queue_alert_refresh(db, medicine_id)
             return True
         except Exception as e:
             logger.error(f"[STOCK_BRIDGE] Deduction failed: {e}")
@@ -175,6 +176,23 @@ class StockIntegrationService:
             return False
         finally:
             db.close()
+
+    def _queue_alert_refresh(self, db, medicine_id: int):
+        """
+        Ask Stock Management to re-evaluate this medicine's stock alerts
+        (its scheduler drains stock_alert_refresh_queue every minute).
+        Best effort: the deduction is already committed either way.
+        """
+        try:
+            sql = text("""
+                INSERT INTO stock_alert_refresh_queue (medicine_id, source, queued_at)
+                VALUES (:mid, 'healix_app', NOW())
+            """)
+            db.execute(sql, {"mid": medicine_id})
+            db.commit()
+        except Exception as e:
+            logger.warning(f"[STOCK_BRIDGE] Could not queue alert refresh for med_id {medicine_id}: {e}")
+            db.rollback()
             
                 
     def get_channelling_service_charge(self) -> float:
@@ -0,0 +1,77 @@
+"""
+benchmarks/bench_features.py
+────────────────────────────
+Times the vectorized feature builder against the original per-row loop.
+
+Default size is 10,000 items × 36 months (360,000 item-month rows).
+The loop version is slow at that size (minutes) — pass --skip-reference
+to time only the vectorized engine.
+
+Usage:
+    cd backend/stock_management/Stock_prediction
+    python benchmarks/bench_features.py
+    python benchmarks/bench_features.py --items 2000 --months 24
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from src.features import build_normalized_features, build_normalized_features_reference
+
+
+def make_monthly_sales(n_items: int, n_months: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic Item/Category/Month/Qty frame, one row per item per month."""
+    rng = np.random.default_rng(seed)
+    categories = np.array(['Cardiovascular', 'Anti-Diabetic', 'Gastrointestinal',
+                           'Vitamins & Supplements', 'Other Meds/Unclassified'])
+    items = np.array([f'ITEM {i:06d}' for i in range(n_items)], dtype=object)
+    base = rng.gamma(2.0, 50.0, size=n_items)
+    qty = np.maximum(1, rng.poisson(np.repeat(base, n_months))).astype(float)
+    return pd.DataFrame({
+        'Item':     np.repeat(items, n_months),
+        'Category': np.repeat(categories[np.arange(n_items) % len(categories)], n_months),
+        'Month':    np.tile(np.arange(1, n_months + 1), n_items),
+        'Qty':      qty,
+    })
+
+
+def _time(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--items', type=int, default=10_000)
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--skip-reference', action='store_true')
+    args = parser.parse_args()
+
+    monthly = make_monthly_sales(args.items, args.months)
+    print(f"Feature builder benchmark: {args.items:,} items × {args.months} months "
+          f"= {len(monthly):,} rows")
+
+    fast_df, fast_s = _time(build_normalized_features, monthly)
+    print(f"   vectorized : {fast_s:8.3f} s")
+
+    if args.skip_reference:
+        return
+
+    ref_df, ref_s = _time(build_normalized_features_reference, monthly)
+    print(f"   reference  : {ref_s:8.3f} s")
+    print(f"   speed-up   : {ref_s / fast_s:8.1f}x")
+
+    pd.testing.assert_frame_equal(fast_df, ref_df, check_exact=False, rtol=1e-12)
+    print("   [+] Outputs identical")
+
+
+if __name__ == "__main__":
+    main()
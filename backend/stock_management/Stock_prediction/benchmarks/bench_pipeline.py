@@ -0,0 +1,221 @@
+"""
+benchmarks/bench_pipeline.py
+────────────────────────────
+Times every pipeline stage at several data sizes, on synthetic POS
+exports from src/synthetic.py.
+
+Each size ("<items>x<months>") runs the same steps as main.py, timed
+with the pipeline's own StageProfiler (wall / CPU / peak RSS):
+
+   0 generate        synthetic raw frame (not a pipeline stage)
+   1 load            clean_sales_frame(), or — with --workbook — write
+                     the .xlsx and read it through load_and_clean_data()
+   2 aggregate ... 10 save   as in main.py (reports go to a temp folder)
+
+Charts (step 11) are skipped: they do not scale with the data.
+
+Every run is appended to benchmarks/results/pipeline_scale.jsonl
+(one line per size), and each size is compared with the previous run
+of the SAME size, so a change can be checked for regressions:
+
+    python benchmarks/bench_pipeline.py                  # before
+    ... change something ...
+    python benchmarks/bench_pipeline.py --label my-fix   # after → deltas
+
+Usage:
+    cd backend/stock_management/Stock_prediction
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --sizes 3000x12,30000x12,300000x12
+    python benchmarks/bench_pipeline.py --sizes 3000x12 --workbook --trees 100
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+
+from sklearn.preprocessing import LabelEncoder
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from src.preprocessing import clean_sales_frame, get_latest_prices, load_and_clean_data
+from src.features import build_normalized_features, period_keys
+from src.training import fit_final_model, last_month_mask, train_and_evaluate
+from src.forecast import (
+    SAFETY_FACTOR,
+    SERVICE_LEVEL,
+    apply_safety_buffer,
+    calculate_budget,
+    compute_item_stats,
+    drop_policy_columns,
+    policy_quantiles,
+    predict_quantities,
+    save_plan_reports,
+)
+from src.profiling import StageProfiler
+from src.synthetic import make_sales_frame, write_sales_workbook
+
+
+RESULTS_FILE = os.path.join(BASE_DIR, 'benchmarks', 'results', 'pipeline_scale.jsonl')
+DEFAULT_SIZES = '3000x12,10000x12,30000x12'
+
+
+def parse_size(text):
+    items, months = text.lower().split('x')
+    return int(items), int(months)
+
+
+def run_size(n_items, n_months, args, work_dir):
+    """Runs steps 1-10 once and returns the profiler report."""
+    profiler = StageProfiler(items=n_items, months=n_months, trees=args.trees,
+                             source='workbook' if args.workbook else 'frame')
+
+    profiler.begin(0, 'generate')
+    raw = make_sales_frame(n_items, n_months, seasonality=args.seasonality,
+                           noise=args.noise, seed=args.seed)
+    profiler.run_info['raw_rows'] = len(raw)
+    if args.workbook:
+        profiler.begin(0, 'write_workbook')
+        path = write_sales_workbook(raw, os.path.join(work_dir, f'sales_{n_items}x{n_months}.xlsx'))
+
+    # ── Steps 1-3 ────────────────────────────────────────────────────────────
+    profiler.begin(1)
+    if args.workbook:
+        df = load_and_clean_data(path, use_cache=False)
+    else:
+        df = clean_sales_frame(raw)
+    latest_prices = get_latest_prices(df)
+
+    profiler.begin(2)
+    monthly_sales = (
+        df.groupby(['Item', 'Category', 'Year', 'Month'])['Qty']
+        .sum().reset_index()
+        .sort_values(['Item', 'Year', 'Month'])
+        .reset_index(drop=True)
+    )
+    profiler.run_info['item_months'] = len(monthly_sales)
+
+    profiler.begin(3)
+    feat_df = build_normalized_features(monthly_sales)
+    le_item, le_cat = LabelEncoder(), LabelEncoder()
+    feat_df['item_enc'] = le_item.fit_transform(feat_df['Item'])
+    feat_df['cat_enc']  = le_cat.fit_transform(feat_df['Category'])
+
+    # ── Steps 4-6 ────────────────────────────────────────────────────────────
+    profiler.begin(4)
+    last_month_mask(feat_df)
+
+    profiler.begin(5)
+    trained = train_and_evaluate(feat_df, mode=args.eval_mode, fit_final=False,
+                                 n_estimators=args.trees)
+    profiler.run_info['R2_Score'] = round(trained['metrics']['R2_Score'], 4)
+
+    profiler.begin(6)
+    final_model = fit_final_model(feat_df, trained)
+
+    # ── Steps 7-10 ───────────────────────────────────────────────────────────
+    profiler.begin(7)
+    last = monthly_sales.sort_values(period_keys(monthly_sales)).iloc[-1]
+    target_month = int(last['Month']) % 12 + 1
+    item_stats = compute_item_stats(monthly_sales)
+    pred_col = 'Predicted_Qty'
+    predictions = predict_quantities(final_model, item_stats, le_item, le_cat,
+                                     target_month, pred_col,
+                                     quantiles=policy_quantiles(SERVICE_LEVEL))
+
+    profiler.begin(8)
+    predictions = apply_safety_buffer(predictions, pred_col, SAFETY_FACTOR, SERVICE_LEVEL)
+    predictions = drop_policy_columns(predictions, SERVICE_LEVEL)
+
+    profiler.begin(9)
+    merged, category_budget = calculate_budget(predictions, latest_prices)
+
+    profiler.begin(10)
+    save_plan_reports(os.path.join(work_dir, 'reports'), category_budget, merged)
+
+    return profiler.report()
+
+
+def load_results():
+    if not os.path.exists(RESULTS_FILE):
+        return []
+    with open(RESULTS_FILE, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_run(history, report):
+    """Latest stored run with the same size, trees and source."""
+    keys = ('items', 'months', 'trees', 'source')
+    for run in reversed(history):
+        if all(run.get(k) == report.get(k) for k in keys):
+            return run
+    return None
+
+
+def print_report(report, previous):
+    before = {s['name']: s['wall_seconds'] for s in previous['stages']} if previous else {}
+    print(f"\n   {report['items']:,} items × {report['months']} months  "
+          f"({report['raw_rows']:,} POS lines, {report['item_months']:,} item-months, "
+          f"R²={report['R2_Score']})")
+    if previous:
+        print(f"   compared with run of {previous['started_at'][:19]} "
+              f"({previous.get('label') or 'no label'})")
+    for st in report['stages']:
+        line = (f"   {st['number']:>2} {st['name']:15s}: {st['wall_seconds']:8.2f}s "
+                f"{st['cpu_seconds']:8.2f}s  {st['peak_rss_mb'] or 0:8.1f} MB")
+        old = before.get(st['name'])
+        if old:
+            line += f"   {(st['wall_seconds'] - old) / old * 100:+6.1f}%"
+        print(line)
+    total = report['total']
+    print(f"      {'total':15s}: {total['wall_seconds']:8.2f}s {total['cpu_seconds']:8.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help="comma-separated <items>x<months>")
+    parser.add_argument('--trees', type=int, default=300)
+    parser.add_argument('--eval-mode', default='holdout', choices=('holdout', 'oob'))
+    parser.add_argument('--seasonality', type=float, default=0.3)
+    parser.add_argument('--noise', type=float, default=0.25)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workbook', action='store_true',
+                        help="round-trip through a real .xlsx (slow at large sizes)")
+    parser.add_argument('--label', default=None, help="stored with the results")
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    history = load_results()
+    print(f"Pipeline scale benchmark: {len(sizes)} size(s), {args.trees} trees, "
+          f"{args.eval_mode}, {os.cpu_count()} CPU(s)")
+    print(f"   columns: wall / cpu / peak RSS / wall change vs previous run")
+
+    reports = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for n_items, n_months in sizes:
+            # Stage prints of the pipeline functions are noise here
+            with open(os.devnull, 'w') as devnull:
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    report = run_size(n_items, n_months, args, work_dir)
+                finally:
+                    sys.stdout = stdout
+            report.update(label=args.label, python=platform.python_version(),
+                          cpus=os.cpu_count())
+            print_report(report, previous_run(history, report))
+            reports.append(report)
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        with open(RESULTS_FILE, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(r) + '\n' for r in reports)
+        print(f"\n   [+] Results appended to {os.path.relpath(RESULTS_FILE, BASE_DIR)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+benchmarks/bench_plan_read.py
+─────────────────────────────
+Read latency of the inventory plan, CSV vs Parquet (src/plan_store.py),
+for the queries the ML API answers:
+
+  full      every row, every column
+  category  one category, top 20 by budget
+  top-N     top 20 by budget over the whole plan
+  page      first 100 rows in file order
+
+CSV has no way to skip anything: each query parses the whole file and
+filters in pandas. Parquet reads only the needed columns, skips row
+groups by their Category stats, and fetches full rows for the page only.
+
+Usage:
+    cd backend/stock_management/Stock_prediction
+    python benchmarks/bench_plan_read.py
+    python benchmarks/bench_plan_read.py --items 5000,50000,200000 --repeats 20
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+import pandas as pd
+
+from src.plan_store import PLAN_PARQUET_FILE, plan_info, query_plan, read_plan, write_plan_parquet
+from src.preprocessing import categorize_items
+from src.synthetic import make_item_names
+
+PLAN_CSV = 'detailed_inventory_plan.csv'
+PRED_COL = 'Predicted_November_2026_Qty'
+
+
+def make_plan(n_items, seed=0):
+    """A plan frame shaped like step 9's output (see calculate_budget)."""
+    rng = np.random.default_rng(seed)
+    items = make_item_names(n_items, seed=seed)
+    predicted = rng.gamma(1.5, 40, n_items).round().astype(np.int64)
+    recommended = np.maximum(predicted, (predicted * rng.uniform(1.0, 1.6, n_items)).round()).astype(np.int64)
+    price = rng.lognormal(5, 1.2, n_items).round(2)
+    return pd.DataFrame({
+        'Item':              items,
+        'Category':          categorize_items(pd.Series(items)),
+        PRED_COL:            predicted,
+        'P50_Qty':           predicted,
+        'P90_Qty':           recommended,
+        'P95_Qty':           (recommended * 1.1).round().astype(np.int64),
+        'Recommended_Stock': recommended,
+        'Price':             price,
+        'Budget_Required':   recommended * price,
+    })
+
+
+def timed(fn, repeats):
+    """Median wall time of fn() in milliseconds (one warm-up call first)."""
+    fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+def csv_queries(path, category):
+    def full():
+        return pd.read_csv(path)
+
+    def by_category():
+        df = pd.read_csv(path)
+        df = df[df['Category'].str.lower() == category.lower()]
+        return df.sort_values('Budget_Required', ascending=False).head(20)
+
+    def top_n():
+        return pd.read_csv(path).sort_values('Budget_Required', ascending=False).head(20)
+
+    def page():
+        return pd.read_csv(path).iloc[:100]
+
+    return full, by_category, top_n, page
+
+
+def parquet_queries(path, category):
+    categories = plan_info(path)['categories']
+
+    def full():
+        return read_plan(path)
+
+    def by_category():
+        return query_plan(path, category=category, sort_column='Budget_Required',
+                          descending=True, limit=20, categories=categories)
+
+    def top_n():
+        return query_plan(path, sort_column='Budget_Required', descending=True,
+                          limit=20, categories=categories)
+
+    def page():
+        return query_plan(path, limit=100, categories=categories)
+
+    return full, by_category, top_n, page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--items', default='5000,50000,200000',
+                        help="comma-separated plan sizes (rows)")
+    parser.add_argument('--repeats', type=int, default=10)
+    args = parser.parse_args()
+
+    queries = ('full', 'category', 'top-N', 'page')
+    print("Inventory plan read latency, median ms (CSV → Parquet)")
+    print(f"   {'rows':>8s}  {'size MB':>13s}  " + "  ".join(f"{q:>20s}" for q in queries))
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_items in (int(x) for x in args.items.split(',')):
+            plan = make_plan(n_items)
+            csv_path = os.path.join(tmp, PLAN_CSV)
+            plan.to_csv(csv_path, index=False, encoding='utf-8-sig')
+            parquet_path = write_plan_parquet(tmp, plan)
+            assert parquet_path.endswith(PLAN_PARQUET_FILE)
+
+            # Smallest real category — where row-group skipping matters most
+            category = plan['Category'].value_counts().index[-1]
+            csv_ms = [timed(q, args.repeats) for q in csv_queries(csv_path, category)]
+            pq_ms = [timed(q, args.repeats) for q in parquet_queries(parquet_path, category)]
+
+            sizes = (f"{os.path.getsize(csv_path) / 1e6:5.1f} → "
+                     f"{os.path.getsize(parquet_path) / 1e6:4.1f}")
+            cells = "  ".join(f"{c:8.1f} → {p:7.1f}  " for c, p in zip(csv_ms, pq_ms))
+            print(f"   {n_items:>8,}  {sizes:>13s}  {cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+benchmarks/bench_streaming.py
+─────────────────────────────
+Peak memory and time of step 1-2 ingestion at growing row counts:
+
+  in-memory  read the whole export → clean_sales_frame() → groupby
+  streaming  src.streaming.stream_sales_aggregate() in chunks
+
+Same item count at every size, only the number of POS lines grows
+(more months × more lines per item-month), so the streaming path should
+stay flat while the in-memory path grows with the rows.
+
+Each measurement runs in a fresh process: peak RSS (ru_maxrss) only
+ever goes up inside one process.
+
+Usage:
+    cd backend/stock_management/Stock_prediction
+    python benchmarks/bench_streaming.py
+    python benchmarks/bench_streaming.py --items 5000 --lines 2,8,32 --format xlsx
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing as mp
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+
+def _measure(path, mode, chunk_rows, queue):
+    import pandas as pd
+    from src.profiling import peak_rss_mb
+    from src.preprocessing import clean_sales_frame, get_latest_prices
+    from src.streaming import stream_sales_aggregate
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        if mode == 'streaming':
+            monthly, prices = stream_sales_aggregate(path, chunk_rows)
+        else:
+            if path.endswith('.csv'):
+                raw = pd.read_csv(path, header=4, dtype=str, skip_blank_lines=False)
+            else:
+                raw = pd.read_excel(path, sheet_name='Sheet1', header=4)
+            df = clean_sales_frame(raw)
+            monthly = (df.groupby(['Item', 'Category', 'Year', 'Month'])['Qty']
+                       .sum().reset_index())
+            prices = get_latest_prices(df)
+    queue.put((time.perf_counter() - start, peak_rss_mb() - baseline,
+               len(monthly), float(monthly['Qty'].sum())))
+
+
+def measure(path, mode, chunk_rows):
+    queue = mp.Queue()
+    proc = mp.Process(target=_measure, args=(path, mode, chunk_rows, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--items', type=int, default=3_000)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--lines', default='2,8,24',
+                        help="comma-separated lines per item-month (row count multiplier)")
+    parser.add_argument('--format', choices=('csv', 'xlsx'), default='csv')
+    parser.add_argument('--chunk-rows', type=int, default=50_000)
+    args = parser.parse_args()
+
+    from src.synthetic import make_sales_frame, write_sales_csv, write_sales_workbook
+
+    print(f"Streaming ingestion benchmark: {args.items:,} items × {args.months} months, "
+          f"{args.format}, chunks of {args.chunk_rows:,} rows")
+    print(f"   {'rows':>10s}  {'in-memory':>22s}  {'streaming':>22s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for lines in (float(x) for x in args.lines.split(',')):
+            raw = make_sales_frame(args.items, args.months, lines_per_item_month=lines)
+            path = os.path.join(tmp, f'sales.{args.format}')
+            (write_sales_csv if args.format == 'csv' else write_sales_workbook)(raw, path)
+            n_rows = len(raw)
+            del raw
+
+            full = measure(path, 'in-memory', args.chunk_rows)
+            stream = measure(path, 'streaming', args.chunk_rows)
+            assert full[2:] == stream[2:], "streaming aggregate differs from in-memory"
+            print(f"   {n_rows:>10,}  {full[0]:7.2f} s {full[1]:8.1f} MB  "
+                  f"{stream[0]:7.2f} s {stream[1]:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
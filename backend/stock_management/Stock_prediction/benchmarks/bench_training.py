@@ -0,0 +1,68 @@
+"""
+benchmarks/bench_training.py
+────────────────────────────
+Times the two evaluation modes of steps 4-6 (src/training.py):
+
+  holdout  evaluation forest + final forest   (2 fits)
+  oob      one forest with oob_score=True      (1 fit)
+
+Both are given the same synthetic feature frame and the production
+forest settings; the metrics of each mode are printed next to the timing
+so the evaluation difference is visible too.
+
+Usage:
+    cd backend/stock_management/Stock_prediction
+    python benchmarks/bench_training.py
+    python benchmarks/bench_training.py --items 1000 --months 12 --trees 100
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from sklearn.preprocessing import LabelEncoder
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'benchmarks'))
+from bench_features import make_monthly_sales
+from src.features import build_normalized_features
+from src.training import EVAL_MODES, train_and_evaluate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--items', type=int, default=3_000)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--trees', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    feat_df = build_normalized_features(make_monthly_sales(args.items, args.months))
+    feat_df['item_enc'] = LabelEncoder().fit_transform(feat_df['Item'])
+    feat_df['cat_enc']  = LabelEncoder().fit_transform(feat_df['Category'])
+    print(f"Training benchmark: {len(feat_df):,} rows, {args.trees} trees, "
+          f"best of {args.repeat}")
+
+    best = {}
+    for mode in EVAL_MODES:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = train_and_evaluate(feat_df, mode=mode, n_estimators=args.trees)
+            times.append(time.perf_counter() - start)
+        best[mode] = min(times)
+        m = result['metrics']
+        print(f"   {mode:8s}: {best[mode]:7.2f} s   "
+              f"MAE={m['MAE']:.2f}  RMSE={m['RMSE']:.2f}  "
+              f"R²={m['R2_Score']:.4f}  MAPE={m['MAPE (%)']:.2f}%  "
+              f"(scored {len(result['y_true']):,} rows)")
+
+    saved = best['holdout'] - best['oob']
+    print(f"   [+] oob saves {saved:.2f} s per run "
+          f"({saved / best['holdout'] * 100:.0f}% of holdout wall time)")
+
+
+if __name__ == "__main__":
+    main()
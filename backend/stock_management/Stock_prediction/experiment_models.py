@@ -5,20 +5,37 @@ Run this SEPARATELY from main.py to test and compare different ML models.
 main.py is NOT touched. This is a pure experimentation file.
 
 Usage:
-    python experiment_models.py
+    python experiment_models.py                      # per-item models, all CPUs
+    python experiment_models.py --workers 4
+    python experiment_models.py --mode global        # ONE fit per model
+
+Modes:
+    per-item  (original)  one model per item: hold-out fit + full fit.
+                          Every (model, chunk of items) pair is a task for
+                          a process pool, so models and items run in parallel.
+    global                one model for ALL items: a single hold-out fit,
+                          a single full fit and one predict call for each.
+
+Each item's feature matrix is built ONCE (one sort + grouped shifts over
+the whole table) and shared by every model.
 
 Output:
     - Prints comparison table of all models
     - Saves outputs/reports/model_comparison.csv
+      (same columns as before + per-model fit / predict timings)
 """
 
 import os
 import sys
+import time
+import argparse
 import pandas as pd
 import numpy as np
 import warnings
 warnings.filterwarnings('ignore')
 
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, ExtraTreesRegressor
 from sklearn.linear_model import Ridge, LinearRegression
 from sklearn.neighbors import KNeighborsRegressor
@@ -46,63 +63,70 @@ MODELS = {
     'KNN (k=3)'               : KNeighborsRegressor(n_neighbors=3),
 }
 
-# ══════════════════════════════════════════════════════════════════════════════
-# STEP 1 — Load & prepare data
-# ══════════════════════════════════════════════════════════════════════════════
-print("=" * 60)
-print("  PHARMACY STOCK PREDICTION — MODEL COMPARISON")
-print("=" * 60)
+FEATURES = ['Month', 'lag_1', 'lag_2', 'rolling_3', 'rolling_6']
+MODES    = ('per-item', 'global')
 
-print("\n[1] Loading data...")
-df = load_and_clean_data(DATA_FILE)
+# Items per pool task in per-item mode
+CHUNK_SIZE = 100
 
-monthly_sales = df.groupby(['Item', 'Category', 'Month'])['Qty'].sum().reset_index()
-monthly_sales = monthly_sales.sort_values(['Item', 'Month']).reset_index(drop=True)
-
-# Only use items with all 12 months — cleanest comparison
-item_month_counts = monthly_sales.groupby('Item')['Month'].count()
-items_12 = item_month_counts[item_month_counts == 12].index
-data_12  = monthly_sales[monthly_sales['Item'].isin(items_12)].copy()
-
-print(f"   Items with full 12 months : {len(items_12)}")
-print(f"   Total records             : {len(data_12)}")
 
 # ══════════════════════════════════════════════════════════════════════════════
-# STEP 2 — Build features
+# STEP 2 — Build features (once, for every item)
 # ══════════════════════════════════════════════════════════════════════════════
-print("\n[2] Engineering features...")
 
-def build_features(item_data):
+def build_item_matrices(data):
     """
-    For a single item's 12-month series, build:
+    For every item's 12-month series, build:
       Month, lag_1, lag_2, rolling_3, rolling_6
-    Returns X (features) and y (target).
+    plus the row used to predict TARGET_MONTH from the full series.
+
+    One sort and grouped shifts/rollings over the whole table — the
+    values are identical to shifting / rolling each item on its own.
+    Returns a list of (item, X, y, target_row) in item order.
     """
-    d = item_data.sort_values('Month').reset_index(drop=True).copy()
-    d['lag_1']     = d['Qty'].shift(1)
-    d['lag_2']     = d['Qty'].shift(2)
-    d['rolling_3'] = d['Qty'].shift(1).rolling(3).mean()
-    d['rolling_6'] = d['Qty'].shift(1).rolling(6).mean()
-    d = d.dropna()
-    features = ['Month', 'lag_1', 'lag_2', 'rolling_3', 'rolling_6']
-    return d[features], d['Qty']
+    d = data.sort_values(['Item', 'Month'], kind='mergesort').reset_index(drop=True)
+    by_item = d.groupby('Item', sort=False)['Qty']
+
+    prev = by_item.shift(1)
+    d['lag_1']     = prev
+    d['lag_2']     = by_item.shift(2)
+    d['rolling_3'] = prev.groupby(d['Item'], sort=False).rolling(3).mean().reset_index(level=0, drop=True)
+    d['rolling_6'] = prev.groupby(d['Item'], sort=False).rolling(6).mean().reset_index(level=0, drop=True)
+
+    complete = d[FEATURES].notna().all(axis=1).values
+    qty = d['Qty'].values
+    items = d['Item'].values
+    # [start, end) of every item's rows in the sorted table
+    starts = np.flatnonzero(np.r_[True, items[1:] != items[:-1]])
+    ends = np.r_[starts[1:], len(d)]
+
+    matrices = []
+    for start, end in zip(starts, ends):
+        keep = np.arange(start, end)[complete[start:end]]
+        q = qty[start:end]
+        target_row = pd.DataFrame([{
+            'Month': TARGET_MONTH,
+            'lag_1': q[-1], 'lag_2': q[-2] if len(q) >= 2 else np.nan,
+            'rolling_3': q[-3:].mean(), 'rolling_6': q[-6:].mean(),
+        }])
+        matrices.append((items[start], d.loc[keep, FEATURES].reset_index(drop=True),
+                         d.loc[keep, 'Qty'].reset_index(drop=True), target_row))
+    return matrices
+
 
 # ══════════════════════════════════════════════════════════════════════════════
-# STEP 3 — Evaluate every model
+# STEP 3 — Evaluate models
 # ══════════════════════════════════════════════════════════════════════════════
-print("\n[3] Evaluating models (hold-out last month per item)...\n")
-
-comparison_results = []
 
-for model_name, model in MODELS.items():
-    y_true_all = []
-    y_pred_all = []
-    april_predictions = []
-
-    for item in items_12:
-        item_data = data_12[data_12['Item'] == item]
-        X, y = build_features(item_data)
+def _evaluate_item_chunk(model, chunk):
+    """
+    Per-item mode worker: for each item, hold-out fit on all but the last
+    row, then a full fit to predict TARGET_MONTH. Runs inside the pool.
+    """
+    y_true, y_pred, target_preds = [], [], []
+    fit_s = predict_s = 0.0
 
+    for _, X, y, target_row in chunk:
         if len(X) < 3:
             continue
 
@@ -111,78 +135,196 @@ for model_name, model in MODELS.items():
         y_train, y_test = y.iloc[:-1], y.iloc[-1]
 
         try:
-            model.fit(X_train, y_train)
-            y_pred = max(0, model.predict(X_test)[0])
-            y_true_all.append(y_test)
-            y_pred_all.append(y_pred)
-
-            # Also predict April using all data
-            model.fit(X, y)
-            last_row  = item_data.sort_values('Month').iloc[-1]
-            lag1      = last_row['Qty']
-            lag2      = item_data.sort_values('Month').iloc[-2]['Qty']
-            roll3     = item_data.sort_values('Month').tail(3)['Qty'].mean()
-            roll6     = item_data.sort_values('Month').tail(6)['Qty'].mean()
-            april_row = pd.DataFrame([{
-                'Month': TARGET_MONTH,
-                'lag_1': lag1, 'lag_2': lag2,
-                'rolling_3': roll3, 'rolling_6': roll6
-            }])
-            april_pred = max(0, model.predict(april_row)[0])
-            april_predictions.append(april_pred)
-
+            est = clone(model)
+            t0 = time.perf_counter()
+            est.fit(X_train, y_train)
+            t1 = time.perf_counter()
+            pred = max(0, est.predict(X_test)[0])
+            t2 = time.perf_counter()
+
+            # Also predict the target month using all data
+            est = clone(model)
+            est.fit(X, y)
+            t3 = time.perf_counter()
+            target_pred = max(0, est.predict(target_row)[0])
+            t4 = time.perf_counter()
         except Exception:
             continue
 
-    # ── Metrics ───────────────────────────────────────────────────────────────
-    if not y_true_all:
-        continue
-
-    mae  = mean_absolute_error(y_true_all, y_pred_all)
-    rmse = np.sqrt(mean_squared_error(y_true_all, y_pred_all))
-    r2   = r2_score(y_true_all, y_pred_all)
-    mape_vals = [abs((t-p)/t)*100 for t,p in zip(y_true_all, y_pred_all) if t != 0]
-    mape = np.mean(mape_vals)
-    avg_april_pred = np.mean(april_predictions)
-
-    if r2 >= 0.85:   verdict = "Excellent ✅"
-    elif r2 >= 0.70: verdict = "Good ✅"
-    elif r2 >= 0.50: verdict = "Acceptable ⚠️"
-    else:            verdict = "Needs Work ❌"
-
-    comparison_results.append({
-        'Model'             : model_name,
-        'MAE (units)'       : round(mae, 2),
-        'RMSE (units)'      : round(rmse, 2),
-        'R²'                : round(r2, 4),
-        'MAPE (%)'          : round(mape, 2),
-        'Avg April Pred'    : round(avg_april_pred, 1),
-        'Verdict'           : verdict,
-    })
-
-    print(f"  ✔ {model_name:<30} MAE={mae:7.1f}  RMSE={rmse:8.1f}  R²={r2:.4f}  MAPE={mape:6.1f}%  -> {verdict}")
+        fit_s += (t1 - t0) + (t3 - t2)
+        predict_s += (t2 - t1) + (t4 - t3)
+        y_true.append(y_test)
+        y_pred.append(pred)
+        target_preds.append(target_pred)
+
+    return y_true, y_pred, target_preds, fit_s, predict_s
 
-# ══════════════════════════════════════════════════════════════════════════════
-# STEP 4 — Print comparison table
-# ══════════════════════════════════════════════════════════════════════════════
-results_df = pd.DataFrame(comparison_results).sort_values('R²', ascending=False)
 
-print("\n" + "=" * 60)
-print("  FINAL RANKING (sorted by R²)")
-print("=" * 60)
-print(results_df[['Model', 'MAE (units)', 'R²', 'MAPE (%)', 'Verdict']].to_string(index=False))
+def evaluate_per_item(models, matrices, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Runs every (model, item chunk) task — in a process pool when
+    workers > 1, inline otherwise. Results keep item order.
+    Returns {model_name: (y_true, y_pred, target_preds, fit_s, predict_s)}.
+    """
+    chunks = [matrices[i:i + chunk_size] for i in range(0, len(matrices), chunk_size)]
+    tasks = [(name, model, chunk) for name, model in models.items() for chunk in chunks]
+
+    if workers == 1:
+        outputs = [_evaluate_item_chunk(model, chunk) for _, model, chunk in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_evaluate_item_chunk, model, chunk) for _, model, chunk in tasks]
+            outputs = [f.result() for f in futures]
+
+    results = {name: ([], [], [], 0.0, 0.0) for name in models}
+    for (name, _, _), (y_true, y_pred, preds, fit_s, predict_s) in zip(tasks, outputs):
+        acc = results[name]
+        acc[0].extend(y_true)
+        acc[1].extend(y_pred)
+        acc[2].extend(preds)
+        results[name] = (acc[0], acc[1], acc[2], acc[3] + fit_s, acc[4] + predict_s)
+    return results
+
+
+def evaluate_global(models, matrices):
+    """
+    Global mode: one model across all items. The hold-out rows (last row
+    of every item) are predicted in ONE call, then one full fit predicts
+    every item's target month in one more call.
+    """
+    usable = [m for m in matrices if len(m[1]) >= 3]
+    X_train = pd.concat([X.iloc[:-1] for _, X, _, _ in usable], ignore_index=True)
+    y_train = pd.concat([y.iloc[:-1] for _, _, y, _ in usable], ignore_index=True)
+    X_test  = pd.concat([X.iloc[[-1]] for _, X, _, _ in usable], ignore_index=True)
+    y_test  = [y.iloc[-1] for _, _, y, _ in usable]
+    X_all   = pd.concat([X for _, X, _, _ in usable], ignore_index=True)
+    y_all   = pd.concat([y for _, _, y, _ in usable], ignore_index=True)
+    X_target = pd.concat([t for _, _, _, t in usable], ignore_index=True)
+
+    results = {}
+    for name, model in models.items():
+        est = clone(model)
+        t0 = time.perf_counter()
+        est.fit(X_train, y_train)
+        t1 = time.perf_counter()
+        y_pred = np.maximum(est.predict(X_test), 0)
+        t2 = time.perf_counter()
+
+        est = clone(model)
+        est.fit(X_all, y_all)
+        t3 = time.perf_counter()
+        target_preds = np.maximum(est.predict(X_target), 0)
+        t4 = time.perf_counter()
+
+        results[name] = (y_test, list(y_pred), list(target_preds),
+                         (t1 - t0) + (t3 - t2), (t2 - t1) + (t4 - t3))
+    return results
+
+
+def summarize(results):
+    """One model_comparison.csv row per model, same columns as before + timings."""
+    comparison_results = []
+    for model_name, (y_true_all, y_pred_all, target_preds, fit_s, predict_s) in results.items():
+        # ── Metrics ───────────────────────────────────────────────────────────
+        if not y_true_all:
+            continue
+
+        mae  = mean_absolute_error(y_true_all, y_pred_all)
+        rmse = np.sqrt(mean_squared_error(y_true_all, y_pred_all))
+        r2   = r2_score(y_true_all, y_pred_all)
+        mape_vals = [abs((t-p)/t)*100 for t,p in zip(y_true_all, y_pred_all) if t != 0]
+        mape = np.mean(mape_vals)
+        avg_april_pred = np.mean(target_preds)
+
+        if r2 >= 0.85:   verdict = "Excellent ✅"
+        elif r2 >= 0.70: verdict = "Good ✅"
+        elif r2 >= 0.50: verdict = "Acceptable ⚠️"
+        else:            verdict = "Needs Work ❌"
+
+        comparison_results.append({
+            'Model'             : model_name,
+            'MAE (units)'       : round(mae, 2),
+            'RMSE (units)'      : round(rmse, 2),
+            'R²'                : round(r2, 4),
+            'MAPE (%)'          : round(mape, 2),
+            'Avg April Pred'    : round(avg_april_pred, 1),
+            'Verdict'           : verdict,
+            'Fit Time (s)'      : round(fit_s, 3),
+            'Predict Time (s)'  : round(predict_s, 3),
+        })
+
+        print(f"  ✔ {model_name:<30} MAE={mae:7.1f}  RMSE={rmse:8.1f}  R²={r2:.4f}  "
+              f"MAPE={mape:6.1f}%  fit={fit_s:6.2f}s  predict={predict_s:5.2f}s  -> {verdict}")
+
+    return pd.DataFrame(comparison_results).sort_values('R²', ascending=False)
 
-best = results_df.iloc[0]
-print(f"\n🏆 BEST MODEL : {best['Model']}")
-print(f"   R²         : {best['R²']}")
-print(f"   MAE        : {best['MAE (units)']} units")
-print(f"   MAPE       : {best['MAPE (%)']}%")
 
 # ══════════════════════════════════════════════════════════════════════════════
-# STEP 5 — Save results
+# MAIN
 # ══════════════════════════════════════════════════════════════════════════════
-os.makedirs(REPORTS_DIR, exist_ok=True)
-out_path = os.path.join(REPORTS_DIR, 'model_comparison.csv')
-results_df.to_csv(out_path, index=False, encoding='utf-8-sig')
-print(f"\n[+] Full comparison saved to: {out_path}")
-print("\nNote: To use the best model in production, update main.py accordingly.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare candidate stock prediction models")
+    parser.add_argument('--mode', choices=MODES, default='per-item')
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes for per-item mode (default: all CPUs, 1 = no pool)")
+    parser.add_argument('--data', default=DATA_FILE)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  PHARMACY STOCK PREDICTION — MODEL COMPARISON")
+    print("=" * 60)
+
+    # ── STEP 1 — Load & prepare data ─────────────────────────────────────────
+    print("\n[1] Loading data...")
+    df = load_and_clean_data(args.data)
+
+    monthly_sales = df.groupby(['Item', 'Category', 'Month'])['Qty'].sum().reset_index()
+    monthly_sales = monthly_sales.sort_values(['Item', 'Month']).reset_index(drop=True)
+
+    # Only use items with all 12 months — cleanest comparison
+    item_month_counts = monthly_sales.groupby('Item')['Month'].count()
+    items_12 = item_month_counts[item_month_counts == 12].index
+    data_12  = monthly_sales[monthly_sales['Item'].isin(items_12)].copy()
+
+    print(f"   Items with full 12 months : {len(items_12)}")
+    print(f"   Total records             : {len(data_12)}")
+
+    # ── STEP 2 — Build features ──────────────────────────────────────────────
+    print("\n[2] Engineering features...")
+    matrices = build_item_matrices(data_12)
+
+    # ── STEP 3 — Evaluate every model ────────────────────────────────────────
+    start = time.perf_counter()
+    if args.mode == 'global':
+        print("\n[3] Evaluating models (ONE global fit, hold-out last month per item)...\n")
+        results = evaluate_global(MODELS, matrices)
+    else:
+        print(f"\n[3] Evaluating models (hold-out last month per item, "
+              f"workers={args.workers or os.cpu_count()})...\n")
+        results = evaluate_per_item(MODELS, matrices, workers=args.workers)
+    results_df = summarize(results)
+    print(f"\n   Evaluation wall time: {time.perf_counter() - start:.1f}s")
+
+    # ── STEP 4 — Print comparison table ──────────────────────────────────────
+    print("\n" + "=" * 60)
+    print("  FINAL RANKING (sorted by R²)")
+    print("=" * 60)
+    print(results_df[['Model', 'MAE (units)', 'R²', 'MAPE (%)', 'Verdict']].to_string(index=False))
+
+    best = results_df.iloc[0]
+    print(f"\n🏆 BEST MODEL : {best['Model']}")
+    print(f"   R²         : {best['R²']}")
+    print(f"   MAE        : {best['MAE (units)']} units")
+    print(f"   MAPE       : {best['MAPE (%)']}%")
+
+    # ── STEP 5 — Save results ────────────────────────────────────────────────
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    out_path = os.path.join(REPORTS_DIR, 'model_comparison.csv')
+    results_df.to_csv(out_path, index=False, encoding='utf-8-sig')
+    print(f"\n[+] Full comparison saved to: {out_path}")
+    print("\nNote: To use the best model in production, update main.py accordingly.")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,163 +17,129 @@ Why normalization helps:
   "March is always 30% below average for this item"
 
 Run: python main.py
+     python main.py --eval-mode oob   (one forest instead of two)
+     python main.py --service-level 0.95
+     python main.py --horizon 6         (6-month outlook in the plan)
 """
 
 import os
+import argparse
 import pandas as pd
-import numpy as np
-from datetime import datetime
-from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.metrics import mean_absolute_error, r2_score
 
 from src.preprocessing import load_and_clean_data, get_latest_prices
-from src.visualization import plot_budget_distribution, plot_category_trends
-
-
-# ══════════════════════════════════════════════════════════════════════════════
-# FEATURES
-# ══════════════════════════════════════════════════════════════════════════════
-
-FEATURES = [
-    'Month',       # what month → seasonality
-    'lag_1_n',     # last month normalized qty → recent momentum
-    'lag_2_n',     # 2 months ago normalized → trend direction
-    'lag_3_n',     # 3 months ago normalized → longer trend
-    'roll_3_n',    # 3-month normalized avg → short term pattern
-    'roll_6_n',    # 6-month normalized avg → long term pattern
-    'trend_n',     # lag_1 - lag_2 normalized → acceleration
-    'item_cv',     # coefficient of variation → item volatility
-    'n_months',    # how many months of data → reliability
-    'is_q1',       # Jan-Mar flag → seasonal signal
-    'is_q4',       # Oct-Dec flag → seasonal signal
-    'item_enc',    # item identity (label encoded)
-    'cat_enc',     # category identity (label encoded)
-]
-
-
-# ══════════════════════════════════════════════════════════════════════════════
-# FEATURE ENGINEERING
-# ══════════════════════════════════════════════════════════════════════════════
-
-def build_normalized_features(monthly_df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Builds normalized features for the global model.
-
-    KEY IDEA: Divide all qty values by the item's mean qty.
-    This removes the scale difference between items and lets
-    the model focus on PATTERNS (is this month above/below normal?)
-
-    Example:
-      ATORVA raw:  3005, 2683, 702, 2416 ...
-      ATORVA mean: 2497
-      ATORVA norm: 1.20,  1.07, 0.28, 0.97 ...
-                   ↑ above avg  ↑ far below  ↑ near avg
-
-    Now the model learns: "month 3 tends to be 0.28x normal"
-    regardless of whether the item sells 3000 or 30 per month.
-    """
-    records = []
-
-    for item, group in monthly_df.groupby('Item'):
-        g        = group.sort_values('Month').reset_index(drop=True)
-        category = g['Category'].iloc[0]
-        qty_vals = g['Qty'].values
-        qty_mean = qty_vals.mean()
-        qty_std  = qty_vals.std() if len(g) > 1 else 1.0
-        n_months = len(g)
-
-        # Skip items with zero mean (avoid division by zero)
-        if qty_mean == 0:
-            continue
-
-        # Normalize: divide every month's qty by item mean
-        norm_vals = qty_vals / qty_mean
-        cv        = qty_std / qty_mean  # volatility score
-
-        for i in range(len(g)):
-            row   = g.iloc[i]
-            month = int(row['Month'])
-
-            # Normalized lag features (fall back to 1.0 = "average" if no history)
-            lag1_n  = norm_vals[i-1] if i >= 1 else 1.0
-            lag2_n  = norm_vals[i-2] if i >= 2 else 1.0
-            lag3_n  = norm_vals[i-3] if i >= 3 else 1.0
-            roll3_n = norm_vals[max(0, i-3):i].mean() if i >= 1 else 1.0
-            roll6_n = norm_vals[max(0, i-6):i].mean() if i >= 1 else 1.0
-            trend_n = lag1_n - lag2_n  # positive = growing, negative = declining
-
-            records.append({
-                'Item':      item,
-                'Category':  category,
-                'Month':     month,
-                'lag_1_n':   lag1_n,
-                'lag_2_n':   lag2_n,
-                'lag_3_n':   lag3_n,
-                'roll_3_n':  roll3_n,
-                'roll_6_n':  roll6_n,
-                'trend_n':   trend_n,
-                'item_mean': qty_mean,
-                'item_std':  qty_std,
-                'item_cv':   cv,
-                'n_months':  n_months,
-                'is_q1':     1 if month in [1, 2, 3]    else 0,
-                'is_q4':     1 if month in [10, 11, 12] else 0,
-                # Targets
-                'qty_norm':  float(row['Qty']) / qty_mean,  # normalized target
-                'qty_raw':   float(row['Qty']),              # raw target
-            })
-
-    return pd.DataFrame(records)
+from src.features import FEATURES, build_normalized_features
+from src.training import (
+    DEFAULT_EVAL_MODE,
+    EVAL_MODES,
+    PARTITIONS,
+    evaluation_frame,
+    fit_final_model,
+    last_month_mask,
+    r2_verdict,
+    train_and_evaluate,
+)
+from src.forecast import (
+    SAFETY_FACTOR,
+    SERVICE_LEVEL,
+    next_target_month,
+    month_label,
+    predicted_column,
+    compute_item_stats,
+    predict_quantities,
+    add_horizon_columns,
+    horizon_months,
+    MAX_HORIZON,
+    policy_quantiles,
+    drop_policy_columns,
+    apply_safety_buffer,
+    calculate_budget,
+    save_plan_reports,
+    save_category_sales,
+    save_artifact,
+)
+from src.profiling import StageProfiler
+from src.streaming import stream_sales_aggregate
+from src.live_data import load_monthly_sales_from_db
+from src.publishing import KEEP_VERSIONS, stage_version, publish_version
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # MAIN PIPELINE
 # ══════════════════════════════════════════════════════════════════════════════
 
-def run_prediction_pipeline():
+def run_prediction_pipeline(eval_mode: str = DEFAULT_EVAL_MODE, service_level=SERVICE_LEVEL,
+                            horizon: int = 1, partition=None, stream: bool = False,
+                            source: str = 'excel', database_url=None,
+                            charts: bool = False, keep_versions: int = KEEP_VERSIONS):
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    # Wall / CPU / peak memory per numbered step → pipeline_profile.json
+    profiler = StageProfiler(eval_mode=eval_mode, service_level=service_level,
+                             partition=partition)
 
     # ── Target month ──────────────────────────────────────────────────────────
-    today = datetime.today()
-    if today.month == 12:
-        target_month, target_year = 1, today.year + 1
-    else:
-        target_month, target_year = today.month + 1, today.year
-    month_name = datetime(target_year, target_month, 1).strftime('%B %Y')
+    target_month, target_year = next_target_month()
+    month_name = month_label(target_month, target_year)
 
     print(f"{'='*57}")
     print(f"  HealixPharm Stock Prediction — {month_name}")
-    print(f"  Model: Normalized Global Random Forest")
+    model_label = ("Normalized Global Random Forest" if partition is None
+                   else f"Normalized Random Forest per {partition}")
+    print(f"  Model: {model_label}")
+    print(f"  Evaluation: {eval_mode}")
+    if source == 'db':
+        print(f"  Data: live monthly_item_sales (stock_logs)")
+    if service_level is not None:
+        print(f"  Stock policy: P{service_level * 100:g} service level")
+    else:
+        print(f"  Stock policy: flat x{SAFETY_FACTOR} buffer")
     print(f"{'='*57}\n")
 
     # ── Step 1: Load data ─────────────────────────────────────────────────────
     print("1. Loading and Preprocessing Data...")
+    profiler.begin(1)
     file_path = os.path.join(BASE_DIR, 'data', 'peoples pharmacy.xlsx')
-    df = load_and_clean_data(file_path)
+    if source == 'db':
+        # Live consumption: monthly_item_sales, kept in sync from stock_logs
+        df = None
+        monthly_sales, latest_prices = load_monthly_sales_from_db(database_url)
+    elif stream:
+        # Chunks are folded straight into the monthly aggregate + prices:
+        # memory bounded by distinct items, no row-level frame kept
+        df = None
+        monthly_sales, latest_prices = stream_sales_aggregate(file_path)
+    else:
+        df = load_and_clean_data(file_path)
 
-    data_dir   = os.path.join(BASE_DIR, 'data')
-    os.makedirs(data_dir, exist_ok=True)
-    df.to_csv(
-        os.path.join(data_dir, 'preprocessed_12_month_data.csv'),
-        index=False, encoding='utf-8-sig'
-    )
-    print(f"   [+] Rows: {len(df):,}  Items: {df['Item'].nunique():,}")
+        data_dir   = os.path.join(BASE_DIR, 'data')
+        os.makedirs(data_dir, exist_ok=True)
+        df.to_csv(
+            os.path.join(data_dir, 'preprocessed_12_month_data.csv'),
+            index=False, encoding='utf-8-sig'
+        )
+        print(f"   [+] Rows: {len(df):,}  Items: {df['Item'].nunique():,}")
 
-    latest_prices = get_latest_prices(df)
+        latest_prices = get_latest_prices(df)
 
     # ── Step 2: Monthly aggregation ───────────────────────────────────────────
     print("\n2. Aggregating Monthly Sales...")
-    monthly_sales = (
-        df.groupby(['Item', 'Category', 'Month'])['Qty']
-        .sum().reset_index()
-        .sort_values(['Item', 'Month'])
-        .reset_index(drop=True)
-    )
+    profiler.begin(2)
+    if df is not None:
+        # Keyed by Year AND Month — Jan 2024 and Jan 2025 stay separate rows
+        monthly_sales = (
+            df.groupby(['Item', 'Category', 'Year', 'Month'])['Qty']
+            .sum().reset_index()
+            .sort_values(['Item', 'Year', 'Month'])
+            .reset_index(drop=True)
+        )
+    else:
+        print("   Already aggregated at the source")
     print(f"   [+] Item-month records: {len(monthly_sales):,}")
 
     # ── Step 3: Build normalized features ────────────────────────────────────
     print("\n3. Building Normalized Features...")
+    profiler.begin(3)
     print("   Normalizing qty by item mean — removes scale bias")
     feat_df = build_normalized_features(monthly_sales)
 
@@ -188,54 +154,37 @@ def run_prediction_pipeline():
 
     # ── Step 4: Train/test split ──────────────────────────────────────────────
     print("\n4. Splitting Data for Evaluation...")
-    train_rows, test_rows = [], []
-    for item, group in feat_df.groupby('Item'):
-        g = group.sort_values('Month').reset_index(drop=True)
-        if len(g) >= 2:
-            train_rows.append(g.iloc[:-1])
-            test_rows.append(g.iloc[[-1]])
-        else:
-            train_rows.append(g)
-
-    train_df = pd.concat(train_rows).reset_index(drop=True)
-    test_df  = pd.concat(test_rows).reset_index(drop=True)
-    print(f"   [+] Train: {len(train_df):,} rows  Test: {len(test_df):,} rows")
+    profiler.begin(4)
+    n_test = int(last_month_mask(feat_df).sum())
+    if eval_mode == 'oob':
+        print(f"   [+] OOB mode: all {len(feat_df):,} rows train ONE forest, "
+              f"{n_test:,} last-month rows scored out-of-bag")
+    else:
+        print(f"   [+] Train: {len(feat_df) - n_test:,} rows  Test: {n_test:,} rows")
 
     # ── Step 5: Train evaluation model ───────────────────────────────────────
-    print("\n5. Training Normalized Random Forest (Evaluation)...")
-    eval_model = RandomForestRegressor(
-        n_estimators=300,
-        max_depth=12,
-        min_samples_leaf=2,
-        max_features='sqrt',
-        random_state=42,
-        n_jobs=-1,
-    )
-    # Train on normalized target
-    eval_model.fit(train_df[FEATURES], train_df['qty_norm'])
-
-    # Predict normalized → multiply by item mean → actual units
-    y_pred_norm = eval_model.predict(test_df[FEATURES])
-    y_pred_raw  = np.maximum(y_pred_norm * test_df['item_mean'].values, 0)
-    y_test_raw  = test_df['qty_raw'].values
-
-    mae  = mean_absolute_error(y_test_raw, y_pred_raw)
-    rmse = np.sqrt(mean_squared_error(y_test_raw, y_pred_raw))
-    r2   = r2_score(y_test_raw, y_pred_raw)
-    mape_vals = [
-        abs((t - p) / t) * 100
-        for t, p in zip(y_test_raw, y_pred_raw) if t != 0
-    ]
-    mape = np.mean(mape_vals)
-
-    if r2 >= 0.85:   verdict = "Excellent"
-    elif r2 >= 0.70: verdict = "Good"
-    elif r2 >= 0.50: verdict = "Acceptable"
-    else:            verdict = "Needs Improvement"
+    if eval_mode == 'oob':
+        print("\n5. Training Normalized Random Forest (OOB Evaluation)...")
+    else:
+        print("\n5. Training Normalized Random Forest (Evaluation)...")
+    profiler.begin(5)
+    # holdout: fits the evaluation forest (final forest comes in step 6)
+    # oob    : fits one forest, scored on its out-of-bag predictions
+    trained     = train_and_evaluate(feat_df, mode=eval_mode, fit_final=False,
+                                     partition=partition)
+    eval_model  = trained['eval_model']
+    test_df     = trained['test_df']
+    y_pred_raw  = trained['y_pred']
+    y_test_raw  = trained['y_true']
+
+    metrics = trained['metrics']
+    mae, rmse, r2, mape = (metrics[k] for k in ('MAE', 'RMSE', 'R2_Score', 'MAPE (%)'))
+    verdict = r2_verdict(r2)
 
     verdict_icon = {"Excellent":"✅","Good":"✅","Acceptable":"⚠️","Needs Improvement":"❌"}[verdict]
 
-    print(f"\n   📊 MODEL EVALUATION (held-out last month per item):")
+    scored_on = "out-of-bag" if eval_mode == 'oob' else "held-out"
+    print(f"\n   📊 MODEL EVALUATION ({scored_on} last month per item):")
     print(f"   ├── MAE    : {mae:.2f} units   (avg prediction error)")
     print(f"   ├── RMSE   : {rmse:.2f} units  (penalizes large errors)")
     print(f"   ├── R²     : {r2:.4f}         → {verdict} {verdict_icon}")
@@ -262,116 +211,59 @@ def run_prediction_pipeline():
         print(f"   {feat:12s}: {bar} {imp:.3f}")
 
     # Save evaluation
-    eval_out = pd.DataFrame({
-        'Metric': ['MAE', 'RMSE', 'R2_Score', 'MAPE (%)'],
-        'Value':  [round(mae,4), round(rmse,4), round(r2,4), round(mape,4)],
-        'Interpretation': [
-            f'Avg error of {mae:.1f} units per item',
-            f'Large-error-penalized: {rmse:.1f}',
-            verdict,
-            f'Avg {mape:.1f}% off from actual'
-        ]
-    })
+    eval_out = evaluation_frame(metrics)
 
     # ── Step 6: Retrain on ALL data ───────────────────────────────────────────
-    print("\n6. Retraining on Full Dataset for Final Predictions...")
-    final_model = RandomForestRegressor(
-        n_estimators=300,
-        max_depth=12,
-        min_samples_leaf=2,
-        max_features='sqrt',
-        random_state=42,
-        n_jobs=-1,
-    )
-    final_model.fit(feat_df[FEATURES], feat_df['qty_norm'])
-    print("   [+] Final model trained on all data")
+    if eval_mode == 'oob':
+        print("\n6. Reusing OOB Model for Final Predictions...")
+    else:
+        print("\n6. Retraining on Full Dataset for Final Predictions...")
+    profiler.begin(6)
+    final_model = fit_final_model(feat_df, trained)
+    if eval_mode == 'oob':
+        print("   [+] Model already trained on all data — no second fit")
+    else:
+        print("   [+] Final model trained on all data")
 
     # ── Step 7: Predict target month ──────────────────────────────────────────
     print(f"\n7. Predicting {month_name} for All Items...")
-    results = []
-    
-    # Pre-calculate stats for all items to avoid repeated filtering
-    item_stats = {}
-    for item, group in monthly_sales.groupby('Item'):
-        g = group.sort_values('Month')
-        qty_vals = g['Qty'].values
-        m = qty_vals.mean()
-        if m > 0:
-            item_stats[item] = {
-                'mean': m,
-                'std':  qty_vals.std() if len(g) > 1 else 0,
-                'norm': qty_vals / m,
-                'cat':  g['Category'].iloc[0],
-                'n':    len(g)
-            }
-
-    # Build feature matrix for all items at once
-    pred_features = []
-    active_items = []
-
-    for item, stats in item_stats.items():
-        norm_v = stats['norm']
-        l1 = float(norm_v[-1])
-        l2 = float(norm_v[-2]) if stats['n'] >= 2 else 1.0
-        
-        try: item_enc = le_item.transform([item])[0]
-        except: item_enc = 0
-        try: cat_enc = le_cat.transform([stats['cat']])[0]
-        except: cat_enc = 0
-
-        pred_features.append({
-            'Month':    target_month,
-            'lag_1_n':  l1,
-            'lag_2_n':  l2,
-            'lag_3_n':  float(norm_v[-3]) if stats['n'] >= 3 else 1.0,
-            'roll_3_n': float(norm_v[-3:].mean()) if stats['n'] >= 3 else 1.0,
-            'roll_6_n': float(norm_v[-6:].mean()) if stats['n'] >= 6 else 1.0,
-            'trend_n':  l1 - l2,
-            'item_cv':  stats['std'] / stats['mean'],
-            'n_months': stats['n'],
-            'is_q1':    1 if target_month in [1, 2, 3]    else 0,
-            'is_q4':    1 if target_month in [10, 11, 12] else 0,
-            'item_enc': item_enc,
-            'cat_enc':  cat_enc
-        })
-        active_items.append(item)
-
-    # Bulk prediction using the full dataframe
-    pred_df = pd.DataFrame(pred_features)[FEATURES]
-    all_preds_norm = final_model.predict(pred_df)
-    
-    # Denormalize results
-    for i, item in enumerate(active_items):
-        stats = item_stats[item]
-        pred_qty = max(0, round(all_preds_norm[i] * stats['mean']))
-        results.append({
-            'Item':     item,
-            'Category': stats['cat'],
-            f'Predicted_{month_name.replace(" ", "_")}_Qty': pred_qty
-        })
-
-    print(f"   [+] Predictions generated: {len(results):,} items")
+    profiler.begin(7)
+    # Per-item stats as aligned arrays → one bulk predict call
+    # (every tree predicts every item once → P50 / P90 / P95 for free)
+    item_stats     = compute_item_stats(monthly_sales)
+    pred_col       = predicted_column(month_name)
+    predictions_df = predict_quantities(
+        final_model, item_stats, le_item, le_cat, target_month, pred_col,
+        quantiles=policy_quantiles(service_level),
+    )
+    print(f"   [+] Predictions generated: {len(predictions_df):,} items")
+
+    if horizon > 1:
+        # Months after the target month: features rolled forward recursively
+        predictions_df = add_horizon_columns(
+            predictions_df, final_model, item_stats, le_item, le_cat,
+            target_month, target_year, horizon,
+        )
+        print(f"   [+] {horizon}-month outlook:")
+        for m, y in horizon_months(target_month, target_year, horizon):
+            col = predicted_column(month_label(m, y))
+            print(f"       {month_label(m, y):15s}: {predictions_df[col].sum():>10,} units")
 
     # ── Step 8: Safety buffer ─────────────────────────────────────────────────
-    print("\n8. Applying 20% Safety Stock Buffer...")
-    pred_col       = f'Predicted_{month_name.replace(" ", "_")}_Qty'
-    predictions_df = pd.DataFrame(results)
-    predictions_df['Recommended_Stock'] = (
-        predictions_df[pred_col] * 1.2
-    ).apply(np.ceil).astype(int)
+    if service_level is not None:
+        print(f"\n8. Applying Service-Level Safety Stock (P{service_level * 100:g})...")
+    else:
+        print(f"\n8. Applying {(SAFETY_FACTOR - 1) * 100:.0f}% Safety Stock Buffer...")
+    profiler.begin(8)
+    predictions_df = apply_safety_buffer(predictions_df, pred_col, SAFETY_FACTOR, service_level)
+    predictions_df = drop_policy_columns(predictions_df, service_level)
+    extra = predictions_df['Recommended_Stock'].sum() - predictions_df[pred_col].sum()
+    print(f"   [+] Safety stock on top of predictions: {extra:,} units")
 
     # ── Step 9: Budget calculation ────────────────────────────────────────────
     print("\n9. Calculating Budget Requirements...")
-    merged = pd.merge(predictions_df, latest_prices, on='Item', how='left')
-    merged['Price']           = merged['Price'].fillna(0)
-    merged['Budget_Required'] = merged['Recommended_Stock'] * merged['Price']
-
-    category_budget = (
-        merged.groupby('Category')['Budget_Required']
-        .sum().reset_index()
-        .sort_values('Budget_Required', ascending=False)
-    )
-    category_budget['Budget_Required'] = category_budget['Budget_Required'].round(2)
+    profiler.begin(9)
+    merged, category_budget = calculate_budget(predictions_df, latest_prices)
     total_budget = category_budget['Budget_Required'].sum()
 
     print(f"   [+] Total budget: Rs. {total_budget:,.2f}")
@@ -382,44 +274,124 @@ def run_prediction_pipeline():
 
     # ── Step 10: Save reports ─────────────────────────────────────────────────
     print("\n10. Saving Reports...")
-    reports_dir = os.path.join(BASE_DIR, 'outputs', 'reports')
-    os.makedirs(reports_dir, exist_ok=True)
+    profiler.begin(10)
+    # Everything goes into a fresh staging dir; readers keep seeing the
+    # previous version until it is published after step 11
+    reports_root = os.path.join(BASE_DIR, 'outputs', 'reports')
+    reports_dir = stage_version(reports_root)
 
-    category_budget.to_csv(
-        os.path.join(reports_dir, 'frontend_category_budgets.csv'),
-        index=False, encoding='utf-8-sig'
-    )
-    category_budget.to_json(
-        os.path.join(reports_dir, 'frontend_category_budgets.json'),
-        orient='records'
-    )
-    merged.to_csv(
-        os.path.join(reports_dir, 'detailed_inventory_plan.csv'),
-        index=False, encoding='utf-8-sig'
-    )
+    save_plan_reports(reports_dir, category_budget, merged)
     eval_out.to_csv(
         os.path.join(reports_dir, 'model_evaluation.csv'),
         index=False, encoding='utf-8-sig'
     )
-    print(f"   [+] Reports saved to {reports_dir}")
+    print(f"   [+] Reports staged in {reports_dir}")
+
+    # Model + encoders + item stats → versioned artifact for in-process inference
+    models_dir = os.path.join(BASE_DIR, 'outputs', 'models')
+    version = save_artifact(
+        models_dir, final_model, le_item, le_cat, item_stats, latest_prices,
+        metrics={'MAE': mae, 'RMSE': rmse, 'R2_Score': r2, 'MAPE (%)': mape},
+    )
+    print(f"   [+] Model artifact saved: {version}")
 
     # ── Step 11: Visualizations ───────────────────────────────────────────────
-    print("\n11. Generating Visualizations...")
-    charts_dir = os.path.join(BASE_DIR, 'outputs', 'charts')
-    plot_budget_distribution(category_budget, output_folder=charts_dir)
-    plot_category_trends(df, output_folder=charts_dir)
+    print("\n11. Generating Visualizations..." if charts else "\n11. Saving Chart Data...")
+    profiler.begin(11)
+    # Only the chart DATA is written here; the ML API renders PNGs on demand
+    save_category_sales(reports_dir, monthly_sales)
+    print("   [+] Chart data saved (charts render on request)")
+    if charts:
+        # matplotlib is imported only when charts are asked for
+        from src.visualization import plot_budget_distribution, plot_category_trends
+        charts_dir = os.path.join(BASE_DIR, 'outputs', 'charts')
+        plot_budget_distribution(category_budget, output_folder=charts_dir)
+        plot_category_trends(df if df is not None else monthly_sales, output_folder=charts_dir)
+
+    profile = profiler.save(reports_dir, history_dir=reports_root)
+    report_version = publish_version(reports_root, reports_dir, keep=keep_versions)
+    print(f"   [+] Published report version {report_version}")
+    print(f"\n   📊 STAGE PROFILE (wall / cpu / peak RSS):")
+    for st in profile['stages']:
+        print(f"   {st['number']:>2} {st['name']:15s}: {st['wall_seconds']:8.2f}s "
+              f"{st['cpu_seconds']:8.2f}s  {st['peak_rss_mb'] or 0:8.1f} MB")
 
     # ── Final summary ─────────────────────────────────────────────────────────
     print(f"\n{'='*57}")
     print(f"✅ Pipeline Complete!")
-    print(f"   Model          : Normalized Global Random Forest")
+    print(f"   Model          : {model_label}")
     print(f"   R² Score       : {r2:.4f}  → {verdict} {verdict_icon}")
     print(f"   MAE            : {mae:.2f} units")
     print(f"   Target month   : {month_name}")
     print(f"   Items predicted: {len(predictions_df):,}")
     print(f"   Total budget   : Rs. {total_budget:,.2f}")
+    print(f"   Report version : {report_version}")
     print(f"{'='*57}")
 
 
 if __name__ == "__main__":
-    run_prediction_pipeline()
+    parser = argparse.ArgumentParser(description="HealixPharm stock prediction pipeline")
+    parser.add_argument(
+        '--eval-mode', choices=EVAL_MODES,
+        default=os.environ.get('HEALIX_EVAL_MODE', DEFAULT_EVAL_MODE),
+        help="holdout = eval forest + final forest (2 fits), "
+             "oob = one forest scored out-of-bag (1 fit)",
+    )
+    parser.add_argument(
+        '--service-level', type=float,
+        default=float(os.environ.get('HEALIX_SERVICE_LEVEL', SERVICE_LEVEL)),
+        help="Recommended stock = this quantile of the forecast (e.g. 0.9 = P90); "
+             f"0 = flat x{SAFETY_FACTOR} buffer",
+    )
+    parser.add_argument(
+        '--horizon', type=int, default=int(os.environ.get('HEALIX_HORIZON', 1)),
+        help=f"months to forecast, 1-{MAX_HORIZON} (one plan column per month)",
+    )
+    parser.add_argument(
+        '--partition', choices=['none', *[p for p in PARTITIONS if p]],
+        default=os.environ.get('HEALIX_PARTITION', 'none'),
+        help="none = one global forest, category = one forest per category "
+             "trained in parallel",
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        default=os.environ.get('HEALIX_STREAM', '') not in ('', '0'),
+        help="read the sales export in chunks straight into the monthly "
+             "aggregate (memory bounded by distinct items)",
+    )
+    parser.add_argument(
+        '--source', choices=('excel', 'db'),
+        default=os.environ.get('HEALIX_SOURCE', 'excel'),
+        help="excel = offline POS workbook, db = live monthly_item_sales "
+             "aggregate (stock_logs, reason='sold')",
+    )
+    parser.add_argument(
+        '--database-url', default=None,
+        help="SQLAlchemy URL for --source db (default: HEALIX_DATABASE_URL or DB_* vars)",
+    )
+    parser.add_argument(
+        '--charts', action='store_true',
+        default=os.environ.get('HEALIX_CHARTS', '') not in ('', '0'),
+        help="also render the PNG charts now (default: the ML API renders them on request)",
+    )
+    parser.add_argument(
+        '--keep-versions', type=int,
+        default=int(os.environ.get('HEALIX_KEEP_VERSIONS', KEEP_VERSIONS)),
+        help="published report versions to keep for rollback (min 2)",
+    )
+    args = parser.parse_args()
+    if not 0 <= args.service_level < 1:
+        parser.error("--service-level must be in [0, 1)")
+    if not 1 <= args.horizon <= MAX_HORIZON:
+        parser.error(f"--horizon must be between 1 and {MAX_HORIZON}")
+    if args.keep_versions < 2:
+        parser.error("--keep-versions must be at least 2")
+    run_prediction_pipeline(eval_mode=args.eval_mode,
+                            service_level=args.service_level or None,
+                            horizon=args.horizon,
+                            partition=None if args.partition == 'none' else args.partition,
+                            stream=args.stream,
+                            source=args.source,
+                            database_url=args.database_url,
+                            charts=args.charts,
+                            keep_versions=args.keep_versions)
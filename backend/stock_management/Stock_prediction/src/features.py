@@ -0,0 +1,255 @@
+"""
+src/features.py — Normalized feature engineering
+─────────────────────────────────────────────────
+Builds the per item-month feature frame the global Random Forest trains on.
+
+build_normalized_features() is the production engine. It works on flat
+NumPy arrays sorted by (Item, Month): every lag / rolling value is a
+shifted copy of the normalized qty array, masked by each row's position
+inside its item. No per-row Python code runs, so cost grows linearly with
+rows instead of with rows × pandas overhead.
+
+build_normalized_features_reference() is the original row-by-row loop.
+It is kept only so tests and benchmarks can prove the two agree.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FEATURES
+# ══════════════════════════════════════════════════════════════════════════════
+
+FEATURES = [
+    'Month',       # what month → seasonality
+    'lag_1_n',     # last month normalized qty → recent momentum
+    'lag_2_n',     # 2 months ago normalized → trend direction
+    'lag_3_n',     # 3 months ago normalized → longer trend
+    'roll_3_n',    # 3-month normalized avg → short term pattern
+    'roll_6_n',    # 6-month normalized avg → long term pattern
+    'trend_n',     # lag_1 - lag_2 normalized → acceleration
+    'item_cv',     # coefficient of variation → item volatility
+    'n_months',    # how many months of data → reliability
+    'is_q1',       # Jan-Mar flag → seasonal signal
+    'is_q4',       # Oct-Dec flag → seasonal signal
+    'item_enc',    # item identity (label encoded)
+    'cat_enc',     # category identity (label encoded)
+]
+
+def period_keys(df: pd.DataFrame):
+    """
+    Sort keys that put each item's history in time order.
+    (Item, Year, Month) when the frame has a Year column — so several
+    years never collapse into the same month — else (Item, Month).
+    """
+    return ['Item', 'Year', 'Month'] if 'Year' in df.columns else ['Item', 'Month']
+
+
+def period_index(df: pd.DataFrame) -> np.ndarray:
+    """Monotonic month counter (Year * 12 + Month - 1), or Month when no Year."""
+    months = df['Month'].to_numpy().astype(np.int64)
+    if 'Year' not in df.columns:
+        return months
+    return df['Year'].to_numpy().astype(np.int64) * 12 + months - 1
+
+
+# Column order of the frame returned by both builders
+FEATURE_FRAME_COLUMNS = [
+    'Item', 'Category', 'Month',
+    'lag_1_n', 'lag_2_n', 'lag_3_n', 'roll_3_n', 'roll_6_n', 'trend_n',
+    'item_mean', 'item_std', 'item_cv', 'n_months',
+    'is_q1', 'is_q4',
+    'qty_norm', 'qty_raw',
+]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# VECTORIZED ENGINE
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _shift_within_item(values, pos, k, fill):
+    """values[i-k] where row i has at least k earlier rows in its item, else fill."""
+    shifted = np.full_like(values, fill)
+    if k < len(values):
+        shifted[k:] = values[:-k]
+    return np.where(pos >= k, shifted, fill)
+
+
+def _trailing_mean(values, pos, window):
+    """
+    Mean of up to `window` previous values inside the item (1.0 if none).
+    Values are summed oldest → newest, the same order np.mean() uses on
+    the slice norm_vals[max(0, i-window):i] in the reference loop.
+    """
+    total = np.zeros_like(values)
+    for k in range(window, 0, -1):
+        total = total + _shift_within_item(values, pos, k, 0.0)
+    count = np.minimum(pos, window)
+    return np.where(count > 0, total / np.maximum(count, 1), 1.0)
+
+
+def build_normalized_features(monthly_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Builds normalized features for the global model.
+
+    KEY IDEA: Divide all qty values by the item's mean qty.
+    This removes the scale difference between items and lets
+    the model focus on PATTERNS (is this month above/below normal?)
+
+    Example:
+      ATORVA raw:  3005, 2683, 702, 2416 ...
+      ATORVA mean: 2497
+      ATORVA norm: 1.20,  1.07, 0.28, 0.97 ...
+                   ↑ above avg  ↑ far below  ↑ near avg
+
+    Now the model learns: "month 3 tends to be 0.28x normal"
+    regardless of whether the item sells 3000 or 30 per month.
+
+    Expects one row per (Item, Month) with columns Item, Category,
+    Month, Qty. Returns the same frame as the reference loop: items in
+    sorted order, months ascending within each item.
+
+    Multi-year history: give one row per (Item, Year, Month) with a Year
+    column. Rows are then ordered by (Year, Month) inside each item, lags
+    run across year boundaries, and the output keeps a Year column
+    (after Month). 'Month' stays the calendar month → seasonality.
+    """
+    if monthly_df.empty:
+        return pd.DataFrame(columns=FEATURE_FRAME_COLUMNS)
+
+    df = monthly_df.sort_values(period_keys(monthly_df), kind='mergesort')
+
+    items  = df['Item'].to_numpy()
+    months = df['Month'].to_numpy().astype(np.int64)
+    qty    = df['Qty'].to_numpy().astype(np.float64)
+    n_rows = len(df)
+
+    # ── Item boundaries ───────────────────────────────────────────────────────
+    # Rows are contiguous per item after the sort, so an item starts
+    # wherever the name changes.
+    is_start       = np.empty(n_rows, dtype=bool)
+    is_start[0]    = True
+    is_start[1:]   = items[1:] != items[:-1]
+    starts         = np.flatnonzero(is_start)
+    item_id        = np.cumsum(is_start) - 1
+    counts         = np.diff(np.append(starts, n_rows))
+    pos            = np.arange(n_rows) - starts[item_id]
+
+    # ── Per-item stats ────────────────────────────────────────────────────────
+    sums      = np.bincount(item_id, weights=qty)
+    item_mean = sums / counts
+    sq_dev    = np.bincount(item_id, weights=(qty - item_mean[item_id]) ** 2)
+    item_std  = np.where(counts > 1, np.sqrt(sq_dev / counts), 1.0)
+
+    # Skip items with zero mean (avoid division by zero)
+    keep_item = item_mean != 0
+    safe_mean = np.where(keep_item, item_mean, 1.0)
+
+    row_mean = safe_mean[item_id]
+    row_std  = item_std[item_id]
+    norm     = qty / row_mean
+
+    # ── Lag / rolling features ────────────────────────────────────────────────
+    lag1  = _shift_within_item(norm, pos, 1, 1.0)
+    lag2  = _shift_within_item(norm, pos, 2, 1.0)
+    lag3  = _shift_within_item(norm, pos, 3, 1.0)
+    roll3 = _trailing_mean(norm, pos, 3)
+    roll6 = _trailing_mean(norm, pos, 6)
+
+    # Category is taken from each item's first month, like the reference
+    category = df['Category'].to_numpy()[starts][item_id]
+
+    out = pd.DataFrame({
+        'Item':      items,
+        'Category':  category,
+        'Month':     months,
+        'lag_1_n':   lag1,
+        'lag_2_n':   lag2,
+        'lag_3_n':   lag3,
+        'roll_3_n':  roll3,
+        'roll_6_n':  roll6,
+        'trend_n':   lag1 - lag2,
+        'item_mean': row_mean,
+        'item_std':  row_std,
+        'item_cv':   row_std / row_mean,
+        'n_months':  counts[item_id].astype(np.int64),
+        'is_q1':     np.isin(months, [1, 2, 3]).astype(np.int64),
+        'is_q4':     np.isin(months, [10, 11, 12]).astype(np.int64),
+        # Targets
+        'qty_norm':  norm,
+        'qty_raw':   qty,
+    })
+
+    if 'Year' in df.columns:
+        out.insert(3, 'Year', df['Year'].to_numpy().astype(np.int64))
+
+    keep_row = keep_item[item_id]
+    if not keep_row.all():
+        out = out[keep_row]
+    return out.reset_index(drop=True)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# REFERENCE IMPLEMENTATION (row-by-row)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def build_normalized_features_reference(monthly_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Original per-row feature builder.
+
+    Slow (one g.iloc[i] per item-month) but easy to read — kept as the
+    ground truth for build_normalized_features().
+    """
+    records = []
+
+    for item, group in monthly_df.groupby('Item'):
+        g        = group.sort_values('Month').reset_index(drop=True)
+        category = g['Category'].iloc[0]
+        qty_vals = g['Qty'].values
+        qty_mean = qty_vals.mean()
+        qty_std  = qty_vals.std() if len(g) > 1 else 1.0
+        n_months = len(g)
+
+        # Skip items with zero mean (avoid division by zero)
+        if qty_mean == 0:
+            continue
+
+        # Normalize: divide every month's qty by item mean
+        norm_vals = qty_vals / qty_mean
+        cv        = qty_std / qty_mean  # volatility score
+
+        for i in range(len(g)):
+            row   = g.iloc[i]
+            month = int(row['Month'])
+
+            # Normalized lag features (fall back to 1.0 = "average" if no history)
+            lag1_n  = norm_vals[i-1] if i >= 1 else 1.0
+            lag2_n  = norm_vals[i-2] if i >= 2 else 1.0
+            lag3_n  = norm_vals[i-3] if i >= 3 else 1.0
+            roll3_n = norm_vals[max(0, i-3):i].mean() if i >= 1 else 1.0
+            roll6_n = norm_vals[max(0, i-6):i].mean() if i >= 1 else 1.0
+            trend_n = lag1_n - lag2_n  # positive = growing, negative = declining
+
+            records.append({
+                'Item':      item,
+                'Category':  category,
+                'Month':     month,
+                'lag_1_n':   lag1_n,
+                'lag_2_n':   lag2_n,
+                'lag_3_n':   lag3_n,
+                'roll_3_n':  roll3_n,
+                'roll_6_n':  roll6_n,
+                'trend_n':   trend_n,
+                'item_mean': qty_mean,
+                'item_std':  qty_std,
+                'item_cv':   cv,
+                'n_months':  n_months,
+                'is_q1':     1 if month in [1, 2, 3]    else 0,
+                'is_q4':     1 if month in [10, 11, 12] else 0,
+                # Targets
+                'qty_norm':  float(row['Qty']) / qty_mean,  # normalized target
+                'qty_raw':   float(row['Qty']),              # raw target
+            })
+
+    return pd.DataFrame(records)
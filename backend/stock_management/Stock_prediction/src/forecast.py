@@ -0,0 +1,515 @@
+"""
+src/forecast.py — Inference from a trained model
+────────────────────────────────────────────────
+Everything needed to turn a trained global Random Forest into an
+inventory plan WITHOUT retraining:
+
+  compute_item_stats()     → per-item mean / std / last 6 normalized months
+  build_prediction_frame() → FEATURES matrix for a target month
+  predict_quantities()     → step 7, denormalized predictions + P50/P90/P95
+  apply_safety_buffer()    → step 8, Recommended_Stock (service level or
+                             flat safety factor)
+  calculate_budget()       → step 9, prices + per-category budget
+  forecast_horizon()       → next N months, features rolled forward recursively
+  predict_inventory_plan() → steps 7-9 in one call
+  save_plan_reports()      → step 10, budget + inventory plan files
+                             (plan also as Parquet, see src/plan_store.py)
+
+The trained model, its label encoders, the item stats and the latest
+prices are bundled into one versioned artifact (save_artifact / load_artifact)
+so the ML API can load it once and answer new what-ifs (another target
+month, another service level) in milliseconds.
+
+Quantiles (P50 / P90 / P95):
+Every tree of the forest makes its own prediction for an item; the
+forest's answer is their mean. The spread of those per-tree predictions
+is the model's uncertainty for THAT item — wide for volatile items,
+narrow for stable ones. Quantiles of the per-tree predictions come from
+ONE (n_trees × n_items) array, no second model. Recommended_Stock is the
+quantile at the chosen service level (e.g. P90 → enough stock in ~90%
+of the model's scenarios), never below the point prediction.
+
+Artifact layout:
+    outputs/models/forecaster_<version>.joblib
+    outputs/models/latest.json   ← {"version": ..., "file": ...}
+"""
+
+import os
+import json
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.features import FEATURES, period_keys
+from src.plan_store import write_plan_parquet
+
+
+ARTIFACT_FORMAT  = 1     # bump when the artifact dict layout changes
+SAFETY_FACTOR    = 1.2   # flat 20% safety stock buffer (legacy policy)
+SERVICE_LEVEL    = 0.90  # default policy: stock up to the P90 forecast
+QUANTILES        = (0.50, 0.90, 0.95)
+HISTORY_WINDOW   = 6     # normalized months kept per item (roll_6_n)
+MAX_HORIZON      = 6     # months ahead the outlook may cover
+KEEP_ARTIFACTS   = 5     # older artifact files are pruned
+LATEST_POINTER   = 'latest.json'
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TARGET MONTH
+# ══════════════════════════════════════════════════════════════════════════════
+
+def next_target_month(today=None):
+    """Returns (month, year) of the calendar month after `today`."""
+    today = today or datetime.today()
+    if today.month == 12:
+        return 1, today.year + 1
+    return today.month + 1, today.year
+
+
+def month_label(target_month, target_year):
+    """(4, 2026) → 'April 2026'"""
+    return datetime(target_year, target_month, 1).strftime('%B %Y')
+
+
+def quantile_column(q):
+    """0.9 → 'P90_Qty'"""
+    return f'P{q * 100:g}_Qty'
+
+
+def predicted_column(month_name):
+    """'April 2026' → 'Predicted_April_2026_Qty'"""
+    return f'Predicted_{month_name.replace(" ", "_")}_Qty'
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ITEM STATS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def compute_item_stats(monthly_sales: pd.DataFrame) -> dict:
+    """
+    Per-item statistics used to build prediction features.
+
+    Works on Item/Category/Month/Qty or, for multi-year data, with a Year
+    column too (history ordered by Year, Month).
+
+    Returns a dict of aligned arrays (one entry per item with mean > 0,
+    items in sorted order):
+        item, cat, mean, std (0 for single-month items), n,
+        norm_tail → (n_items, HISTORY_WINDOW) last normalized months,
+                    right-aligned, NaN where the item has no history
+    """
+    df = monthly_sales.sort_values(period_keys(monthly_sales), kind='mergesort')
+    items = df['Item'].to_numpy()
+    qty   = df['Qty'].to_numpy().astype(np.float64)
+    n_rows = len(df)
+
+    if n_rows == 0:
+        return {
+            'item': np.array([], dtype=object), 'cat': np.array([], dtype=object),
+            'mean': np.array([]), 'std': np.array([]), 'n': np.array([], dtype=np.int64),
+            'norm_tail': np.empty((0, HISTORY_WINDOW)),
+        }
+
+    is_start     = np.empty(n_rows, dtype=bool)
+    is_start[0]  = True
+    is_start[1:] = items[1:] != items[:-1]
+    starts  = np.flatnonzero(is_start)
+    item_id = np.cumsum(is_start) - 1
+    counts  = np.diff(np.append(starts, n_rows))
+    ends    = starts + counts  # exclusive
+
+    mean   = np.bincount(item_id, weights=qty) / counts
+    sq_dev = np.bincount(item_id, weights=(qty - mean[item_id]) ** 2)
+    std    = np.where(counts > 1, np.sqrt(sq_dev / counts), 0.0)
+
+    safe_mean = np.where(mean > 0, mean, 1.0)
+    norm      = qty / safe_mean[item_id]
+
+    norm_tail = np.full((len(starts), HISTORY_WINDOW), np.nan)
+    for k in range(1, HISTORY_WINDOW + 1):
+        has_k = counts >= k
+        norm_tail[has_k, HISTORY_WINDOW - k] = norm[ends[has_k] - k]
+
+    keep = mean > 0
+    return {
+        'item':      items[starts][keep],
+        'cat':       df['Category'].to_numpy()[starts][keep],
+        'mean':      mean[keep],
+        'std':       std[keep],
+        'n':         counts[keep].astype(np.int64),
+        'norm_tail': norm_tail[keep],
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PREDICTION
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _safe_encode(encoder, values):
+    """LabelEncoder.transform that maps unseen labels to 0 instead of raising."""
+    classes = encoder.classes_
+    if len(classes) == 0:
+        return np.zeros(len(values), dtype=np.int64)
+    idx = np.searchsorted(classes, values)
+    idx = np.clip(idx, 0, len(classes) - 1)
+    known = classes[idx] == values
+    return np.where(known, idx, 0).astype(np.int64)
+
+
+def build_prediction_frame(item_stats: dict, target_month: int, le_item, le_cat) -> pd.DataFrame:
+    """FEATURES matrix (one row per item) for predicting `target_month`."""
+    tail = item_stats['norm_tail']
+    n    = item_stats['n']
+    # Months available as lags: the item's history, plus any months
+    # already forecast by roll_item_stats() (multi-horizon)
+    lags = item_stats.get('n_lags', n)
+
+    l1 = tail[:, -1]
+    l2 = np.where(lags >= 2, tail[:, -2], 1.0)
+    l3 = np.where(lags >= 3, tail[:, -3], 1.0)
+
+    frame = pd.DataFrame({
+        'Month':    np.full(len(n), target_month, dtype=np.int64),
+        'lag_1_n':  l1,
+        'lag_2_n':  l2,
+        'lag_3_n':  l3,
+        'roll_3_n': np.where(lags >= 3, tail[:, -3:].mean(axis=1), 1.0),
+        'roll_6_n': np.where(lags >= 6, tail[:, -6:].mean(axis=1), 1.0),
+        'trend_n':  l1 - l2,
+        'item_cv':  item_stats['std'] / item_stats['mean'],
+        'n_months': n,
+        'is_q1':    np.full(len(n), int(target_month in (1, 2, 3)), dtype=np.int64),
+        'is_q4':    np.full(len(n), int(target_month in (10, 11, 12)), dtype=np.int64),
+        'item_enc': _safe_encode(le_item, item_stats['item']),
+        'cat_enc':  _safe_encode(le_cat, item_stats['cat']),
+    })
+    return frame[FEATURES]
+
+
+def roll_item_stats(item_stats: dict, preds_norm: np.ndarray) -> dict:
+    """
+    item_stats one month later: every item's normalized prediction is
+    appended to its norm_tail (oldest month drops off), so the next
+    build_prediction_frame() sees it as lag_1. Item-level stats (mean,
+    std, n_months) stay as observed. One array operation for all items.
+    """
+    rolled = dict(item_stats)
+    rolled['norm_tail'] = np.concatenate(
+        [item_stats['norm_tail'][:, 1:], preds_norm[:, None]], axis=1
+    )
+    rolled['n_lags'] = item_stats.get('n_lags', item_stats['n']) + 1
+    return rolled
+
+
+def horizon_months(target_month, target_year, horizon):
+    """(11, 2026, 3) → [(11, 2026), (12, 2026), (1, 2027)]"""
+    first = target_year * 12 + target_month - 1
+    return [((first + h) % 12 + 1, (first + h) // 12) for h in range(horizon)]
+
+
+def forecast_horizon(model, item_stats: dict, le_item, le_cat,
+                     target_month: int, target_year: int, horizon: int) -> pd.DataFrame:
+    """
+    Recursive multi-month forecast for all items at once.
+
+    Step h predicts month h for EVERY item in one predict call, then
+    rolls those predictions into the lag / rolling features of step h+1.
+    Returns Item, Category and one Predicted_<Month>_<Year>_Qty column
+    per horizon month (denormalized, rounded, >= 0).
+    """
+    columns = {'Item': item_stats['item'], 'Category': item_stats['cat']}
+    stats = item_stats
+    for month, year in horizon_months(target_month, target_year, horizon):
+        if len(stats['item']):
+            preds_norm = model.predict(build_prediction_frame(stats, month, le_item, le_cat))
+        else:
+            preds_norm = np.array([])
+        col = predicted_column(month_label(month, year))
+        columns[col] = np.maximum(0, np.round(preds_norm * stats['mean'])).astype(np.int64)
+        stats = roll_item_stats(stats, preds_norm)
+    return pd.DataFrame(columns)
+
+
+def add_horizon_columns(predictions_df: pd.DataFrame, model, item_stats: dict,
+                        le_item, le_cat, target_month: int, target_year: int,
+                        horizon: int) -> pd.DataFrame:
+    """Appends the months after the target month (horizon > 1) to step 7's frame."""
+    if horizon <= 1:
+        return predictions_df
+    outlook = forecast_horizon(model, item_stats, le_item, le_cat,
+                               target_month, target_year, horizon)
+    predictions_df = predictions_df.copy()
+    for col in outlook.columns[3:]:     # Item, Category, target month come from step 7
+        predictions_df[col] = outlook[col].to_numpy()
+    return predictions_df
+
+
+def tree_predictions(model, frame: pd.DataFrame):
+    """
+    Returns (point, per_tree) normalized predictions for every row.
+
+    per_tree is (n_trees, n_rows): each tree predicts the whole frame in
+    one call. point is their mean — what model.predict() returns. Models
+    without trees (anything that is not a forest) give per_tree = None.
+    """
+    if hasattr(model, 'tree_predictions'):      # training.PartitionedForest
+        return model.tree_predictions(frame)
+    trees = getattr(model, 'estimators_', None)
+    if trees is None or len(trees) == 0:
+        return model.predict(frame), None
+
+    X = np.ascontiguousarray(frame.to_numpy(dtype=np.float32))
+    per_tree = np.empty((len(trees), len(X)), dtype=np.float64)
+    point = np.zeros(len(X), dtype=np.float64)
+    for i, tree in enumerate(trees):
+        per_tree[i] = tree.predict(X, check_input=False)
+        point += per_tree[i]      # same accumulation order as the forest
+    point /= len(trees)
+    return point, per_tree
+
+
+def policy_quantiles(service_level=None):
+    """Report quantiles plus the service level's own quantile, ascending."""
+    levels = set(QUANTILES)
+    if service_level is not None:
+        levels.add(service_level)
+    return tuple(sorted(levels))
+
+
+def predict_quantities(model, item_stats: dict, le_item, le_cat,
+                       target_month: int, pred_col: str,
+                       quantiles=QUANTILES) -> pd.DataFrame:
+    """
+    Step 7 — Item, Category, <pred_col>, P50_Qty, P90_Qty, ...
+    (denormalized, rounded, >= 0).
+    """
+    n_items = len(item_stats['item'])
+    if n_items:
+        frame = build_prediction_frame(item_stats, target_month, le_item, le_cat)
+        preds_norm, per_tree = tree_predictions(model, frame)
+    else:
+        preds_norm, per_tree = np.array([]), None
+    pred_qty = np.maximum(0, np.round(preds_norm * item_stats['mean'])).astype(np.int64)
+
+    columns = {
+        'Item':     item_stats['item'],
+        'Category': item_stats['cat'],
+        pred_col:   pred_qty,
+    }
+    if quantiles:
+        if per_tree is not None and n_items:
+            q_norm = np.quantile(per_tree, quantiles, axis=0)   # (n_q, n_items)
+        else:
+            q_norm = np.tile(preds_norm, (len(quantiles), 1))
+        q_qty = np.maximum(0, np.round(q_norm * item_stats['mean'])).astype(np.int64)
+        for q, values in zip(quantiles, q_qty):
+            columns[quantile_column(q)] = values
+    return pd.DataFrame(columns)
+
+
+def apply_safety_buffer(predictions_df: pd.DataFrame, pred_col: str,
+                        safety_factor: float = SAFETY_FACTOR,
+                        service_level=None) -> pd.DataFrame:
+    """
+    Step 8 — adds Recommended_Stock.
+
+    service_level given → max(predicted, P<service_level> quantile)
+                          (needs that quantile column from step 7)
+    otherwise           → ceil(predicted × safety_factor)  (flat buffer)
+    """
+    predictions_df = predictions_df.copy()
+    predicted = predictions_df[pred_col].to_numpy()
+    if service_level is not None:
+        quantile = predictions_df[quantile_column(service_level)].to_numpy()
+        recommended = np.maximum(predicted, quantile)
+    else:
+        recommended = np.ceil(predicted * safety_factor)
+    predictions_df['Recommended_Stock'] = recommended.astype(np.int64)
+    return predictions_df
+
+
+def drop_policy_columns(predictions_df: pd.DataFrame, service_level=None) -> pd.DataFrame:
+    """Removes a service-level quantile column that is not one of QUANTILES."""
+    if service_level is None or service_level in QUANTILES:
+        return predictions_df
+    return predictions_df.drop(columns=[quantile_column(service_level)])
+
+
+def calculate_budget(predictions_df: pd.DataFrame, latest_prices: pd.DataFrame):
+    """
+    Step 9 — joins latest prices and sums budget per category.
+    Returns (merged, category_budget) with category_budget highest first.
+    """
+    merged = pd.merge(predictions_df, latest_prices, on='Item', how='left')
+    merged['Price']           = merged['Price'].fillna(0)
+    merged['Budget_Required'] = merged['Recommended_Stock'] * merged['Price']
+
+    category_budget = (
+        merged.groupby('Category')['Budget_Required']
+        .sum().reset_index()
+        .sort_values('Budget_Required', ascending=False)
+    )
+    category_budget['Budget_Required'] = category_budget['Budget_Required'].round(2)
+    return merged, category_budget
+
+
+def predict_inventory_plan(
+    model,
+    item_stats: dict,
+    le_item,
+    le_cat,
+    latest_prices: pd.DataFrame,
+    target_month: int,
+    target_year: int,
+    safety_factor: float = SAFETY_FACTOR,
+    service_level=None,
+    horizon: int = 1,
+):
+    """
+    Steps 7-9 of the pipeline as one call.
+    service_level (e.g. 0.9) sets Recommended_Stock from that quantile;
+    None keeps the flat safety_factor buffer.
+    horizon > 1 adds one Predicted_*_Qty column per following month
+    (stock and budget stay based on the target month).
+
+    Returns (merged, category_budget, pred_col):
+        merged          → Item, Category, Predicted_*_Qty, P50/P90/P95_Qty,
+                          Recommended_Stock, Price, Budget_Required
+        category_budget → Category, Budget_Required (highest first)
+        pred_col        → name of the Predicted_*_Qty column
+    """
+    pred_col = predicted_column(month_label(target_month, target_year))
+    predictions_df = predict_quantities(model, item_stats, le_item, le_cat, target_month,
+                                        pred_col, quantiles=policy_quantiles(service_level))
+    predictions_df = add_horizon_columns(predictions_df, model, item_stats, le_item, le_cat,
+                                         target_month, target_year, horizon)
+    predictions_df = apply_safety_buffer(predictions_df, pred_col, safety_factor, service_level)
+    predictions_df = drop_policy_columns(predictions_df, service_level)
+    merged, category_budget = calculate_budget(predictions_df, latest_prices)
+    return merged, category_budget, pred_col
+
+
+CATEGORY_SALES_FILE = 'category_monthly_sales.csv'
+
+
+def save_plan_reports(reports_dir, category_budget: pd.DataFrame, merged: pd.DataFrame):
+    """
+    Step 10 (plan part) — writes the budget CSV/JSON and the inventory plan
+    (CSV + Parquet) in the format the ML API reads.
+    """
+    os.makedirs(reports_dir, exist_ok=True)
+    category_budget.to_csv(
+        os.path.join(reports_dir, 'frontend_category_budgets.csv'),
+        index=False, encoding='utf-8-sig'
+    )
+    category_budget.to_json(
+        os.path.join(reports_dir, 'frontend_category_budgets.json'),
+        orient='records'
+    )
+    merged.to_csv(
+        os.path.join(reports_dir, 'detailed_inventory_plan.csv'),
+        index=False, encoding='utf-8-sig'
+    )
+    # Same plan, typed and columnar — what the ML API queries with pushdown
+    write_plan_parquet(reports_dir, merged)
+
+
+def save_category_sales(reports_dir, monthly_sales: pd.DataFrame):
+    """
+    Step 11 — units sold per Category / Year / Month, the small series the
+    ML API draws the trend chart from (charts are rendered on demand).
+    """
+    keys = ['Category', 'Year', 'Month'] if 'Year' in monthly_sales.columns else ['Category', 'Month']
+    series = monthly_sales.groupby(keys)['Qty'].sum().reset_index()
+    os.makedirs(reports_dir, exist_ok=True)
+    series.to_csv(os.path.join(reports_dir, CATEGORY_SALES_FILE), index=False, encoding='utf-8-sig')
+    return series
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ARTIFACTS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def save_artifact(models_dir, model, le_item, le_cat, item_stats, latest_prices, metrics=None):
+    """
+    Writes a new versioned artifact and points latest.json at it.
+    Returns the version string (e.g. '20260320_103000').
+    """
+    os.makedirs(models_dir, exist_ok=True)
+    version   = datetime.now().strftime('%Y%m%d_%H%M%S')
+    file_name = f'forecaster_{version}.joblib'
+    artifact = {
+        'format':        ARTIFACT_FORMAT,
+        'version':       version,
+        'created_at':    datetime.now().isoformat(),
+        'features':      list(FEATURES),
+        'model':         model,
+        'le_item':       le_item,
+        'le_cat':        le_cat,
+        'item_stats':    item_stats,
+        'latest_prices': latest_prices[['Item', 'Price']].reset_index(drop=True),
+        'metrics':       metrics or {},
+    }
+
+    tmp_path = os.path.join(models_dir, f'{file_name}.tmp')
+    joblib.dump(artifact, tmp_path)
+    os.replace(tmp_path, os.path.join(models_dir, file_name))
+
+    pointer_tmp = os.path.join(models_dir, f'{LATEST_POINTER}.tmp')
+    with open(pointer_tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'file': file_name}, f)
+    os.replace(pointer_tmp, os.path.join(models_dir, LATEST_POINTER))
+
+    _prune_artifacts(models_dir, keep=KEEP_ARTIFACTS)
+    return version
+
+
+def _prune_artifacts(models_dir, keep):
+    files = sorted(
+        f for f in os.listdir(models_dir)
+        if f.startswith('forecaster_') and f.endswith('.joblib')
+    )
+    for old in files[:-keep]:
+        try:
+            os.remove(os.path.join(models_dir, old))
+        except OSError:
+            pass
+
+
+def load_artifact(models_dir) -> dict:
+    """
+    Loads the artifact latest.json points to.
+    Raises FileNotFoundError if no model has been trained yet.
+    """
+    pointer = os.path.join(models_dir, LATEST_POINTER)
+    if not os.path.exists(pointer):
+        raise FileNotFoundError(f"No trained model found in {models_dir}.")
+    with open(pointer, 'r', encoding='utf-8') as f:
+        latest = json.load(f)
+
+    artifact = joblib.load(os.path.join(models_dir, latest['file']))
+    if artifact.get('format') != ARTIFACT_FORMAT:
+        raise RuntimeError(
+            f"Model artifact format {artifact.get('format')} is not supported "
+            f"(expected {ARTIFACT_FORMAT}). Retrain the model."
+        )
+    return artifact
+
+
+def predict_from_artifact(artifact, target_month, target_year, safety_factor=SAFETY_FACTOR,
+                          service_level=None, horizon=1):
+    """predict_inventory_plan() using everything stored in the artifact."""
+    return predict_inventory_plan(
+        artifact['model'],
+        artifact['item_stats'],
+        artifact['le_item'],
+        artifact['le_cat'],
+        artifact['latest_prices'],
+        target_month,
+        target_year,
+        safety_factor,
+        service_level,
+        horizon,
+    )
@@ -0,0 +1,94 @@
+"""
+src/live_data.py — Training data from the live stock_management database
+───────────────────────────────────────────────────────────────────────
+Instead of the offline POS workbook, the pipeline can train on what the
+pharmacy actually dispensed: stock_logs rows with reason="sold".
+
+The stock_management app keeps those folded into a small aggregate
+table (SalesAggregateService, synced nightly from a stored watermark):
+
+    monthly_item_sales   medicine_id / year / month / quantity_sold
+
+This module only READS that table (joined with medicines for the name
+and price), so loading costs O(items × months) whatever the number of
+raw stock logs:
+
+    monthly_sales, latest_prices = load_monthly_sales_from_db(database_url)
+
+Categories are assigned from the medicine name with the same keyword
+rules as the workbook path, so both sources train the same categories.
+
+Database URL: --database-url, else HEALIX_DATABASE_URL, else built from
+the DB_USER / DB_PASSWORD / DB_HOST / DB_PORT / DB_NAME variables the
+stock_management app uses.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing import categorize_items
+
+
+AGGREGATE_QUERY = """
+    SELECT m.id            AS medicine_id,
+           m.name          AS item,
+           m.selling_price AS price,
+           s.year          AS year,
+           s.month         AS month,
+           s.quantity_sold AS qty
+    FROM monthly_item_sales s
+    JOIN medicines m ON m.id = s.medicine_id
+    WHERE s.quantity_sold > 0
+"""
+
+
+def default_database_url():
+    url = os.environ.get('HEALIX_DATABASE_URL')
+    if url:
+        return url
+    return (f"mysql+mysqlconnector://{os.environ.get('DB_USER', 'root')}:"
+            f"{os.environ.get('DB_PASSWORD', '')}@{os.environ.get('DB_HOST', 'localhost')}:"
+            f"{os.environ.get('DB_PORT', '3306')}/{os.environ.get('DB_NAME', 'railway')}")
+
+
+def load_monthly_sales_from_db(database_url=None):
+    """
+    Returns (monthly_sales, latest_prices) in the same shape as the
+    workbook path after step 2 — Item / Category / Year / Month / Qty
+    sorted by Item, Year, Month, and Item / Price sorted by Item.
+    """
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_url or default_database_url())
+    try:
+        with engine.connect() as conn:
+            rows = pd.read_sql(text(AGGREGATE_QUERY), conn)
+    finally:
+        engine.dispose()
+
+    print(f"-> Loaded {len(rows):,} item-month rows from monthly_item_sales")
+    if rows.empty:
+        raise ValueError("monthly_item_sales is empty — run the sales aggregate sync first")
+
+    rows['Item'] = rows['item'].astype(str).str.strip()
+    rows['Category'] = categorize_items(rows['Item'])
+    # Two medicines with the same name are one item to the model
+    monthly_sales = (
+        rows.groupby(['Item', 'Category', 'year', 'month'])['qty']
+        .sum().reset_index()
+        .rename(columns={'year': 'Year', 'month': 'Month', 'qty': 'Qty'})
+        .astype({'Year': np.int32, 'Month': np.int32, 'Qty': np.float64})
+        .sort_values(['Item', 'Year', 'Month'])
+        .reset_index(drop=True)
+    )
+    latest_prices = (
+        rows.sort_values('medicine_id')
+        .groupby('Item')['price'].last().reset_index()
+        .rename(columns={'price': 'Price'})
+    )
+
+    print(f"   [+] Items: {monthly_sales['Item'].nunique():,}  "
+          f"Months: {len(monthly_sales[['Year', 'Month']].drop_duplicates())}")
+    return monthly_sales, latest_prices
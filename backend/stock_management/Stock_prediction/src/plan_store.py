@@ -0,0 +1,201 @@
+"""
+src/plan_store.py — Columnar inventory plan (Parquet) with pushdown reads
+────────────────────────────────────────────────────────────────────────
+detailed_inventory_plan.csv is untyped text: every reader parses the
+whole file, every column, every row. Step 10 now also writes
+
+    detailed_inventory_plan.parquet
+
+typed columns, Category dictionary-encoded, rows grouped by Category
+(stable, so each category keeps the plan's order) and split into row
+groups of ROW_GROUP_ROWS. A `Row` column keeps each item's position in
+the CSV, so "file order" survives the regrouping.
+
+Readers ask only for what they need:
+- columns     → only those column chunks are decoded
+- category    → row groups whose Category min/max stats (file footer)
+                exclude it are never read — grouping by Category makes
+                those stats tight
+- top-N page  → read just Row + the sort key, pick the page, then read
+                the other columns only of the row groups holding it
+
+    total, page = query_plan(path, category='Analgesics (Pain/Fever)',
+                             sort_column='Budget_Required', descending=True, limit=10)
+
+The category names are stored in the file's metadata, so a
+case-insensitive category lookup costs no data read.
+"""
+
+import os
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+PLAN_PARQUET_FILE = 'detailed_inventory_plan.parquet'
+ROW_COLUMN        = 'Row'
+ROW_GROUP_ROWS    = 1024
+_CATEGORIES_KEY   = b'healix.categories'
+
+
+def write_plan_parquet(reports_dir, merged: pd.DataFrame):
+    """Writes the plan as Parquet next to the CSV and returns the path."""
+    df = merged.reset_index(drop=True)
+    df.insert(0, ROW_COLUMN, np.arange(len(df), dtype=np.int32))
+    df['Item'] = df['Item'].astype(str)
+    df['Category'] = df['Category'].astype(str).astype('category')
+    df = df.sort_values('Category', kind='stable').reset_index(drop=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    categories = sorted(df['Category'].cat.categories.tolist())
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        _CATEGORIES_KEY: json.dumps(categories).encode('utf-8'),
+    })
+
+    os.makedirs(reports_dir, exist_ok=True)
+    path = os.path.join(reports_dir, PLAN_PARQUET_FILE)
+    tmp_path = f'{path}.tmp'
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_ROWS,
+                   use_dictionary=['Category'], write_statistics=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def plan_info(path):
+    """Column names, categories and row/row-group counts — metadata only."""
+    meta = pq.read_metadata(path)
+    schema = pq.read_schema(path)
+    return {
+        'columns':        [c for c in schema.names if c != ROW_COLUMN],
+        'categories':     json.loads((schema.metadata or {}).get(_CATEGORIES_KEY, b'[]')),
+        'num_rows':       meta.num_rows,
+        'num_row_groups': meta.num_row_groups,
+    }
+
+
+def _category_name(path, category, categories=None):
+    """Exact stored name for a case-insensitive category, or None if unknown."""
+    if categories is None:
+        categories = plan_info(path)['categories']
+    wanted = category.lower()
+    return next((c for c in categories if c.lower() == wanted), None)
+
+
+def _row_groups(plan_file, category_name):
+    """Row groups that can hold `category_name` (all when None), from the footer stats."""
+    meta = plan_file.metadata
+    groups = list(range(meta.num_row_groups))
+    if category_name is None:
+        return groups
+    col = plan_file.schema_arrow.get_field_index('Category')
+    keep = []
+    for i in groups:
+        stats = meta.row_group(i).column(col).statistics
+        if stats is None or not stats.has_min_max or stats.min <= category_name <= stats.max:
+            keep.append(i)
+    return keep
+
+
+def _read_groups(plan_file, groups, columns, category_name):
+    """
+    Reads `columns` of the given row groups (Category is dropped again
+    unless asked for), keeping only `category_name` rows when given.
+    Returns (table, row group of every returned row).
+    """
+    wanted = list(columns)
+    if category_name is not None and 'Category' not in wanted:
+        wanted.append('Category')
+    table = plan_file.read_row_groups(groups, columns=wanted)
+    sizes = [plan_file.metadata.row_group(i).num_rows for i in groups]
+    group_of = np.repeat(np.asarray(groups, dtype=np.int64), sizes)
+    if category_name is not None:
+        mask = pc.equal(table.column('Category').cast(pa.string()), category_name)
+        table = table.filter(mask)
+        group_of = group_of[np.asarray(mask.to_numpy(zero_copy_only=False), dtype=bool)]
+        if 'Category' not in columns:
+            table = table.drop_columns(['Category'])
+    return table, group_of
+
+
+def _to_frame(table):
+    df = table.to_pandas()
+    if 'Category' in df.columns:
+        df['Category'] = df['Category'].astype(str)
+    return df
+
+
+def _empty_frame(path, columns):
+    names = plan_info(path)['columns'] if columns is None else list(columns)
+    return pd.DataFrame({name: pd.Series(dtype=object) for name in names})
+
+
+def read_plan(path, columns=None, category=None, categories=None):
+    """
+    Plan rows in file (CSV) order, only `columns` (default: all), only
+    `category` (case-insensitive) when given.
+    """
+    name = None
+    if category:
+        name = _category_name(path, category, categories)
+        if name is None:
+            return _empty_frame(path, columns)
+
+    plan_file = pq.ParquetFile(path)
+    if columns is None:
+        columns = [c for c in plan_file.schema_arrow.names if c != ROW_COLUMN]
+    table, _ = _read_groups(plan_file, _row_groups(plan_file, name),
+                            [ROW_COLUMN, *columns], name)
+    df = _to_frame(table)
+    return (df.sort_values(ROW_COLUMN, kind='stable')
+            .drop(columns=ROW_COLUMN).reset_index(drop=True))
+
+
+def query_plan(path, category=None, sort_column=None, descending=False,
+               limit=100, offset=0, columns=None, categories=None):
+    """
+    One page of the plan: (total matching rows, page frame).
+
+    sort_column None → file order; otherwise ascending by that column
+    (ties in file order), reversed when descending — the same order the
+    API's in-memory index produces.
+    """
+    name = None
+    if category:
+        name = _category_name(path, category, categories)
+        if name is None:
+            return 0, _empty_frame(path, columns)
+
+    plan_file = pq.ParquetFile(path)
+    if columns is None:
+        columns = [c for c in plan_file.schema_arrow.names if c != ROW_COLUMN]
+
+    # Pass 1: only Row (+ the sort key) of the matching row groups
+    key_columns = [ROW_COLUMN] if sort_column is None else [ROW_COLUMN, sort_column]
+    keys, group_of = _read_groups(plan_file, _row_groups(plan_file, name), key_columns, name)
+    rows = keys.column(ROW_COLUMN).to_numpy()
+    total = len(rows)
+
+    if sort_column is None:
+        order = np.argsort(rows, kind='stable')
+    else:
+        values = np.nan_to_num(keys.column(sort_column).to_numpy(zero_copy_only=False))
+        order = np.lexsort((rows, values))
+    if descending:
+        order = order[::-1]
+    order = order[offset: offset + limit]
+    if len(order) == 0:
+        return total, _empty_frame(path, columns)
+
+    # Pass 2: every column, but only of the row groups holding the page
+    page_rows = rows[order]
+    table, _ = _read_groups(plan_file, sorted(set(group_of[order].tolist())),
+                            [ROW_COLUMN, *columns], None)
+    row_values = table.column(ROW_COLUMN).to_numpy()
+    sorter = np.argsort(row_values)
+    take = sorter[np.searchsorted(row_values, page_rows, sorter=sorter)]
+    return total, _to_frame(table.take(take).drop_columns([ROW_COLUMN]))
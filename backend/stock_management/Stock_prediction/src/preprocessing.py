@@ -1,35 +1,187 @@
+import os
+import json
+import re
+import hashlib
+
+import numpy as np
 import pandas as pd
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+# CATEGORIES
+# ══════════════════════════════════════════════════════════════════════════════
+# Order matters: an item matching keywords from several categories gets the
+# FIRST category listed here.
+
+CATEGORY_KEYWORDS = {
+    'Anti-Diabetic': ['GLUCOPHAGE', 'GLYCOMET', 'DIAMICRON', 'SITA', 'EMPA', 'NEVOX', 'PROGLUTROL', 'JANUVIA',
+                      'METFORMIN', 'RECLIDE', 'EMPAVIC', 'DIPLIN', 'LANTUS', 'GLICLAZIDE', 'GLIPIZIDE'],
+    'Cardiovascular': ['ATORVA', 'ROSUVAS', 'LOSACAR', 'BISOPROLOL', 'CONCOR', 'CILACAR', 'LASIX', 'ECOSPRIN',
+                       'ECORIN', 'ZAART', 'H.C.T', 'AMLO', 'LIPICARD', 'STATIN', 'BISOLOL', 'AMLODIPINE',
+                       'TELMISARTAN', 'RAMIPRIL', 'CARVEDILOL', 'NEBIVOLOL'],
+    'Vitamins & Supplements': ['NEUROBION', 'EVION', 'VITAMIN', 'FA 1', 'FERUP', 'DEPLUS', 'VITRA', 'CALCIUM',
+                               'ZINC', 'BONE', 'FOLIC', 'IRON', 'MULTIVIT'],
+    'Analgesics (Pain/Fever)': ['PANADOL', 'PANADEINE', 'RAPIDINE', 'FASTUM', 'PARACETAMOL', 'DICLOFENAC',
+                                'IBUPROFEN', 'SOLPADINE', 'ARCOXIA', 'CELEBREX', 'TRAMADOL', 'KETOROLAC'],
+    'Gastrointestinal': ['OMEPRAZOLE', 'VOMIKIND', 'JEEVANEE', 'CLASIPRO', 'LANZOPRAZOLE', 'PANTOPRAZOLE',
+                         'GAVISCON', 'ENO', 'NEXIUM', 'RANITIDINE', 'DOMPERIDONE', 'METOCLOPRAMIDE'],
+    'Consumer Goods & Skincare': ['BISCUITS', 'SHAMPOO', 'SOAP', 'ACNE AID', 'MICROPORE', 'PERNEX', 'LOTION',
+                                  'WASH', 'TAPE', 'CREAM', 'GEL', 'POWDER', 'BANDAGE', 'PLASTER'],
+    'Respiratory & Antibiotics': ['CLOXIL', 'AXCIL', 'DOXYN', 'TRIFIX', 'AMOXICILLIN', 'AZITHROMYCIN',
+                                  'AUGMENTIN', 'CLARYTIN', 'SALBUTAMOL', 'INHALER', 'CEFUROXIME', 'CIPROFLOX',
+                                  'CLAVULANATE', 'COTRIMOXAZOLE', 'DOXYCYCLINE', 'CLARITHROMYCIN', 'CETIRIZINE',
+                                  'LORATADINE', 'MONTELUKAST', 'SERETIDE', 'VENTOLIN']
+}
+
+UNCLASSIFIED = 'Other Meds/Unclassified'
+
+
+def _compile_keyword_matcher(category_keywords):
+    """
+    Compiles every keyword into ONE regex alternation wrapped in a lookahead.
+
+    The lookahead makes finditer() report a match at every position where
+    some keyword starts. Alternatives are listed in category order, so at
+    each position the regex picks the highest-precedence keyword starting
+    there — the best rank over all positions is then exactly the first
+    category (in dict order) with any keyword inside the name.
+    """
+    rank_of = {}
+    for rank, keywords in enumerate(category_keywords.values()):
+        for keyword in keywords:
+            rank_of.setdefault(keyword, rank)
+    alternation = '|'.join(re.escape(k) for k in rank_of)
+    return re.compile(f'(?=({alternation}))'), rank_of
+
+
+_KEYWORD_PATTERN, _KEYWORD_RANK = _compile_keyword_matcher(CATEGORY_KEYWORDS)
+_CATEGORY_NAMES = list(CATEGORY_KEYWORDS)
+
+
+def _match_category(upper_name):
+    best = None
+    for match in _KEYWORD_PATTERN.finditer(upper_name):
+        rank = _KEYWORD_RANK[match.group(1)]
+        if best is None or rank < best:
+            best = rank
+            if best == 0:
+                break
+    return _CATEGORY_NAMES[best] if best is not None else UNCLASSIFIED
+
+
 def categorize_item(item):
     """Assigns a medical category based on the item name."""
-    item = str(item).upper()
-    categories = {
-        'Anti-Diabetic': ['GLUCOPHAGE', 'GLYCOMET', 'DIAMICRON', 'SITA', 'EMPA', 'NEVOX', 'PROGLUTROL', 'JANUVIA',
-                          'METFORMIN', 'RECLIDE', 'EMPAVIC', 'DIPLIN', 'LANTUS', 'GLICLAZIDE', 'GLIPIZIDE'],
-        'Cardiovascular': ['ATORVA', 'ROSUVAS', 'LOSACAR', 'BISOPROLOL', 'CONCOR', 'CILACAR', 'LASIX', 'ECOSPRIN',
-                           'ECORIN', 'ZAART', 'H.C.T', 'AMLO', 'LIPICARD', 'STATIN', 'BISOLOL', 'AMLODIPINE',
-                           'TELMISARTAN', 'RAMIPRIL', 'CARVEDILOL', 'NEBIVOLOL'],
-        'Vitamins & Supplements': ['NEUROBION', 'EVION', 'VITAMIN', 'FA 1', 'FERUP', 'DEPLUS', 'VITRA', 'CALCIUM',
-                                   'ZINC', 'BONE', 'FOLIC', 'IRON', 'MULTIVIT'],
-        'Analgesics (Pain/Fever)': ['PANADOL', 'PANADEINE', 'RAPIDINE', 'FASTUM', 'PARACETAMOL', 'DICLOFENAC',
-                                    'IBUPROFEN', 'SOLPADINE', 'ARCOXIA', 'CELEBREX', 'TRAMADOL', 'KETOROLAC'],
-        'Gastrointestinal': ['OMEPRAZOLE', 'VOMIKIND', 'JEEVANEE', 'CLASIPRO', 'LANZOPRAZOLE', 'PANTOPRAZOLE',
-                             'GAVISCON', 'ENO', 'NEXIUM', 'RANITIDINE', 'DOMPERIDONE', 'METOCLOPRAMIDE'],
-        'Consumer Goods & Skincare': ['BISCUITS', 'SHAMPOO', 'SOAP', 'ACNE AID', 'MICROPORE', 'PERNEX', 'LOTION',
-                                      'WASH', 'TAPE', 'CREAM', 'GEL', 'POWDER', 'BANDAGE', 'PLASTER'],
-        'Respiratory & Antibiotics': ['CLOXIL', 'AXCIL', 'DOXYN', 'TRIFIX', 'AMOXICILLIN', 'AZITHROMYCIN',
-                                      'AUGMENTIN', 'CLARYTIN', 'SALBUTAMOL', 'INHALER', 'CEFUROXIME', 'CIPROFLOX',
-                                      'CLAVULANATE', 'COTRIMOXAZOLE', 'DOXYCYCLINE', 'CLARITHROMYCIN', 'CETIRIZINE',
-                                      'LORATADINE', 'MONTELUKAST', 'SERETIDE', 'VENTOLIN']
-    }
-    for category, keywords in categories.items():
-        if any(keyword in item for keyword in keywords):
-            return category
-    return 'Other Meds/Unclassified'
-
-
-def load_and_clean_data(file_path):
+    return _match_category(str(item).upper())
+
+
+def categorize_items(items: pd.Series) -> pd.Series:
+    """
+    Vectorized categorize_item for a whole column.
+
+    The matcher runs once per DISTINCT name; results are mapped back to
+    every row through the factorized codes.
+    """
+    codes, uniques = pd.factorize(items, use_na_sentinel=False)
+    labels = np.array(
+        [_match_category(name) for name in pd.Index(uniques).astype(str).str.upper()],
+        dtype=object,
+    )
+    return pd.Series(labels[codes], index=items.index, name=items.name)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PARSED-SALES CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+# Parsing the workbook with openpyxl dominates pipeline wall time, so the
+# cleaned frame is stored as Parquet next to the workbook:
+#
+#   data/.cache/<workbook stem>.parquet     ← cleaned frame
+#   data/.cache/<workbook stem>.meta.json   ← mtime, size, sha256, version
+#
+# Same mtime + size  → cache is used without reading the workbook at all.
+# Changed mtime/size → file is hashed; same hash → cache is still valid.
+# Different hash     → workbook is re-parsed and the cache rewritten.
+#
+# Bump CACHE_VERSION whenever the cleaning steps below change.
+
+CACHE_VERSION  = 1
+CACHE_DIR_NAME = '.cache'
+
+
+def _file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_paths(file_path, cache_dir):
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return (
+        os.path.join(cache_dir, f'{stem}.parquet'),
+        os.path.join(cache_dir, f'{stem}.meta.json'),
+    )
+
+
+def _write_json_atomic(path, payload):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _load_cached_frame(file_path, cache_dir):
+    """Returns the cached cleaned frame, or None if the cache is missing/stale."""
+    data_path, meta_path = _cache_paths(file_path, cache_dir)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != CACHE_VERSION or not os.path.exists(data_path):
+        return None
+
+    stat = os.stat(file_path)
+    if meta.get('mtime_ns') != stat.st_mtime_ns or meta.get('size') != stat.st_size:
+        # Touched or copied — only trust the cache if the content is identical
+        if meta.get('sha256') != _file_sha256(file_path):
+            return None
+        meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        _write_json_atomic(meta_path, meta)
+
+    try:
+        return pd.read_parquet(data_path)
+    except Exception as e:
+        print(f"   [-] Ignoring unreadable sales cache: {e}")
+        return None
+
+
+def _store_cached_frame(file_path, cache_dir, df):
+    """Writes the cleaned frame + its metadata. Failures never stop the pipeline."""
+    data_path, meta_path = _cache_paths(file_path, cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        stat = os.stat(file_path)
+        tmp_path = f'{data_path}.tmp'
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, data_path)
+        _write_json_atomic(meta_path, {
+            'version':  CACHE_VERSION,
+            'source':   os.path.basename(file_path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size':     stat.st_size,
+            'sha256':   _file_sha256(file_path),
+        })
+    except Exception as e:
+        print(f"   [-] Could not write sales cache: {e}")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# LOADING
+# ══════════════════════════════════════════════════════════════════════════════
+
+def load_and_clean_data(file_path, use_cache=True, cache_dir=None):
     """
     Loads the raw pharmacy Excel file.
     - Skips the 4 title rows at the top (header is on row index 4)
@@ -38,11 +190,44 @@ def load_and_clean_data(file_path):
     - Removes invalid rows
     - Applies medical categories
     - Extracts Month/Year for seasonality
+
+    With use_cache=True a warm run returns the cleaned frame from the
+    Parquet cache above and never opens the workbook with openpyxl.
+    cache_dir defaults to <workbook folder>/.cache.
     """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR_NAME)
+
+    if use_cache:
+        df = _load_cached_frame(file_path, cache_dir)
+        if df is not None:
+            print("-> Loaded cleaned sales data from cache (workbook unchanged)")
+            _print_clean_summary(df)
+            return df
+
+    df = _read_and_clean_workbook(file_path)
+    _print_clean_summary(df)
+
+    if use_cache:
+        _store_cached_frame(file_path, cache_dir, df)
+
+    return df
+
+
+def _read_and_clean_workbook(file_path):
+    """Parses the workbook and applies every cleaning step."""
     print("-> Loading raw data...")
     # FIX 1: Skip the 4 header/title rows — real column headers are on row 4
     df = pd.read_excel(file_path, sheet_name='Sheet1', header=4)
+    return clean_sales_frame(df)
+
 
+def clean_sales_frame(df):
+    """
+    Every cleaning step of load_and_clean_data, on a frame that is
+    already read (workbook column names: Date, Vch/Bill No, Particulars,
+    Item Details, Qty., Unit, Price, Amount).
+    """
     print("-> Fixing column names...")
     # FIX 2: Rename to standard internal names
     df = df.rename(columns={
@@ -77,19 +262,21 @@ def load_and_clean_data(file_path):
     df = df[df['Qty'] > 0]
 
     print("-> Applying medical categories...")
-    df['Category'] = df['Item'].apply(categorize_item)
+    df['Category'] = categorize_items(df['Item'])
 
     print("-> Extracting seasonality (Month/Year)...")
     df['Month'] = df['Date'].dt.month
     df['Year'] = df['Date'].dt.year
 
+    return df
+
+
+def _print_clean_summary(df):
     print(f"   [+] Clean data shape: {df.shape}")
     print(f"   [+] Date range: {df['Date'].min().date()} -> {df['Date'].max().date()}")
     print(f"   [+] Unique items: {df['Item'].nunique()}")
     print(f"   [+] Unique months: {sorted(df['Month'].unique())}")
 
-    return df
-
 
 def get_latest_prices(df):
     """Extracts the most recent unit price for every item."""
@@ -0,0 +1,152 @@
+"""
+src/profiling.py — Per-stage profile of the prediction pipeline
+────────────────────────────────────────────────────────────────
+Records, for every numbered step of main.py (1-11):
+
+    wall_seconds    elapsed time                (time.perf_counter)
+    cpu_seconds     CPU time of ALL threads     (time.process_time — so a
+                    n_jobs=-1 forest shows more CPU than wall time)
+    peak_rss_mb     process peak resident memory at the end of the stage
+    rss_growth_mb   how much that peak grew DURING the stage
+                    (0 = the stage fit inside memory already reached)
+
+Usage (main.py):
+    profiler = StageProfiler()
+    profiler.begin(1, 'load')      # closes the previous stage, if any
+    ...
+    profiler.end()
+    profiler.save(reports_dir)     # pipeline_profile.json + history
+
+The history file (one JSON run per line, last HISTORY_RUNS kept) lets
+the API compare each stage against the previous run.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+try:
+    import resource            # Linux / macOS
+except ImportError:            # Windows
+    resource = None
+
+try:
+    import psutil              # optional — only needed on Windows
+except ImportError:
+    psutil = None
+
+
+PROFILE_FILE = 'pipeline_profile.json'
+HISTORY_FILE = 'pipeline_profile_history.jsonl'
+HISTORY_RUNS = 50
+
+# main.py step number → stage key
+STAGES = {
+    1:  'load',
+    2:  'aggregate',
+    3:  'features',
+    4:  'split',
+    5:  'train_evaluate',
+    6:  'retrain',
+    7:  'predict',
+    8:  'safety_buffer',
+    9:  'budget',
+    10: 'save',
+    11: 'charts',
+}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unknown)."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux, bytes on macOS
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1)
+    return None
+
+
+class StageProfiler:
+    """Wall / CPU / peak-RSS per pipeline stage."""
+
+    def __init__(self, **run_info):
+        self.run_info = run_info
+        self.started_at = datetime.now()
+        self.stages = []
+        self._current = None
+        self._run_wall = time.perf_counter()
+        self._run_cpu = time.process_time()
+
+    def begin(self, number, name=None):
+        self.end()
+        self._current = {
+            'number': number,
+            'name':   name or STAGES.get(number, f'stage_{number}'),
+            '_wall':  time.perf_counter(),
+            '_cpu':   time.process_time(),
+            '_rss':   peak_rss_mb(),
+        }
+
+    def end(self):
+        stage, self._current = self._current, None
+        if stage is None:
+            return
+        peak = peak_rss_mb()
+        self.stages.append({
+            'number':        stage['number'],
+            'name':          stage['name'],
+            'wall_seconds':  round(time.perf_counter() - stage['_wall'], 4),
+            'cpu_seconds':   round(time.process_time() - stage['_cpu'], 4),
+            'peak_rss_mb':   peak,
+            'rss_growth_mb': None if peak is None else round(peak - stage['_rss'], 1),
+        })
+
+    def report(self):
+        self.end()
+        return {
+            'started_at': self.started_at.isoformat(),
+            **self.run_info,
+            'total': {
+                'wall_seconds': round(time.perf_counter() - self._run_wall, 4),
+                'cpu_seconds':  round(time.process_time() - self._run_cpu, 4),
+                'peak_rss_mb':  peak_rss_mb(),
+            },
+            'stages': self.stages,
+        }
+
+    def save(self, reports_dir, history_dir=None):
+        """
+        Writes pipeline_profile.json and appends the run to the history
+        (kept in history_dir when given — it spans report versions).
+        """
+        report = self.report()
+        history_dir = history_dir or reports_dir
+        os.makedirs(reports_dir, exist_ok=True)
+        os.makedirs(history_dir, exist_ok=True)
+
+        profile_path = os.path.join(reports_dir, PROFILE_FILE)
+        tmp_path = f'{profile_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, profile_path)
+
+        history_path = os.path.join(history_dir, HISTORY_FILE)
+        runs = load_history(history_dir)[-(HISTORY_RUNS - 1):] + [report]
+        tmp_path = f'{history_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(run) + '\n' for run in runs)
+        os.replace(tmp_path, history_path)
+        return report
+
+
+def load_history(reports_dir):
+    """Past profiles, oldest first ([] if none yet)."""
+    path = os.path.join(reports_dir, HISTORY_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
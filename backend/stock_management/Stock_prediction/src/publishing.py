@@ -0,0 +1,217 @@
+"""
+src/publishing.py — Atomic, versioned report publishing
+───────────────────────────────────────────────────────
+The pipeline used to rewrite the report CSVs in place, one after the
+other, so a reader could load a new budget file next to an old inventory
+plan, or a half-written CSV. Now every run writes a complete set of
+reports into its own directory and publishes it with one atomic step:
+
+    outputs/reports/
+        current.json                     → {"version": "20260320_103000_123456", ...}
+        versions/
+            20260313_101500_654321/      ← previous run (kept for rollback)
+            20260320_103000_123456/      ← current run
+            .20260320_110000_000001.staging/   ← run still being written
+        pipeline_profile_history.jsonl   ← shared across versions
+
+    staging = stage_version(reports_root)          # fresh, invisible dir
+    ... write every report into staging ...
+    version = publish_version(reports_root, staging, keep=5)
+
+publish_version() renames the staging dir into versions/ and then swaps
+current.json with os.replace() — readers see the old set or the new
+set, never a mix. A reader resolves current.json ONCE per request
+(pinned_reports_dir) and reads every file from that directory.
+
+rollback() points current.json at an earlier version; prune_versions()
+keeps the newest `keep` versions plus whichever one is current.
+Before the first versioned run (no current.json) readers fall back to
+the flat files in outputs/reports/ itself.
+"""
+
+import os
+import json
+import shutil
+import threading
+import time
+from datetime import datetime
+
+
+VERSIONS_DIR    = 'versions'
+CURRENT_POINTER = 'current.json'
+MANIFEST_FILE   = 'manifest.json'
+KEEP_VERSIONS   = 5             # >= 2: the version just replaced stays readable
+STALE_STAGING_SECONDS = 3600    # staging dirs this old belong to crashed runs
+_STAGING_SUFFIX = '.staging'
+
+
+def _versions_root(reports_root):
+    return os.path.join(reports_root, VERSIONS_DIR)
+
+
+def version_dir(reports_root, version):
+    return os.path.join(_versions_root(reports_root), version)
+
+
+def _write_json_atomic(path, payload):
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def current_version(reports_root):
+    """Version current.json points to, or None before the first versioned run."""
+    try:
+        with open(os.path.join(reports_root, CURRENT_POINTER), 'r', encoding='utf-8') as f:
+            return json.load(f)['version']
+    except FileNotFoundError:
+        return None
+
+
+def pinned_reports_dir(reports_root):
+    """
+    (version, directory) to read ONE consistent set of reports from.
+    Falls back to (None, reports_root) before the first versioned run.
+    """
+    version = current_version(reports_root)
+    if version is None:
+        return None, reports_root
+    return version, version_dir(reports_root, version)
+
+
+def list_versions(reports_root):
+    """Published versions, oldest first, with their manifest (if any)."""
+    root = _versions_root(reports_root)
+    if not os.path.isdir(root):
+        return []
+    versions = []
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if name.startswith('.') or not os.path.isdir(path):
+            continue
+        manifest = {}
+        try:
+            with open(os.path.join(path, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            pass
+        versions.append({
+            'version':      name,
+            'published_at': manifest.get('published_at'),
+            'files':        manifest.get('files') or sorted(
+                f for f in os.listdir(path) if f != MANIFEST_FILE
+            ),
+        })
+    return versions
+
+
+def stage_version(reports_root, carry_over=()):
+    """
+    Creates an empty staging dir for the next version and returns its path.
+
+    carry_over: file names copied from the current version (or the flat
+    legacy files) — for writers that only regenerate part of the set,
+    like the API's refresh-from-saved-model.
+    """
+    root = _versions_root(reports_root)
+    os.makedirs(root, exist_ok=True)
+    while True:
+        version = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        staging = os.path.join(root, f'.{version}{_STAGING_SUFFIX}')
+        try:
+            os.mkdir(staging)
+            break
+        except FileExistsError:     # same microsecond as another writer
+            time.sleep(0.001)
+
+    _, source_dir = pinned_reports_dir(reports_root)
+    for name in carry_over:
+        source = os.path.join(source_dir, name)
+        if os.path.exists(source):
+            shutil.copy2(source, os.path.join(staging, name))
+    return staging
+
+
+def publish_version(reports_root, staging_dir, keep=KEEP_VERSIONS):
+    """
+    Moves a fully written staging dir into versions/ and atomically
+    points current.json at it. Returns the new version string.
+    """
+    name = os.path.basename(os.path.normpath(staging_dir))
+    if not (name.startswith('.') and name.endswith(_STAGING_SUFFIX)):
+        raise ValueError(f"{staging_dir} is not a staging directory")
+    version = name[1:-len(_STAGING_SUFFIX)]
+
+    _write_json_atomic(os.path.join(staging_dir, MANIFEST_FILE), {
+        'version':      version,
+        'published_at': datetime.now().isoformat(),
+        'files':        sorted(f for f in os.listdir(staging_dir) if f != MANIFEST_FILE),
+    })
+    final_dir = version_dir(reports_root, version)
+    os.rename(staging_dir, final_dir)
+    _point_to(reports_root, version)
+
+    prune_versions(reports_root, keep=keep)
+    return version
+
+
+def discard_staging(staging_dir):
+    """Deletes a staging dir whose run failed (never published)."""
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def _point_to(reports_root, version):
+    previous = current_version(reports_root)
+    _write_json_atomic(os.path.join(reports_root, CURRENT_POINTER), {
+        'version':    version,
+        'previous':   previous,
+        'updated_at': datetime.now().isoformat(),
+    })
+    return previous
+
+
+def rollback(reports_root, version=None):
+    """
+    Points current.json at `version` — or, if None, at the newest version
+    older than the current one. Returns (new current, previous current).
+    """
+    available = [v['version'] for v in list_versions(reports_root)]
+    current = current_version(reports_root)
+    if version is None:
+        older = [v for v in available if current is None or v < current]
+        if not older:
+            raise FileNotFoundError("No earlier report version to roll back to.")
+        version = older[-1]
+    elif version not in available:
+        raise FileNotFoundError(f"Report version {version} not found.")
+    return version, _point_to(reports_root, version)
+
+
+def prune_versions(reports_root, keep=KEEP_VERSIONS):
+    """
+    Deletes all but the newest `keep` versions (the current one is always
+    kept), plus staging dirs left behind by crashed runs.
+    """
+    root = _versions_root(reports_root)
+    if not os.path.isdir(root):
+        return []
+    current = current_version(reports_root)
+    published = [v['version'] for v in list_versions(reports_root)]
+    doomed = [v for v in published[:-keep] if v != current] if keep > 0 else []
+
+    now = time.time()
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name.endswith(_STAGING_SUFFIX):
+            try:
+                if now - os.path.getmtime(path) > STALE_STAGING_SECONDS:
+                    doomed.append(name)
+            except OSError:
+                pass
+
+    for name in doomed:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return doomed
@@ -0,0 +1,205 @@
+"""
+src/streaming.py — Streaming ingestion of large sales exports
+─────────────────────────────────────────────────────────────
+load_and_clean_data() reads the WHOLE sheet into one frame before
+cleaning it, so memory grows with the number of POS lines. This module
+reads the export in chunks and folds every chunk straight into the two
+things the pipeline actually needs:
+
+    monthly_sales   Item / Category / Year / Month / Qty   (step 2 output)
+    latest_prices   Item / Price                          (get_latest_prices)
+
+Only those aggregates live between chunks, so peak memory is bounded by
+the number of distinct items (× months), plus ONE chunk of rows.
+
+Sources:
+    .xlsx / .xlsm  openpyxl read-only row iterator (the sheet is never
+                   materialized; rows are batched into chunks)
+    .csv           pd.read_csv(chunksize=...) with the same layout
+                   (title rows, header on row 4)
+
+Every chunk goes through the same cleaning rules as clean_sales_frame().
+The one rule that crosses chunk boundaries — dates are forward-filled
+from the bill header — carries the last seen date into the next chunk,
+so the result equals the in-memory path (load → step 2 aggregation).
+
+Usage:
+    monthly_sales, latest_prices = stream_sales_aggregate(path)
+"""
+
+import os
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing import categorize_items
+
+
+CHUNK_ROWS = 50_000
+HEADER_ROW = 4          # 0-based, same as read_excel(header=4)
+MONTHLY_COLUMNS = ['Item', 'Category', 'Year', 'Month', 'Qty']
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CHUNK READERS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def iter_workbook_chunks(file_path, chunk_rows=CHUNK_ROWS, sheet_name='Sheet1',
+                         header_row=HEADER_ROW):
+    """Raw frames of ≤ chunk_rows rows, read with openpyxl's read-only iterator."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet_name].iter_rows(min_row=header_row + 1, values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c) if c is not None else f'Unnamed: {i}' for i, c in enumerate(header)]
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        wb.close()
+
+
+def iter_csv_chunks(file_path, chunk_rows=CHUNK_ROWS, header_row=HEADER_ROW):
+    """Raw frames from a CSV export with the workbook's layout."""
+    yield from pd.read_csv(file_path, header=header_row, chunksize=chunk_rows,
+                           dtype=str, skip_blank_lines=False)
+
+
+def iter_sales_chunks(file_path, chunk_rows=CHUNK_ROWS):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == '.csv':
+        return iter_csv_chunks(file_path, chunk_rows)
+    if ext in ('.xlsx', '.xlsm'):
+        return iter_workbook_chunks(file_path, chunk_rows)
+    raise ValueError(f"Streaming ingestion supports .xlsx and .csv, got {ext!r}")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ACCUMULATOR
+# ══════════════════════════════════════════════════════════════════════════════
+
+class MonthlySalesAccumulator:
+    """
+    Folds raw POS chunks into monthly qty per (Item, Category, Year, Month)
+    and the latest price per item. State is per item, never per row.
+    """
+
+    def __init__(self):
+        self.qty = defaultdict(float)     # (item, category, year, month) → qty
+        self.price = {}                   # item → last price seen
+        self.categories = {}              # item → category (categorized once)
+        self.last_date = pd.NaT           # carried into the next chunk's ffill
+        self.rows_read = 0
+        self.rows_kept = 0
+        self.min_date = pd.NaT
+        self.max_date = pd.NaT
+
+    def _clean(self, df):
+        """clean_sales_frame() rules, with the date carried across chunks."""
+        df = df.rename(columns={'Item Details': 'Item', 'Qty.': 'Qty'})
+
+        dates = pd.to_datetime(df['Date'], errors='coerce')
+        if len(dates) and pd.isna(dates.iloc[0]) and pd.notna(self.last_date):
+            dates.iloc[0] = self.last_date
+        dates = dates.ffill()
+        if len(dates) and pd.notna(dates.iloc[-1]):
+            self.last_date = dates.iloc[-1]
+        df = df.assign(Date=dates)
+
+        df = df[df['Item'].notna()]
+        df = df.assign(Item=df['Item'].astype(str).str.strip())
+        df = df[(df['Item'] != 'DELIVERY CHARGE') & (df['Item'] != 'nan')
+                & (df['Item'].str.len() > 1)]
+
+        qty = pd.to_numeric(df['Qty'].astype(str).str.replace(',', '').str.strip(),
+                            errors='coerce').fillna(0)
+        price = pd.to_numeric(df['Price'].astype(str).str.replace(',', '').str.strip(),
+                              errors='coerce').fillna(0)
+        keep = (qty > 0).to_numpy()
+        return pd.DataFrame({
+            'Item':  df['Item'].to_numpy()[keep],
+            'Date':  df['Date'].to_numpy()[keep],
+            'Qty':   qty.to_numpy()[keep],
+            'Price': price.to_numpy()[keep],
+        })
+
+    def _categorize(self, items):
+        new = pd.unique(items[~items.isin(self.categories.keys())])
+        if len(new):
+            self.categories.update(zip(new, categorize_items(pd.Series(new))))
+        return items.map(self.categories)
+
+    def add(self, raw_chunk):
+        self.rows_read += len(raw_chunk)
+        df = self._clean(raw_chunk)
+        if df.empty:
+            return self
+        self.rows_kept += len(df)
+
+        df['Category'] = self._categorize(df['Item'])
+        dated = df['Date'].notna()
+        if dated.any():
+            lo, hi = df.loc[dated, 'Date'].min(), df.loc[dated, 'Date'].max()
+            self.min_date = lo if pd.isna(self.min_date) else min(self.min_date, lo)
+            self.max_date = hi if pd.isna(self.max_date) else max(self.max_date, hi)
+
+        # Rows before the first bill date have no month → dropped by step 2's
+        # groupby in the in-memory path too
+        months = df.loc[dated]
+        grouped = months.groupby(
+            [months['Item'], months['Category'],
+             months['Date'].dt.year, months['Date'].dt.month], sort=False,
+        )['Qty'].sum()
+        for key, qty in zip(grouped.index, grouped.to_numpy()):
+            self.qty[key] += qty
+
+        self.price.update(df.groupby('Item', sort=False)['Price'].last().items())
+        return self
+
+    # ── results ──────────────────────────────────────────────────────────────
+
+    def monthly_sales(self):
+        """Same frame as main.py step 2: sorted by Item, Year, Month."""
+        if not self.qty:
+            return pd.DataFrame(columns=MONTHLY_COLUMNS)
+        keys = np.array(list(self.qty.keys()), dtype=object)
+        out = pd.DataFrame({
+            'Item':     keys[:, 0],
+            'Category': keys[:, 1],
+            'Year':     keys[:, 2].astype(np.int32),
+            'Month':    keys[:, 3].astype(np.int32),
+            'Qty':      np.fromiter(self.qty.values(), dtype=np.float64, count=len(self.qty)),
+        })
+        return out.sort_values(['Item', 'Year', 'Month']).reset_index(drop=True)
+
+    def latest_prices(self):
+        """Same frame as get_latest_prices(): Item, Price sorted by Item."""
+        out = pd.DataFrame({'Item': list(self.price.keys()),
+                            'Price': list(self.price.values())}, columns=['Item', 'Price'])
+        return out.sort_values('Item').reset_index(drop=True)
+
+
+def stream_sales_aggregate(file_path, chunk_rows=CHUNK_ROWS):
+    """
+    Reads a sales export chunk by chunk.
+    Returns (monthly_sales, latest_prices) — see module docstring.
+    """
+    acc = MonthlySalesAccumulator()
+    print(f"-> Streaming {os.path.basename(file_path)} in chunks of {chunk_rows:,} rows...")
+    for chunk in iter_sales_chunks(file_path, chunk_rows):
+        acc.add(chunk)
+    print(f"   [+] Rows read: {acc.rows_read:,}  kept: {acc.rows_kept:,}")
+    if pd.notna(acc.min_date):
+        print(f"   [+] Date range: {acc.min_date.date()} -> {acc.max_date.date()}")
+    print(f"   [+] Unique items: {len(acc.price)}")
+    return acc.monthly_sales(), acc.latest_prices()
@@ -0,0 +1,158 @@
+"""
+src/synthetic.py — Synthetic POS sales exports
+───────────────────────────────────────────────
+Generates sales data in the SAME shape as the pharmacy's POS export,
+so the pipeline can be run and timed at 10× / 100× today's volume:
+
+  make_sales_frame()     → raw frame with the workbook's columns
+                           (what pd.read_excel(..., header=4) returns)
+  write_sales_workbook() → .xlsx with title rows above the header on row 4,
+                           sheet 'Sheet1' — load_and_clean_data() reads it
+  write_sales_csv()      → the same layout as CSV (for src/streaming.py)
+
+Shape rules copied from the real export:
+- only the FIRST line of every bill carries Date / Vch/Bill No /
+  Particulars; the other lines leave them blank (forward-filled on load)
+- Qty. and Price are text with thousands separators ("1,200"); a few
+  bulk lines (bulk_rate) are 100× a normal sale
+- a few DELIVERY CHARGE lines, which cleaning must drop
+
+Demand per item-month:
+    base_item × (1 + seasonality × cos(2π (month - peak_item) / 12)) × noise
+where noise is lognormal with sigma `noise`. Item names are built from
+the category keywords, so categorize_items() spreads them over every
+category (plus unclassified names).
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing import CATEGORY_KEYWORDS
+
+
+WORKBOOK_COLUMNS = ['Date', 'Vch/Bill No', 'Particulars', 'Item Details',
+                    'Qty.', 'Unit', 'Price', 'Amount']
+TITLE_ROWS = [
+    ["PEOPLE'S PHARMACY (synthetic)"],
+    ['Generated by src/synthetic.py'],
+    ['List of Sales Vouchers'],
+]
+UNCLASSIFIED_STEMS = ['ZENTEL', 'BETASERC', 'DIANE', 'OVRON', 'ZOTRAL', 'ZOSERT']
+STRENGTHS = ['5MG', '10MG', '20MG', '50MG', '100MG', '250MG', '500MG', '1000MG']
+PACKS = ['10S', '14S', '28S', '30S', '50S', '100S']
+
+
+def make_item_names(n_items: int, seed: int = 0) -> np.ndarray:
+    """n_items distinct names like 'ATORVA 20MG 30S 0042'."""
+    rng = np.random.default_rng(seed)
+    stems = np.array([k for keywords in CATEGORY_KEYWORDS.values() for k in keywords]
+                     + UNCLASSIFIED_STEMS, dtype=object)
+    stem = stems[rng.integers(0, len(stems), n_items)]
+    strength = np.array(STRENGTHS, dtype=object)[rng.integers(0, len(STRENGTHS), n_items)]
+    pack = np.array(PACKS, dtype=object)[rng.integers(0, len(PACKS), n_items)]
+    serial = np.char.zfill(np.arange(n_items).astype(str), 4).astype(object)
+    return stem + ' ' + strength + ' ' + pack + ' ' + serial
+
+
+def _with_commas(values: np.ndarray, decimals: int = 0) -> np.ndarray:
+    return np.array([f'{v:,.{decimals}f}' for v in values], dtype=object)
+
+
+def make_sales_frame(
+    n_items: int = 3_000,
+    n_months: int = 12,
+    start: str = '2025-01',
+    seasonality: float = 0.3,
+    noise: float = 0.25,
+    lines_per_item_month: float = 3.0,
+    lines_per_bill: float = 4.0,
+    delivery_rate: float = 0.01,
+    bulk_rate: float = 0.002,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    Raw POS lines for n_items over n_months calendar months starting at
+    `start`, in bill order, with the workbook's column names and text
+    formatting. Roughly n_items × n_months × lines_per_item_month rows.
+    """
+    rng = np.random.default_rng(seed)
+    names = make_item_names(n_items, seed)
+    months = pd.period_range(start, periods=n_months, freq='M')
+
+    # ── Demand per item-month ────────────────────────────────────────────────
+    base = rng.gamma(1.5, 40.0, n_items)
+    peak = rng.integers(1, 13, n_items)
+    month_no = months.month.to_numpy()
+    season = 1 + seasonality * np.cos(2 * np.pi * (month_no[None, :] - peak[:, None]) / 12)
+    demand = base[:, None] * season * rng.lognormal(0.0, noise, (n_items, n_months))
+
+    # ── Split each item-month into sale lines on random days ─────────────────
+    n_lines = np.maximum(1, rng.poisson(lines_per_item_month, (n_items, n_months))).ravel()
+    item_idx = np.repeat(np.repeat(np.arange(n_items), n_months), n_lines)
+    month_idx = np.repeat(np.tile(np.arange(n_months), n_items), n_lines)
+    share = rng.gamma(2.0, 1.0, len(item_idx))
+    line_qty = np.maximum(1, np.rint(
+        demand.ravel()[np.repeat(np.arange(n_items * n_months), n_lines)]
+        * share / np.repeat(np.add.reduceat(share, np.r_[0, np.cumsum(n_lines)[:-1]]), n_lines)
+    )).astype(np.int64)
+    # Occasional bulk sales (institutions, other pharmacies) → "1,200"
+    line_qty[rng.random(len(line_qty)) < bulk_rate] *= 100
+
+    month_start = months.to_timestamp().to_numpy()
+    days = rng.integers(0, months.days_in_month.to_numpy()[month_idx])
+    dates = month_start[month_idx] + days.astype('timedelta64[D]')
+
+    price = np.round(rng.lognormal(4.5, 1.2, n_items), 2)
+    lines = pd.DataFrame({
+        'Date': dates, 'item': item_idx, 'qty': line_qty,
+        'price': price[item_idx], 'order': rng.random(len(item_idx)),
+    })
+
+    # A few delivery charges, sold like any other line
+    n_delivery = int(len(lines) * delivery_rate)
+    if n_delivery:
+        lines = pd.concat([lines, pd.DataFrame({
+            'Date': rng.choice(dates, n_delivery), 'item': -1, 'qty': 1,
+            'price': 150.0, 'order': rng.random(n_delivery),
+        })], ignore_index=True)
+    lines = lines.sort_values(['Date', 'order'], kind='stable').reset_index(drop=True)
+
+    # ── Group lines into bills: a new bill every ~lines_per_bill lines,
+    #    and always when the date changes ─────────────────────────────────────
+    date_changed = lines['Date'].ne(lines['Date'].shift()).to_numpy()
+    new_bill = date_changed | (rng.random(len(lines)) < 1.0 / lines_per_bill)
+    bill_no = np.cumsum(new_bill)
+
+    items = np.where(lines['item'].to_numpy() >= 0,
+                     names[lines['item'].clip(lower=0).to_numpy()], 'DELIVERY CHARGE')
+    qty = lines['qty'].to_numpy()
+    price = lines['price'].to_numpy()
+    return pd.DataFrame({
+        'Date':         np.where(new_bill, lines['Date'].dt.strftime('%Y-%m-%d'), None),
+        'Vch/Bill No':  np.where(new_bill, [f'CS-{b}' for b in bill_no], None),
+        'Particulars':  np.where(new_bill, 'Cash', None),
+        'Item Details': items,
+        'Qty.':         _with_commas(qty),
+        'Unit':         'Nos',
+        'Price':        _with_commas(price, 2),
+        'Amount':       np.round(qty * price, 2),
+    }, columns=WORKBOOK_COLUMNS)
+
+
+def write_sales_workbook(raw: pd.DataFrame, path: str) -> str:
+    """Writes a raw frame as a POS-style workbook (title rows, header on row 4)."""
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        pd.DataFrame(TITLE_ROWS).to_excel(writer, sheet_name='Sheet1',
+                                          index=False, header=False)
+        raw.to_excel(writer, sheet_name='Sheet1', index=False, startrow=4)
+    return path
+
+
+def write_sales_csv(raw: pd.DataFrame, path: str) -> str:
+    """Writes a raw frame as CSV with the workbook layout (header on line 4)."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for title in TITLE_ROWS:
+            f.write(f'"{title[0]}"\n')
+        f.write('\n')
+        raw.to_csv(f, index=False)
+    return path
@@ -0,0 +1,353 @@
+"""
+src/training.py — Model training + evaluation (steps 4-6 of main.py)
+─────────────────────────────────────────────────────────────────────
+Two ways to get an evaluation AND a final model:
+
+  "holdout"  (original)  fit on every month except each item's last,
+                         score that last month, then fit a SECOND forest
+                         with the same settings on all data
+                         → 2 forests per run
+
+  "oob"                  fit ONE forest on all data with oob_score=True.
+                         Every row is predicted by the ~37% of trees that
+                         never saw it in their bootstrap sample, so the
+                         out-of-bag prediction of each item's last month is
+                         an honest "unseen row" score from the same model
+                         that goes on to make the final predictions
+                         → 1 forest per run
+
+Both modes score the same rows (last month per item, items with ≥ 2
+months) and produce the same metrics, so model_evaluation.csv keeps
+its schema whichever mode ran.
+
+Either mode can train one global forest (default) or one forest per
+category in parallel (partition='category', see PartitionedForest).
+
+Caveat: item_mean / item_cv are computed over an item's WHOLE history,
+so with very short histories (2-3 months) a last-month row is almost
+determined by the item's other rows. The OOB forest trains on those
+other rows and scores optimistically there; hold-out never trains on
+any last-month row. On a year of data the two agree closely (see
+benchmarks/bench_training.py), which is why holdout stays the default.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from src.features import FEATURES, period_index, period_keys
+
+
+EVAL_MODES = ('holdout', 'oob')
+DEFAULT_EVAL_MODE = 'holdout'
+
+# Hyperparameters of the production forest (shared by both modes)
+FOREST_PARAMS = dict(
+    n_estimators=300,
+    max_depth=12,
+    min_samples_leaf=2,
+    max_features='sqrt',
+    random_state=42,
+    n_jobs=-1,
+)
+
+
+PARTITIONS = (None, 'category')
+# Categories with fewer training rows than this share one pooled forest
+PARTITION_MIN_ROWS = 200
+POOLED = -1
+
+
+def make_forest(partition=None, **overrides):
+    """
+    The production forest. partition='category' → one forest per
+    category (PartitionedForest), trained in parallel.
+    """
+    params = {**FOREST_PARAMS, **overrides}
+    if partition is None:
+        return RandomForestRegressor(**params)
+    if partition == 'category':
+        return PartitionedForest(partition_col='cat_enc', **params)
+    raise ValueError(f"partition must be one of {PARTITIONS}, got {partition!r}")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PARTITIONED TRAINING
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _fit_partition(params, X, y):
+    model = RandomForestRegressor(**params)
+    model.fit(X, y)
+    return model
+
+
+def _oob_predictions(forest: RandomForestRegressor) -> np.ndarray:
+    """
+    forest.oob_prediction_ with NaN for rows no tree left out of its
+    bootstrap sample. sklearn gives those rows 0.0 (and a UserWarning),
+    which would score as a real prediction.
+    """
+    n_rows = len(forest.oob_prediction_)
+    oob_trees = np.zeros(n_rows, dtype=np.int64)
+    for samples in forest.estimators_samples_:
+        left_out = np.ones(n_rows, dtype=bool)
+        left_out[samples] = False
+        oob_trees += left_out
+    return np.where(oob_trees > 0, forest.oob_prediction_, np.nan)
+
+
+class PartitionedForest:
+    """
+    One RandomForestRegressor per partition (e.g. per category), used
+    like a single model: fit / predict / oob_prediction_ /
+    feature_importances_ cover all rows.
+
+    Why:
+    - each forest is fit on a fraction of the rows → the partitions run
+      in parallel on separate cores (joblib processes), each forest
+      single-threaded so cores are not oversubscribed
+    - a category's forest only learns that category's patterns
+
+    Reproducible: every partition gets its own random_state derived from
+    (random_state, partition key), so results do not depend on which
+    worker ran which partition or in what order.
+    """
+
+    def __init__(self, partition_col='cat_enc', min_rows=PARTITION_MIN_ROWS, **forest_params):
+        self.partition_col = partition_col
+        self.min_rows = min_rows
+        self.n_jobs = forest_params.pop('n_jobs', -1)
+        self.random_state = forest_params.pop('random_state', None)
+        self.forest_params = forest_params
+
+    # ── routing ──────────────────────────────────────────────────────────────
+
+    def _route(self, X: pd.DataFrame) -> np.ndarray:
+        """Partition key for every row (unseen keys → pooled / largest forest)."""
+        keys = X[self.partition_col].tolist()
+        return np.fromiter((self.route_.get(k, self.fallback_) for k in keys),
+                           dtype=np.int64, count=len(keys))
+
+    def _groups(self, routed):
+        for key in self.models_:
+            rows = np.flatnonzero(routed == key)
+            if len(rows):
+                yield key, rows
+
+    # ── sklearn-style API ────────────────────────────────────────────────────
+
+    def fit(self, X: pd.DataFrame, y):
+        from joblib import Parallel, delayed
+
+        keys = X[self.partition_col].to_numpy()
+        uniq, counts = np.unique(keys, return_counts=True)
+        small = set(uniq[counts < self.min_rows].tolist())
+        self.route_ = {int(k): (POOLED if k in small else int(k)) for k in uniq}
+        sizes = {}
+        for k, c in zip(uniq, counts):
+            sizes[self.route_[int(k)]] = sizes.get(self.route_[int(k)], 0) + int(c)
+        self.fallback_ = max(sizes, key=sizes.get)
+
+        routed = np.fromiter((self.route_[k] for k in keys.tolist()),
+                             dtype=np.int64, count=len(keys))
+        partitions = sorted(sizes)
+        y = np.asarray(y)
+        base_seed = 0 if self.random_state is None else int(self.random_state)
+        jobs = []
+        for key in partitions:
+            rows = np.flatnonzero(routed == key)
+            params = {**self.forest_params, 'n_jobs': 1,
+                      'random_state': (base_seed * 1_000_003 + key + 1) % (2 ** 32)}
+            jobs.append(delayed(_fit_partition)(params, X.iloc[rows], y[rows]))
+        n_jobs = 1 if len(jobs) == 1 else self.n_jobs
+        models = Parallel(n_jobs=n_jobs)(jobs)
+        self.models_ = dict(zip(partitions, models))
+
+        # Row-weighted feature importances, like one forest over all rows
+        weights = np.array([sizes[k] for k in partitions], dtype=np.float64)
+        self.feature_importances_ = np.average(
+            [m.feature_importances_ for m in models], axis=0, weights=weights)
+
+        if self.forest_params.get('oob_score'):
+            self.oob_prediction_ = np.full(len(X), np.nan)
+            for key, rows in self._groups(routed):
+                self.oob_prediction_[rows] = _oob_predictions(self.models_[key])
+        return self
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        out = np.empty(len(X), dtype=np.float64)
+        for key, rows in self._groups(self._route(X)):
+            out[rows] = self.models_[key].predict(X.iloc[rows])
+        return out
+
+    def tree_predictions(self, X: pd.DataFrame):
+        """(point, per_tree) like forecast.tree_predictions() on one forest."""
+        from src.forecast import tree_predictions
+
+        n_trees = self.forest_params.get('n_estimators', 100)
+        point = np.empty(len(X), dtype=np.float64)
+        per_tree = np.empty((n_trees, len(X)), dtype=np.float64)
+        for key, rows in self._groups(self._route(X)):
+            point[rows], per_tree[:, rows] = tree_predictions(self.models_[key], X.iloc[rows])
+        return point, per_tree
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SPLIT + METRICS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def last_month_mask(feat_df: pd.DataFrame) -> np.ndarray:
+    """
+    True for each item's latest month (latest Year + Month when the frame
+    has a Year column), for items with ≥ 2 months.
+    These are the evaluation rows in both modes.
+    """
+    period = pd.Series(period_index(feat_df), index=feat_df.index)
+    by_item = period.groupby(feat_df['Item'])
+    is_last = period.values == by_item.transform('max').values
+    has_history = by_item.transform('size').values >= 2
+    return is_last & has_history
+
+
+def split_train_test(feat_df: pd.DataFrame):
+    """
+    Step 4 hold-out split: last month per item → test, the rest → train.
+    Rows come out in (Item, [Year,] Month) order, like the original loop.
+    """
+    ordered = feat_df.sort_values(period_keys(feat_df), kind='mergesort')
+    test = last_month_mask(ordered)
+    return (ordered[~test].reset_index(drop=True),
+            ordered[test].reset_index(drop=True))
+
+
+def regression_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> dict:
+    """MAE / RMSE / R² / MAPE (MAPE skips zero actuals)."""
+    nonzero = y_true != 0
+    return {
+        'MAE':      mean_absolute_error(y_true, y_pred),
+        'RMSE':     np.sqrt(mean_squared_error(y_true, y_pred)),
+        'R2_Score': r2_score(y_true, y_pred),
+        'MAPE (%)': float(np.mean(np.abs((y_true[nonzero] - y_pred[nonzero])
+                                         / y_true[nonzero])) * 100),
+    }
+
+
+def r2_verdict(r2: float) -> str:
+    if r2 >= 0.85:   return "Excellent"
+    elif r2 >= 0.70: return "Good"
+    elif r2 >= 0.50: return "Acceptable"
+    return "Needs Improvement"
+
+
+def evaluation_frame(metrics: dict) -> pd.DataFrame:
+    """The model_evaluation.csv table (same schema in every mode)."""
+    mae, rmse, r2, mape = (metrics[k] for k in ('MAE', 'RMSE', 'R2_Score', 'MAPE (%)'))
+    return pd.DataFrame({
+        'Metric': ['MAE', 'RMSE', 'R2_Score', 'MAPE (%)'],
+        'Value':  [round(mae, 4), round(rmse, 4), round(r2, 4), round(mape, 4)],
+        'Interpretation': [
+            f'Avg error of {mae:.1f} units per item',
+            f'Large-error-penalized: {rmse:.1f}',
+            r2_verdict(r2),
+            f'Avg {mape:.1f}% off from actual'
+        ]
+    })
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TRAINING MODES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _denormalize(pred_norm: np.ndarray, rows: pd.DataFrame) -> np.ndarray:
+    # Predict normalized → multiply by item mean → actual units
+    return np.maximum(pred_norm * rows['item_mean'].values, 0)
+
+
+def train_holdout(feat_df: pd.DataFrame, fit_final: bool = True, **forest_overrides) -> dict:
+    """
+    Original path: evaluation forest on the split + final forest on all rows.
+    fit_final=False leaves the final fit to fit_final_model() (main.py does
+    that in step 6, so each fit is timed in its own stage).
+    """
+    train_df, test_df = split_train_test(feat_df)
+
+    t0 = time.perf_counter()
+    eval_model = make_forest(**forest_overrides)
+    eval_model.fit(train_df[FEATURES], train_df['qty_norm'])
+    y_pred = _denormalize(eval_model.predict(test_df[FEATURES]), test_df)
+    eval_seconds = time.perf_counter() - t0
+
+    result = {
+        'mode':        'holdout',
+        'final_model': None,
+        'eval_model':  eval_model,
+        'test_df':     test_df,
+        'y_true':      test_df['qty_raw'].values,
+        'y_pred':      y_pred,
+        'n_train':     len(train_df),
+        'fit_seconds': {'evaluation': eval_seconds},
+        'forest_overrides': forest_overrides,
+    }
+    if fit_final:
+        fit_final_model(feat_df, result, **forest_overrides)
+    return result
+
+
+def fit_final_model(feat_df: pd.DataFrame, result: dict, **forest_overrides):
+    """
+    Step 6: the forest used for the real predictions. OOB results already
+    have it (no second fit); hold-out results get a fresh fit on all rows.
+    """
+    if result['final_model'] is None:
+        t0 = time.perf_counter()
+        final_model = make_forest(**{**result.get('forest_overrides', {}), **forest_overrides})
+        final_model.fit(feat_df[FEATURES], feat_df['qty_norm'])
+        result['fit_seconds']['final'] = time.perf_counter() - t0
+        result['final_model'] = final_model
+    return result['final_model']
+
+
+def train_oob(feat_df: pd.DataFrame, fit_final: bool = True, **forest_overrides) -> dict:
+    """One forest on all rows; evaluation from its out-of-bag predictions."""
+    ordered = feat_df.sort_values(period_keys(feat_df), kind='mergesort').reset_index(drop=True)
+
+    t0 = time.perf_counter()
+    model = make_forest(oob_score=True, **forest_overrides)
+    model.fit(ordered[FEATURES], ordered['qty_norm'])
+    fit_seconds = time.perf_counter() - t0
+
+    test = last_month_mask(ordered)
+    if isinstance(model, PartitionedForest):
+        oob_norm = model.oob_prediction_[test]
+    else:
+        oob_norm = _oob_predictions(model)[test]
+    # A row that landed in every bootstrap sample has no OOB prediction
+    # (NaN here) — vanishingly rare with 300 trees, but never score it.
+    scored = ~np.isnan(oob_norm)
+    test_df = ordered[test].reset_index(drop=True)[scored].reset_index(drop=True)
+
+    return {
+        'mode':        'oob',
+        'final_model': model,
+        'eval_model':  model,
+        'test_df':     test_df,
+        'y_true':      test_df['qty_raw'].values,
+        'y_pred':      _denormalize(oob_norm[scored], test_df),
+        'n_train':     len(ordered),
+        'fit_seconds': {'final': fit_seconds},
+        'forest_overrides': forest_overrides,
+    }
+
+
+def train_and_evaluate(feat_df: pd.DataFrame, mode: str = DEFAULT_EVAL_MODE,
+                       fit_final: bool = True, **forest_overrides) -> dict:
+    """Dispatches to the chosen mode; adds 'metrics' to the result."""
+    if mode not in EVAL_MODES:
+        raise ValueError(f"eval mode must be one of {EVAL_MODES}, got {mode!r}")
+    trainer = train_oob if mode == 'oob' else train_holdout
+    result = trainer(feat_df, fit_final=fit_final, **forest_overrides)
+    result['metrics'] = regression_metrics(result['y_true'], result['y_pred'])
+    return result
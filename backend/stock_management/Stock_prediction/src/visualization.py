@@ -1,3 +1,8 @@
+"""
+Chart rendering (matplotlib). Imported lazily — only when a chart is
+actually requested (main.py --charts, or the ML API's /predict/charts).
+"""
+
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
@@ -5,7 +10,12 @@ import pandas as pd
 import os
 
 
-def plot_budget_distribution(category_budget_df, output_folder='outputs/charts'):
+BUDGET_CHART_FILE = 'category_budget_chart.png'
+TRENDS_CHART_FILE = 'monthly_category_trends.png'
+
+
+def plot_budget_distribution(category_budget_df, output_folder='outputs/charts',
+                             file_name=BUDGET_CHART_FILE, dpi=300):
     """Generates a horizontal bar chart showing the required budget per category."""
     os.makedirs(output_folder, exist_ok=True)
 
@@ -18,13 +28,15 @@ def plot_budget_distribution(category_budget_df, output_folder='outputs/charts')
     plt.grid(axis='x', linestyle='--', alpha=0.7)
     plt.tight_layout()
 
-    file_path = os.path.join(output_folder, 'category_budget_chart.png')
-    plt.savefig(file_path, dpi=300)
+    file_path = os.path.join(output_folder, file_name)
+    plt.savefig(file_path, dpi=dpi)
     plt.close()
     print(f"   [+] Saved budget chart to: {file_path}")
+    return file_path
 
 
-def plot_category_trends(monthly_sales_df, output_folder='outputs/charts'):
+def plot_category_trends(monthly_sales_df, output_folder='outputs/charts',
+                         file_name=TRENDS_CHART_FILE, dpi=300):
     """Generates a line chart showing 12-month sales trends for medical categories."""
     os.makedirs(output_folder, exist_ok=True)
 
@@ -44,10 +56,11 @@ def plot_category_trends(monthly_sales_df, output_folder='outputs/charts'):
     plt.grid(True, linestyle='--', alpha=0.5)
     plt.tight_layout()
 
-    file_path = os.path.join(output_folder, 'monthly_category_trends.png')
-    plt.savefig(file_path, dpi=300)
+    file_path = os.path.join(output_folder, file_name)
+    plt.savefig(file_path, dpi=dpi)
     plt.close()
     print(f"   [+] Saved trend chart to: {file_path}")
+    return file_path
 
 
 # --- NEW CODE FOR RUNNING SEPARATELY ---
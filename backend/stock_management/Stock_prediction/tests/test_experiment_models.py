@@ -0,0 +1,95 @@
+"""
+tests/test_experiment_models.py
+───────────────────────────────
+Tests for the model comparison harness (experiment_models.py): the
+one-pass feature builder, pool vs inline runs and the global mode.
+
+How to run:
+    cd backend/stock_management/Stock_prediction
+    pytest tests/test_experiment_models.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+
+import experiment_models as em
+
+MODELS = {
+    'Ridge': Ridge(alpha=1.0),
+    'RF':    RandomForestRegressor(n_estimators=5, random_state=0),
+}
+
+
+@pytest.fixture(scope='module')
+def data_12():
+    rng = np.random.default_rng(11)
+    n_items = 25
+    rows = pd.DataFrame({
+        'Item':     np.repeat([f'ITEM {i:02d}' for i in range(n_items)], 12),
+        'Category': 'Cardiovascular',
+        'Month':    np.tile(np.arange(1, 13), n_items),
+        'Qty':      rng.integers(1, 500, size=n_items * 12).astype(float),
+    })
+    return rows.sample(frac=1, random_state=1).reset_index(drop=True)   # unsorted input
+
+
+def _reference(model, data_12):
+    """The original per-item loop (4 sorts per item, shared model instance)."""
+    y_true, y_pred, april = [], [], []
+    for item in sorted(data_12['Item'].unique()):
+        item_data = data_12[data_12['Item'] == item]
+        d = item_data.sort_values('Month').reset_index(drop=True).copy()
+        d['lag_1'] = d['Qty'].shift(1)
+        d['lag_2'] = d['Qty'].shift(2)
+        d['rolling_3'] = d['Qty'].shift(1).rolling(3).mean()
+        d['rolling_6'] = d['Qty'].shift(1).rolling(6).mean()
+        d = d.dropna()
+        X, y = d[em.FEATURES], d['Qty']
+        model.fit(X.iloc[:-1], y.iloc[:-1])
+        y_true.append(y.iloc[-1])
+        y_pred.append(max(0, model.predict(X.iloc[[-1]])[0]))
+        model.fit(X, y)
+        s = item_data.sort_values('Month')
+        row = pd.DataFrame([{'Month': em.TARGET_MONTH, 'lag_1': s.iloc[-1]['Qty'],
+                             'lag_2': s.iloc[-2]['Qty'], 'rolling_3': s.tail(3)['Qty'].mean(),
+                             'rolling_6': s.tail(6)['Qty'].mean()}])
+        april.append(max(0, model.predict(row)[0]))
+    return y_true, y_pred, april
+
+
+def test_per_item_results_match_original_loop(data_12):
+    """Features built once give the exact predictions of the old loop"""
+    results = em.evaluate_per_item(MODELS, em.build_item_matrices(data_12),
+                                   workers=1, chunk_size=7)
+    for name, model in MODELS.items():
+        y_true, y_pred, april = _reference(model, data_12)
+        assert results[name][0] == y_true
+        np.testing.assert_allclose(results[name][1], y_pred, rtol=1e-12)
+        np.testing.assert_allclose(results[name][2], april, rtol=1e-12)
+
+
+def test_pool_matches_inline(data_12):
+    """Process pool returns the same results, in item order"""
+    matrices = em.build_item_matrices(data_12)
+    inline = em.evaluate_per_item(MODELS, matrices, workers=1, chunk_size=10)
+    pooled = em.evaluate_per_item(MODELS, matrices, workers=2, chunk_size=10)
+    for name in MODELS:
+        assert inline[name][:3] == pooled[name][:3]
+
+
+def test_global_mode_and_csv_columns(data_12):
+    """Global mode scores every item and the table gains timing columns"""
+    matrices = em.build_item_matrices(data_12)
+    results = em.evaluate_global(MODELS, matrices)
+    assert all(len(r[1]) == len(matrices) for r in results.values())
+    table = em.summarize(results)
+    assert list(table.columns) == ['Model', 'MAE (units)', 'RMSE (units)', 'R²', 'MAPE (%)',
+                                   'Avg April Pred', 'Verdict', 'Fit Time (s)', 'Predict Time (s)']
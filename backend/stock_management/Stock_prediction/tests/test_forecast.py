@@ -0,0 +1,221 @@
+"""
+tests/test_forecast.py
+──────────────────────
+Tests for in-process inference (src/forecast.py): item stats, the
+prediction feature matrix, forecast quantiles and the saved model artifact.
+
+How to run:
+    cd backend/stock_management/Stock_prediction
+    pytest tests/test_forecast.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import LabelEncoder
+
+from src.features import FEATURES, build_normalized_features
+from src.forecast import (
+    build_prediction_frame,
+    compute_item_stats,
+    forecast_horizon,
+    load_artifact,
+    predict_from_artifact,
+    predict_inventory_plan,
+    predict_quantities,
+    save_artifact,
+)
+
+
+def _monthly_sales(n_items=40, seed=3):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n_items):
+        n = int(rng.integers(1, 13))
+        for m in sorted(rng.choice(np.arange(1, 13), size=n, replace=False)):
+            rows.append({'Item': f'ITEM {i:03d}',
+                         'Category': ['Cardiovascular', 'Anti-Diabetic'][i % 2],
+                         'Month': int(m), 'Qty': float(rng.integers(1, 300))})
+    return pd.DataFrame(rows)
+
+
+def _reference_prediction_rows(monthly_sales, target_month, le_item, le_cat):
+    """The original per-item dict loop from step 7 of main.py."""
+    rows = []
+    for item, group in monthly_sales.groupby('Item'):
+        g = group.sort_values('Month')
+        qty_vals = g['Qty'].values
+        m = qty_vals.mean()
+        if m <= 0:
+            continue
+        norm_v = qty_vals / m
+        n = len(g)
+        std = qty_vals.std() if n > 1 else 0
+        l1 = float(norm_v[-1])
+        l2 = float(norm_v[-2]) if n >= 2 else 1.0
+        rows.append({
+            'Month': target_month, 'lag_1_n': l1, 'lag_2_n': l2,
+            'lag_3_n': float(norm_v[-3]) if n >= 3 else 1.0,
+            'roll_3_n': float(norm_v[-3:].mean()) if n >= 3 else 1.0,
+            'roll_6_n': float(norm_v[-6:].mean()) if n >= 6 else 1.0,
+            'trend_n': l1 - l2, 'item_cv': std / m, 'n_months': n,
+            'is_q1': 1 if target_month in [1, 2, 3] else 0,
+            'is_q4': 1 if target_month in [10, 11, 12] else 0,
+            'item_enc': le_item.transform([item])[0],
+            'cat_enc': le_cat.transform([g['Category'].iloc[0]])[0],
+        })
+    return pd.DataFrame(rows)[FEATURES]
+
+
+@pytest.fixture(scope='module')
+def trained():
+    monthly = _monthly_sales()
+    feat_df = build_normalized_features(monthly)
+    le_item, le_cat = LabelEncoder(), LabelEncoder()
+    feat_df['item_enc'] = le_item.fit_transform(feat_df['Item'])
+    feat_df['cat_enc'] = le_cat.fit_transform(feat_df['Category'])
+    model = RandomForestRegressor(n_estimators=10, random_state=0)
+    model.fit(feat_df[FEATURES], feat_df['qty_norm'])
+    prices = pd.DataFrame({'Item': sorted(monthly['Item'].unique()), 'Price': 2.5})
+    return monthly, model, le_item, le_cat, prices
+
+
+def test_prediction_frame_matches_reference_loop(trained):
+    """Vectorized step 7 features equal the original per-item dicts"""
+    monthly, _, le_item, le_cat, _ = trained
+    stats = compute_item_stats(monthly)
+    actual = build_prediction_frame(stats, 4, le_item, le_cat)
+    expected = _reference_prediction_rows(monthly, 4, le_item, le_cat)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False,
+                                  check_exact=False, rtol=1e-12)
+
+
+def test_unknown_item_encodes_to_zero(trained):
+    """Items missing from the encoder fall back to 0 instead of raising"""
+    monthly, _, le_item, le_cat, _ = trained
+    extra = pd.DataFrame([{'Item': 'ZZZ NEW', 'Category': 'Brand New', 'Month': 1, 'Qty': 5.0}])
+    stats = compute_item_stats(pd.concat([monthly, extra]))
+    frame = build_prediction_frame(stats, 4, le_item, le_cat)
+    assert frame['item_enc'].iloc[-1] == 0
+    assert frame['cat_enc'].iloc[-1] == 0
+
+
+def test_safety_factor_scales_recommended_stock(trained):
+    """Recommended_Stock = ceil(predicted × safety_factor)"""
+    monthly, model, le_item, le_cat, prices = trained
+    stats = compute_item_stats(monthly)
+    merged, budget, pred_col = predict_inventory_plan(
+        model, stats, le_item, le_cat, prices, 4, 2026, safety_factor=1.5)
+    assert pred_col == 'Predicted_April_2026_Qty'
+    assert (merged['Recommended_Stock'] == np.ceil(merged[pred_col] * 1.5)).all()
+    assert budget['Budget_Required'].sum() == pytest.approx(merged['Budget_Required'].sum())
+
+
+def test_artifact_round_trip_gives_same_plan(trained, tmp_path):
+    """A saved + reloaded artifact predicts exactly what the live model does"""
+    monthly, model, le_item, le_cat, prices = trained
+    stats = compute_item_stats(monthly)
+    version = save_artifact(str(tmp_path), model, le_item, le_cat, stats, prices,
+                            metrics={'R2_Score': 0.5})
+
+    artifact = load_artifact(str(tmp_path))
+    assert artifact['version'] == version
+    assert artifact['metrics']['R2_Score'] == 0.5
+
+    live, _, _ = predict_inventory_plan(model, stats, le_item, le_cat, prices, 7, 2026)
+    loaded, _, _ = predict_from_artifact(artifact, 7, 2026)
+    pd.testing.assert_frame_equal(live, loaded)
+
+
+def test_load_artifact_without_model_raises(tmp_path):
+    """No latest.json → FileNotFoundError (API turns this into a 404)"""
+    with pytest.raises(FileNotFoundError):
+        load_artifact(str(tmp_path))
+
+
+def test_quantiles_are_ordered_and_point_matches_forest(trained):
+    """P50 ≤ P90 ≤ P95 per item; the point column is still model.predict"""
+    monthly, model, le_item, le_cat, _ = trained
+    stats = compute_item_stats(monthly)
+    df = predict_quantities(model, stats, le_item, le_cat, 4, 'Pred')
+    assert (df['P50_Qty'] <= df['P90_Qty']).all()
+    assert (df['P90_Qty'] <= df['P95_Qty']).all()
+    frame = build_prediction_frame(stats, 4, le_item, le_cat)
+    expected = np.maximum(0, np.round(model.predict(frame) * stats['mean'])).astype(np.int64)
+    np.testing.assert_array_equal(df['Pred'].to_numpy(), expected)
+
+
+def test_service_level_sets_recommended_stock(trained):
+    """Recommended_Stock = max(predicted, quantile at the service level)"""
+    monthly, model, le_item, le_cat, prices = trained
+    stats = compute_item_stats(monthly)
+    merged, _, pred_col = predict_inventory_plan(
+        model, stats, le_item, le_cat, prices, 4, 2026, service_level=0.9)
+    expected = np.maximum(merged[pred_col], merged['P90_Qty'])
+    assert (merged['Recommended_Stock'] == expected).all()
+
+    merged, _, _ = predict_inventory_plan(
+        model, stats, le_item, le_cat, prices, 4, 2026, service_level=0.8)
+    assert 'P80_Qty' not in merged.columns
+    assert (merged['Recommended_Stock'] >= merged[pred_col]).all()
+
+
+def _reference_horizon(model, monthly_sales, le_item, le_cat, months):
+    """Per-item recursive loop: predict a month, append it, predict the next."""
+    out = {}
+    for item, group in monthly_sales.groupby('Item'):
+        g = group.sort_values('Month')
+        qty = g['Qty'].values
+        m = qty.mean()
+        if m <= 0:
+            continue
+        norm = list(qty / m)
+        n = len(qty)
+        std = qty.std() if n > 1 else 0
+        preds = []
+        for month in months:
+            l1, l2 = norm[-1], (norm[-2] if len(norm) >= 2 else 1.0)
+            row = pd.DataFrame([{
+                'Month': month, 'lag_1_n': l1, 'lag_2_n': l2,
+                'lag_3_n': norm[-3] if len(norm) >= 3 else 1.0,
+                'roll_3_n': np.mean(norm[-3:]) if len(norm) >= 3 else 1.0,
+                'roll_6_n': np.mean(norm[-6:]) if len(norm) >= 6 else 1.0,
+                'trend_n': l1 - l2, 'item_cv': std / m, 'n_months': n,
+                'is_q1': int(month in (1, 2, 3)), 'is_q4': int(month in (10, 11, 12)),
+                'item_enc': le_item.transform([item])[0],
+                'cat_enc': le_cat.transform([g['Category'].iloc[0]])[0],
+            }])[FEATURES]
+            p = model.predict(row)[0]
+            preds.append(max(0, round(p * m)))
+            norm.append(p)
+        out[item] = preds
+    return out
+
+
+def test_horizon_matches_per_item_recursion(trained):
+    """Batched recursive outlook equals rolling each item forward on its own"""
+    monthly, model, le_item, le_cat, _ = trained
+    outlook = forecast_horizon(model, compute_item_stats(monthly), le_item, le_cat, 11, 2026, 4)
+    assert list(outlook.columns[2:]) == [
+        'Predicted_November_2026_Qty', 'Predicted_December_2026_Qty',
+        'Predicted_January_2027_Qty', 'Predicted_February_2027_Qty']
+    expected = _reference_horizon(model, monthly, le_item, le_cat, [11, 12, 1, 2])
+    actual = dict(zip(outlook['Item'], outlook.iloc[:, 2:].values.tolist()))
+    assert actual == expected
+
+
+def test_horizon_plan_keeps_target_month_first(trained):
+    """horizon > 1 adds later months; the target month column is unchanged"""
+    monthly, model, le_item, le_cat, prices = trained
+    stats = compute_item_stats(monthly)
+    one, _, pred_col = predict_inventory_plan(model, stats, le_item, le_cat, prices, 4, 2026)
+    three, _, _ = predict_inventory_plan(model, stats, le_item, le_cat, prices, 4, 2026, horizon=3)
+    assert [c for c in three.columns if c.startswith('Predicted_')] == [
+        pred_col, 'Predicted_May_2026_Qty', 'Predicted_June_2026_Qty']
+    pd.testing.assert_frame_equal(three[one.columns], one)
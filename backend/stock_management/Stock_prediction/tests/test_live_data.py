@@ -0,0 +1,66 @@
+"""
+tests/test_live_data.py
+───────────────────────
+Tests for training data read from the live monthly_item_sales table
+(src/live_data.py), using a throwaway SQLite database.
+
+How to run:
+    cd backend/stock_management/Stock_prediction
+    pytest tests/test_live_data.py -v
+"""
+
+import sys
+import os
+import sqlite3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.live_data import load_monthly_sales_from_db
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    path = tmp_path / 'live.db'
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE medicines (id INTEGER PRIMARY KEY, name TEXT, selling_price REAL);
+        CREATE TABLE monthly_item_sales (id INTEGER PRIMARY KEY, medicine_id INTEGER,
+                                         year INTEGER, month INTEGER, quantity_sold INTEGER);
+        INSERT INTO medicines VALUES (1, 'ATORVA 10MG 100S', 37.2),
+                                     (2, 'ZINC 10MG', 12.0),
+                                     (3, 'ZINC 10MG', 13.5);
+        INSERT INTO monthly_item_sales (medicine_id, year, month, quantity_sold) VALUES
+            (1, 2026, 1, 40), (1, 2025, 12, 30), (2, 2026, 1, 5), (3, 2026, 1, 2),
+            (2, 2025, 11, 0);
+    """)
+    conn.commit()
+    conn.close()
+    return f'sqlite:///{path}'
+
+
+def test_aggregate_has_pipeline_shape(database_url):
+    """Same columns and order as step 2 of the workbook path"""
+    monthly, prices = load_monthly_sales_from_db(database_url)
+    assert list(monthly.columns) == ['Item', 'Category', 'Year', 'Month', 'Qty']
+    assert monthly.values.tolist() == [
+        ['ATORVA 10MG 100S', 'Cardiovascular', 2025, 12, 30.0],
+        ['ATORVA 10MG 100S', 'Cardiovascular', 2026, 1, 40.0],
+        ['ZINC 10MG', 'Vitamins & Supplements', 2026, 1, 7.0],
+    ]
+    assert prices.values.tolist() == [['ATORVA 10MG 100S', 37.2], ['ZINC 10MG', 13.5]]
+
+
+def test_empty_aggregate_raises(tmp_path):
+    """Training on an unsynced database fails with a clear message"""
+    path = tmp_path / 'empty.db'
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE medicines (id INTEGER PRIMARY KEY, name TEXT, selling_price REAL);
+        CREATE TABLE monthly_item_sales (id INTEGER PRIMARY KEY, medicine_id INTEGER,
+                                         year INTEGER, month INTEGER, quantity_sold INTEGER);
+    """)
+    conn.close()
+    with pytest.raises(ValueError, match='sync'):
+        load_monthly_sales_from_db(f'sqlite:///{path}')
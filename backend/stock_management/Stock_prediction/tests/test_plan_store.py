@@ -0,0 +1,99 @@
+"""
+tests/test_plan_store.py
+────────────────────────
+Tests for the columnar inventory plan and its pushdown reads
+(src/plan_store.py).
+
+How to run:
+    cd backend/stock_management/Stock_prediction
+    pytest tests/test_plan_store.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import src.plan_store as plan_store
+from src.plan_store import plan_info, query_plan, read_plan, write_plan_parquet
+
+
+@pytest.fixture
+def plan():
+    rng = np.random.default_rng(3)
+    n = 500
+    budget = rng.integers(0, 50, n).astype(float)   # many ties
+    return pd.DataFrame({
+        'Item':              [f'ITEM {i:04d}' for i in range(n)],
+        'Category':          rng.choice(['Respiratory', 'Anti-Diabetic', 'Cardiovascular'], n),
+        'Predicted_May_2026_Qty': rng.integers(0, 20, n),
+        'Recommended_Stock': rng.integers(0, 30, n),
+        'Price':             rng.uniform(1, 100, n).round(2),
+        'Budget_Required':   budget,
+    })
+
+
+@pytest.fixture
+def plan_path(plan, tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_store, 'ROW_GROUP_ROWS', 64)
+    return write_plan_parquet(str(tmp_path), plan)
+
+
+def test_category_is_dictionary_encoded(plan_path):
+    """Category is stored as a dictionary column, names in the metadata"""
+    schema = pq.read_schema(plan_path)
+    assert pa.types.is_dictionary(schema.field('Category').type)
+    info = plan_info(plan_path)
+    assert info['categories'] == ['Anti-Diabetic', 'Cardiovascular', 'Respiratory']
+    assert info['num_rows'] == 500 and info['num_row_groups'] > 1
+
+
+def test_row_groups_hold_one_category_range(plan_path):
+    """Rows are grouped by category so row-group stats are tight"""
+    meta = pq.ParquetFile(plan_path).metadata
+    col = pq.read_schema(plan_path).get_field_index('Category')
+    spans = [meta.row_group(i).column(col).statistics for i in range(meta.num_row_groups)]
+    single = sum(s.min == s.max for s in spans)
+    assert single >= meta.num_row_groups - 2
+
+
+def test_read_plan_matches_csv_order(plan, plan_path):
+    """Full read gives back the plan in its original row order"""
+    pd.testing.assert_frame_equal(read_plan(plan_path), plan, check_dtype=False)
+
+
+def test_read_plan_category_and_columns(plan, plan_path):
+    """Category filter is case-insensitive; only asked columns come back"""
+    df = read_plan(plan_path, columns=['Item', 'Budget_Required'], category='respiratory')
+    expected = plan[plan['Category'] == 'Respiratory'][['Item', 'Budget_Required']]
+    pd.testing.assert_frame_equal(df, expected.reset_index(drop=True))
+    assert read_plan(plan_path, category='nope').empty
+
+
+@pytest.mark.parametrize('category', [None, 'Cardiovascular'])
+@pytest.mark.parametrize('descending', [False, True])
+def test_query_plan_top_n_matches_pandas(plan, plan_path, category, descending):
+    """Pushdown page equals a stable sort of the whole frame"""
+    df = plan if category is None else plan[plan['Category'] == category]
+    order = np.lexsort((df.index.to_numpy(), df['Budget_Required'].to_numpy()))
+    if descending:
+        order = order[::-1]
+    expected = df.iloc[order[10:30]].reset_index(drop=True)
+
+    total, page = query_plan(plan_path, category=category, sort_column='Budget_Required',
+                             descending=descending, limit=20, offset=10)
+    assert total == len(df)
+    pd.testing.assert_frame_equal(page, expected, check_dtype=False)
+
+
+def test_query_plan_file_order_page(plan, plan_path):
+    """No sort column → the plan's own order"""
+    total, page = query_plan(plan_path, limit=7, offset=495, columns=['Item'])
+    assert total == 500
+    assert page['Item'].tolist() == plan['Item'].iloc[495:].tolist()
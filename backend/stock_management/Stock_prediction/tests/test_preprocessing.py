@@ -0,0 +1,127 @@
+"""
+tests/test_preprocessing.py
+───────────────────────────
+Tests for load_and_clean_data and its Parquet parsed-sales cache.
+
+How to run:
+    cd backend/stock_management/Stock_prediction
+    pytest tests/test_preprocessing.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+from src import preprocessing
+from src.preprocessing import load_and_clean_data
+
+
+def _write_workbook(path, rows):
+    """Writes a workbook shaped like the POS export (4 title rows, header on row 4)."""
+    df = pd.DataFrame(rows, columns=['Date', 'Vch/Bill No', 'Particulars',
+                                     'Item Details', 'Qty.', 'Unit', 'Price', 'Amount'])
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        pd.DataFrame([["PEOPLE'S PHARMACY"], ['List of Sales Vouchers']]).to_excel(
+            writer, sheet_name='Sheet1', index=False, header=False)
+        df.to_excel(writer, sheet_name='Sheet1', index=False, startrow=4)
+
+
+SALES_ROWS = [
+    ['2026-02-01', 'CS-1', 'Cash', 'ATORVA 10MG 100S', '1,200', 'Nos', '37.2', '44640'],
+    [None,         '',     '',     'PANADOL 500MG',    '10',    'Nos', '5',    '50'],
+    [None,         '',     '',     'DELIVERY CHARGE',  '1',     'Nos', '200',  '200'],
+    ['2026-03-02', 'CS-2', 'Cash', 'ZINC 10MG',        '3',     'Nos', '12',   '36'],
+]
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / 'sales.xlsx'
+    _write_workbook(path, SALES_ROWS)
+    return str(path)
+
+
+def test_cleaning_rules_are_applied(workbook):
+    """Commas stripped, dates forward-filled, delivery rows dropped, categories set"""
+    df = load_and_clean_data(workbook, use_cache=False)
+    assert df['Item'].tolist() == ['ATORVA 10MG 100S', 'PANADOL 500MG', 'ZINC 10MG']
+    assert df['Qty'].tolist() == [1200.0, 10.0, 3.0]
+    assert df['Month'].tolist() == [2, 2, 3]
+    assert df['Category'].tolist() == ['Cardiovascular', 'Analgesics (Pain/Fever)',
+                                       'Vitamins & Supplements']
+
+
+def test_warm_run_skips_excel_parsing(workbook, monkeypatch):
+    """Second load must come from the cache without calling pd.read_excel"""
+    cold = load_and_clean_data(workbook)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("read_excel called on a warm run")
+
+    monkeypatch.setattr(preprocessing.pd, 'read_excel', _fail)
+    warm = load_and_clean_data(workbook)
+    pd.testing.assert_frame_equal(warm[['Item', 'Qty', 'Price', 'Category', 'Month', 'Date']],
+                                  cold[['Item', 'Qty', 'Price', 'Category', 'Month', 'Date']])
+
+
+def test_touched_but_unchanged_workbook_still_hits_cache(workbook, monkeypatch):
+    """A new mtime with identical content is detected by the content hash"""
+    load_and_clean_data(workbook)
+    stat = os.stat(workbook)
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    monkeypatch.setattr(preprocessing.pd, 'read_excel',
+                        lambda *a, **k: pytest.fail("cache should still be valid"))
+    load_and_clean_data(workbook)
+
+
+def test_changed_workbook_invalidates_cache(workbook):
+    """Rewriting the workbook must trigger a re-parse"""
+    first = load_and_clean_data(workbook)
+    _write_workbook(workbook, SALES_ROWS + [
+        ['2026-03-05', 'CS-3', 'Cash', 'GLUCOPHAGE 500MG', '7', 'Nos', '9', '63'],
+    ])
+    second = load_and_clean_data(workbook)
+    assert len(second) == len(first) + 1
+    assert 'GLUCOPHAGE 500MG' in second['Item'].tolist()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CATEGORY MATCHER
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _categorize_reference(item):
+    """Original nested-loop categorizer (dict order = precedence)."""
+    item = str(item).upper()
+    for category, keywords in preprocessing.CATEGORY_KEYWORDS.items():
+        if any(keyword in item for keyword in keywords):
+            return category
+    return preprocessing.UNCLASSIFIED
+
+
+def test_categorize_items_matches_reference_loop():
+    """Compiled matcher agrees with the loop, including multi-category names"""
+    names = pd.Series([
+        'ATORVA 10MG', 'zinc + vitamin c',   # lower case still matches
+        'PANADOL CREAM',                     # Analgesics beats Consumer Goods
+        'ECOSPRIN GEL',                      # Cardiovascular beats Consumer Goods
+        'GLUCOPHAGE ATORVA',                 # Anti-Diabetic wins over a later keyword
+        'TAPE METFORMIN',                    # ... even when it appears later in the name
+        'H.C.T 25MG', 'HXCXT 25MG',          # '.' is literal, not a wildcard
+        'UNKNOWN ITEM', 'ATORVA 10MG',       # duplicates map back correctly
+    ])
+    expected = names.apply(_categorize_reference)
+    pd.testing.assert_series_equal(preprocessing.categorize_items(names), expected)
+    assert [preprocessing.categorize_item(n) for n in names] == expected.tolist()
+
+
+def test_categorize_items_keeps_index():
+    """Result aligns with the input's (filtered) index"""
+    names = pd.Series(['ZINC', 'ENO'], index=[10, 42])
+    out = preprocessing.categorize_items(names)
+    assert out.index.tolist() == [10, 42]
+    assert out.tolist() == ['Vitamins & Supplements', 'Gastrointestinal']
@@ -0,0 +1,51 @@
+"""
+tests/test_profiling.py
+───────────────────────
+Tests for the per-stage pipeline profiler (src/profiling.py).
+
+How to run:
+    cd backend/stock_management/Stock_prediction
+    pytest tests/test_profiling.py -v
+"""
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from src import profiling
+from src.profiling import StageProfiler, load_history
+
+
+def test_stages_are_closed_in_order(tmp_path):
+    """begin() closes the previous stage; save() writes every stage"""
+    profiler = StageProfiler(eval_mode='oob')
+    profiler.begin(1)
+    time.sleep(0.02)
+    profiler.begin(2)
+    report = profiler.save(str(tmp_path))
+
+    assert [s['name'] for s in report['stages']] == ['load', 'aggregate']
+    assert report['stages'][0]['wall_seconds'] >= 0.02
+    assert report['eval_mode'] == 'oob'
+    with open(tmp_path / profiling.PROFILE_FILE, encoding='utf-8') as f:
+        assert json.load(f) == report
+
+
+def test_history_keeps_last_runs(tmp_path, monkeypatch):
+    """History appends one line per run and drops the oldest"""
+    monkeypatch.setattr(profiling, 'HISTORY_RUNS', 3)
+    for _ in range(5):
+        profiler = StageProfiler()
+        profiler.begin(1)
+        profiler.save(str(tmp_path))
+    assert len(load_history(str(tmp_path))) == 3
+
+
+def test_peak_rss_is_reported():
+    """Peak RSS is a positive number of MB on supported platforms"""
+    peak = profiling.peak_rss_mb()
+    assert peak is None or peak > 0
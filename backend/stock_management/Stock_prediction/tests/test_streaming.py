@@ -0,0 +1,80 @@
+"""
+tests/test_streaming.py
+───────────────────────
+Tests for chunked ingestion (src/streaming.py): the streamed aggregate
+must equal load → clean → step 2 groupby, whatever the chunk size.
+
+How to run:
+    cd backend/stock_management/Stock_prediction
+    pytest tests/test_streaming.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+from src.preprocessing import clean_sales_frame, get_latest_prices
+from src.streaming import MonthlySalesAccumulator, stream_sales_aggregate
+from src.synthetic import make_sales_frame, write_sales_csv, write_sales_workbook
+
+
+def _in_memory(raw):
+    df = clean_sales_frame(raw)
+    monthly = (df.groupby(['Item', 'Category', 'Year', 'Month'])['Qty']
+               .sum().reset_index()
+               .sort_values(['Item', 'Year', 'Month'])
+               .reset_index(drop=True))
+    return monthly, get_latest_prices(df)
+
+
+@pytest.fixture(scope='module')
+def raw():
+    return make_sales_frame(60, 14, start='2024-11', seed=11)
+
+
+@pytest.mark.parametrize('chunk_rows', [7, 97, 100_000])
+def test_csv_stream_matches_in_memory_path(raw, tmp_path, chunk_rows):
+    """Any chunk size gives the same monthly sales and latest prices"""
+    path = write_sales_csv(raw, str(tmp_path / 'sales.csv'))
+    monthly, prices = stream_sales_aggregate(path, chunk_rows=chunk_rows)
+    expected_monthly, expected_prices = _in_memory(raw)
+    pd.testing.assert_frame_equal(monthly, expected_monthly, check_dtype=False)
+    pd.testing.assert_frame_equal(prices, expected_prices)
+
+
+def test_workbook_stream_matches_in_memory_path(tmp_path):
+    """The openpyxl read-only iterator gives the same result as read_excel"""
+    raw = make_sales_frame(30, 3, seed=2)
+    path = write_sales_workbook(raw, str(tmp_path / 'sales.xlsx'))
+    monthly, prices = stream_sales_aggregate(path, chunk_rows=50)
+    expected_monthly, expected_prices = _in_memory(pd.read_excel(path, header=4))
+    pd.testing.assert_frame_equal(monthly, expected_monthly, check_dtype=False)
+    pd.testing.assert_frame_equal(prices, expected_prices)
+
+
+def test_bill_date_carries_into_next_chunk():
+    """A chunk that starts mid-bill uses the previous chunk's date"""
+    cols = ['Date', 'Vch/Bill No', 'Particulars', 'Item Details', 'Qty.', 'Unit',
+            'Price', 'Amount']
+    acc = MonthlySalesAccumulator()
+    acc.add(pd.DataFrame([['2025-01-31', 'CS-1', 'Cash', 'ZINC 10MG', '1', 'Nos', '5', 5]],
+                         columns=cols))
+    acc.add(pd.DataFrame([[None, None, None, 'ZINC 10MG', '1,000', 'Nos', '6', 6000]],
+                         columns=cols))
+    monthly = acc.monthly_sales()
+    assert monthly[['Year', 'Month', 'Qty']].values.tolist() == [[2025, 1, 1001.0]]
+    assert acc.latest_prices()['Price'].tolist() == [6.0]
+
+
+def test_state_is_per_item_not_per_row(raw):
+    """The accumulator keeps one entry per item-month, not per row"""
+    acc = MonthlySalesAccumulator()
+    for start in range(0, len(raw), 500):
+        acc.add(raw.iloc[start:start + 500])
+    assert acc.rows_read == len(raw)
+    assert len(acc.qty) == 60 * 14
+    assert len(acc.price) == 60
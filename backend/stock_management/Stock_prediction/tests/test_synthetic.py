@@ -0,0 +1,61 @@
+"""
+tests/test_synthetic.py
+───────────────────────
+Tests for the synthetic POS export generator (src/synthetic.py).
+
+How to run:
+    cd backend/stock_management/Stock_prediction
+    pytest tests/test_synthetic.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from src.preprocessing import UNCLASSIFIED, clean_sales_frame, load_and_clean_data
+from src.synthetic import WORKBOOK_COLUMNS, make_sales_frame, write_sales_workbook
+
+
+def test_frame_has_pos_export_shape():
+    """Dates only on bill headers, comma-formatted text quantities"""
+    raw = make_sales_frame(200, 3, lines_per_item_month=20, seed=1)
+    assert list(raw.columns) == WORKBOOK_COLUMNS
+    headers = raw['Date'].notna()
+    assert headers.iloc[0] and not headers.all()
+    assert raw.loc[~headers, 'Vch/Bill No'].isna().all()
+    assert raw['Qty.'].str.contains(',').any()
+    assert raw['Price'].str.contains(',').any()
+    assert (raw['Item Details'] == 'DELIVERY CHARGE').any()
+
+
+def test_workbook_round_trips_through_loader(tmp_path):
+    """load_and_clean_data reads the workbook like a real export"""
+    raw = make_sales_frame(40, 3, start='2025-11', seed=3)
+    path = write_sales_workbook(raw, str(tmp_path / 'synthetic.xlsx'))
+    df = load_and_clean_data(path, use_cache=False)
+    cols = ['Date', 'Item', 'Qty', 'Price', 'Category', 'Year', 'Month']
+    pd.testing.assert_frame_equal(df[cols].reset_index(drop=True),
+                                  clean_sales_frame(raw)[cols].reset_index(drop=True),
+                                  check_dtype=False)
+    assert df['Item'].nunique() == 40
+    assert sorted(set(zip(df['Year'], df['Month']))) == [(2025, 11), (2025, 12), (2026, 1)]
+    assert 'DELIVERY CHARGE' not in set(df['Item'])
+    assert df['Category'].nunique() > 1 and UNCLASSIFIED in set(df['Category'])
+
+
+def test_seasonality_and_seed_are_respected():
+    """Same seed → same data; seasonality moves monthly totals"""
+    a = make_sales_frame(100, 12, seed=5)
+    pd.testing.assert_frame_equal(a, make_sales_frame(100, 12, seed=5))
+
+    def monthly_spread(raw):
+        df = clean_sales_frame(raw)
+        totals = df.groupby(['Item', 'Month'])['Qty'].sum().groupby('Item')
+        return (totals.max() / totals.min()).median()
+
+    flat = make_sales_frame(100, 12, seasonality=0.0, noise=0.0, seed=5)
+    seasonal = make_sales_frame(100, 12, seasonality=0.8, noise=0.0, seed=5)
+    assert monthly_spread(seasonal) > monthly_spread(flat)
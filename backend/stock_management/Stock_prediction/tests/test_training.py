@@ -0,0 +1,136 @@
+"""
+tests/test_training.py
+──────────────────────
+Tests for steps 4-6 (src/training.py): the hold-out split, the
+single-fit OOB evaluation mode, and per-category partitioned training.
+
+How to run:
+    cd backend/stock_management/Stock_prediction
+    pytest tests/test_training.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from src.features import FEATURES, build_normalized_features
+from src.training import (
+    PartitionedForest,
+    evaluation_frame,
+    split_train_test,
+    train_and_evaluate,
+)
+
+
+@pytest.fixture(scope='module')
+def feat_df():
+    rng = np.random.default_rng(7)
+    rows = []
+    for i in range(60):
+        n = int(rng.integers(1, 13))
+        for m in sorted(rng.choice(np.arange(1, 13), size=n, replace=False)):
+            rows.append({'Item': f'ITEM {i:03d}', 'Category': ['A', 'B', 'C'][i % 3],
+                         'Month': int(m), 'Qty': float(rng.integers(1, 300))})
+    df = build_normalized_features(pd.DataFrame(rows))
+    df['item_enc'] = LabelEncoder().fit_transform(df['Item'])
+    df['cat_enc'] = LabelEncoder().fit_transform(df['Category'])
+    return df
+
+
+def test_split_matches_original_loop(feat_df):
+    """Vectorized split gives the same train/test rows as the per-item loop"""
+    train_rows, test_rows = [], []
+    for _, group in feat_df.groupby('Item'):
+        g = group.sort_values('Month').reset_index(drop=True)
+        if len(g) >= 2:
+            train_rows.append(g.iloc[:-1])
+            test_rows.append(g.iloc[[-1]])
+        else:
+            train_rows.append(g)
+    train, test = split_train_test(feat_df)
+    pd.testing.assert_frame_equal(train, pd.concat(train_rows).reset_index(drop=True))
+    pd.testing.assert_frame_equal(test, pd.concat(test_rows).reset_index(drop=True))
+
+
+def test_oob_mode_fits_one_forest(feat_df):
+    """OOB mode scores the same rows with the model it returns as final"""
+    holdout = train_and_evaluate(feat_df, mode='holdout', n_estimators=20)
+    oob = train_and_evaluate(feat_df, mode='oob', n_estimators=60)
+    assert oob['final_model'] is oob['eval_model']
+    assert list(oob['fit_seconds']) == ['final']
+    assert holdout['final_model'] is not holdout['eval_model']
+    assert len(oob['y_true']) == len(holdout['y_true'])
+    assert np.isfinite(oob['y_pred']).all()
+
+
+@pytest.mark.filterwarnings("ignore:Some inputs do not have OOB scores")
+def test_oob_mode_skips_rows_no_tree_left_out(feat_df):
+    """With 2 trees many rows are never out-of-bag: they are not scored as 0"""
+    holdout = train_and_evaluate(feat_df, mode='holdout', n_estimators=2)
+    oob = train_and_evaluate(feat_df, mode='oob', n_estimators=2, random_state=0)
+    model = oob['final_model']
+    assert (model.oob_prediction_ == 0).any()          # what sklearn reports
+    assert 0 < len(oob['y_true']) < len(holdout['y_true'])
+    assert len(oob['y_pred']) == len(oob['y_true'])
+    assert np.isfinite(oob['y_pred']).all()
+
+
+def test_evaluation_csv_schema_is_mode_independent(feat_df):
+    """model_evaluation.csv keeps the same Metric rows and columns"""
+    frames = [evaluation_frame(train_and_evaluate(feat_df, mode=m, n_estimators=10)['metrics'])
+              for m in ('holdout', 'oob')]
+    for frame in frames:
+        assert list(frame.columns) == ['Metric', 'Value', 'Interpretation']
+        assert list(frame['Metric']) == ['MAE', 'RMSE', 'R2_Score', 'MAPE (%)']
+
+
+def test_unknown_mode_raises(feat_df):
+    """Only holdout and oob are accepted"""
+    with pytest.raises(ValueError):
+        train_and_evaluate(feat_df, mode='cv')
+
+
+def test_split_orders_by_year_then_month():
+    """The held-out row is the latest (Year, Month), not the largest Month"""
+    df = pd.DataFrame({'Item': ['A'] * 3, 'Year': [2025, 2024, 2024],
+                       'Month': [1, 11, 12], 'qty_norm': [1.0, 2.0, 3.0]})
+    train, test = split_train_test(df)
+    assert list(zip(test['Year'], test['Month'])) == [(2025, 1)]
+    assert list(train['Month']) == [11, 12]
+
+
+def test_partitioned_forest_is_reproducible(feat_df):
+    """Same seed → same predictions, with one forest per category"""
+    X, y = feat_df[FEATURES], feat_df['qty_norm']
+    a = PartitionedForest(min_rows=1, n_estimators=10, random_state=42, n_jobs=2).fit(X, y)
+    b = PartitionedForest(min_rows=1, n_estimators=10, random_state=42, n_jobs=1).fit(X, y)
+    assert sorted(a.models_) == sorted(feat_df['cat_enc'].unique())
+    np.testing.assert_array_equal(a.predict(X), b.predict(X))
+    assert a.feature_importances_.shape == (len(FEATURES),)
+
+
+def test_partitioned_forest_routes_rows_by_category(feat_df):
+    """Each row is predicted by its own category's forest"""
+    X, y = feat_df[FEATURES], feat_df['qty_norm']
+    model = PartitionedForest(min_rows=1, n_estimators=10, random_state=0).fit(X, y)
+    for key, forest in model.models_.items():
+        rows = X['cat_enc'] == key
+        np.testing.assert_allclose(model.predict(X[rows]), forest.predict(X[rows]))
+    point, per_tree = model.tree_predictions(X)
+    np.testing.assert_allclose(point, model.predict(X))
+    assert per_tree.shape == (10, len(X))
+
+
+def test_partitioned_mode_scores_same_rows(feat_df):
+    """partition='category' keeps the evaluation rows and result schema"""
+    glob = train_and_evaluate(feat_df, mode='holdout', n_estimators=10)
+    part = train_and_evaluate(feat_df, mode='oob', n_estimators=30, partition='category')
+    assert isinstance(part['final_model'], PartitionedForest)
+    assert len(part['y_true']) == len(glob['y_true'])
+    assert set(part['metrics']) == set(glob['metrics'])
@@ -4,12 +4,13 @@ from app.models.batch import MedicineBatch
 from app.models.stock_log import StockLog
 from app.models.stock_update import StockUpdate
 from app.models.stock_adjustment import StockAdjustment
-from app.models.stock_alert import StockAlert
+from app.models.stock_alert import StockAlert, StockAlertRefresh
 from app.models.issued_item import IssuedItem
 from app.models.prescription import Prescription
 from app.models.patient import Patient
 from app.models.reminder import Reminder
 from app.models.reminder_log import ReminderLog
+from app.models.sales_aggregate import MonthlyItemSales, IngestionWatermark
 
 __all__ = [
     "Medicine",
@@ -19,9 +20,12 @@ __all__ = [
     "StockUpdate",
     "StockAdjustment",
     "StockAlert",
+    "StockAlertRefresh",
     "IssuedItem",
     "Prescription",
     "Patient",
     "Reminder",
-    "ReminderLog"
+    "ReminderLog",
+    "MonthlyItemSales",
+    "IngestionWatermark"
 ]
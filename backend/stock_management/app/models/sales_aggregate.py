@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint
+from datetime import datetime
+from app.database.base import Base
+
+class MonthlyItemSales(Base):
+    """
+    Units sold per medicine per calendar month, folded in from
+    stock_logs (reason="sold"). Training data for the ML forecaster.
+    """
+
+    __tablename__ = "monthly_item_sales"
+    __table_args__ = (
+        UniqueConstraint("medicine_id", "year", "month", name="uq_monthly_item_sales"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), nullable=False, index=True)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+
+    quantity_sold = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class IngestionWatermark(Base):
+    """
+    Highest source row id already folded into an aggregate table,
+    one row per ingestion stream (e.g. "monthly_item_sales").
+    """
+
+    __tablename__ = "ingestion_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -32,3 +32,19 @@ class StockAlert(Base):
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     resolved_at = Column(DateTime, nullable=True)
+
+
+class StockAlertRefresh(Base):
+    """
+    Medicines whose stock was changed by a writer outside this service
+    (the healix_app stock bridge) and whose alerts still need re-evaluating.
+    Drained by the scheduler's alert refresh job.
+    """
+
+    __tablename__ = "stock_alert_refresh_queue"
+
+    id = Column(Integer, primary_key=True, index=True)
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), nullable=False)
+    batch_id = Column(Integer, ForeignKey("medicine_batches.id"), nullable=True)
+    source = Column(String(50), nullable=True)
+    queued_at = Column(DateTime, default=datetime.utcnow)
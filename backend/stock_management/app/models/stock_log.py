@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Index
 from datetime import datetime
 from app.database.base import Base
 
 class StockLog(Base):
     __tablename__ = "stock_logs"
+    __table_args__ = (
+        # Covers the "sold in the last N days, per medicine" aggregates
+        Index("idx_stock_log_reason_date", "reason", "logged_at", "medicine_id", "quantity_used"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     medicine_id = Column(Integer, ForeignKey("medicines.id"), nullable=False)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 
 from app.database.db import SessionLocal
 from app.services.stock_analytics_service import StockAnalyticsService
+from app.services.sales_aggregate_service import SalesAggregateService
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
@@ -135,3 +136,16 @@ def export_analytics(medicine_id: int = None, db: Session = Depends(get_db)):
         return data
     except AttributeError:
         raise HTTPException(status_code=404, detail="Medicine not found")
+
+
+@router.post("/sales-aggregate/sync")
+def sync_sales_aggregate(rebuild: bool = False, db: Session = Depends(get_db)):
+    """Folds new sold stock logs into monthly_item_sales (ML training data)"""
+    service = SalesAggregateService(db)
+    return service.rebuild() if rebuild else service.sync()
+
+
+@router.get("/sales-aggregate/status")
+def get_sales_aggregate_status(db: Session = Depends(get_db)):
+    service = SalesAggregateService(db)
+    return service.get_status()
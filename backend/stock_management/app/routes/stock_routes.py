@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -10,6 +10,8 @@ from app.models.inventory import Inventory
 from app.models.batch import MedicineBatch
 from app.services.batch_management_service import BatchManagementService
 from app.services.stock_add_service import StockAddService
+from app.services.fefo_deduction_service import FEFODeductionService, StockConflictError
+from app.services.enhanced_stock_alert_service import EnhancedStockAlertService
 from app.repositories.inventory_repo import InventoryRepository
 from app.repositories.stock_update_repo import StockUpdateRepository
 
@@ -50,6 +52,18 @@ class UpdateStockRequest(BaseModel):
     reorder_level:           Optional[int]   = None
 
 
+class OrderLine(BaseModel):
+    medicine_id: int
+    quantity:    int
+
+
+class DeductOrderRequest(BaseModel):
+    lines:          List[OrderLine]
+    issued_to:      Optional[int] = None
+    reference_type: Optional[str] = "order"
+    staff_id:       Optional[int] = None
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -157,6 +171,32 @@ def smart_add_stock(payload: AddStockSmartRequest, db: Session = Depends(get_db)
     }
 
 
+# ── POST /stock/deduct-order ─────────────────────────────────────────
+@router.post("/deduct-order")
+def deduct_order(payload: DeductOrderRequest, db: Session = Depends(get_db)):
+    """
+    Deduct every line of an order FEFO (earliest expiry first) in one
+    transaction. If any line is short, nothing is deducted.
+    """
+    try:
+        order = FEFODeductionService(db).deduct_order_fefo(
+            [(line.medicine_id, line.quantity) for line in payload.lines],
+            issued_to=payload.issued_to,
+            reference_type=payload.reference_type,
+            staff_id=payload.staff_id,
+        )
+    except StockConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "message":        "Order deducted successfully",
+        "total_deducted": sum(line["quantity"] for line in order),
+        "lines":          order,
+    }
+
+
 # ── PUT /stock/update/{inventory_id} ────────────────────────────────
 @router.put("/update/{inventory_id}")
 def update_stock(
@@ -191,6 +231,9 @@ def update_stock(
                 medicine.minimum_stock_threshold = payload.minimum_stock_threshold
             db.commit()
 
+    # Quantities or thresholds changed: re-evaluate this medicine's alerts
+    EnhancedStockAlertService(db).refresh_alerts_for([inventory.medicine_id])
+
     return {
         "message":            "Stock updated successfully",
         "inventory_id":       inventory.id,
@@ -3,7 +3,7 @@ from app.services.stock_update_service import StockUpdateService, StockLogServic
 from app.services.enhanced_stock_alert_service import EnhancedStockAlertService
 from app.services.stock_adjustment_service import StockAdjustmentService
 from app.services.batch_management_service import BatchManagementService
-from app.services.fefo_deduction_service import FEFODeductionService
+from app.services.fefo_deduction_service import FEFODeductionService, StockConflictError
 from app.services.stock_analytics_service import StockAnalyticsService
 from app.services.sms_service import send_sms
 from app.services.refill_service import calculate_remaining_days, check_refill_needed
@@ -18,6 +18,7 @@ __all__ = [
     "StockAdjustmentService",
     "BatchManagementService",
     "FEFODeductionService",
+    "StockConflictError",
     "StockAnalyticsService",
     "send_sms",
     "calculate_remaining_days",
@@ -1,10 +1,21 @@
+import logging
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_, insert, null
 from app.models.inventory import Inventory
 from app.models.medicine import Medicine
 from app.models.batch import MedicineBatch
-from app.models.stock_alert import StockAlert
+from app.models.stock_alert import StockAlert, StockAlertRefresh
+
+logger = logging.getLogger(__name__)
+
+ALERT_TYPES = ("low_stock", "critical_stock", "expiry_warning", "overstock")
+
+
+def _alert_key(alert_type, medicine_id, batch_id):
+    """Expiry alerts are raised once per batch, the others once per medicine"""
+    return alert_type, batch_id if alert_type == "expiry_warning" else medicine_id
+
 
 class EnhancedStockAlertService:
     """
@@ -23,34 +34,246 @@ class EnhancedStockAlertService:
         """
         Scan all medicines and generate appropriate alerts
         """
-        medicines = self.db.query(Medicine).filter(
-            Medicine.is_active == True
-        ).all()
-
-        alerts_generated = []
+        return self.scan_alerts()
 
-        for medicine in medicines:
-            # Check low stock
-            low_stock = self.check_low_stock_alert(medicine.id)
-            if low_stock:
-                alerts_generated.append(low_stock)
-
-            # Check critical stock
-            critical = self.check_critical_stock_alert(medicine.id)
-            if critical:
-                alerts_generated.append(critical)
-
-            # Check expiry
-            expiry = self.check_expiry_alert(medicine.id)
-            if expiry:
-                alerts_generated.extend(expiry)
-
-            # Check overstock
-            overstock = self.check_overstock_alert(medicine.id)
-            if overstock:
-                alerts_generated.append(overstock)
+    def scan_alerts(self, medicine_ids=None, resolve_cleared=False, stock_totals=False):
+        """
+        Set-based scan: evaluates all four alert conditions for every active
+        medicine (or just medicine_ids) in two aggregate queries, diffs them
+        against the active alerts in memory and bulk-inserts the new ones.
+        Same conditions as the per-medicine checks below; returns the new alerts.
+        stock_totals: judge low/critical/overstock on the medicine's stock
+        summed over all batches instead of its first inventory row
+        resolve_cleared: also resolve low/critical/overstock alerts whose
+        condition no longer holds (expiry warnings stay until resolved by
+        hand); always judged on stock totals
+        """
+        # Whole seconds: DATETIME columns drop fractions (MySQL), and the
+        # re-read below matches created_at exactly
+        now = datetime.utcnow().replace(microsecond=0)
+        if medicine_ids is not None:
+            medicine_ids = list(medicine_ids)
+            if not medicine_ids:
+                return []
+
+        if stock_totals or resolve_cleared:
+            # All batches together, so an emptied oldest batch is not low stock
+            stock = self.db.query(
+                Inventory.medicine_id,
+                null().label("batch_id"),
+                func.sum(Inventory.quantity_available).label("quantity"),
+                func.max(Inventory.reorder_level).label("reorder_level"),
+                func.max(Inventory.last_dispensed_at).label("last_dispensed_at")
+            ).group_by(Inventory.medicine_id)
+        else:
+            # Each medicine's first inventory row, like the per-medicine checks
+            first_inventory = self.db.query(
+                func.min(Inventory.id).label("id")
+            ).group_by(Inventory.medicine_id)
+            if medicine_ids is not None:
+                first_inventory = first_inventory.filter(Inventory.medicine_id.in_(medicine_ids))
+            first_inventory = first_inventory.subquery()
+            stock = self.db.query(
+                Inventory.medicine_id,
+                Inventory.batch_id,
+                Inventory.quantity_available.label("quantity"),
+                Inventory.reorder_level,
+                Inventory.last_dispensed_at
+            ).join(
+                first_inventory, Inventory.id == first_inventory.c.id
+            )
+        if medicine_ids is not None:
+            stock = stock.filter(Inventory.medicine_id.in_(medicine_ids))
+        stock = stock.subquery()
+
+        ninety_days_ago = now - timedelta(days=90)
+        is_low = stock.c.quantity <= stock.c.reorder_level
+        is_critical = stock.c.quantity < Medicine.minimum_stock_threshold
+        is_overstock = and_(
+            Medicine.maximum_stock_level > 0,
+            stock.c.quantity > Medicine.maximum_stock_level,
+            or_(stock.c.last_dispensed_at.is_(None), stock.c.last_dispensed_at < ninety_days_ago)
+        )
+        stock_rows = self.db.query(
+            stock.c.medicine_id,
+            stock.c.batch_id,
+            stock.c.quantity.label("quantity_available"),
+            stock.c.reorder_level,
+            Medicine.minimum_stock_threshold,
+            Medicine.maximum_stock_level,
+            is_low.label("is_low"),
+            is_critical.label("is_critical"),
+            is_overstock.label("is_overstock")
+        ).join(
+            Medicine, Medicine.id == stock.c.medicine_id
+        ).filter(
+            Medicine.is_active == True,
+            or_(is_low, is_critical, is_overstock)
+        ).all()
 
-        return alerts_generated
+        # Batches expiring within the warning window, with their stock (0 if none)
+        expiring = self.db.query(
+            MedicineBatch.medicine_id,
+            MedicineBatch.id,
+            Inventory.quantity_available
+        ).join(
+            Medicine, Medicine.id == MedicineBatch.medicine_id
+        ).outerjoin(
+            Inventory,
+            and_(
+                Inventory.batch_id == MedicineBatch.id,
+                Inventory.medicine_id == MedicineBatch.medicine_id
+            )
+        ).filter(
+            Medicine.is_active == True,
+            MedicineBatch.is_active == True,
+            MedicineBatch.expiry_date <= now + timedelta(days=self.expiry_warning_days),
+            MedicineBatch.expiry_date > now
+        )
+        if medicine_ids is not None:
+            expiring = expiring.filter(MedicineBatch.medicine_id.in_(medicine_ids))
+        expiring = expiring.order_by(MedicineBatch.id, Inventory.id).all()
+
+        # What is already raised: stock alerts per medicine, expiry alerts per batch
+        active = self.db.query(
+            StockAlert.id, StockAlert.alert_type, StockAlert.medicine_id, StockAlert.batch_id
+        ).filter(
+            StockAlert.is_active == True,
+            StockAlert.alert_type.in_(ALERT_TYPES)
+        )
+        if medicine_ids is not None:
+            active = active.filter(StockAlert.medicine_id.in_(medicine_ids))
+        active = active.all()
+        raised = {_alert_key(*row[1:]) for row in active}
+
+        def new_alert(alert_type, medicine_id, batch_id, quantity, threshold):
+            key = _alert_key(alert_type, medicine_id, batch_id)
+            if key in raised:
+                return None
+            raised.add(key)
+            return {
+                "medicine_id": medicine_id,
+                "batch_id": batch_id,
+                "alert_type": alert_type,
+                "current_quantity": quantity,
+                "threshold_value": threshold,
+                "is_active": True,
+                "is_acknowledged": False,
+                "created_at": now
+            }
+
+        candidates = []
+        for row in stock_rows:
+            if row.is_low:
+                candidates.append((row.medicine_id, 0, new_alert(
+                    "low_stock", row.medicine_id, row.batch_id,
+                    row.quantity_available, row.reorder_level)))
+            if row.is_critical:
+                candidates.append((row.medicine_id, 1, new_alert(
+                    "critical_stock", row.medicine_id, row.batch_id,
+                    row.quantity_available, row.minimum_stock_threshold)))
+            if row.is_overstock:
+                candidates.append((row.medicine_id, 3, new_alert(
+                    "overstock", row.medicine_id, row.batch_id,
+                    row.quantity_available, row.maximum_stock_level)))
+        for medicine_id, batch_id, quantity in expiring:
+            candidates.append((medicine_id, 2, new_alert(
+                "expiry_warning", medicine_id, batch_id, quantity or 0, 0)))
+
+        # Same order the per-medicine loop produced them in
+        rows = [alert for _, _, alert in sorted(
+            (c for c in candidates if c[2] is not None), key=lambda c: (c[0], c[1])
+        )]
+
+        cleared = []
+        if resolve_cleared:
+            holding = {(name, row.medicine_id) for row in stock_rows
+                       for name, flag in (("low_stock", row.is_low),
+                                          ("critical_stock", row.is_critical),
+                                          ("overstock", row.is_overstock)) if flag}
+            cleared = [alert_id for alert_id, alert_type, medicine_id, _ in active
+                       if alert_type != "expiry_warning" and (alert_type, medicine_id) not in holding]
+
+        if not rows and not cleared:
+            return []
+
+        if cleared:
+            self.db.query(StockAlert).filter(
+                StockAlert.id.in_(cleared)
+            ).update(
+                {StockAlert.is_active: False, StockAlert.resolved_at: now},
+                synchronize_session=False
+            )
+        inserted_ids = None
+        if rows and self.db.get_bind().dialect.insert_executemany_returning:
+            inserted_ids = self.db.scalars(
+                insert(StockAlert).returning(StockAlert.id, sort_by_parameter_order=True), rows
+            ).all()
+        elif rows:
+            last_id = self.db.query(func.max(StockAlert.id)).scalar() or 0
+            self.db.execute(insert(StockAlert), rows)
+        self.db.commit()
+        if not rows:
+            return []
+
+        # Re-read only this scan's rows: concurrent refreshes insert alerts too
+        created = self.db.query(StockAlert)
+        if inserted_ids is not None:
+            created = created.filter(StockAlert.id.between(min(inserted_ids), max(inserted_ids)))
+            inserted_ids = set(inserted_ids)
+        else:
+            # No RETURNING: our id range, our timestamp and our keys
+            created = created.filter(
+                StockAlert.id > last_id,
+                StockAlert.created_at == now,
+                StockAlert.alert_type.in_({r["alert_type"] for r in rows})
+            )
+            if medicine_ids is not None:
+                created = created.filter(StockAlert.medicine_id.in_(medicine_ids))
+        created = {
+            _alert_key(a.alert_type, a.medicine_id, a.batch_id): a
+            for a in created.order_by(StockAlert.id)
+            if inserted_ids is None or a.id in inserted_ids
+        }
+        return [created[_alert_key(r["alert_type"], r["medicine_id"], r["batch_id"])] for r in rows]
+
+    def refresh_alerts_for(self, medicine_ids):
+        """
+        Re-evaluates alerts of just these medicines after an inventory
+        mutation: raises new alerts and resolves cleared stock alerts.
+        Runs after the mutation has committed, so a failure here is logged
+        and never undoes or fails the mutation.
+        """
+        medicine_ids = sorted({m for m in medicine_ids if m is not None})
+        if not medicine_ids:
+            return []
+        try:
+            return self.scan_alerts(medicine_ids, resolve_cleared=True, stock_totals=True)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"[ALERTS] Refresh for medicines {medicine_ids} failed: {e}")
+            return []
+
+    def process_refresh_queue(self, limit: int = 1000):
+        """
+        Refreshes alerts for medicines queued by writers outside this
+        service (the healix_app stock bridge), then drops those queue rows.
+        Returns the number of queue rows processed.
+        """
+        queued = self.db.query(
+            StockAlertRefresh.id, StockAlertRefresh.medicine_id
+        ).order_by(
+            StockAlertRefresh.id
+        ).limit(limit).all()
+        if not queued:
+            return 0
+
+        self.scan_alerts({medicine_id for _, medicine_id in queued}, resolve_cleared=True, stock_totals=True)
+        self.db.query(StockAlertRefresh).filter(
+            StockAlertRefresh.id <= queued[-1].id
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return len(queued)
 
     def check_low_stock_alert(self, medicine_id: int):
         """
@@ -1,8 +1,39 @@
+import random
+import time
 from datetime import datetime
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 from app.models.batch import MedicineBatch
 from app.models.inventory import Inventory
 from app.models.stock_log import StockLog
+from app.services.enhanced_stock_alert_service import EnhancedStockAlertService
+
+# Locking modes
+#   guarded    - plain read, then conditional UPDATEs that only succeed while the
+#                batch still holds enough stock; on a conflict the order is
+#                undone and re-read with row locks (retries)
+#   for_update - the read locks the inventory rows (SELECT ... FOR UPDATE) from
+#                the first attempt, so concurrent orders queue instead of retrying
+# In both modes the UPDATEs run in inventory id order, and a deadlock or lock
+# wait timeout is retried like any other lost race.
+LOCK_GUARDED = "guarded"
+LOCK_FOR_UPDATE = "for_update"
+MAX_RETRIES = 5
+
+# MySQL error codes: lock wait timeout, deadlock
+LOCK_ERROR_CODES = (1205, 1213)
+
+
+class StockConflictError(ValueError):
+    """Stock kept changing under a deduction until its retries ran out"""
+
+
+def _is_lock_conflict(error: OperationalError) -> bool:
+    """Deadlock / lock wait timeout (InnoDB) or a busy database (SQLite)"""
+    args = getattr(error.orig, "args", None) or (None,)
+    return args[0] in LOCK_ERROR_CODES or "database is locked" in str(error.orig)
+
 
 class FEFODeductionService:
     """
@@ -10,8 +41,12 @@ class FEFODeductionService:
     When medicine is issued, it uses the batch that expires earliest
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, locking: str = LOCK_GUARDED, max_retries: int = MAX_RETRIES):
+        if locking not in (LOCK_GUARDED, LOCK_FOR_UPDATE):
+            raise ValueError(f"Unknown locking mode {locking}")
         self.db = db
+        self.locking = locking
+        self.max_retries = max_retries
 
     def deduct_stock_fefo(
         self,
@@ -26,83 +61,196 @@ class FEFODeductionService:
         Reduces quantity from batches expiring earliest first
         Returns list of batches used and quantities deducted
         """
-        
-        # Get all active, non-expired batches for this medicine
-        # Order by expiry_date ascending to get earliest expiry first
-        batches = self.db.query(
-            MedicineBatch
+        order = self.deduct_order_fefo(
+            [(medicine_id, quantity_needed)],
+            issued_to=issued_to,
+            reference_type=reference_type,
+            staff_id=staff_id
+        )
+        return order[0]["deductions"]
+
+    def deduct_order_fefo(
+        self,
+        lines,
+        issued_to: int = None,
+        reference_type: str = "order",
+        staff_id: int = None
+    ):
+        """
+        Deduct a whole order using FEFO logic, in one transaction
+        lines: list of (medicine_id, quantity) pairs
+        Loads every candidate batch with its inventory in one query,
+        allocates in memory and commits once. If any line is short,
+        nothing is deducted and ValueError names every short line.
+        Safe under concurrent orders: see the locking modes above.
+        Returns one entry per medicine: medicine_id, quantity and deductions
+        """
+        # Merge repeated medicines, keeping first-seen order
+        needed = {}
+        for medicine_id, quantity in lines:
+            if quantity is None or quantity <= 0:
+                raise ValueError(f"Quantity for medicine {medicine_id} must be positive")
+            needed[medicine_id] = needed.get(medicine_id, 0) + quantity
+        if not needed:
+            raise ValueError("Order has no lines")
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                now = datetime.utcnow()
+                lock = self.locking == LOCK_FOR_UPDATE or attempt > 0
+                allocations = self._allocate(needed, now, lock)
+
+                order = []
+                stock_logs = []
+                for medicine_id, quantity_needed, taken in allocations:
+                    deductions = []
+                    for batch, inventory_id, to_deduct in taken:
+                        stock_logs.append({
+                            "medicine_id": medicine_id,
+                            "batch_id": batch.id,
+                            "quantity_used": to_deduct,
+                            "reason": "sold",
+                            "issued_to": issued_to,
+                            "reference_type": reference_type,
+                            "staff_id": staff_id,
+                            "logged_at": now
+                        })
+                        deductions.append({
+                            "batch_id": batch.id,
+                            "batch_number": batch.batch_number,
+                            "expiry_date": batch.expiry_date,
+                            "quantity_deducted": to_deduct
+                        })
+                    order.append({
+                        "medicine_id": medicine_id,
+                        "quantity": quantity_needed,
+                        "deductions": deductions
+                    })
+
+                try:
+                    if self._apply(allocations, stock_logs, now):
+                        break
+                except OperationalError as e:
+                    if not _is_lock_conflict(e):
+                        raise
+                    # A deadlock rolls the whole transaction back: start over
+                    self.db.rollback()
+                # Lost a race for a batch: back off a little, then re-read
+                time.sleep(random.uniform(0, 0.002 * 2 ** attempt))
+            else:
+                raise StockConflictError(
+                    f"Stock changed while deducting this order, "
+                    f"gave up after {self.max_retries} retries"
+                )
+
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        EnhancedStockAlertService(self.db).refresh_alerts_for(needed)
+        return order
+
+    def _allocate(self, needed, now, lock):
+        """
+        Reads the candidate batches of every medicine in one query and
+        splits each line over them, earliest expiry first.
+        Returns [(medicine_id, quantity, [(batch, inventory_id, quantity)])]
+        Raises ValueError naming every line that cannot be covered.
+        """
+        # All active, non-expired batches of every medicine with their inventory,
+        # earliest expiry first within each medicine
+        query = self.db.query(
+            MedicineBatch, Inventory
+        ).join(
+            Inventory,
+            (Inventory.batch_id == MedicineBatch.id)
+            & (Inventory.medicine_id == MedicineBatch.medicine_id)
         ).filter(
-            MedicineBatch.medicine_id == medicine_id,
+            MedicineBatch.medicine_id.in_(list(needed)),
             MedicineBatch.is_active == True,
             MedicineBatch.is_expired == False,
-            MedicineBatch.expiry_date > datetime.utcnow()
+            MedicineBatch.expiry_date > now,
+            Inventory.quantity_available > 0
         ).order_by(
-            MedicineBatch.expiry_date.asc()
-        ).all()
-
-        if not batches:
-            raise ValueError(f"No active batches available for medicine {medicine_id}")
-
-        # Track deductions
-        deductions = []
-        remaining_quantity = quantity_needed
-
-        # Deduct from earliest expiry batches
-        for batch in batches:
-            if remaining_quantity <= 0:
-                break
-
-            # Get inventory for this batch
-            inventory = self.db.query(
-                Inventory
-            ).filter(
-                Inventory.medicine_id == medicine_id,
-                Inventory.batch_id == batch.id
-            ).first()
-
-            if not inventory:
+            MedicineBatch.medicine_id,
+            MedicineBatch.expiry_date.asc(),
+            MedicineBatch.id,
+            Inventory.id
+        ).populate_existing()
+        if lock:
+            # No SKIP LOCKED: skipping a locked batch would sell a later expiry first.
+            query = query.with_for_update(of=Inventory)
+
+        candidates = {}
+        for batch, inventory in query.all():
+            candidates.setdefault(batch.medicine_id, []).append((batch, inventory))
+
+        allocations = []
+        shortages = []
+        for medicine_id, quantity_needed in needed.items():
+            if medicine_id not in candidates:
+                shortages.append(f"No active batches available for medicine {medicine_id}")
                 continue
 
-            # Calculate how much we can take from this batch
-            available = inventory.quantity_available
-            to_deduct = min(remaining_quantity, available)
-
-            # Update inventory
-            inventory.quantity_available -= to_deduct
-            inventory.last_stock_update = datetime.utcnow()
-            self.db.add(inventory)
-
-            # Log the deduction
-            stock_log = StockLog(
-                medicine_id=medicine_id,
-                batch_id=batch.id,
-                quantity_used=to_deduct,
-                reason="sold",
-                issued_to=issued_to,
-                reference_type=reference_type,
-                staff_id=staff_id,
-                logged_at=datetime.utcnow()
-            )
-            self.db.add(stock_log)
-
-            # Track what we deducted
-            deductions.append({
-                "batch_id": batch.id,
-                "batch_number": batch.batch_number,
-                "expiry_date": batch.expiry_date,
-                "quantity_deducted": to_deduct
-            })
-
-            remaining_quantity -= to_deduct
-
-        if remaining_quantity > 0:
-            raise ValueError(
-                f"Not enough stock. Needed {quantity_needed}, "
-                f"only could deduct {quantity_needed - remaining_quantity}"
-            )
+            taken = []
+            remaining_quantity = quantity_needed
+            for batch, inventory in candidates[medicine_id]:
+                if remaining_quantity <= 0:
+                    break
+                to_deduct = min(remaining_quantity, inventory.quantity_available)
+                taken.append((batch, inventory.id, to_deduct))
+                remaining_quantity -= to_deduct
+
+            if remaining_quantity > 0:
+                shortages.append(
+                    f"Not enough stock. Needed {quantity_needed}, "
+                    f"only could deduct {quantity_needed - remaining_quantity}"
+                    + ("" if len(needed) == 1 else f" (medicine {medicine_id})")
+                )
+            allocations.append((medicine_id, quantity_needed, taken))
 
-        self.db.commit()
-        return deductions
+        if shortages:
+            raise ValueError("; ".join(shortages))
+        return allocations
+
+    def _apply(self, allocations, stock_logs, now):
+        """
+        Deducts every allocation in one executemany of a conditional UPDATE
+        that only matches while the batch still holds the quantity, in
+        inventory id order, then writes the stock logs. Runs in a SAVEPOINT:
+        if a row misses (another order got there first) the savepoint is
+        rolled back and False is returned, leaving the rest of the
+        transaction untouched.
+        """
+        rows = sorted(
+            (
+                {"inventory_id": inventory_id, "to_deduct": to_deduct}
+                for _, _, taken in allocations
+                for _, inventory_id, to_deduct in taken
+            ),
+            key=lambda row: row["inventory_id"]
+        )
+        inventory = Inventory.__table__
+        savepoint = self.db.begin_nested()
+        result = self.db.execute(
+            update(inventory)
+            .where(
+                inventory.c.id == bindparam("inventory_id"),
+                inventory.c.quantity_available >= bindparam("to_deduct")
+            )
+            .values(
+                quantity_available=inventory.c.quantity_available - bindparam("to_deduct"),
+                last_stock_update=now
+            ),
+            rows
+        )
+        if result.rowcount != len(rows):
+            savepoint.rollback()
+            return False
+        self.db.execute(insert(StockLog), stock_logs)
+        savepoint.commit()
+        return True
 
     def validate_stock_available(self, medicine_id: int, quantity_needed: int) -> bool:
         """
@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy import func, extract, tuple_
+from app.models.stock_log import StockLog
+from app.models.sales_aggregate import MonthlyItemSales, IngestionWatermark
+
+class SalesAggregateService:
+    """
+    Keeps monthly_item_sales (units sold per medicine per month) up to
+    date from stock_logs, for the ML forecaster to train on.
+
+    Incremental: the highest stock_logs.id already folded in is stored
+    in ingestion_watermarks, so each sync reads only the logs written
+    since the previous one — one GROUP BY over the new rows, then one
+    update/insert per touched (medicine, month). A nightly sync costs
+    time proportional to that day's sales, not to the whole history.
+
+    Auto-increment ids are handed out at INSERT, not at commit, so a log
+    with a lower id can still become visible after a higher one. Each
+    sync therefore stops at the newest log older than SETTLE; anything
+    later waits for the next sync instead of being skipped for good.
+
+    The sync and its watermark move are committed together, so a failed
+    sync is simply retried from the same watermark. Overlapping syncs
+    (scheduler, API, rebuild) cannot fold the same logs twice: the
+    watermark row is read FOR UPDATE, and it only moves if it still holds
+    the id the sync started from.
+    """
+
+    WATERMARK = "monthly_item_sales"
+    KEY_BATCH = 500     # (medicine, year, month) keys per IN (...) lookup
+    SETTLE = timedelta(minutes=5)   # longer than any dispensing transaction
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _watermark(self, lock=False):
+        query = self.db.query(IngestionWatermark).filter(
+            IngestionWatermark.name == self.WATERMARK
+        )
+        if lock:
+            query = query.with_for_update()
+        watermark = query.first()
+        if not watermark:
+            # First run: an overlapping sync may create the row at the same time
+            try:
+                with self.db.begin_nested():
+                    self.db.add(IngestionWatermark(name=self.WATERMARK, last_id=0))
+            except IntegrityError:
+                pass
+            watermark = query.first()
+        return watermark
+
+    def sync(self):
+        """
+        Folds stock_logs rows with reason="sold" and id above the
+        watermark into monthly_item_sales
+        """
+        watermark = self._watermark(lock=True)
+        start_id = watermark.last_id
+        nothing_new = {
+            "from_log_id": start_id,
+            "to_log_id": start_id,
+            "months_updated": 0,
+            "months_created": 0,
+            "quantity_added": 0,
+        }
+
+        # Upper bound fixed first, at settled logs only: logs written during
+        # the sync, or still being committed, wait for the next one
+        end_id = self.db.query(func.max(StockLog.id)).filter(
+            StockLog.logged_at < datetime.utcnow() - self.SETTLE
+        ).scalar() or 0
+        if end_id <= start_id:
+            self.db.commit()
+            return nothing_new
+
+        year = extract("year", StockLog.logged_at)
+        month = extract("month", StockLog.logged_at)
+        new_sales = self.db.query(
+            StockLog.medicine_id,
+            year.label("year"),
+            month.label("month"),
+            func.sum(StockLog.quantity_used).label("quantity")
+        ).filter(
+            StockLog.reason == "sold",
+            StockLog.id > start_id,
+            StockLog.id <= end_id
+        ).group_by(
+            StockLog.medicine_id, year, month
+        ).all()
+
+        totals = {
+            (row.medicine_id, int(row.year), int(row.month)): int(row.quantity or 0)
+            for row in new_sales
+        }
+
+        existing = {}
+        keys = list(totals)
+        for start in range(0, len(keys), self.KEY_BATCH):
+            for row in self.db.query(MonthlyItemSales).filter(
+                tuple_(
+                    MonthlyItemSales.medicine_id,
+                    MonthlyItemSales.year,
+                    MonthlyItemSales.month
+                ).in_(keys[start:start + self.KEY_BATCH])
+            ).all():
+                existing[(row.medicine_id, row.year, row.month)] = row
+
+        created = 0
+        for key, quantity in totals.items():
+            row = existing.get(key)
+            if row:
+                row.quantity_sold += quantity
+                row.updated_at = datetime.utcnow()
+            else:
+                medicine_id, year_value, month_value = key
+                self.db.add(MonthlyItemSales(
+                    medicine_id=medicine_id,
+                    year=year_value,
+                    month=month_value,
+                    quantity_sold=quantity
+                ))
+                created += 1
+
+        moved = self.db.query(IngestionWatermark).filter(
+            IngestionWatermark.name == self.WATERMARK,
+            IngestionWatermark.last_id == start_id
+        ).update(
+            {IngestionWatermark.last_id: end_id, IngestionWatermark.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        if moved != 1:
+            # Another sync folded these logs first: drop ours
+            self.db.rollback()
+            return nothing_new
+        self.db.commit()
+
+        return {
+            "from_log_id": start_id,
+            "to_log_id": end_id,
+            "months_updated": len(totals) - created,
+            "months_created": created,
+            "quantity_added": sum(totals.values()),
+        }
+
+    def rebuild(self):
+        """
+        Drops the aggregate and re-folds every sold log from the start
+        (e.g. after historical logs were corrected)
+        """
+        watermark = self._watermark(lock=True)
+        self.db.query(MonthlyItemSales).delete(synchronize_session=False)
+        watermark.last_id = 0
+        self.db.flush()
+        return self.sync()
+
+    def get_status(self):
+        watermark = self._watermark()
+        self.db.commit()
+        pending = self.db.query(func.count(StockLog.id)).filter(
+            StockLog.reason == "sold",
+            StockLog.id > watermark.last_id
+        ).scalar()
+        return {
+            "last_log_id": watermark.last_id,
+            "last_synced_at": watermark.updated_at,
+            "pending_sold_logs": pending,
+            "months_tracked": self.db.query(func.count(MonthlyItemSales.id)).scalar(),
+        }
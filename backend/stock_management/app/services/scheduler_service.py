@@ -8,6 +8,8 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from app.database.db import SessionLocal
 from app.services.refill_service import get_eligible_prescriptions
 from app.services.reminder_service import create_reminder, process_pending_reminders
+from app.services.sales_aggregate_service import SalesAggregateService
+from app.services.enhanced_stock_alert_service import EnhancedStockAlertService
 
 logger = logging.getLogger(__name__)
 
@@ -101,6 +103,63 @@ def dose_reminder_check_job():
     logger.info("🕒 Dose reminder check complete")
 
 
+def sales_aggregate_sync_job():
+    """
+    Nightly job: folds the day's sold stock logs into monthly_item_sales,
+    so the ML pipeline (--source db) trains on live consumption.
+    Only logs newer than the stored watermark are read.
+    """
+    logger.info("📦 Syncing monthly sales aggregate...")
+    db = SessionLocal()
+    try:
+        result = SalesAggregateService(db).sync()
+        logger.info(
+            f"Folded stock logs {result['from_log_id']}→{result['to_log_id']}: "
+            f"{result['quantity_added']} units, {result['months_created']} new "
+            f"and {result['months_updated']} updated item-months"
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Sales aggregate sync failed: {e}")
+    finally:
+        db.close()
+
+
+def alert_refresh_queue_job():
+    """
+    Frequent job: re-evaluates alerts for medicines whose stock was changed
+    outside this service (the healix_app stock bridge queues them).
+    Changes made here re-evaluate their alerts immediately.
+    """
+    db = SessionLocal()
+    try:
+        processed = EnhancedStockAlertService(db).process_refresh_queue()
+        if processed:
+            logger.info(f"🔔 Refreshed alerts for {processed} queued stock changes")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Alert refresh queue job failed: {e}")
+    finally:
+        db.close()
+
+
+def alert_scan_job():
+    """
+    Nightly safety net: full set-based alert scan of the catalogue, in case
+    a stock change slipped past the per-mutation refresh.
+    """
+    logger.info("🔔 Running full alert scan...")
+    db = SessionLocal()
+    try:
+        created = EnhancedStockAlertService(db).scan_alerts(resolve_cleared=True, stock_totals=True)
+        logger.info(f"Full alert scan raised {len(created)} new alerts")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Full alert scan failed: {e}")
+    finally:
+        db.close()
+
+
 def start_scheduler():
     """
     Start the background scheduler with daily refill and hourly dose checks.
@@ -123,8 +182,35 @@ def start_scheduler():
         replace_existing=True
     )
 
+    # 3. Monthly sales aggregate for the ML forecaster every 24 hours
+    scheduler.add_job(
+        sales_aggregate_sync_job,
+        trigger="interval",
+        hours=24,
+        id="daily_sales_aggregate_sync",
+        replace_existing=True
+    )
+
+    # 4. Alert refresh for stock changed by the healix_app bridge every minute
+    scheduler.add_job(
+        alert_refresh_queue_job,
+        trigger="interval",
+        minutes=1,
+        id="alert_refresh_queue",
+        replace_existing=True
+    )
+
+    # 5. Full alert scan as a safety net every 24 hours
+    scheduler.add_job(
+        alert_scan_job,
+        trigger="interval",
+        hours=24,
+        id="daily_alert_scan",
+        replace_existing=True
+    )
+
     scheduler.start()
-    logger.info("📅 Scheduler started – Daily refills & Hourly dose checks")
+    logger.info("📅 Scheduler started – Daily refills, sales sync, alert scan & Hourly dose checks")
 
 
 def stop_scheduler():
@@ -3,6 +3,7 @@ from datetime import datetime
 from app.models.stock_update import StockUpdate
 from app.models.inventory import Inventory
 from app.models.batch import MedicineBatch
+from app.services.enhanced_stock_alert_service import EnhancedStockAlertService
 from sqlalchemy.orm import Session
 
 class StockAddService:
@@ -82,4 +83,7 @@ class StockAddService:
         # Save history
         self.stock_update_repo.add(stock_update)
 
+        # Re-evaluate alerts for the restocked medicine
+        EnhancedStockAlertService(db).refresh_alerts_for([medicine_id])
+
         return inventory
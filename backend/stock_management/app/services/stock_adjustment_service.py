@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.models.stock_adjustment import StockAdjustment
 from app.models.inventory import Inventory
 from app.models.stock_log import StockLog
+from app.services.enhanced_stock_alert_service import EnhancedStockAlertService
 
 class StockAdjustmentService:
     """
@@ -147,6 +148,7 @@ class StockAdjustmentService:
         self.db.add(adjustment)
         self.db.commit()
 
+        EnhancedStockAlertService(self.db).refresh_alerts_for([medicine_id])
         return adjustment
 
     def _process_adjustment(
@@ -214,6 +216,7 @@ class StockAdjustmentService:
         self.db.add(adjustment)
         self.db.commit()
 
+        EnhancedStockAlertService(self.db).refresh_alerts_for([medicine_id])
         return adjustment
 
     def approve_adjustment(self, adjustment_id: int, approved_by: int):
@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, or_
 from app.models.stock_log import StockLog
 from app.models.medicine import Medicine
 from app.models.inventory import Inventory
@@ -147,47 +147,81 @@ class StockAnalyticsService:
         turnover = total_consumed / inventory.quantity_available
         return round(turnover, 2)
 
-    def get_reorder_recommendations(self):
+    def get_reorder_recommendations(self, days: int = 30, cover_days: int = 7):
         """
         Recommend medicines that should be reordered soon.
         Improved logic: checks both predicted days remaining AND database reorder levels.
+        One aggregate query: consumption over the last `days` and stock summed
+        over all batches, per medicine. Ranked by days of cover, fewest first
+        (medicines with no recent sales last).
         """
-        medicines = self.db.query(Medicine).filter(
-            Medicine.is_active == True
-        ).all()
+        date_threshold = datetime.utcnow() - timedelta(days=days)
 
-        recommendations = []
+        consumption = self.db.query(
+            StockLog.medicine_id.label("medicine_id"),
+            func.sum(StockLog.quantity_used).label("consumed")
+        ).filter(
+            StockLog.reason == "sold",
+            StockLog.logged_at >= date_threshold
+        ).group_by(
+            StockLog.medicine_id
+        ).subquery()
+
+        stock = self.db.query(
+            Inventory.medicine_id.label("medicine_id"),
+            func.sum(Inventory.quantity_available).label("quantity"),
+            func.max(Inventory.reorder_level).label("reorder_level"),
+            func.max(Inventory.reorder_quantity).label("reorder_quantity")
+        ).group_by(
+            Inventory.medicine_id
+        ).subquery()
 
-        for medicine in medicines:
-            avg_daily = self.get_daily_average_consumption(medicine.id, 30)
-            inventory = self.db.query(Inventory).filter(
-                Inventory.medicine_id == medicine.id
-            ).first()
+        consumed = func.coalesce(consumption.c.consumed, 0)
+        # days of cover = stock / (consumed / days); None when nothing was sold
+        days_of_cover = case(
+            (consumed > 0, stock.c.quantity * float(days) / consumed),
+            else_=None
+        )
 
-            if not inventory:
-                continue
-
-            # Check 1: Live consumption logic (Predicted days remaining)
-            if avg_daily > 0:
-                days_remaining = inventory.quantity_available / avg_daily
-            else:
-                days_remaining = float('inf')
-
-            # Check 2: Static reorder level (Database threshold)
-            is_below_threshold = inventory.quantity_available <= inventory.reorder_level
-
-            # Recommend if either condition is met
-            if days_remaining < 7 or is_below_threshold:
-                recommendations.append({
-                    "medicine_id": medicine.id,
-                    "medicine_name": medicine.name,
-                    "current_quantity": inventory.quantity_available,
-                    "daily_average": avg_daily,
-                    "days_remaining": round(days_remaining, 1) if days_remaining != float('inf') else "N/A",
-                    "reorder_quantity": inventory.reorder_quantity or (medicine.minimum_stock_threshold * 3)
-                })
-
-        return recommendations
+        rows = self.db.query(
+            Medicine.id,
+            Medicine.name,
+            Medicine.minimum_stock_threshold,
+            stock.c.quantity,
+            stock.c.reorder_quantity,
+            consumed.label("consumed"),
+            days_of_cover.label("days_of_cover")
+        ).join(
+            stock, stock.c.medicine_id == Medicine.id
+        ).outerjoin(
+            consumption, consumption.c.medicine_id == Medicine.id
+        ).filter(
+            Medicine.is_active == True,
+            or_(
+                # Check 1: Live consumption logic (Predicted days remaining)
+                stock.c.quantity * days < cover_days * consumed,
+                # Check 2: Static reorder level (Database threshold)
+                stock.c.quantity <= stock.c.reorder_level
+            )
+        ).order_by(
+            days_of_cover.is_(None),
+            days_of_cover,
+            stock.c.quantity,
+            Medicine.id
+        ).all()
+
+        return [
+            {
+                "rank": rank,
+                "medicine_id": row.id,
+                "medicine_name": row.name,
+                "current_quantity": row.quantity,
+                "daily_average": round(row.consumed / days, 2),
+                "days_remaining": round(row.days_of_cover, 1) if row.days_of_cover is not None else "N/A",
+                "reorder_quantity": row.reorder_quantity or ((row.minimum_stock_threshold or 0) * 3)
+            }
+            for rank, row in enumerate(rows, start=1)
+        ]
 
     def get_monthly_consumption_trend(
         self,
@@ -3,7 +3,10 @@ from app.models.batch import MedicineBatch
 from app.models.stock_log import StockLog
 from app.models.issued_item import IssuedItem
 from app.models.prescription import Prescription
+from app.services.fefo_deduction_service import FEFODeductionService
+from app.services.enhanced_stock_alert_service import EnhancedStockAlertService
 from datetime import datetime
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -29,73 +32,25 @@ class StockUpdateService:
         """
         Deduct stock using FEFO logic
         Get batches ordered by expiry date and deduct from earliest first
+        (delegates to FEFODeductionService)
         """
 
         # Validate quantity
         if quantity_to_deduct <= 0:
             raise ValueError("Quantity to deduct must be greater than zero")
 
-        # Get total available stock
-        total_available = db.query(Inventory).filter(
-            Inventory.medicine_id == medicine_id
-        ).with_entities(
-            db.func.sum(Inventory.quantity_available)
-        ).scalar()
-
-        if not total_available or total_available < quantity_to_deduct:
-            raise ValueError(
-                f"Not enough stock. Available: {total_available}, "
-                f"Requested: {quantity_to_deduct}"
-            )
-
-        # Get all batches with available stock, ordered by expiry date
-        batches_with_stock = db.query(Inventory).filter(
-            Inventory.medicine_id == medicine_id,
-            Inventory.quantity_available > 0
-        ).join(
-            MedicineBatch
-        ).order_by(
-            MedicineBatch.expiry_date.asc()
-        ).all()
-
-        deductions = []
-        remaining_to_deduct = quantity_to_deduct
-
-        # Deduct from earliest expiry batches
-        for inventory in batches_with_stock:
-            if remaining_to_deduct <= 0:
-                break
-
-            available = inventory.quantity_available
-            to_deduct = min(remaining_to_deduct, available)
-
-            # Update inventory
-            inventory.quantity_available -= to_deduct
-            inventory.last_stock_update = datetime.utcnow()
-            db.add(inventory)
-
-            # Log the deduction
-            stock_log = StockLog(
-                medicine_id=medicine_id,
-                batch_id=inventory.batch_id,
-                quantity_used=to_deduct,
-                reason="sold",
-                issued_to=issued_to,
-                reference_type=reference_type,
-                staff_id=staff_id,
-                logged_at=datetime.utcnow()
-            )
-            db.add(stock_log)
-
-            deductions.append({
-                "batch_id": inventory.batch_id,
-                "quantity_deducted": to_deduct
-            })
-
-            remaining_to_deduct -= to_deduct
-
-        db.commit()
-        return deductions
+        # Conditional updates keep concurrent issues from overselling a batch
+        deductions = FEFODeductionService(db).deduct_stock_fefo(
+            medicine_id,
+            quantity_to_deduct,
+            issued_to=issued_to,
+            reference_type=reference_type,
+            staff_id=staff_id
+        )
+        return [
+            {"batch_id": d["batch_id"], "quantity_deducted": d["quantity_deducted"]}
+            for d in deductions
+        ]
 
     def update_stock(
             self,
@@ -148,13 +103,22 @@ class StockUpdateService:
         Issue medicine from specific inventory record
         Records log, updates quantity, and creates IssuedItem entry
         """
-        if inventory.quantity_available < issued_quantity:
+        # Conditional update: only matches while the batch still holds the quantity
+        result = db.execute(
+            update(Inventory)
+            .where(
+                Inventory.id == inventory.id,
+                Inventory.quantity_available >= issued_quantity
+            )
+            .values(
+                quantity_available=Inventory.quantity_available - issued_quantity,
+                last_stock_update=datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
             raise ValueError("Not enough stock in this batch")
 
-        inventory.quantity_available -= issued_quantity
-        inventory.last_stock_update = datetime.utcnow()
-        db.add(inventory)
-
         # 1. Log the stock movement
         log = StockLog(
             medicine_id=inventory.medicine_id,
@@ -183,6 +147,7 @@ class StockUpdateService:
         db.add(issued_item)
 
         db.commit()
+        EnhancedStockAlertService(db).refresh_alerts_for([inventory.medicine_id])
         db.refresh(inventory)
         return inventory
 
@@ -0,0 +1,115 @@
+"""
+benchmarks/bench_alert_scan.py
+──────────────────────────────
+Full alert scan over the whole catalogue: the per-medicine loop (four
+checks, ~10 queries and several commits per medicine) vs the set-based
+EnhancedStockAlertService.scan_alerts (a handful of queries in total).
+
+Each size runs on a fresh SQLite file with two batches per medicine and
+a mix of low, critical, expiring and overstocked items. Both paths start
+from no active alerts, and the run checks they raise the same alerts.
+
+Usage:
+    cd backend/stock_management
+    python benchmarks/bench_alert_scan.py
+    python benchmarks/bench_alert_scan.py --medicines 1000,10000 --loop-limit 10000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.models import Inventory, Medicine, MedicineBatch, StockAlert
+from app.services.enhanced_stock_alert_service import EnhancedStockAlertService
+
+
+def setup(url, n_medicines, seed=0):
+    rng = random.Random(seed)
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Medicine), [
+            {"id": i, "name": f"Med {i}", "sku": f"BENCH-{i}", "dosage_form": "tablet",
+             "unit_of_measurement": "tablet", "cost_price": 1.0, "selling_price": 2.0,
+             "minimum_stock_threshold": 10, "maximum_stock_level": rng.choice([None, 300]),
+             "is_active": True}
+            for i in range(1, n_medicines + 1)
+        ])
+        batches, stock = [], []
+        for i in range(1, n_medicines + 1):
+            for j in range(2):
+                batch_id = 2 * i + j - 1
+                batches.append({
+                    "id": batch_id, "medicine_id": i, "batch_number": f"B-{i}-{j}",
+                    "manufacture_date": now, "cost_price": 1.0, "is_active": True, "is_expired": False,
+                    "expiry_date": now + timedelta(days=rng.choice([15, 120, 400])),
+                })
+                stock.append({
+                    "medicine_id": i, "batch_id": batch_id, "reorder_level": 20,
+                    "quantity_available": rng.choice([0, 5, 15, 80, 500]),
+                    "last_dispensed_at": now - timedelta(days=rng.choice([5, 200])),
+                })
+        conn.execute(insert(MedicineBatch), batches)
+        conn.execute(insert(Inventory), stock)
+    return engine
+
+
+def legacy_scan(service, medicine_ids):
+    alerts = []
+    for medicine_id in medicine_ids:
+        for alert in (service.check_low_stock_alert(medicine_id),
+                      service.check_critical_stock_alert(medicine_id),
+                      *service.check_expiry_alert(medicine_id),
+                      service.check_overstock_alert(medicine_id)):
+            if alert:
+                alerts.append(alert)
+    return alerts
+
+
+def timed_scan(engine, fn):
+    db = sessionmaker(bind=engine)()
+    db.query(StockAlert).delete()
+    db.commit()
+    start = time.perf_counter()
+    alerts = fn(EnhancedStockAlertService(db))
+    elapsed = time.perf_counter() - start
+    raised = sorted((a.alert_type, a.medicine_id, a.batch_id) for a in alerts)
+    db.close()
+    return elapsed, raised
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument("--medicines", default="1000,10000", help="comma-separated catalogue sizes")
+    parser.add_argument("--loop-limit", type=int, default=2000,
+                        help="skip the per-medicine loop above this size (it is slow)")
+    args = parser.parse_args()
+
+    print("Alert scan over the whole catalogue, seconds (loop → set-based)")
+    print(f"   {'medicines':>9s}  {'alerts':>7s}  {'loop':>8s}  {'scan':>7s}  same")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (int(x) for x in args.medicines.split(",")):
+            engine = setup(f"sqlite:///{os.path.join(tmp, f'alerts_{n}.db')}", n)
+            scan_s, scanned = timed_scan(engine, lambda s: s.scan_alerts())
+            if n <= args.loop_limit:
+                loop_s, looped = timed_scan(engine, lambda s: legacy_scan(s, range(1, n + 1)))
+                loop, same = f"{loop_s:8.2f}", "yes" if looped == scanned else "NO"
+            else:
+                loop, same = f"{'-':>8s}", "-"
+            print(f"   {n:>9,}  {len(scanned):>7,}  {loop}  {scan_s:7.2f}  {same}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
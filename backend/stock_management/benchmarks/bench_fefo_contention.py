@@ -0,0 +1,182 @@
+"""
+benchmarks/bench_fefo_contention.py
+───────────────────────────────────
+Many threads dispensing one hot medicine at once, through FEFO deduction.
+
+Modes:
+  naive       the pre-locking read → subtract in Python → write back
+  guarded     FEFODeductionService default: conditional UPDATEs, retry on conflict
+  for_update  FEFODeductionService(locking="for_update"): row locks on the read
+
+For each mode the run checks correctness after the dust settles:
+  - no batch below zero
+  - ledger matches inventory: stock received - stock left == sum of StockLog
+and reports orders per second (served + rejected as out of stock).
+
+SQLite (the default, a temp file) ignores FOR UPDATE, so there both safe
+modes rely on the guarded UPDATEs; pass --database-url to run against MySQL.
+
+Usage:
+    cd backend/stock_management
+    python benchmarks/bench_fefo_contention.py
+    python benchmarks/bench_fefo_contention.py --threads 16 --orders 200
+    python benchmarks/bench_fefo_contention.py --database-url mysql+pymysql://user:pw@host/bench
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.models import Inventory, Medicine, MedicineBatch, StockLog
+from app.services.fefo_deduction_service import (
+    FEFODeductionService,
+    LOCK_FOR_UPDATE,
+    LOCK_GUARDED,
+    StockConflictError,
+)
+
+MODES = ("naive", LOCK_GUARDED, LOCK_FOR_UPDATE)
+
+
+def naive_deduct(db, medicine_id, quantity_needed):
+    """FEFO deduction as it was before locking: lost updates under contention."""
+    rows = db.query(MedicineBatch, Inventory).join(
+        Inventory, Inventory.batch_id == MedicineBatch.id
+    ).filter(
+        MedicineBatch.medicine_id == medicine_id,
+        Inventory.quantity_available > 0
+    ).order_by(MedicineBatch.expiry_date.asc()).all()
+
+    if sum(inventory.quantity_available for _, inventory in rows) < quantity_needed:
+        raise ValueError("Not enough stock")
+
+    remaining = quantity_needed
+    for batch, inventory in rows:
+        if remaining <= 0:
+            break
+        to_deduct = min(remaining, inventory.quantity_available)
+        inventory.quantity_available -= to_deduct
+        db.add(StockLog(medicine_id=medicine_id, batch_id=batch.id, quantity_used=to_deduct,
+                        reason="sold", logged_at=datetime.utcnow()))
+        remaining -= to_deduct
+    db.commit()
+
+
+def setup(url, batches, stock_per_batch):
+    engine = create_engine(url, connect_args={"timeout": 30, "check_same_thread": False}
+                           if url.startswith("sqlite") else {})
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    db = sessionmaker(bind=engine)()
+    med = Medicine(name="Hot Medicine", sku="BENCH-HOT", dosage_form="tablet",
+                   unit_of_measurement="tablet", cost_price=1.0, selling_price=2.0)
+    db.add(med)
+    db.flush()
+    for i in range(batches):
+        batch = MedicineBatch(medicine_id=med.id, batch_number=f"HOT-{i}",
+                              manufacture_date=datetime.utcnow(),
+                              expiry_date=datetime.utcnow() + timedelta(days=30 + i),
+                              cost_price=1.0)
+        db.add(batch)
+        db.flush()
+        db.add(Inventory(medicine_id=med.id, batch_id=batch.id,
+                         quantity_available=stock_per_batch, reorder_level=10))
+    db.commit()
+    medicine_id = med.id
+    db.close()
+    return engine, medicine_id
+
+
+def run(mode, url, threads, orders, batches, stock_per_batch, seed=0):
+    engine, medicine_id = setup(url, batches, stock_per_batch)
+    Session = sessionmaker(bind=engine)
+    counts = {"served": 0, "rejected": 0, "conflicts": 0, "errors": 0}
+    lock = threading.Lock()
+    start_gate = threading.Barrier(threads)
+
+    def worker(worker_id):
+        rng = random.Random(seed + worker_id)
+        db = Session()
+        start_gate.wait()
+        for _ in range(orders):
+            quantity = rng.randint(1, 5)
+            outcome = "served"
+            try:
+                if mode == "naive":
+                    naive_deduct(db, medicine_id, quantity)
+                else:
+                    FEFODeductionService(db, locking=mode).deduct_stock_fefo(medicine_id, quantity)
+            except StockConflictError:
+                outcome = "conflicts"
+            except ValueError:
+                outcome = "rejected"
+                db.rollback()
+            except Exception:
+                outcome = "errors"
+                db.rollback()
+            with lock:
+                counts[outcome] += 1
+        db.close()
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    db = Session()
+    received = batches * stock_per_batch
+    left = db.query(func.sum(Inventory.quantity_available)).scalar() or 0
+    lowest = db.query(func.min(Inventory.quantity_available)).scalar()
+    logged = db.query(func.sum(StockLog.quantity_used)).scalar() or 0
+    db.close()
+    engine.dispose()
+
+    return {
+        **counts,
+        "ops_per_sec": (threads * orders) / elapsed,
+        "negative":    lowest < 0,
+        "ledger_ok":   received - left == logged,
+        "oversold":    max(0, logged - received),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--orders", type=int, default=100, help="orders per thread")
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--stock", type=int, default=200, help="units per batch")
+    parser.add_argument("--database-url", default=None,
+                        help="defaults to a temporary SQLite file (tables are dropped!)")
+    args = parser.parse_args()
+
+    print(f"FEFO contention: {args.threads} threads x {args.orders} orders of 1-5 units, "
+          f"{args.batches} batches x {args.stock} units")
+    print(f"   {'mode':<11s} {'orders/s':>9s} {'served':>7s} {'rejected':>9s} "
+          f"{'conflicts':>10s} {'errors':>7s}  {'no negative':>11s}  {'ledger':>6s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in MODES:
+            url = args.database_url or f"sqlite:///{os.path.join(tmp, mode)}.db"
+            r = run(mode, url, args.threads, args.orders, args.batches, args.stock)
+            ledger = "ok" if r["ledger_ok"] else f"+{r['oversold']} oversold" if r["oversold"] else "drift"
+            print(f"   {mode:<11s} {r['ops_per_sec']:9.0f} {r['served']:7d} {r['rejected']:9d} "
+                  f"{r['conflicts']:10d} {r['errors']:7d}  {'yes' if not r['negative'] else 'NO':>11s}  {ledger:>6s}")
+
+
+if __name__ == "__main__":
+    main()
@@ -68,3 +68,207 @@ def test_fefo_deduction_prefers_earliest_batch(db_session):
     # ensure stock logs created
     logs = db.query(StockLog).filter(StockLog.medicine_id == med.id).all()
     assert any(l.batch_id == b1.id for l in logs)
+
+
+def _medicine_with_batches(db, sku, quantities):
+    """Medicine with one batch per quantity, expiring 10, 20, 30... days out."""
+    med = Medicine(
+        name=f"OrderMed {sku}",
+        sku=sku,
+        dosage_form="tablet",
+        strength="500mg",
+        unit_of_measurement="tablet",
+        cost_price=10.0,
+        selling_price=15.0,
+        minimum_stock_threshold=10,
+    )
+    db.add(med)
+    db.flush()
+
+    batch_service = BatchManagementService(db)
+    batches = [
+        batch_service.create_batch(
+            medicine_id=med.id,
+            batch_number=f"{sku}-B{i}",
+            manufacture_date=datetime.utcnow(),
+            expiry_date=datetime.utcnow() + timedelta(days=10 * (i + 1)),
+            cost_price=10.0,
+            supplier_id=1,
+            quantity_received=quantity
+        )
+        for i, quantity in enumerate(quantities)
+    ]
+    return med, batches
+
+
+def _quantities(db, batches):
+    return [
+        db.query(Inventory).filter(Inventory.batch_id == b.id).first().quantity_available
+        for b in batches
+    ]
+
+
+def test_order_deduction_spans_batches_for_every_line(db_session):
+    db = db_session
+    med_a, batches_a = _medicine_with_batches(db, "ORD-A1", [20, 50])
+    med_b, batches_b = _medicine_with_batches(db, "ORD-B1", [5, 5, 5])
+
+    order = FEFODeductionService(db).deduct_order_fefo(
+        [(med_a.id, 30), (med_b.id, 7), (med_a.id, 5)], issued_to=1
+    )
+
+    # repeated medicines are merged, order of first appearance kept
+    assert [(line["medicine_id"], line["quantity"]) for line in order] == [(med_a.id, 35), (med_b.id, 7)]
+    assert [d["quantity_deducted"] for d in order[0]["deductions"]] == [20, 15]
+    assert [d["batch_id"] for d in order[1]["deductions"]] == [batches_b[0].id, batches_b[1].id]
+
+    assert _quantities(db, batches_a) == [0, 35]
+    assert _quantities(db, batches_b) == [0, 3, 5]
+    logs = db.query(StockLog).filter(StockLog.medicine_id.in_([med_a.id, med_b.id])).all()
+    assert sorted(l.quantity_used for l in logs) == [2, 5, 15, 20]
+
+
+def test_order_deduction_short_line_deducts_nothing(db_session):
+    db = db_session
+    med_a, batches_a = _medicine_with_batches(db, "ORD-A2", [20])
+    med_b, batches_b = _medicine_with_batches(db, "ORD-B2", [5])
+    db.commit()
+
+    fefo = FEFODeductionService(db)
+    try:
+        fefo.deduct_order_fefo([(med_a.id, 10), (med_b.id, 8)])
+        assert False, "short line should fail the whole order"
+    except ValueError as exc:
+        assert f"medicine {med_b.id}" in str(exc)
+
+    assert _quantities(db, batches_a) == [20]
+    assert _quantities(db, batches_b) == [5]
+    assert db.query(StockLog).filter(StockLog.medicine_id.in_([med_a.id, med_b.id])).count() == 0
+
+
+def test_order_deduction_loads_batches_in_one_query(db_session):
+    from sqlalchemy import event
+
+    db = db_session
+    meds = [_medicine_with_batches(db, f"ORD-Q{i}", [10, 10, 10])[0] for i in range(4)]
+    medicine_ids = [m.id for m in meds]
+    db.commit()
+
+    # count the deduction's own transaction (the alert refresh runs after its commit)
+    statements = []
+    committed = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: committed or statements.append(statement)
+    on_commit = lambda conn: committed.append(True)
+    event.listen(engine, "before_cursor_execute", listener)
+    event.listen(engine, "commit", on_commit)
+    try:
+        FEFODeductionService(db).deduct_order_fefo([(m, 25) for m in medicine_ids])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+        event.remove(engine, "commit", on_commit)
+
+    kinds = [s.lstrip().split()[0].upper() for s in statements]
+    assert kinds.count("SELECT") == 1
+    assert kinds.count("INSERT") == 1
+    assert kinds.count("UPDATE") == 1      # one executemany for every batch used
+
+
+def _interfere_once(fefo, db, inventory_id, quantity):
+    """After the first allocation, another 'order' takes stock from one batch."""
+    from sqlalchemy import update
+
+    allocate = fefo._allocate
+    calls = []
+
+    def allocate_then_interfere(*args):
+        allocations = allocate(*args)
+        if not calls:
+            db.execute(
+                update(Inventory)
+                .where(Inventory.id == inventory_id)
+                .values(quantity_available=Inventory.quantity_available - quantity)
+            )
+        calls.append(args)
+        return allocations
+
+    fefo._allocate = allocate_then_interfere
+    return calls
+
+
+def test_order_deduction_retries_after_losing_a_batch(db_session):
+    db = db_session
+    med, batches = _medicine_with_batches(db, "ORD-R1", [50, 50])
+    inv1 = db.query(Inventory).filter(Inventory.batch_id == batches[0].id).first()
+
+    fefo = FEFODeductionService(db)
+    calls = _interfere_once(fefo, db, inv1.id, 45)
+    deductions = fefo.deduct_stock_fefo(medicine_id=med.id, quantity_needed=40)
+
+    # first attempt planned 40 from batch 1, which only had 5 left by then;
+    # the retry re-reads (with row locks) and spills over to batch 2
+    assert len(calls) == 2 and calls[1][2] is True
+    assert [d["quantity_deducted"] for d in deductions] == [5, 35]
+    assert _quantities(db, batches) == [0, 15]
+
+
+def test_order_deduction_gives_up_without_partial_deductions(db_session):
+    import pytest
+    from app.services.fefo_deduction_service import StockConflictError
+
+    db = db_session
+    med, batches = _medicine_with_batches(db, "ORD-R2", [10, 50])
+    inv2 = db.query(Inventory).filter(Inventory.batch_id == batches[1].id).first()
+    inv2_id = inv2.id
+
+    # batch 2 misses: the savepoint takes batch 1's deduction back too
+    fefo = FEFODeductionService(db)
+    _interfere_once(fefo, db, inv2_id, 45)
+    now = datetime.utcnow()
+    assert fefo._apply(fefo._allocate({med.id: 30}, now, False), [], now) is False
+    assert _quantities(db, batches) == [10, 5]
+    db.commit()
+
+    # out of retries: conflict error, nothing deducted, nothing logged
+    fefo = FEFODeductionService(db, max_retries=0)
+    _interfere_once(fefo, db, inv2_id, 5)
+    with pytest.raises(StockConflictError):
+        fefo.deduct_stock_fefo(medicine_id=med.id, quantity_needed=12)
+    assert _quantities(db, batches) == [10, 5]
+    assert db.query(StockLog).filter(StockLog.medicine_id == med.id).count() == 0
+
+
+def test_order_deduction_retries_after_a_deadlock(db_session):
+    import pytest
+    from sqlalchemy.exc import OperationalError
+    from app.services.fefo_deduction_service import StockConflictError
+
+    db = db_session
+    med, batches = _medicine_with_batches(db, "ORD-R3", [10, 50])
+    deadlock = OperationalError("UPDATE inventory", {}, Exception(1213, "Deadlock found"))
+
+    def deadlock_first(fefo, times):
+        apply = fefo._apply
+        calls = []
+
+        def apply_or_deadlock(*args):
+            calls.append(args)
+            if len(calls) <= times:
+                raise deadlock
+            return apply(*args)
+
+        fefo._apply = apply_or_deadlock
+        return calls
+
+    fefo = FEFODeductionService(db)
+    calls = deadlock_first(fefo, 1)
+    deductions = fefo.deduct_stock_fefo(medicine_id=med.id, quantity_needed=12)
+    assert len(calls) == 2
+    assert [d["quantity_deducted"] for d in deductions] == [10, 2]
+
+    # still deadlocking once retries run out: a conflict, nothing deducted
+    fefo = FEFODeductionService(db, max_retries=1)
+    deadlock_first(fefo, 2)
+    with pytest.raises(StockConflictError):
+        fefo.deduct_stock_fefo(medicine_id=med.id, quantity_needed=5)
+    assert _quantities(db, batches) == [0, 48]
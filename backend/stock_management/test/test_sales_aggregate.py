@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+from app.models.medicine import Medicine
+from app.models.stock_log import StockLog
+from app.models.sales_aggregate import MonthlyItemSales
+from app.services.batch_management_service import BatchManagementService
+from app.services.sales_aggregate_service import SalesAggregateService
+
+
+def _monthly(db, medicine_id):
+    rows = db.query(MonthlyItemSales).filter(
+        MonthlyItemSales.medicine_id == medicine_id
+    ).order_by(MonthlyItemSales.year, MonthlyItemSales.month).all()
+    return [(r.year, r.month, r.quantity_sold) for r in rows]
+
+
+def test_sync_folds_only_new_sold_logs(db_session):
+    db = db_session
+
+    med = Medicine(
+        name="AggregateMed",
+        sku="AG-001",
+        dosage_form="tablet",
+        strength="10mg",
+        unit_of_measurement="tablet",
+        cost_price=1.0,
+        selling_price=2.0,
+    )
+    db.add(med)
+    db.flush()
+
+    batch = BatchManagementService(db).create_batch(
+        medicine_id=med.id,
+        batch_number="AGLOT-1",
+        manufacture_date=datetime.utcnow(),
+        expiry_date=datetime.utcnow() + timedelta(days=300),
+        cost_price=1.0,
+        supplier_id=1,
+        quantity_received=500
+    )
+
+    def log(qty, when, reason="sold"):
+        db.add(StockLog(medicine_id=med.id, batch_id=batch.id, quantity_used=qty,
+                        reason=reason, logged_at=when))
+        db.commit()
+
+    service = SalesAggregateService(db)
+    log(5, datetime(2025, 12, 30))
+    log(7, datetime(2026, 1, 2))
+    log(3, datetime(2026, 1, 5), reason="damage")
+    first = service.sync()
+    assert _monthly(db, med.id) == [(2025, 12, 5), (2026, 1, 7)]
+
+    # Second sync only reads the logs written after the watermark
+    log(4, datetime(2026, 1, 20))
+    second = service.sync()
+    assert second["from_log_id"] == first["to_log_id"]
+    assert second["quantity_added"] == 4
+    assert second["months_created"] == 0
+    assert _monthly(db, med.id) == [(2025, 12, 5), (2026, 1, 11)]
+
+    # Nothing new → nothing changes
+    assert service.sync()["quantity_added"] == 0
+    assert service.get_status()["pending_sold_logs"] == 0
+
+    # Rebuild from scratch gives the same totals
+    service.rebuild()
+    assert _monthly(db, med.id) == [(2025, 12, 5), (2026, 1, 11)]
+
+
+def test_overlapping_sync_does_not_count_sales_twice(db_session):
+    from sqlalchemy import update
+    from app.models.sales_aggregate import IngestionWatermark
+
+    db = db_session
+    med = Medicine(name="AggregateMed 2", sku="AG-002", dosage_form="tablet",
+                   unit_of_measurement="tablet", cost_price=1.0, selling_price=2.0)
+    db.add(med)
+    db.flush()
+    batch = BatchManagementService(db).create_batch(
+        medicine_id=med.id, batch_number="AGLOT-2", manufacture_date=datetime.utcnow(),
+        expiry_date=datetime.utcnow() + timedelta(days=300), cost_price=1.0, quantity_received=50
+    )
+    service = SalesAggregateService(db)
+    service.sync()
+    before = _monthly(db, med.id)
+
+    db.add(StockLog(medicine_id=med.id, batch_id=batch.id, quantity_used=6,
+                    reason="sold", logged_at=datetime(2026, 2, 3)))
+    db.commit()
+
+    # another sync moves the watermark past the new log while this one runs
+    read_watermark = service._watermark
+
+    def watermark_then_overtaken(*args, **kwargs):
+        watermark = read_watermark(*args, **kwargs)
+        db.execute(update(IngestionWatermark).where(
+            IngestionWatermark.name == service.WATERMARK
+        ).values(last_id=watermark.last_id + 1_000_000).execution_options(synchronize_session=False))
+        return watermark
+
+    service._watermark = watermark_then_overtaken
+    result = service.sync()
+    assert result["quantity_added"] == 0
+    assert _monthly(db, med.id) == before
+
+
+def test_log_committed_late_with_a_lower_id_is_folded_next_time(db_session):
+    db = db_session
+    med = Medicine(name="AggregateMed 3", sku="AG-003", dosage_form="tablet",
+                   unit_of_measurement="tablet", cost_price=1.0, selling_price=2.0)
+    db.add(med)
+    db.flush()
+    batch = BatchManagementService(db).create_batch(
+        medicine_id=med.id, batch_number="AGLOT-3", manufacture_date=datetime.utcnow(),
+        expiry_date=datetime.utcnow() + timedelta(days=300), cost_price=1.0, quantity_received=50
+    )
+    service = SalesAggregateService(db)
+    service.sync()
+
+    def sold(qty, log_id=None):
+        log = StockLog(id=log_id, medicine_id=med.id, batch_id=batch.id, quantity_used=qty,
+                       reason="sold", logged_at=datetime.utcnow())
+        db.add(log)
+        db.commit()
+        return log.id
+
+    # id n+1 is still in flight when n+2 commits and a sync runs
+    in_flight = sold(2)
+    db.query(StockLog).filter(StockLog.id == in_flight).delete()
+    db.commit()
+    sold(3, log_id=in_flight + 1)
+    assert service.sync()["quantity_added"] == 0
+
+    # n+1 commits late; once both have settled the next sync folds both
+    sold(4, log_id=in_flight)
+    db.query(StockLog).filter(StockLog.medicine_id == med.id).update(
+        {StockLog.logged_at: datetime.utcnow() - timedelta(minutes=10)})
+    db.commit()
+    service.sync()
+    month = datetime.utcnow() - timedelta(minutes=10)
+    assert _monthly(db, med.id) == [(month.year, month.month, 7)]
+
+
+def test_first_syncs_racing_to_create_the_watermark(db_session):
+    from sqlalchemy import event, insert
+    from app.models.sales_aggregate import IngestionWatermark
+
+    db = db_session
+    service = SalesAggregateService(db)
+    service.WATERMARK = "race_test"
+
+    # the other sync inserts the row right after our read found none
+    raced = []
+
+    def other_sync_inserts(state):
+        if state.is_select and not raced:
+            raced.append(True)
+            result = state.invoke_statement().freeze()
+            state.session.connection().execute(
+                insert(IngestionWatermark.__table__).values(name="race_test", last_id=0))
+            return result()
+
+    event.listen(db, "do_orm_execute", other_sync_inserts)
+    try:
+        watermark = service._watermark(lock=True)
+    finally:
+        event.remove(db, "do_orm_execute", other_sync_inserts)
+    assert raced and watermark.name == "race_test" and watermark.last_id == 0
@@ -1,3 +1,4 @@
+import pytest
 from datetime import datetime, timedelta
 from app.models.medicine import Medicine
 from app.services.batch_management_service import BatchManagementService
@@ -50,3 +51,212 @@ def test_expiry_and_low_stock_alerts(db_session):
     # Expect at least one expiry warning and a low stock alert for batch1 (4 < reorder threshold)
     assert any(a.alert_type == "expiry_warning" for a in alerts)
     assert any(a.alert_type == "low_stock" for a in alerts)
+
+
+def _catalogue(db, prefix):
+    """Medicines covering every alert condition, and some covering none."""
+    from app.models.inventory import Inventory
+
+    batch_service = BatchManagementService(db)
+    cases = [
+        # (min threshold, max level, [(days to expiry, quantity)], last dispensed days ago)
+        (5, 100, [(20, 4), (200, 10)], None),       # low + critical + expiry
+        (5, 100, [(200, 50)], None),                # nothing
+        (5, 30, [(200, 60)], 120),                  # overstock, not dispensed lately
+        (5, 30, [(200, 60)], 10),                   # dispensed lately: no overstock
+        (5, None, [(10, 0), (15, 20), (300, 40)], None),   # two expiry + low
+    ]
+    ids = []
+    for i, (minimum, maximum, batches, dispensed) in enumerate(cases):
+        med = Medicine(
+            name=f"ScanMed {prefix}{i}", sku=f"{prefix}-{i}", dosage_form="tablet",
+            unit_of_measurement="tablet", cost_price=2.0, selling_price=5.0,
+            minimum_stock_threshold=minimum, maximum_stock_level=maximum
+        )
+        db.add(med)
+        db.flush()
+        for j, (days, quantity) in enumerate(batches):
+            batch = batch_service.create_batch(
+                medicine_id=med.id, batch_number=f"{prefix}-{i}-{j}",
+                manufacture_date=datetime.utcnow(),
+                expiry_date=datetime.utcnow() + timedelta(days=days),
+                cost_price=2.0, supplier_id=1, quantity_received=quantity
+            )
+            if dispensed is not None:
+                inventory = db.query(Inventory).filter(Inventory.batch_id == batch.id).first()
+                inventory.last_dispensed_at = datetime.utcnow() - timedelta(days=dispensed)
+        ids.append(med.id)
+    db.commit()
+    return ids
+
+
+def _summary(alerts):
+    return [(a.alert_type, a.medicine_id, a.batch_id, a.current_quantity, a.threshold_value)
+            for a in alerts]
+
+
+def test_scan_matches_per_medicine_checks(db_session):
+    from app.models.stock_alert import StockAlert
+
+    db = db_session
+    ids = _catalogue(db, "SCAN-A")
+    service = EnhancedStockAlertService(db)
+
+    scanned = _summary(service.scan_alerts(ids))
+    assert {a[0] for a in scanned} == {"low_stock", "critical_stock", "expiry_warning", "overstock"}
+
+    db.query(StockAlert).filter(StockAlert.medicine_id.in_(ids)).delete()
+    db.commit()
+
+    looped = []
+    for medicine_id in ids:
+        for alert in (service.check_low_stock_alert(medicine_id),
+                      service.check_critical_stock_alert(medicine_id),
+                      *service.check_expiry_alert(medicine_id),
+                      service.check_overstock_alert(medicine_id)):
+            if alert:
+                looped.append(alert)
+    assert scanned == _summary(looped)
+
+
+def test_scan_skips_active_alerts_in_few_queries(db_session):
+    from sqlalchemy import event
+
+    db = db_session
+    ids = _catalogue(db, "SCAN-B")
+    service = EnhancedStockAlertService(db)
+    assert service.scan_alerts(ids)
+
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert service.scan_alerts(ids) == []
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len(statements) == 3
+
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_scan_returns_only_its_own_inserts(db_session, monkeypatch, returning):
+    from sqlalchemy import event
+
+    db = db_session
+    med = Medicine(name=f"RaceMed {returning}", sku=f"SCAN-C-{returning}", dosage_form="tablet",
+                   unit_of_measurement="tablet", cost_price=2.0, selling_price=5.0,
+                   minimum_stock_threshold=10)
+    db.add(med)
+    db.flush()
+    BatchManagementService(db).create_batch(
+        medicine_id=med.id, batch_number=f"SCAN-C-{returning}-A", manufacture_date=datetime.utcnow(),
+        expiry_date=datetime.utcnow() + timedelta(days=200), cost_price=2.0, quantity_received=5
+    )
+    engine = db.get_bind()
+    monkeypatch.setattr(engine.dialect, "insert_executemany_returning", returning)
+
+    # another refresh inserts the same alert right after this scan's insert
+    done = []
+
+    def concurrent_insert(conn, cursor, statement, *args):
+        if statement.startswith("INSERT INTO stock_alerts") and not done:
+            done.append(True)
+            cursor.connection.execute(
+                "INSERT INTO stock_alerts (medicine_id, alert_type, current_quantity, threshold_value, "
+                "is_active, is_acknowledged, created_at) VALUES (?, 'low_stock', 5, 10, 1, 0, ?)",
+                (med.id, "2000-01-01 00:00:00.000000")
+            )
+
+    event.listen(engine, "after_cursor_execute", concurrent_insert)
+    try:
+        alerts = EnhancedStockAlertService(db).scan_alerts([med.id])
+    finally:
+        event.remove(engine, "after_cursor_execute", concurrent_insert)
+
+    assert sorted(a.alert_type for a in alerts) == ["critical_stock", "low_stock"]
+    assert all(a.created_at.year != 2000 for a in alerts)
+
+def _active_types(db, medicine_id):
+    from app.models.stock_alert import StockAlert
+
+    return sorted(a.alert_type for a in db.query(StockAlert).filter(
+        StockAlert.medicine_id == medicine_id, StockAlert.is_active == True
+    ))
+
+
+def test_inventory_mutations_refresh_alerts(db_session):
+    from app.repositories.inventory_repo import InventoryRepository
+    from app.repositories.stock_update_repo import StockUpdateRepository
+    from app.services.fefo_deduction_service import FEFODeductionService
+    from app.services.stock_add_service import StockAddService
+
+    db = db_session
+    med = Medicine(name="HookMed", sku="HOOK-1", dosage_form="tablet", unit_of_measurement="tablet",
+                   cost_price=2.0, selling_price=5.0, minimum_stock_threshold=10)
+    db.add(med)
+    db.flush()
+    batch = BatchManagementService(db).create_batch(
+        medicine_id=med.id, batch_number="HOOK-1-A", manufacture_date=datetime.utcnow(),
+        expiry_date=datetime.utcnow() + timedelta(days=200), cost_price=2.0, quantity_received=50
+    )
+    assert _active_types(db, med.id) == []
+
+    # selling down to 8 crosses the reorder level (10) and the minimum threshold
+    FEFODeductionService(db).deduct_stock_fefo(medicine_id=med.id, quantity_needed=42)
+    assert _active_types(db, med.id) == ["critical_stock", "low_stock"]
+
+    # restocking clears both
+    StockAddService(InventoryRepository(db), StockUpdateRepository(db)).add_stock(
+        medicine_id=med.id, batch_id=batch.id, batch_number="HOOK-1-A",
+        expiry_date=batch.expiry_date, quantity_added=100, cost_price=2.0,
+        supplier_id=1, supplier_name="", staff_id=1, db=db
+    )
+    assert _active_types(db, med.id) == []
+
+
+
+def test_refresh_judges_total_stock_not_the_emptied_batch(db_session):
+    from app.services.fefo_deduction_service import FEFODeductionService
+
+    db = db_session
+    med = Medicine(name="TotalMed", sku="HOOK-3", dosage_form="tablet", unit_of_measurement="tablet",
+                   cost_price=2.0, selling_price=5.0, minimum_stock_threshold=10)
+    db.add(med)
+    db.flush()
+    for i, quantity in enumerate([20, 100]):
+        BatchManagementService(db).create_batch(
+            medicine_id=med.id, batch_number=f"HOOK-3-{i}", manufacture_date=datetime.utcnow(),
+            expiry_date=datetime.utcnow() + timedelta(days=200 + i), cost_price=2.0,
+            quantity_received=quantity
+        )
+
+    # FEFO empties the oldest batch, but 100 units are still on the shelf
+    FEFODeductionService(db).deduct_stock_fefo(medicine_id=med.id, quantity_needed=20)
+    assert _active_types(db, med.id) == []
+
+    FEFODeductionService(db).deduct_stock_fefo(medicine_id=med.id, quantity_needed=95)
+    assert _active_types(db, med.id) == ["critical_stock", "low_stock"]
+
+def test_refresh_queue_covers_outside_writers(db_session):
+    from app.models.inventory import Inventory
+    from app.models.stock_alert import StockAlertRefresh
+
+    db = db_session
+    med = Medicine(name="BridgeMed", sku="HOOK-2", dosage_form="tablet", unit_of_measurement="tablet",
+                   cost_price=2.0, selling_price=5.0, minimum_stock_threshold=10)
+    db.add(med)
+    db.flush()
+    BatchManagementService(db).create_batch(
+        medicine_id=med.id, batch_number="HOOK-2-A", manufacture_date=datetime.utcnow(),
+        expiry_date=datetime.utcnow() + timedelta(days=200), cost_price=2.0, quantity_received=50
+    )
+
+    # what the healix_app bridge does: raw stock update, then queue a refresh
+    db.query(Inventory).filter(Inventory.medicine_id == med.id).update({Inventory.quantity_available: 10})
+    db.add(StockAlertRefresh(medicine_id=med.id, source="healix_app"))
+    db.commit()
+
+    assert EnhancedStockAlertService(db).process_refresh_queue() >= 1
+    assert _active_types(db, med.id) == ["low_stock"]
+    assert db.query(StockAlertRefresh).count() == 0
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from app.models.medicine import Medicine
+from app.models.stock_log import StockLog
+from app.services.batch_management_service import BatchManagementService
+from app.services.stock_analytics_service import StockAnalyticsService
+
+
+def _medicine(db, sku, batch_quantities, sold_last_30_days, sold_earlier=0):
+    med = Medicine(
+        name=f"ReorderMed {sku}",
+        sku=sku,
+        dosage_form="tablet",
+        unit_of_measurement="tablet",
+        cost_price=1.0,
+        selling_price=2.0,
+        minimum_stock_threshold=10,
+    )
+    db.add(med)
+    db.flush()
+
+    batch_service = BatchManagementService(db)
+    batches = [
+        batch_service.create_batch(
+            medicine_id=med.id,
+            batch_number=f"{sku}-{i}",
+            manufacture_date=datetime.utcnow(),
+            expiry_date=datetime.utcnow() + timedelta(days=100 + i),
+            cost_price=1.0,
+            quantity_received=quantity
+        )
+        for i, quantity in enumerate(batch_quantities)
+    ]
+    for quantity, days_ago in ((sold_last_30_days, 3), (sold_earlier, 45)):
+        if quantity:
+            db.add(StockLog(medicine_id=med.id, batch_id=batches[0].id, quantity_used=quantity,
+                            reason="sold", logged_at=datetime.utcnow() - timedelta(days=days_ago)))
+    db.commit()
+    return med.id
+
+
+def test_reorder_recommendations_sum_batches_and_rank_by_cover(db_session):
+    db = db_session
+    fast = _medicine(db, "RO-FAST", [20, 20], sold_last_30_days=300)      # 40 left, 10/day → 4 days
+    faster = _medicine(db, "RO-FASTER", [15], sold_last_30_days=300)      # 15 left, 10/day → 1.5 days
+    spread = _medicine(db, "RO-SPREAD", [5, 5, 200], sold_last_30_days=300)  # 210 left: 21 days, skip
+    old_sales = _medicine(db, "RO-OLD", [8], sold_last_30_days=0, sold_earlier=500)  # below reorder level
+    ours = {fast, faster, spread, old_sales}
+
+    recommendations = [r for r in StockAnalyticsService(db).get_reorder_recommendations()
+                       if r["medicine_id"] in ours]
+
+    assert [r["medicine_id"] for r in recommendations] == [faster, fast, old_sales]
+    by_id = {r["medicine_id"]: r for r in recommendations}
+    assert by_id[fast]["current_quantity"] == 40
+    assert by_id[fast]["daily_average"] == 10.0
+    assert by_id[fast]["days_remaining"] == 4.0
+    assert by_id[old_sales]["days_remaining"] == "N/A"
+    ranks = [r["rank"] for r in recommendations]
+    assert ranks == sorted(ranks)
+
+
+def test_reorder_recommendations_run_one_query(db_session):
+    from sqlalchemy import event
+
+    db = db_session
+    for i in range(5):
+        _medicine(db, f"RO-Q{i}", [5, 5], sold_last_30_days=100)
+
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        StockAnalyticsService(db).get_reorder_recommendations()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len(statements) == 1